@@ -0,0 +1,192 @@
+"""
+Índice de busca textual unificado.
+
+Cada registro pesquisável vira um DocumentoBusca com o texto já normalizado (sem acentos, minúsculo).
+No SQLite o texto é indexado por uma tabela virtual FTS5 de conteúdo externo, mantida por gatilhos;
+no PostgreSQL, por um índice GIN sobre to_tsvector('simple', texto). Nos dois casos a consulta usa
+prefixo em cada termo (busca enquanto se digita) e ordena pela relevância.
+"""
+import re
+import unicodedata
+
+from django.apps import apps as django_apps
+from django.db import connection, transaction
+
+from .models import DocumentoBusca
+
+TAMANHO_LOTE = 1000
+LIMITE_RESULTADOS = 20
+CANDIDATOS_FTS = 2000
+TABELA_FTS = 'busca_documentobusca_fts'
+
+_conexoes_com_fts5 = set()
+
+
+def normalizar(texto):
+    """Remove acentos e converte para minúsculas ('João' -> 'joao')."""
+    texto = unicodedata.normalize('NFKD', str(texto or ''))
+    return ''.join(c for c in texto if not unicodedata.combining(c)).lower()
+
+
+def _apenas_digitos(valor):
+    return re.sub(r'\D', '', valor or '')
+
+
+def _colaborador(id, nome_completo, cpf, email):
+    return nome_completo, f'CPF {cpf}', [nome_completo, cpf, email]
+
+
+def _pessoa(id, nome_razao_social, cpf_cnpj, email, cidade):
+    return nome_razao_social, cpf_cnpj or '', [nome_razao_social, cpf_cnpj, _apenas_digitos(cpf_cnpj), email, cidade]
+
+
+def _veiculo(id, placa, marca, modelo, chassi):
+    # A placa também entra sem separadores, para 'abc1234' encontrar 'ABC-1234'
+    return placa, f'{marca} {modelo}', [placa, re.sub(r'\W', '', placa), marca, modelo, chassi]
+
+
+def _lancamento(id, descricao, tipo_lancamento, valor_original, data_vencimento):
+    return descricao[:255], f'{tipo_lancamento} de {valor_original} com vencimento em {data_vencimento:%d/%m/%Y}', [descricao]
+
+
+# tipo -> (modelo, campos lidos, função que monta (título, detalhe, textos pesquisáveis))
+FONTES = {
+    'colaborador': ('rh.Colaborador', ('id', 'nome_completo', 'cpf', 'email'), _colaborador),
+    'pessoa': ('financeiro.Pessoa', ('id', 'nome_razao_social', 'cpf_cnpj', 'email', 'cidade'), _pessoa),
+    'veiculo': ('veiculos.Veiculo', ('id', 'placa', 'marca', 'modelo', 'chassi'), _veiculo),
+    'lancamento': ('financeiro.LancamentoFinanceiro', ('id', 'descricao', 'tipo_lancamento', 'valor_original', 'data_vencimento'), _lancamento),
+}
+
+
+def tipo_do_modelo(modelo):
+    rotulo = modelo._meta.label
+    for tipo, (rotulo_fonte, _, _) in FONTES.items():
+        if rotulo_fonte == rotulo:
+            return tipo
+    return None
+
+
+def _documento(tipo, valores, modelo_documento=DocumentoBusca):
+    _, _, montar = FONTES[tipo]
+    titulo, detalhe, textos = montar(*valores)
+    return modelo_documento(
+        tipo=tipo,
+        objeto_id=valores[0],
+        titulo=titulo,
+        detalhe=detalhe,
+        texto=normalizar(' '.join(t for t in textos if t)),
+    )
+
+
+def indexar_objetos(objetos):
+    """
+    (Re)indexa instâncias dos modelos pesquisáveis. Usado pelos sinais e pelas gravações em lote
+    (bulk_create não dispara sinais).
+    """
+    por_tipo = {}
+    for objeto in objetos:
+        tipo = tipo_do_modelo(type(objeto))
+        if tipo is not None and objeto.pk is not None:
+            por_tipo.setdefault(tipo, []).append(objeto)
+
+    for tipo, lista in por_tipo.items():
+        _, campos, _ = FONTES[tipo]
+        documentos = [_documento(tipo, [getattr(o, campo) for campo in campos]) for o in lista]
+        with transaction.atomic():
+            # Apaga e insere: os gatilhos do FTS tratam remoção e inclusão da mesma forma que uma atualização
+            DocumentoBusca.objects.filter(tipo=tipo, objeto_id__in=[d.objeto_id for d in documentos]).delete()
+            DocumentoBusca.objects.bulk_create(documentos, batch_size=TAMANHO_LOTE)
+
+
+def remover_objetos(tipo, ids):
+    DocumentoBusca.objects.filter(tipo=tipo, objeto_id__in=list(ids)).delete()
+
+
+def reindexar(tipos=None, get_model=django_apps.get_model, modelo_documento=DocumentoBusca):
+    """
+    Reconstrói o índice dos tipos informados (todos por padrão) a partir das tabelas de origem.
+    Também usado pela migração inicial, com os modelos históricos. Retorna {tipo: documentos}.
+    """
+    totais = {}
+    for tipo in tipos or FONTES:
+        rotulo, campos, _ = FONTES[tipo]
+        modelo = get_model(rotulo)
+        with transaction.atomic():
+            modelo_documento.objects.filter(tipo=tipo).delete()
+            lote = []
+            totais[tipo] = 0
+            for valores in modelo.objects.values_list(*campos).iterator(chunk_size=TAMANHO_LOTE):
+                lote.append(_documento(tipo, valores, modelo_documento))
+                if len(lote) >= TAMANHO_LOTE:
+                    modelo_documento.objects.bulk_create(lote)
+                    totais[tipo] += len(lote)
+                    lote = []
+            modelo_documento.objects.bulk_create(lote)
+            totais[tipo] += len(lote)
+    otimizar(connection)
+    return totais
+
+
+def otimizar(conexao):
+    """Compacta os segmentos do índice FTS5 após cargas grandes."""
+    if fts5_disponivel(conexao):
+        with conexao.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {TABELA_FTS}({TABELA_FTS}) VALUES ('optimize')")
+
+
+def fts5_disponivel(conexao):
+    # A tabela FTS5 só existe se o SQLite tiver sido compilado com o módulo (ver a migração inicial)
+    if conexao.vendor != 'sqlite':
+        return False
+    if conexao.alias not in _conexoes_com_fts5 and TABELA_FTS in conexao.introspection.table_names():
+        _conexoes_com_fts5.add(conexao.alias)
+    return conexao.alias in _conexoes_com_fts5
+
+
+def _termos(consulta):
+    return re.findall(r'\w+', normalizar(consulta))
+
+
+def buscar(consulta, tipos=None, limite=LIMITE_RESULTADOS):
+    """
+    Documentos que contêm todos os termos da consulta, cada um como prefixo de uma palavra
+    ('jo sil' encontra 'João da Silva'), em ordem de relevância.
+    """
+    termos = _termos(consulta)
+    if not termos:
+        return []
+
+    tipos = [tipo for tipo in tipos or () if tipo in FONTES]
+    if fts5_disponivel(connection):
+        consulta_fts = 'texto : (' + ' '.join(f'"{termo}"*' for termo in termos) + ')'
+        if tipos:
+            consulta_fts += ' AND tipo : (' + ' OR '.join(tipos) + ')'
+        # A relevância (bm25) é calculada só para os primeiros CANDIDATOS_FTS documentos encontrados:
+        # prefixos curtos casam com boa parte da tabela e ordenar todos passaria do tempo de digitação.
+        # Quando há menos candidatos que isso, a ordenação é exata.
+        return list(DocumentoBusca.objects.raw(
+            f'SELECT d.id, d.tipo, d.objeto_id, d.titulo, d.detalhe'
+            f' FROM (SELECT rowid, rank FROM {TABELA_FTS} WHERE {TABELA_FTS} MATCH %s LIMIT %s) f'
+            f' JOIN busca_documentobusca d ON d.id = f.rowid'
+            f' ORDER BY f.rank LIMIT %s',
+            [consulta_fts, CANDIDATOS_FTS, limite],
+        ))
+
+    documentos = DocumentoBusca.objects.defer('texto')
+    if tipos:
+        documentos = documentos.filter(tipo__in=tipos)
+    if connection.vendor == 'postgresql':
+        # Mesma expressão do índice GIN criado na migração, para que ele seja usado
+        consulta_ts = ' & '.join(f'{termo}:*' for termo in termos)
+        documentos = documentos.extra(
+            select={'relevancia': "ts_rank(to_tsvector('simple', texto), to_tsquery('simple', %s))"},
+            select_params=[consulta_ts],
+            where=["to_tsvector('simple', texto) @@ to_tsquery('simple', %s)"],
+            params=[consulta_ts],
+            order_by=['-relevancia'],
+        )
+    else:
+        # Outros bancos: varredura por substring, sem índice
+        for termo in termos:
+            documentos = documentos.filter(texto__contains=termo)
+    return list(documentos[:limite])
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from busca.indexacao import FONTES, reindexar
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói o índice de busca textual a partir dos cadastros (ex.: após cargas em lote).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('tipos', nargs='*', help=f'Tipos a reindexar ({", ".join(FONTES)}). Padrão: todos.')
+
+    def handle(self, *args, **options):
+        desconhecidos = set(options['tipos']) - set(FONTES)
+        if desconhecidos:
+            raise CommandError(f'Tipo(s) desconhecido(s): {", ".join(sorted(desconhecidos))}.')
+
+        for tipo, total in reindexar(options['tipos']).items():
+            self.stdout.write(self.style.SUCCESS(f'{tipo}: {total} documento(s) indexado(s).'))
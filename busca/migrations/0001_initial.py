@@ -0,0 +1,84 @@
+# Generated by Django 4.2.11 on 2026-10-17 03:09
+
+from django.db import migrations, models
+
+
+def criar_indice_textual(apps, schema_editor):
+    # A tabela FTS5 é de conteúdo externo: guarda só o índice e lê o texto de busca_documentobusca.
+    # O tipo também é indexado, para filtrar por tipo dentro da própria consulta MATCH.
+    # Os gatilhos mantêm o índice em dia com qualquer escrita na tabela, inclusive em lote.
+    conexao = schema_editor.connection
+    if conexao.vendor == 'sqlite':
+        with conexao.cursor() as cursor:
+            opcoes = {linha[0] for linha in cursor.execute('PRAGMA compile_options').fetchall()}
+        if 'ENABLE_FTS5' not in opcoes:
+            return # Sem FTS5 a busca recorre a uma varredura por substring (ver busca/indexacao.py)
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE busca_documentobusca_fts USING fts5("
+            "tipo, texto, content='busca_documentobusca', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+        schema_editor.execute(
+            "CREATE TRIGGER busca_documentobusca_ai AFTER INSERT ON busca_documentobusca BEGIN "
+            "INSERT INTO busca_documentobusca_fts(rowid, tipo, texto) VALUES (new.id, new.tipo, new.texto); END"
+        )
+        schema_editor.execute(
+            "CREATE TRIGGER busca_documentobusca_ad AFTER DELETE ON busca_documentobusca BEGIN "
+            "INSERT INTO busca_documentobusca_fts(busca_documentobusca_fts, rowid, tipo, texto) VALUES ('delete', old.id, old.tipo, old.texto); END"
+        )
+        schema_editor.execute(
+            "CREATE TRIGGER busca_documentobusca_au AFTER UPDATE ON busca_documentobusca BEGIN "
+            "INSERT INTO busca_documentobusca_fts(busca_documentobusca_fts, rowid, tipo, texto) VALUES ('delete', old.id, old.tipo, old.texto); "
+            "INSERT INTO busca_documentobusca_fts(rowid, tipo, texto) VALUES (new.id, new.tipo, new.texto); END"
+        )
+    elif conexao.vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE INDEX busca_doc_texto_gin ON busca_documentobusca USING GIN (to_tsvector('simple', texto))"
+        )
+
+
+def remover_indice_textual(apps, schema_editor):
+    conexao = schema_editor.connection
+    if conexao.vendor == 'sqlite':
+        for gatilho in ('busca_documentobusca_ai', 'busca_documentobusca_ad', 'busca_documentobusca_au'):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {gatilho}')
+        schema_editor.execute('DROP TABLE IF EXISTS busca_documentobusca_fts')
+    elif conexao.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS busca_doc_texto_gin')
+
+
+def popular_indice(apps, schema_editor):
+    # Indexa os cadastros já existentes antes de os sinais assumirem a manutenção
+    from busca.indexacao import reindexar
+    reindexar(get_model=apps.get_model, modelo_documento=apps.get_model('busca', 'DocumentoBusca'))
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('financeiro', '0003_contacontabilhierarquia'),
+        ('rh', '0004_historicopagamento_unico_por_periodo'),
+        ('veiculos', '0003_agenda_manutencao'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentoBusca',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('colaborador', 'Colaborador'), ('pessoa', 'Pessoa'), ('veiculo', 'Veículo'), ('lancamento', 'Lançamento Financeiro')], max_length=20)),
+                ('objeto_id', models.BigIntegerField()),
+                ('titulo', models.CharField(max_length=255)),
+                ('detalhe', models.CharField(blank=True, max_length=255)),
+                ('texto', models.TextField()),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='documentobusca',
+            constraint=models.UniqueConstraint(fields=('tipo', 'objeto_id'), name='busca_doc_tipo_objeto_uniq'),
+        ),
+        migrations.RunPython(criar_indice_textual, remover_indice_textual),
+        migrations.RunPython(popular_indice, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+from django.db import models
+
+class DocumentoBusca(models.Model):
+    """
+    Um registro pesquisável (colaborador, pessoa, veículo ou lançamento) no índice de busca textual.
+    `texto` guarda os campos pesquisáveis já sem acentos e em minúsculas; é indexado por uma tabela
+    FTS5 no SQLite ou por um índice GIN de tsvector no PostgreSQL (ver busca/indexacao.py).
+    Alterações de esquema que recriem a tabela no SQLite descartam os gatilhos do FTS5, que
+    precisam ser recriados na mesma migração (ver busca/migrations/0001_initial.py).
+    """
+    TIPO_CHOICES = [
+        ('colaborador', 'Colaborador'),
+        ('pessoa', 'Pessoa'),
+        ('veiculo', 'Veículo'),
+        ('lancamento', 'Lançamento Financeiro'),
+    ]
+    tipo = models.CharField(max_length=20, choices=TIPO_CHOICES)
+    objeto_id = models.BigIntegerField()
+    titulo = models.CharField(max_length=255)
+    detalhe = models.CharField(max_length=255, blank=True)
+    texto = models.TextField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['tipo', 'objeto_id'], name='busca_doc_tipo_objeto_uniq'),
+        ]
+
+    def __str__(self):
+        return f'{self.get_tipo_display()}: {self.titulo}'
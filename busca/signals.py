@@ -0,0 +1,26 @@
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save
+
+from . import indexacao
+
+
+def _campos_indexados(sender):
+    _, campos, _ = indexacao.FONTES[indexacao.tipo_do_modelo(sender)]
+    return campos
+
+
+def atualizar_indice(sender, instance, update_fields=None, **kwargs):
+    # Gravações parciais que não tocam nos campos pesquisáveis (ex.: baixa de um lançamento) não reindexam
+    if update_fields is not None and not set(update_fields) & set(_campos_indexados(sender)):
+        return
+    indexacao.indexar_objetos([instance])
+
+
+def remover_do_indice(sender, instance, **kwargs):
+    indexacao.remover_objetos(indexacao.tipo_do_modelo(sender), [instance.pk])
+
+
+for rotulo, _, _ in indexacao.FONTES.values():
+    modelo = apps.get_model(rotulo)
+    post_save.connect(atualizar_indice, sender=modelo, dispatch_uid=f'busca_indexar_{rotulo}')
+    post_delete.connect(remover_do_indice, sender=modelo, dispatch_uid=f'busca_remover_{rotulo}')
@@ -0,0 +1,78 @@
+import datetime
+import unittest
+
+from django.db import connection
+from django.test import TestCase
+
+from rh.models import Colaborador
+from veiculos.models import Veiculo
+
+from .indexacao import TABELA_FTS, buscar, fts5_disponivel, reindexar
+from .models import DocumentoBusca
+
+
+def _titulos(consulta, **opcoes):
+    return [documento.titulo for documento in buscar(consulta, **opcoes)]
+
+
+class BuscaTests(TestCase):
+    def setUp(self):
+        self.joao = Colaborador.objects.create(
+            nome_completo='João da Conceição', cpf='12345678901', email='joao@empresa.com.br',
+            data_nascimento=datetime.date(1990, 5, 17),
+        )
+        Colaborador.objects.create(
+            nome_completo='Joana Silva', cpf='98765432100', email='joana@empresa.com.br',
+            data_nascimento=datetime.date(1988, 1, 2),
+        )
+        Veiculo.objects.create(placa='ABC-1234', modelo='Atego', marca='Mercedes', ano_fabricacao=2020)
+
+    def _conferir_fts(self):
+        # O integrity-check falha se o índice FTS5 divergir da tabela de documentos
+        if fts5_disponivel(connection):
+            with connection.cursor() as cursor:
+                cursor.execute(f"INSERT INTO {TABELA_FTS}({TABELA_FTS}) VALUES ('integrity-check')")
+
+    def test_busca_ignora_acentos_e_maiusculas(self):
+        self.assertEqual(_titulos('JOÃO'), ['João da Conceição'])
+        self.assertEqual(_titulos('joao conceicao'), ['João da Conceição'])
+        self.assertEqual(_titulos('Conceição'), ['João da Conceição'])
+        self.assertEqual(sorted(_titulos('jo')), ['Joana Silva', 'João da Conceição'])
+        self.assertEqual(_titulos('jo sil'), ['Joana Silva'])
+        self.assertEqual(_titulos('abc1234'), ['ABC-1234'])
+        self.assertEqual(_titulos('jo', tipos=['veiculo']), [])
+        self.assertEqual(_titulos('...'), [])
+
+    def test_indice_acompanha_alteracoes_e_exclusoes(self):
+        self.joao.nome_completo = 'José Antônio'
+        self.joao.save()
+        self.assertEqual(_titulos('conceicao'), [])
+        self.assertEqual(_titulos('jose antonio'), ['José Antônio'])
+        self.assertEqual(DocumentoBusca.objects.filter(tipo='colaborador', objeto_id=self.joao.pk).count(), 1)
+        self._conferir_fts()
+
+        self.joao.delete()
+        self.assertEqual(_titulos('jose'), [])
+        self.assertFalse(DocumentoBusca.objects.filter(tipo='colaborador', objeto_id=self.joao.pk).exists())
+        self._conferir_fts()
+
+    def test_gravacao_parcial_sem_campos_pesquisaveis_nao_reindexa(self):
+        documento = DocumentoBusca.objects.get(tipo='colaborador', objeto_id=self.joao.pk)
+        self.joao.status = 'inativo'
+        self.joao.save(update_fields=['status'])
+        self.assertEqual(DocumentoBusca.objects.get(tipo='colaborador', objeto_id=self.joao.pk).pk, documento.pk)
+
+    def test_reindexar_reconstroi_o_indice(self):
+        DocumentoBusca.objects.all().delete()
+        self.assertEqual(_titulos('joao'), [])
+        self.assertEqual(reindexar(['colaborador', 'veiculo']), {'colaborador': 2, 'veiculo': 1})
+        self.assertEqual(_titulos('joao'), ['João da Conceição'])
+        self._conferir_fts()
+
+    @unittest.skipUnless(connection.vendor == 'sqlite', 'índice FTS5 só existe no SQLite')
+    def test_consulta_usa_fts5(self):
+        self.assertTrue(fts5_disponivel(connection))
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT rowid FROM {TABELA_FTS} WHERE {TABELA_FTS} MATCH %s', ['texto : "conceicao"*'])
+            ids = [linha[0] for linha in cursor.fetchall()]
+        self.assertEqual(ids, list(DocumentoBusca.objects.filter(objeto_id=self.joao.pk, tipo='colaborador').values_list('pk', flat=True)))
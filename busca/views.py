@@ -0,0 +1,33 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+
+from .indexacao import FONTES, LIMITE_RESULTADOS, buscar as buscar_documentos
+
+TAMANHO_MINIMO_CONSULTA = 2
+LIMITE_MAXIMO = 100
+
+
+@staff_member_required
+def buscar(request):
+    """
+    Busca textual unificada (JSON), para uso enquanto o usuário digita. Restrita à equipe: o índice
+    inclui CPF, CNPJ e e-mail.
+    Parâmetros: q (termos), tipo (um ou mais de colaborador, pessoa, veiculo, lancamento) e limite.
+    """
+    consulta = request.GET.get('q', '').strip()
+    tipos = [tipo for tipo in request.GET.getlist('tipo') if tipo in FONTES]
+    try:
+        limite = min(int(request.GET.get('limite', LIMITE_RESULTADOS)), LIMITE_MAXIMO)
+    except ValueError:
+        limite = LIMITE_RESULTADOS
+
+    resultados = []
+    if len(consulta) >= TAMANHO_MINIMO_CONSULTA:
+        resultados = buscar_documentos(consulta, tipos=tipos, limite=limite)
+    return JsonResponse({
+        'q': consulta,
+        'resultados': [
+            {'tipo': d.tipo, 'id': d.objeto_id, 'titulo': d.titulo, 'detalhe': d.detalhe}
+            for d in resultados
+        ],
+    })
@@ -1,3 +1,91 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import (
+    CentroCusto, Cliente, ContaBancaria, ContaCartao, ContaContabil, Fornecedor, LancamentoFinanceiro,
+    LancamentoRecorrente, LinhaExtrato, NotaFiscal, Pessoa,
+)
+
+# Tabelas materializadas (cubo do fluxo de caixa, hierarquia do plano de contas) ficam fora do admin:
+# são mantidas pelos sinais.
+
+@admin.register(ContaContabil)
+class ContaContabilAdmin(admin.ModelAdmin):
+    list_display = ('codigo', 'nome', 'tipo', 'conta_pai', 'aceita_lancamentos')
+    list_select_related = ('conta_pai',)
+    list_filter = ('tipo', 'aceita_lancamentos')
+    search_fields = ('codigo', 'nome')
+    ordering = ('codigo',)
+
+@admin.register(CentroCusto)
+class CentroCustoAdmin(admin.ModelAdmin):
+    list_display = ('codigo', 'nome', 'ativo')
+    list_filter = ('ativo',)
+    search_fields = ('codigo', 'nome')
+
+@admin.register(Pessoa)
+class PessoaAdmin(admin.ModelAdmin):
+    list_display = ('nome_razao_social', 'tipo', 'cpf_cnpj', 'cidade', 'estado', 'ativo')
+    list_filter = ('tipo', 'ativo')
+    search_fields = ('nome_razao_social', 'cpf_cnpj')
+
+@admin.register(Cliente)
+class ClienteAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'limite_credito')
+    list_select_related = ('pessoa',)
+    search_fields = ('pessoa__nome_razao_social', 'pessoa__cpf_cnpj')
+    raw_id_fields = ('pessoa',)
+
+@admin.register(Fornecedor)
+class FornecedorAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'prazo_pagamento_padrao')
+    list_select_related = ('pessoa',)
+    search_fields = ('pessoa__nome_razao_social', 'pessoa__cpf_cnpj')
+    raw_id_fields = ('pessoa',)
+
+@admin.register(ContaBancaria)
+class ContaBancariaAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'saldo_inicial', 'saldo_atual', 'ativa')
+    list_filter = ('ativa',)
+    readonly_fields = ('saldo_atual',) # Mantido pelos lançamentos quitados (financeiro/saldos.py)
+
+@admin.register(ContaCartao)
+class ContaCartaoAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'titular', 'ativa')
+    list_filter = ('ativa', 'tipo')
+
+@admin.register(NotaFiscal)
+class NotaFiscalAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'tipo', 'data_emissao', 'valor_total', 'cliente', 'fornecedor')
+    list_select_related = ('cliente__pessoa', 'fornecedor__pessoa')
+    list_filter = ('tipo',)
+    search_fields = ('numero', 'cliente__pessoa__nome_razao_social', 'fornecedor__pessoa__nome_razao_social')
+    date_hierarchy = 'data_emissao'
+    raw_id_fields = ('cliente', 'fornecedor')
+
+@admin.register(LancamentoFinanceiro)
+class LancamentoFinanceiroAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'tipo_lancamento', 'status', 'data_vencimento', 'valor_original', 'valor_quitado', 'conta_contabil', 'centro_custo', 'pessoa')
+    list_select_related = ('conta_contabil', 'centro_custo', 'pessoa')
+    list_filter = ('tipo_lancamento', 'status')
+    search_fields = ('descricao', 'pessoa__nome_razao_social')
+    date_hierarchy = 'data_vencimento'
+    raw_id_fields = ('pessoa', 'nota_fiscal', 'historico_pagamento', 'abastecimento', 'manutencao', 'recorrencia')
+
+@admin.register(LancamentoRecorrente)
+class LancamentoRecorrenteAdmin(admin.ModelAdmin):
+    list_display = ('descricao', 'tipo_lancamento', 'valor', 'intervalo_meses', 'dia_vencimento', 'data_inicio', 'data_fim', 'ativo', 'materializado_ate')
+    list_select_related = ('conta_contabil', 'centro_custo', 'pessoa')
+    list_filter = ('tipo_lancamento', 'intervalo_meses', 'ativo')
+    search_fields = ('descricao', 'pessoa__nome_razao_social')
+    raw_id_fields = ('pessoa',)
+    readonly_fields = ('materializado_ate',)
+
+@admin.register(LinhaExtrato)
+class LinhaExtratoAdmin(admin.ModelAdmin):
+    list_display = ('data', 'conta_bancaria', 'tipo', 'valor', 'descricao', 'documento', 'lancamento')
+    list_select_related = ('conta_bancaria', 'lancamento')
+    list_filter = ('tipo', 'origem', 'conta_bancaria')
+    search_fields = ('descricao', 'documento')
+    date_hierarchy = 'data'
+    raw_id_fields = ('lancamento',)
+    readonly_fields = ('identificador', 'origem', 'data_importacao')
@@ -0,0 +1,118 @@
+"""
+Conciliação automática dos extratos bancários (LinhaExtrato) com os lançamentos em aberto.
+
+Um movimento concilia com um lançamento em aberto do mesmo sentido (crédito/receita, débito/despesa)
+e do mesmo valor, vinculado à mesma conta bancária ou ainda sem conta, com vencimento até
+`janela_dias` dias antes ou depois da data do movimento; entre vários, vale o vencimento mais próximo.
+
+Os candidatos são carregados em uma consulta (índice status + data_vencimento) e agrupados por
+(tipo, conta, valor); cada grupo fica ordenado por vencimento e a busca na janela é uma bisseção,
+sem comparar cada movimento com cada lançamento. Os lançamentos conciliados são quitados com um
+UPDATE por data e conta, e os dados consolidados (fluxo de caixa, saldos, cache dos painéis)
+recebem as alterações de uma vez.
+"""
+import datetime
+from bisect import bisect_left
+from collections import defaultdict
+from dataclasses import dataclass
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import LancamentoFinanceiro, LinhaExtrato
+from .signals import CAMPOS_MONITORADOS, registrar_alteracoes_lancamentos
+
+JANELA_DIAS = 5
+TAMANHO_LOTE = 1000
+TIPO_LANCAMENTO = {'credito': 'receita', 'debito': 'despesa'}
+
+
+@dataclass
+class ResultadoConciliacao:
+    conciliadas: int = 0
+    pendentes: int = 0
+
+
+def _candidatos(contas, inicio, fim):
+    """Lançamentos em aberto no período, agrupados por (tipo, conta, valor) e ordenados por vencimento."""
+    lancamentos = (
+        LancamentoFinanceiro.objects.filter(status='aberto', data_vencimento__range=(inicio, fim))
+        .filter(Q(conta_bancaria_id__in=contas) | Q(conta_bancaria__isnull=True))
+        .select_for_update()
+        .values('id', *CAMPOS_MONITORADOS)
+    )
+    grupos = defaultdict(list)
+    estados = {}
+    for lancamento in lancamentos.iterator(chunk_size=TAMANHO_LOTE):
+        chave = (lancamento['tipo_lancamento'], lancamento['conta_bancaria_id'], lancamento['valor_original'])
+        grupos[chave].append((lancamento['data_vencimento'], lancamento['id']))
+        estados[lancamento['id']] = lancamento
+    for grupo in grupos.values():
+        grupo.sort()
+    return grupos, estados
+
+
+def _mais_proximo(grupo, data, janela):
+    """Posição no grupo do vencimento mais próximo de `data` dentro da janela, e a distância em dias."""
+    melhor = None
+    posicao = bisect_left(grupo, (data - janela,))
+    while posicao < len(grupo) and grupo[posicao][0] <= data + janela:
+        distancia = abs((grupo[posicao][0] - data).days)
+        if melhor is None or distancia < melhor[1]: # Empate: fica o vencimento mais antigo
+            melhor = (posicao, distancia)
+        posicao += 1
+    return melhor
+
+
+def conciliar(conta_ids=None, janela_dias=JANELA_DIAS):
+    """
+    Concilia os movimentos ainda pendentes das contas informadas (todas, se None): associa cada um a
+    um lançamento e quita o lançamento na data do movimento, na conta do extrato.
+    """
+    janela = datetime.timedelta(days=janela_dias)
+    with transaction.atomic():
+        linhas = LinhaExtrato.objects.filter(lancamento__isnull=True).order_by('data', 'id')
+        if conta_ids is not None:
+            linhas = linhas.filter(conta_bancaria_id__in=list(conta_ids))
+        linhas = list(linhas.only('id', 'conta_bancaria_id', 'data', 'tipo', 'valor'))
+        if not linhas:
+            return ResultadoConciliacao()
+
+        contas = {linha.conta_bancaria_id for linha in linhas}
+        grupos, estados = _candidatos(contas, linhas[0].data - janela, linhas[-1].data + janela)
+
+        conciliadas = []
+        quitados = defaultdict(list) # (data, conta) -> ids dos lançamentos
+        for linha in linhas:
+            escolhido = None
+            # A conta do próprio extrato tem preferência sobre os lançamentos ainda sem conta
+            for prioridade, conta_id in enumerate((linha.conta_bancaria_id, None)):
+                grupo = grupos.get((TIPO_LANCAMENTO[linha.tipo], conta_id, linha.valor))
+                encontrado = _mais_proximo(grupo, linha.data, janela) if grupo else None
+                if encontrado is not None and (escolhido is None or (encontrado[1], prioridade) < escolhido[2]):
+                    escolhido = (grupo, encontrado[0], (encontrado[1], prioridade))
+            if escolhido is None:
+                continue
+            grupo, posicao, _ = escolhido
+            _, lancamento_id = grupo.pop(posicao)
+            linha.lancamento_id = lancamento_id
+            conciliadas.append(linha)
+            quitados[(linha.data, linha.conta_bancaria_id)].append(lancamento_id)
+
+        agora = timezone.now()
+        alteracoes = []
+        for (data, conta_id), ids in quitados.items():
+            for inicio in range(0, len(ids), TAMANHO_LOTE):
+                LancamentoFinanceiro.objects.filter(pk__in=ids[inicio:inicio + TAMANHO_LOTE]).update(
+                    status='quitado', valor_quitado=F('valor_original'), data_pagamento_recebimento=data,
+                    conta_bancaria_id=conta_id, data_atualizacao=agora,
+                )
+            for lancamento_id in ids:
+                anterior = {campo: estados[lancamento_id][campo] for campo in CAMPOS_MONITORADOS}
+                atual = dict(anterior, status='quitado', valor_quitado=anterior['valor_original'], conta_bancaria_id=conta_id)
+                alteracoes.append((anterior, atual))
+        LinhaExtrato.objects.bulk_update(conciliadas, ['lancamento'], batch_size=TAMANHO_LOTE)
+        # UPDATE em lote não dispara os sinais que mantêm os consolidados e o cache dos painéis
+        registrar_alteracoes_lancamentos(alteracoes)
+    return ResultadoConciliacao(conciliadas=len(conciliadas), pendentes=len(linhas) - len(conciliadas))
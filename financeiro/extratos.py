@@ -0,0 +1,214 @@
+"""
+Leitura de extratos bancários e importação dos movimentos em LinhaExtrato.
+
+Formatos aceitos (detectados pelo conteúdo):
+- OFX 1.x (SGML) e 2.x (XML): cada STMTTRN vira um movimento; a conta vem de BANKACCTFROM/ACCTID.
+- CNAB 240 (FEBRABAN): segmento E (extrato para conciliação) e segmentos T/U do retorno de
+  cobrança (títulos liquidados viram créditos). A conta vem do próprio segmento E ou do header do arquivo.
+
+Os arquivos são lidos linha a linha. Cada movimento recebe um identificador derivado de data, valor,
+documento e descrição (com um contador para movimentos idênticos no mesmo arquivo): reimportar um
+extrato, ou outro que cubra parte do mesmo período, não duplica as linhas.
+"""
+import datetime
+import hashlib
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+
+from .models import ContaBancaria, LinhaExtrato
+
+TAMANHO_LOTE = 1000
+TAG_OFX = re.compile(r'<(/?)([A-Za-z0-9.]+)>([^<]*)')
+TAMANHO_REGISTRO_CNAB = 240
+MOVIMENTOS_LIQUIDACAO = {'06', '17'} # Retorno de cobrança: liquidação e liquidação após baixa
+
+
+@dataclass
+class ResultadoImportacao:
+    importadas: int = 0
+    duplicadas: int = 0
+    contas: set = field(default_factory=set) # ids das contas bancárias com movimentos no arquivo
+
+
+def _apenas_digitos(valor):
+    return re.sub(r'\D', '', valor or '')
+
+
+def _numero_conta(valor):
+    return _apenas_digitos(valor).lstrip('0')
+
+
+def _decodificar(linha):
+    try:
+        return linha.decode('utf-8')
+    except UnicodeDecodeError:
+        return linha.decode('cp1252', errors='replace') # OFX 1.x dos bancos brasileiros: CHARSET:1252
+
+
+def _movimento(conta, data, valor, descricao, documento):
+    return {
+        'conta': conta,
+        'data': data,
+        'tipo': 'credito' if valor > 0 else 'debito',
+        'valor': abs(valor),
+        'descricao': ' '.join(descricao.split())[:255],
+        'documento': documento.strip()[:64],
+    }
+
+
+def ler_ofx(arquivo):
+    """Movimentos de um OFX: dicts com conta, data, tipo, valor (positivo), descricao e documento."""
+    conta = None
+    transacao = None
+    em_conta = False
+    for numero, linha in enumerate(arquivo, start=1):
+        for fechamento, tag, valor in TAG_OFX.findall(_decodificar(linha)):
+            tag, valor = tag.upper(), valor.strip()
+            if tag in ('BANKACCTFROM', 'CCACCTFROM'):
+                em_conta = not fechamento
+            elif tag == 'ACCTID' and em_conta and not fechamento:
+                conta = valor
+            elif tag == 'STMTTRN':
+                if fechamento and transacao is not None:
+                    yield _movimento_ofx(conta, transacao, numero)
+                transacao = None if fechamento else {}
+            elif transacao is not None and not fechamento:
+                transacao[tag] = valor
+
+
+def _movimento_ofx(conta, transacao, numero):
+    try:
+        data = datetime.datetime.strptime(transacao.get('DTPOSTED', '')[:8], '%Y%m%d').date()
+        valor = Decimal(transacao.get('TRNAMT', '').replace(',', '.'))
+    except (ValueError, InvalidOperation):
+        raise ValueError(f'Linha {numero}: movimento com data ou valor inválido.')
+    descricao = transacao.get('MEMO') or transacao.get('NAME') or transacao.get('TRNTYPE', '')
+    return _movimento(conta, data, valor, descricao, transacao.get('FITID') or transacao.get('CHECKNUM', ''))
+
+
+def _registros_cnab(arquivo):
+    for linha in arquivo:
+        linha = linha.decode('latin-1').rstrip('\r\n')
+        # Há bancos que gravam o arquivo sem quebras de linha
+        for inicio in range(0, len(linha), TAMANHO_REGISTRO_CNAB):
+            registro = linha[inicio:inicio + TAMANHO_REGISTRO_CNAB]
+            if registro.strip():
+                yield registro
+
+
+def _data_cnab(valor):
+    return datetime.datetime.strptime(valor, '%d%m%Y').date()
+
+
+def _valor_cnab(valor):
+    return Decimal(int(valor)) / 100
+
+
+def ler_cnab240(arquivo):
+    """Movimentos de um CNAB 240 (segmento E e segmentos T/U liquidados), no formato de ler_ofx."""
+    conta_arquivo = None
+    titulo = None
+    for numero, registro in enumerate(_registros_cnab(arquivo), start=1):
+        if len(registro) != TAMANHO_REGISTRO_CNAB:
+            raise ValueError(f'Registro {numero}: tamanho {len(registro)}, esperado {TAMANHO_REGISTRO_CNAB}.')
+        tipo, segmento = registro[7], registro[13]
+        try:
+            if tipo == '0':
+                conta_arquivo = registro[58:71] # Número da conta (59-70) e dígito (71)
+            elif tipo == '3' and segmento == 'E':
+                valor = _valor_cnab(registro[150:168])
+                yield _movimento(
+                    registro[58:71], _data_cnab(registro[142:150]), valor if registro[168] == 'C' else -valor,
+                    registro[176:201], registro[201:240],
+                )
+            elif tipo == '3' and segmento == 'T':
+                titulo = registro if registro[15:17] in MOVIMENTOS_LIQUIDACAO else None
+            elif tipo == '3' and segmento == 'U' and titulo is not None:
+                data_credito = registro[145:153]
+                data = data_credito if data_credito.strip('0 ') else registro[137:145] # Sem data de crédito: a da ocorrência
+                yield _movimento(
+                    conta_arquivo, _data_cnab(data), _valor_cnab(registro[77:92]),
+                    f'Liquidação do título {titulo[58:73].strip()}', titulo[37:57],
+                )
+                titulo = None
+        except (ValueError, InvalidOperation):
+            raise ValueError(f'Registro {numero}: data ou valor inválido.')
+
+
+def ler_extrato(arquivo):
+    """Detecta o formato (OFX ou CNAB 240) e devolve (origem, movimentos)."""
+    inicio = arquivo.read(1024)
+    arquivo.seek(0)
+    texto = inicio.removeprefix(b'\xef\xbb\xbf').decode('latin-1')
+    if texto.lstrip().upper().startswith(('OFXHEADER', '<?XML', '<OFX')):
+        return 'ofx', ler_ofx(arquivo)
+    # Sem lstrip: as posições do CNAB são fixas a partir do primeiro caractere
+    primeiro_registro = texto.split('\n', 1)[0].rstrip('\r')
+    if len(primeiro_registro) >= TAMANHO_REGISTRO_CNAB and primeiro_registro[7] == '0': # Header de arquivo
+        return 'cnab240', ler_cnab240(arquivo)
+    raise ValueError('Formato de extrato não reconhecido (esperado OFX ou CNAB 240).')
+
+
+def _identificador(movimento, ocorrencia):
+    base = '|'.join(str(movimento[campo]) for campo in ('data', 'tipo', 'valor', 'documento', 'descricao'))
+    return hashlib.sha256(f'{base}|{ocorrencia}'.encode()).hexdigest()[:64]
+
+
+def importar_extrato(movimentos, origem, conta_bancaria=None, tamanho_lote=TAMANHO_LOTE):
+    """
+    Grava os movimentos em LinhaExtrato, em lotes, ignorando os já importados.
+    Sem `conta_bancaria`, a conta de cada movimento é localizada pelo número informado no arquivo.
+    """
+    contas = {_numero_conta(numero): conta_id for conta_id, numero in ContaBancaria.objects.values_list('id', 'numero_conta')}
+    ocorrencias = Counter()
+    resultado = ResultadoImportacao()
+    lote = []
+
+    def gravar():
+        if not lote:
+            return
+        with transaction.atomic():
+            existentes = set(
+                LinhaExtrato.objects.filter(
+                    conta_bancaria_id__in={linha.conta_bancaria_id for linha in lote},
+                    identificador__in=[linha.identificador for linha in lote],
+                ).values_list('conta_bancaria_id', 'identificador')
+            )
+            novas = [linha for linha in lote if (linha.conta_bancaria_id, linha.identificador) not in existentes]
+            LinhaExtrato.objects.bulk_create(novas, batch_size=1000, ignore_conflicts=True)
+        resultado.importadas += len(novas)
+        resultado.duplicadas += len(lote) - len(novas)
+        lote.clear()
+
+    for movimento in movimentos:
+        if not movimento['valor']:
+            continue # Linhas informativas (ex.: saldo do dia) vêm com valor zero
+        if conta_bancaria is not None:
+            conta_id = conta_bancaria.pk
+        else:
+            # O número no arquivo pode vir com ou sem o dígito verificador
+            numero = _numero_conta(movimento['conta'])
+            conta_id = contas.get(numero) or contas.get(numero[:-1])
+            if conta_id is None:
+                raise ValueError(f'Conta bancária do extrato não cadastrada: {(movimento["conta"] or "").strip() or "não informada"}')
+        base = (conta_id, movimento['data'], movimento['tipo'], movimento['valor'], movimento['documento'], movimento['descricao'])
+        ocorrencias[base] += 1
+        lote.append(LinhaExtrato(
+            conta_bancaria_id=conta_id,
+            data=movimento['data'],
+            tipo=movimento['tipo'],
+            valor=movimento['valor'],
+            descricao=movimento['descricao'],
+            documento=movimento['documento'],
+            identificador=_identificador(movimento, ocorrencias[base]),
+            origem=origem,
+        ))
+        resultado.contas.add(conta_id)
+        if len(lote) >= tamanho_lote:
+            gravar()
+    gravar()
+    return resultado
@@ -0,0 +1,220 @@
+import calendar
+from collections import defaultdict
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, F, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce, TruncMonth
+
+from .models import CentroCusto, ContaContabil, LancamentoFinanceiro, ResumoFluxoCaixa
+
+ZERO = Decimal('0.00')
+CENTAVO = Decimal('0.01')
+
+# Campos de LancamentoFinanceiro que afetam o cubo de fluxo de caixa
+CAMPOS_FLUXO_CAIXA = [
+    'tipo_lancamento', 'status', 'conta_contabil_id', 'centro_custo_id',
+    'data_vencimento', 'data_competencia', 'valor_original', 'valor_quitado',
+]
+
+
+def _inicio_do_mes(data):
+    return data.replace(day=1)
+
+
+def _fim_do_mes(data):
+    return data.replace(day=calendar.monthrange(data.year, data.month)[1])
+
+
+def _celulas(estado):
+    """
+    Células do cubo afetadas por um lançamento: cada data de referência preenchida,
+    nas granularidades diária e mensal.
+    """
+    for data_base, data in (('vencimento', estado['data_vencimento']), ('competencia', estado['data_competencia'])):
+        if data is None:
+            continue
+        for granularidade, periodo in (('dia', data), ('mes', _inicio_do_mes(data))):
+            yield (
+                granularidade, data_base, periodo, estado['tipo_lancamento'], estado['status'],
+                estado['conta_contabil_id'], estado['centro_custo_id'],
+            )
+
+
+def _aplicar_celula(chave, quantidade, valor_original, valor_quitado):
+    granularidade, data_base, periodo, tipo_lancamento, status, conta_contabil_id, centro_custo_id = chave
+    celula = ResumoFluxoCaixa.objects.filter(
+        granularidade=granularidade,
+        data_base=data_base,
+        periodo=periodo,
+        tipo_lancamento=tipo_lancamento,
+        status=status,
+        conta_contabil_id=conta_contabil_id,
+        centro_custo_id=centro_custo_id,
+    )
+    # Atualiza uma única linha da célula, mesmo que existam duplicatas
+    atualizadas = ResumoFluxoCaixa.objects.filter(pk=Subquery(celula.values('pk')[:1])).update(
+        quantidade=F('quantidade') + quantidade,
+        valor_original=F('valor_original') + valor_original,
+        valor_quitado=F('valor_quitado') + valor_quitado,
+    )
+    if not atualizadas:
+        ResumoFluxoCaixa.objects.create(
+            granularidade=granularidade,
+            data_base=data_base,
+            periodo=periodo,
+            tipo_lancamento=tipo_lancamento,
+            status=status,
+            conta_contabil_id=conta_contabil_id,
+            centro_custo_id=centro_custo_id,
+            quantidade=quantidade,
+            valor_original=valor_original,
+            valor_quitado=valor_quitado,
+        )
+
+
+def registrar_alteracoes(alteracoes):
+    """
+    Ajusta o cubo a partir de pares (anterior, atual) de estados de lançamentos, onde cada
+    estado é um dict com CAMPOS_FLUXO_CAIXA ou None (inclusão/exclusão).
+    As diferenças são somadas por célula antes de gravar, de modo que alterações em lote
+    (ex.: conciliação bancária) custam uma instrução por célula afetada.
+    Deve ser chamado também por quem altera lançamentos via QuerySet.update()/bulk_update().
+    """
+    deltas = defaultdict(lambda: [0, ZERO, ZERO])
+    for anterior, atual in alteracoes:
+        for estado, sinal in ((anterior, -1), (atual, 1)):
+            if estado is None:
+                continue
+            for chave in _celulas(estado):
+                delta = deltas[chave]
+                delta[0] += sinal
+                delta[1] += sinal * estado['valor_original']
+                delta[2] += sinal * (estado['valor_quitado'] or ZERO)
+
+    with transaction.atomic():
+        for chave, (quantidade, valor_original, valor_quitado) in deltas.items():
+            if quantidade or valor_original or valor_quitado:
+                _aplicar_celula(chave, quantidade, valor_original, valor_quitado)
+
+
+def reconstruir_cubo():
+    """
+    Recria o cubo inteiro a partir dos lançamentos, com uma consulta agrupada por
+    data de referência e granularidade. Retorna o número de células gravadas.
+    """
+    celulas = []
+    for data_base in ('vencimento', 'competencia'):
+        campo = f'data_{data_base}'
+        for granularidade, periodo in (('dia', F(campo)), ('mes', TruncMonth(campo))):
+            totais = (
+                LancamentoFinanceiro.objects.filter(**{f'{campo}__isnull': False})
+                .order_by()
+                .values('tipo_lancamento', 'status', 'conta_contabil_id', 'centro_custo_id', periodo_celula=periodo)
+                .annotate(
+                    total_quantidade=Count('id'),
+                    total_original=Sum('valor_original'),
+                    total_quitado=Coalesce(Sum('valor_quitado'), Value(ZERO)),
+                )
+            )
+            celulas.extend(
+                ResumoFluxoCaixa(
+                    granularidade=granularidade,
+                    data_base=data_base,
+                    periodo=t['periodo_celula'],
+                    tipo_lancamento=t['tipo_lancamento'],
+                    status=t['status'],
+                    conta_contabil_id=t['conta_contabil_id'],
+                    centro_custo_id=t['centro_custo_id'],
+                    quantidade=t['total_quantidade'],
+                    valor_original=t['total_original'],
+                    valor_quitado=t['total_quitado'],
+                )
+                for t in totais
+            )
+
+    with transaction.atomic():
+        ResumoFluxoCaixa.objects.all().delete()
+        ResumoFluxoCaixa.objects.bulk_create(celulas, batch_size=1000)
+    return len(celulas)
+
+
+def _com_sinal(campo):
+    # Receitas entram positivas e despesas negativas no fluxo de caixa
+    return Case(
+        When(tipo_lancamento='receita', then=F(campo)),
+        default=-F(campo),
+        output_field=DecimalField(max_digits=14, decimal_places=2),
+    )
+
+
+def _somar_recorrencias(linhas, inicio, fim, granularidade, data_base, conta_contabil, centro_custo):
+    """
+    Acrescenta ao previsto as ocorrências ainda não materializadas dos lançamentos recorrentes,
+    expandidas na hora e somadas nas mesmas células do cubo.
+    """
+    # Importado aqui: recorrencias depende dos sinais, que dependem deste módulo
+    from .recorrencias import ocorrencias_projetadas
+
+    projetado = defaultdict(lambda: ZERO)
+    for estado in ocorrencias_projetadas(_inicio_do_mes(inicio), _fim_do_mes(fim), conta_contabil, centro_custo):
+        valor = estado['valor_original'] if estado['tipo_lancamento'] == 'receita' else -estado['valor_original']
+        for celula_granularidade, celula_data_base, periodo, _, _, conta_id, centro_id in _celulas(estado):
+            if celula_granularidade == granularidade and celula_data_base == data_base and inicio <= periodo <= fim:
+                projetado[(periodo, conta_id, centro_id)] += valor
+    if not projetado:
+        return linhas
+
+    por_celula = {(linha['periodo'], linha['conta_contabil_id'], linha['centro_custo_id']): linha for linha in linhas}
+    contas = dict(ContaContabil.objects.filter(id__in={chave[1] for chave in projetado}).values_list('id', 'nome'))
+    centros = dict(CentroCusto.objects.filter(id__in={chave[2] for chave in projetado}).values_list('id', 'nome'))
+    for (periodo, conta_id, centro_id), valor in projetado.items():
+        linha = por_celula.get((periodo, conta_id, centro_id))
+        if linha is None:
+            linha = por_celula[(periodo, conta_id, centro_id)] = {
+                'periodo': periodo, 'conta_contabil_id': conta_id, 'conta_contabil__nome': contas.get(conta_id),
+                'centro_custo_id': centro_id, 'centro_custo__nome': centros.get(centro_id),
+                'previsto': ZERO, 'realizado': ZERO,
+            }
+        linha['previsto'] += valor
+    return sorted(
+        por_celula.values(),
+        key=lambda linha: (linha['periodo'], linha['conta_contabil__nome'] or '', linha['centro_custo__nome'] or ''),
+    )
+
+
+def fluxo_caixa(inicio, fim, granularidade='mes', data_base='vencimento', conta_contabil=None, centro_custo=None,
+                projetar_recorrencias=True):
+    """
+    Fluxo de caixa previsto x realizado entre `inicio` e `fim`, por período, conta contábil e
+    centro de custo, lido do cubo. Previsto soma o valor original dos lançamentos não cancelados
+    e, com `projetar_recorrencias`, as ocorrências futuras dos lançamentos recorrentes;
+    realizado soma o valor quitado dos lançamentos quitados. Despesas aparecem com sinal negativo.
+    """
+    if granularidade == 'mes':
+        inicio = _inicio_do_mes(inicio)
+    celulas = ResumoFluxoCaixa.objects.filter(
+        granularidade=granularidade,
+        data_base=data_base,
+        periodo__range=(inicio, fim),
+    ).exclude(status='cancelado')
+    if conta_contabil is not None:
+        celulas = celulas.filter(conta_contabil=conta_contabil)
+    if centro_custo is not None:
+        celulas = celulas.filter(centro_custo=centro_custo)
+
+    linhas = list(
+        celulas.order_by('periodo', 'conta_contabil__nome', 'centro_custo__nome')
+        .values('periodo', 'conta_contabil_id', 'conta_contabil__nome', 'centro_custo_id', 'centro_custo__nome')
+        .annotate(
+            previsto=Sum(_com_sinal('valor_original')),
+            realizado=Coalesce(Sum(_com_sinal('valor_quitado'), filter=Q(status='quitado')), Value(ZERO)),
+        )
+    )
+    for linha in linhas:
+        # Alguns bancos (ex.: SQLite) somam decimais em ponto flutuante
+        linha['previsto'] = linha['previsto'].quantize(CENTAVO, rounding=ROUND_HALF_UP)
+        linha['realizado'] = linha['realizado'].quantize(CENTAVO, rounding=ROUND_HALF_UP)
+    if projetar_recorrencias:
+        linhas = _somar_recorrencias(linhas, inicio, fim, granularidade, data_base, conta_contabil, centro_custo)
+    return linhas
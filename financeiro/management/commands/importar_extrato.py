@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from financeiro.conciliacao import JANELA_DIAS, conciliar
+from financeiro.extratos import importar_extrato, ler_extrato
+from financeiro.models import ContaBancaria
+
+
+class Command(BaseCommand):
+    help = (
+        'Importa extratos bancários (OFX ou CNAB 240) e concilia os movimentos com os lançamentos em aberto, '
+        'quitando os que forem encontrados.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivos', nargs='+', help='Caminhos dos arquivos de extrato.')
+        parser.add_argument('--conta', help='Número da conta bancária. Padrão: o informado em cada arquivo.')
+        parser.add_argument('--janela', type=int, default=JANELA_DIAS, help='Dias de tolerância entre o movimento e o vencimento.')
+        parser.add_argument('--sem-conciliar', action='store_true', help='Apenas importa os movimentos.')
+
+    def handle(self, *args, **options):
+        conta = None
+        if options['conta']:
+            conta = ContaBancaria.objects.filter(numero_conta=options['conta']).first()
+            if conta is None:
+                raise CommandError(f'Conta bancária não encontrada: {options["conta"]}')
+
+        contas = set()
+        for caminho in options['arquivos']:
+            try:
+                with open(caminho, 'rb') as arquivo:
+                    origem, movimentos = ler_extrato(arquivo)
+                    resultado = importar_extrato(movimentos, origem, conta_bancaria=conta)
+            except (OSError, ValueError) as erro:
+                raise CommandError(f'{caminho}: {erro}')
+            contas |= resultado.contas
+            self.stdout.write(f'{caminho}: {resultado.importadas} movimento(s) importado(s), {resultado.duplicadas} já existente(s).')
+
+        if options['sem_conciliar'] or not contas:
+            return
+        conciliacao = conciliar(contas, janela_dias=options['janela'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{conciliacao.conciliadas} movimento(s) conciliado(s); {conciliacao.pendentes} pendente(s).'
+        ))
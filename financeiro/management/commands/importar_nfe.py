@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from financeiro.nfe import TAMANHO_LOTE, conta_a_pagar, importar_notas, ler_arquivo
+
+
+class Command(BaseCommand):
+    help = (
+        'Importa NF-e de fornecedores (XML ou .zip de XMLs): cria as notas fiscais de entrada, os '
+        'fornecedores que faltam e os lançamentos a pagar das duplicatas.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivos', nargs='+', help='Caminhos dos arquivos .xml ou .zip.')
+        parser.add_argument('--conta', required=True, help='Código da conta contábil dos lançamentos a pagar.')
+        parser.add_argument('--lote', type=int, default=TAMANHO_LOTE, help='Notas gravadas por transação.')
+        parser.add_argument('--simular', action='store_true', help='Apenas valida e confere as duplicadas, sem gravar.')
+        parser.add_argument('--sem-xml', action='store_true', help='Não guarda o XML de cada nota em arquivo_xml.')
+
+    def handle(self, *args, **options):
+        try:
+            conta = conta_a_pagar(options['conta'])
+        except ValueError as erro:
+            raise CommandError(str(erro))
+
+        def ao_errar(origem, mensagens):
+            self.stderr.write(f'{origem}: {"; ".join(mensagens)}')
+
+        def notas():
+            for caminho in options['arquivos']:
+                with open(caminho, 'rb') as arquivo:
+                    yield from ler_arquivo(arquivo, caminho)
+
+        try:
+            resultado = importar_notas(
+                notas(), conta, tamanho_lote=options['lote'], simular=options['simular'],
+                arquivar_xml=not options['sem_xml'], ao_errar=ao_errar,
+            )
+        except (OSError, ValueError) as erro:
+            raise CommandError(str(erro))
+
+        acao = 'validada(s)' if options['simular'] else 'importada(s)'
+        self.stdout.write(self.style.SUCCESS(
+            f'{resultado.importadas} nota(s) {acao} ({resultado.lancamentos} lançamento(s) a pagar, '
+            f'{resultado.fornecedores_criados} fornecedor(es) novo(s)), {resultado.duplicadas} duplicada(s), '
+            f'{resultado.total_erros} com erro.'
+        ))
@@ -0,0 +1,28 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from financeiro.recorrencias import materializar
+
+
+class Command(BaseCommand):
+    help = (
+        'Grava como lançamentos as ocorrências dos lançamentos recorrentes que vencem dentro do horizonte; '
+        'as seguintes continuam apenas projetadas no fluxo de caixa. Execute periodicamente (ex.: diariamente).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--horizonte',
+            type=int,
+            default=settings.RECORRENCIAS_HORIZONTE_DIAS,
+            help='Dias à frente de hoje a materializar.',
+        )
+
+    def handle(self, *args, **options):
+        ate = datetime.date.today() + datetime.timedelta(days=options['horizonte'])
+        resultado = materializar(ate)
+        self.stdout.write(self.style.SUCCESS(
+            f'{resultado.lancamentos} lançamento(s) gravado(s) de {resultado.regras} regra(s), até {ate:%d/%m/%Y}.'
+        ))
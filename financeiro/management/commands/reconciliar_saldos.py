@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from financeiro.saldos import reconciliar_saldos
+
+
+class Command(BaseCommand):
+    help = 'Recalcula o saldo atual das contas bancárias a partir dos lançamentos quitados e informa divergências.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verificar',
+            action='store_true',
+            help='Apenas confere os saldos, sem gravar correções.',
+        )
+
+    def handle(self, *args, **options):
+        corrigir = not options['verificar']
+        divergencias = reconciliar_saldos(corrigir=corrigir)
+
+        for conta_id, registrado, calculado in divergencias:
+            self.stdout.write(f'Conta bancária {conta_id}: saldo registrado {registrado}, calculado {calculado}')
+
+        if not divergencias:
+            self.stdout.write(self.style.SUCCESS('Nenhuma divergência encontrada.'))
+        elif corrigir:
+            self.stdout.write(self.style.SUCCESS(f'{len(divergencias)} saldo(s) corrigido(s).'))
+        else:
+            self.stdout.write(self.style.WARNING(f'{len(divergencias)} divergência(s) encontrada(s).'))
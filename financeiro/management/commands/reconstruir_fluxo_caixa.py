@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from financeiro.fluxo_caixa import reconstruir_cubo
+
+
+class Command(BaseCommand):
+    help = 'Recria do zero o resumo (cubo) de fluxo de caixa a partir dos lançamentos financeiros.'
+
+    def handle(self, *args, **options):
+        celulas = reconstruir_cubo()
+        self.stdout.write(self.style.SUCCESS(f'Fluxo de caixa reconstruído: {celulas} célula(s).'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from financeiro.plano_contas import reconstruir_hierarquia
+
+
+class Command(BaseCommand):
+    help = 'Recria a tabela de hierarquia (closure table) do plano de contas a partir de conta_pai.'
+
+    def handle(self, *args, **options):
+        linhas = reconstruir_hierarquia()
+        self.stdout.write(self.style.SUCCESS(f'Hierarquia do plano de contas reconstruída: {linhas} ligação(ões).'))
@@ -0,0 +1,72 @@
+# Generated by Django 4.2.11 on 2026-10-17 02:55
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, F, Sum, Value
+from django.db.models.functions import Coalesce, TruncMonth
+
+
+def popular_resumo(apps, schema_editor):
+    # Consolida os lançamentos já existentes antes de os sinais assumirem a manutenção
+    LancamentoFinanceiro = apps.get_model('financeiro', 'LancamentoFinanceiro')
+    ResumoFluxoCaixa = apps.get_model('financeiro', 'ResumoFluxoCaixa')
+    celulas = []
+    for data_base in ('vencimento', 'competencia'):
+        campo = f'data_{data_base}'
+        for granularidade, periodo in (('dia', F(campo)), ('mes', TruncMonth(campo))):
+            totais = (
+                LancamentoFinanceiro.objects.filter(**{f'{campo}__isnull': False})
+                .order_by()
+                .values('tipo_lancamento', 'status', 'conta_contabil_id', 'centro_custo_id', periodo_celula=periodo)
+                .annotate(
+                    total_quantidade=Count('id'),
+                    total_original=Sum('valor_original'),
+                    total_quitado=Coalesce(Sum('valor_quitado'), Value(0, output_field=models.DecimalField())),
+                )
+            )
+            celulas.extend(
+                ResumoFluxoCaixa(
+                    granularidade=granularidade,
+                    data_base=data_base,
+                    periodo=t['periodo_celula'],
+                    tipo_lancamento=t['tipo_lancamento'],
+                    status=t['status'],
+                    conta_contabil_id=t['conta_contabil_id'],
+                    centro_custo_id=t['centro_custo_id'],
+                    quantidade=t['total_quantidade'],
+                    valor_original=t['total_original'],
+                    valor_quitado=t['total_quitado'],
+                )
+                for t in totais
+            )
+    ResumoFluxoCaixa.objects.bulk_create(celulas, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financeiro', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumoFluxoCaixa',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularidade', models.CharField(choices=[('dia', 'Diária'), ('mes', 'Mensal')], max_length=3)),
+                ('data_base', models.CharField(choices=[('vencimento', 'Data de Vencimento'), ('competencia', 'Data de Competência')], max_length=11)),
+                ('periodo', models.DateField()),
+                ('tipo_lancamento', models.CharField(choices=[('receita', 'Receita'), ('despesa', 'Despesa')], max_length=10)),
+                ('status', models.CharField(choices=[('aberto', 'Aberto'), ('quitado', 'Quitado'), ('cancelado', 'Cancelado')], max_length=10)),
+                ('quantidade', models.IntegerField(default=0)),
+                ('valor_original', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('valor_quitado', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('centro_custo', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='financeiro.centrocusto')),
+                ('conta_contabil', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='financeiro.contacontabil')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['granularidade', 'data_base', 'periodo', 'conta_contabil', 'centro_custo'], name='fin_resumo_fluxo_periodo_idx')],
+            },
+        ),
+        migrations.RunPython(popular_resumo, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.11 on 2026-10-17 02:57
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def popular_hierarquia(apps, schema_editor):
+    # Gera as ligações ancestral/descendente das contas já cadastradas a partir de conta_pai
+    ContaContabil = apps.get_model('financeiro', 'ContaContabil')
+    ContaContabilHierarquia = apps.get_model('financeiro', 'ContaContabilHierarquia')
+    pais = dict(ContaContabil.objects.values_list('id', 'conta_pai_id'))
+    linhas = []
+    for conta_id in pais:
+        atual, profundidade, visitadas = conta_id, 0, set()
+        while atual is not None and atual not in visitadas:
+            visitadas.add(atual)
+            linhas.append(ContaContabilHierarquia(ancestral_id=atual, descendente_id=conta_id, profundidade=profundidade))
+            atual = pais.get(atual)
+            profundidade += 1
+    ContaContabilHierarquia.objects.bulk_create(linhas, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financeiro', '0002_resumofluxocaixa'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContaContabilHierarquia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('profundidade', models.PositiveIntegerField()),
+                ('ancestral', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hierarquia_descendentes', to='financeiro.contacontabil')),
+                ('descendente', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hierarquia_ancestrais', to='financeiro.contacontabil')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['descendente', 'ancestral'], name='fin_conta_hier_desc_idx')],
+                'unique_together': {('ancestral', 'descendente')},
+            },
+        ),
+        migrations.RunPython(popular_hierarquia, migrations.RunPython.noop),
+    ]
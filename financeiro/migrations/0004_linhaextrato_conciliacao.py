@@ -0,0 +1,51 @@
+# Generated by Django 4.2.11 on 2026-10-17 03:34
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financeiro', '0003_contacontabilhierarquia'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LinhaExtrato',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.DateField()),
+                ('tipo', models.CharField(choices=[('credito', 'Crédito'), ('debito', 'Débito')], max_length=7)),
+                ('valor', models.DecimalField(decimal_places=2, max_digits=12, validators=[django.core.validators.MinValueValidator(0)])),
+                ('descricao', models.CharField(blank=True, max_length=255)),
+                ('documento', models.CharField(blank=True, max_length=64)),
+                ('identificador', models.CharField(max_length=64)),
+                ('origem', models.CharField(choices=[('ofx', 'OFX'), ('cnab240', 'CNAB 240')], max_length=7)),
+                ('data_importacao', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='lancamentofinanceiro',
+            index=models.Index(fields=['status', 'data_vencimento'], name='fin_lanc_status_venc_idx'),
+        ),
+        migrations.AddField(
+            model_name='linhaextrato',
+            name='conta_bancaria',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='linhas_extrato', to='financeiro.contabancaria'),
+        ),
+        migrations.AddField(
+            model_name='linhaextrato',
+            name='lancamento',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='linhas_extrato', to='financeiro.lancamentofinanceiro'),
+        ),
+        migrations.AddIndex(
+            model_name='linhaextrato',
+            index=models.Index(fields=['conta_bancaria', 'lancamento', 'data'], name='fin_extrato_pendente_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='linhaextrato',
+            unique_together={('conta_bancaria', 'identificador')},
+        ),
+    ]
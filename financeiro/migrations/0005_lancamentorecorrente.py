@@ -0,0 +1,66 @@
+# Generated by Django 4.2.11 on 2026-10-17 03:41
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financeiro', '0004_linhaextrato_conciliacao'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LancamentoRecorrente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('descricao', models.CharField(max_length=255)),
+                ('tipo_lancamento', models.CharField(choices=[('receita', 'Receita'), ('despesa', 'Despesa')], max_length=10)),
+                ('valor', models.DecimalField(decimal_places=2, max_digits=10, validators=[django.core.validators.MinValueValidator(0)])),
+                ('intervalo_meses', models.PositiveSmallIntegerField(choices=[(1, 'Mensal'), (2, 'Bimestral'), (3, 'Trimestral'), (6, 'Semestral'), (12, 'Anual')], default=1)),
+                ('dia_vencimento', models.PositiveSmallIntegerField()),
+                ('data_inicio', models.DateField()),
+                ('data_fim', models.DateField(blank=True, null=True)),
+                ('ativo', models.BooleanField(default=True)),
+                ('materializado_ate', models.DateField(blank=True, null=True)),
+                ('data_criacao', models.DateTimeField(auto_now_add=True)),
+                ('data_atualizacao', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='lancamentofinanceiro',
+            name='data_ocorrencia',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='lancamentorecorrente',
+            name='centro_custo',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='lancamentos_recorrentes', to='financeiro.centrocusto'),
+        ),
+        migrations.AddField(
+            model_name='lancamentorecorrente',
+            name='conta_bancaria',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='lancamentos_recorrentes', to='financeiro.contabancaria'),
+        ),
+        migrations.AddField(
+            model_name='lancamentorecorrente',
+            name='conta_contabil',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='lancamentos_recorrentes', to='financeiro.contacontabil'),
+        ),
+        migrations.AddField(
+            model_name='lancamentorecorrente',
+            name='pessoa',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='lancamentos_recorrentes', to='financeiro.pessoa'),
+        ),
+        migrations.AddField(
+            model_name='lancamentofinanceiro',
+            name='recorrencia',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='lancamentos', to='financeiro.lancamentorecorrente'),
+        ),
+        migrations.AddConstraint(
+            model_name='lancamentofinanceiro',
+            constraint=models.UniqueConstraint(fields=('recorrencia', 'data_ocorrencia'), name='fin_lanc_ocorrencia_unica'),
+        ),
+    ]
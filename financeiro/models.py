@@ -1,7 +1,10 @@
-from django.db import models
+from django.db import models, transaction
+from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
 from django.conf import settings # Para linkar com o modelo User, se necessário
 
+from projeto_integrador.managers import RelacionadosManager
+
 try:
     from rh.models import HistoricoPagamento
     from veiculos.models import Abastecimento, Manutencao
@@ -10,6 +13,10 @@ except ImportError:
     Abastecimento = None
     Manutencao = None
 
+# Manager padrão que traz junto a pessoa usada no __str__ (ver projeto_integrador/managers.py)
+class ComPessoaManager(RelacionadosManager):
+    relacionados = ('pessoa',)
+
 class ContaContabil(models.Model):
     """
     Plano de contas da empresa (Receitas, Despesas, Ativos, Passivos, Patrimônio Líquido).
@@ -33,6 +40,39 @@ class ContaContabil(models.Model):
     def __str__(self):
         return self.nome
 
+    def clean(self):
+        # Impede ciclos na hierarquia (conta pai não pode ser a própria conta nem uma subconta dela)
+        if self.pk is not None and self.conta_pai_id is not None:
+            if ContaContabilHierarquia.objects.filter(ancestral_id=self.pk, descendente_id=self.conta_pai_id).exists():
+                raise ValidationError({'conta_pai': 'A conta pai não pode ser a própria conta nem uma de suas subcontas.'})
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            return super().delete(*args, **kwargs)
+
+class ContaContabilHierarquia(models.Model):
+    """
+    Tabela de fechamento (closure table) do plano de contas: uma linha para cada par
+    ancestral/descendente, incluindo a própria conta com profundidade 0.
+    Mantida pelos sinais de ContaContabil (ver financeiro/plano_contas.py).
+    """
+    ancestral = models.ForeignKey(ContaContabil, on_delete=models.CASCADE, related_name='hierarquia_descendentes')
+    descendente = models.ForeignKey(ContaContabil, on_delete=models.CASCADE, related_name='hierarquia_ancestrais')
+    profundidade = models.PositiveIntegerField() # 0 para a própria conta, 1 para subcontas diretas, etc.
+
+    class Meta:
+        unique_together = ('ancestral', 'descendente')
+        indexes = [
+            models.Index(fields=['descendente', 'ancestral'], name='fin_conta_hier_desc_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.ancestral_id} > {self.descendente_id} ({self.profundidade})'
+
 class CentroCusto(models.Model):
     """
     Classificação das despesas/receitas por área, projeto ou departamento.
@@ -83,6 +123,8 @@ class Cliente(models.Model):
     pessoa = models.OneToOneField(Pessoa, on_delete=models.CASCADE, primary_key=True, related_name='cliente_info')
     limite_credito = models.DecimalField(max_digits=10, decimal_places=2, default=0)
 
+    objects = ComPessoaManager()
+
     def __str__(self):
         return self.pessoa.nome_razao_social
 
@@ -93,6 +135,8 @@ class Fornecedor(models.Model):
     pessoa = models.OneToOneField(Pessoa, on_delete=models.CASCADE, primary_key=True, related_name='fornecedor_info')
     prazo_pagamento_padrao = models.IntegerField(blank=True, null=True) # Dias para pagamento padrão
 
+    objects = ComPessoaManager()
+
     def __str__(self):
         return self.pessoa.nome_razao_social
 
@@ -104,13 +148,37 @@ class ContaBancaria(models.Model):
     agencia = models.CharField(max_length=20)
     numero_conta = models.CharField(max_length=50, unique=True)
     saldo_inicial = models.DecimalField(max_digits=10, decimal_places=2, default=0)
-    saldo_atual = models.DecimalField(max_digits=10, decimal_places=2, default=0) # Pode ser calculado
+    saldo_atual = models.DecimalField(max_digits=10, decimal_places=2, default=0) # Mantido pelos lançamentos quitados (ver financeiro/saldos.py)
     ativa = models.BooleanField(default=True)
     observacoes = models.TextField(blank=True, null=True)
 
     def __str__(self):
         return f'{self.banco} - Ag: {self.agencia} - Cc: {self.numero_conta}'
 
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            # Conta nova ainda não tem lançamentos: o saldo atual parte do saldo inicial
+            self.saldo_atual = self.saldo_inicial
+            return super().save(*args, **kwargs)
+
+        # saldo_atual é ajustado com F() a cada lançamento; nunca é regravado a partir desta
+        # instância (possivelmente desatualizada), apenas deslocado se o saldo inicial mudar
+        with transaction.atomic():
+            saldo_inicial_anterior = (
+                ContaBancaria.objects.select_for_update().filter(pk=self.pk).values_list('saldo_inicial', flat=True).first()
+            )
+            update_fields = kwargs.pop('update_fields', None)
+            if update_fields is None:
+                update_fields = [f.name for f in self._meta.concrete_fields if not f.primary_key]
+            kwargs['update_fields'] = [campo for campo in update_fields if campo != 'saldo_atual']
+            super().save(*args, **kwargs)
+
+            if saldo_inicial_anterior is not None and saldo_inicial_anterior != self.saldo_inicial:
+                ContaBancaria.objects.filter(pk=self.pk).update(
+                    saldo_atual=models.F('saldo_atual') + self.saldo_inicial - saldo_inicial_anterior
+                )
+            self.saldo_atual = ContaBancaria.objects.filter(pk=self.pk).values_list('saldo_atual', flat=True).first()
+
 class ContaCartao(models.Model):
     """
     Dados das contas de cartão (crédito/débito) da empresa.
@@ -151,6 +219,43 @@ class NotaFiscal(models.Model):
     def __str__(self):
         return f'NF {self.tipo.capitalize()} {self.numero}{"-"+self.serie if self.serie else ""} - {self.data_emissao}'
 
+class LancamentoRecorrente(models.Model):
+    """
+    Regra de um lançamento que se repete a cada `intervalo_meses` (aluguel, seguro, locação da frota,
+    provisões da folha). As ocorrências futuras entram projetadas no fluxo de caixa e só viram
+    LancamentoFinanceiro dentro do horizonte de materialização ou quando quitadas (ver financeiro/recorrencias.py).
+    """
+    INTERVALO_CHOICES = [(1, 'Mensal'), (2, 'Bimestral'), (3, 'Trimestral'), (6, 'Semestral'), (12, 'Anual')]
+
+    descricao = models.CharField(max_length=255)
+    tipo_lancamento = models.CharField(max_length=10, choices=[('receita', 'Receita'), ('despesa', 'Despesa')])
+    valor = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(0)])
+    intervalo_meses = models.PositiveSmallIntegerField(choices=INTERVALO_CHOICES, default=1)
+    dia_vencimento = models.PositiveSmallIntegerField() # 29 a 31: último dia dos meses mais curtos
+    data_inicio = models.DateField()
+    data_fim = models.DateField(blank=True, null=True) # Vazio: sem término
+    ativo = models.BooleanField(default=True)
+
+    conta_contabil = models.ForeignKey(ContaContabil, on_delete=models.PROTECT, related_name='lancamentos_recorrentes')
+    centro_custo = models.ForeignKey(CentroCusto, on_delete=models.SET_NULL, null=True, blank=True, related_name='lancamentos_recorrentes')
+    pessoa = models.ForeignKey(Pessoa, on_delete=models.SET_NULL, null=True, blank=True, related_name='lancamentos_recorrentes')
+    conta_bancaria = models.ForeignKey(ContaBancaria, on_delete=models.SET_NULL, null=True, blank=True, related_name='lancamentos_recorrentes')
+
+    # Todas as ocorrências até esta data já foram gravadas como lançamentos; as seguintes são projetadas
+    materializado_ate = models.DateField(blank=True, null=True)
+
+    data_criacao = models.DateTimeField(auto_now_add=True)
+    data_atualizacao = models.DateTimeField(auto_now=True)
+
+    def clean(self):
+        if not 1 <= (self.dia_vencimento or 0) <= 31:
+            raise ValidationError({'dia_vencimento': 'Informe um dia entre 1 e 31.'})
+        if self.data_fim and self.data_inicio and self.data_fim < self.data_inicio:
+            raise ValidationError({'data_fim': 'A data de término não pode ser anterior ao início.'})
+
+    def __str__(self):
+        return f'{self.descricao} ({self.get_intervalo_meses_display()}, dia {self.dia_vencimento})'
+
 class LancamentoFinanceiro(models.Model):
     """
     Registro de cada movimentação financeira (entrada ou saída).
@@ -216,10 +321,94 @@ class LancamentoFinanceiro(models.Model):
     )
     # Adicione mais FKs para outras possíveis integrações (ex: compra de insumos, etc.)
 
+    # Ocorrência de um lançamento recorrente: a data prevista pela regra (o vencimento pode ser alterado depois)
+    recorrencia = models.ForeignKey(LancamentoRecorrente, on_delete=models.SET_NULL, null=True, blank=True, related_name='lancamentos')
+    data_ocorrencia = models.DateField(blank=True, null=True)
+
     data_criacao = models.DateTimeField(auto_now_add=True)
     data_atualizacao = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Lançamentos em aberto por vencimento (conciliação dos extratos, ver financeiro/conciliacao.py)
+            models.Index(fields=['status', 'data_vencimento'], name='fin_lanc_status_venc_idx'),
+        ]
+        constraints = [
+            # Cada ocorrência de uma regra é gravada uma única vez
+            models.UniqueConstraint(fields=['recorrencia', 'data_ocorrencia'], name='fin_lanc_ocorrencia_unica'),
+        ]
+
     def __str__(self):
         return f'{self.tipo_lancamento.capitalize()} - {self.descricao} ({self.data_vencimento})'
 
-    # Opcional: Métodos para calcular saldo, juros, multas, etc.
\ No newline at end of file
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            return super().delete(*args, **kwargs)
+
+    # Opcional: Métodos para calcular saldo, juros, multas, etc.
+
+class ResumoFluxoCaixa(models.Model):
+    """
+    Cubo pré-agregado dos lançamentos financeiros por período (dia ou mês), data de referência
+    (vencimento ou competência), tipo, status, conta contábil e centro de custo.
+    Mantido incrementalmente pelos sinais de LancamentoFinanceiro (ver financeiro/fluxo_caixa.py).
+    Pode haver mais de uma linha para a mesma combinação; as consultas sempre somam as linhas.
+    """
+    GRANULARIDADE_CHOICES = [('dia', 'Diária'), ('mes', 'Mensal')]
+    DATA_BASE_CHOICES = [('vencimento', 'Data de Vencimento'), ('competencia', 'Data de Competência')]
+
+    granularidade = models.CharField(max_length=3, choices=GRANULARIDADE_CHOICES)
+    data_base = models.CharField(max_length=11, choices=DATA_BASE_CHOICES)
+    periodo = models.DateField() # O próprio dia, ou o primeiro dia do mês
+    tipo_lancamento = models.CharField(max_length=10, choices=LancamentoFinanceiro.TIPO_LANCAMENTO_CHOICES)
+    status = models.CharField(max_length=10, choices=LancamentoFinanceiro.STATUS_CHOICES)
+    conta_contabil = models.ForeignKey(ContaContabil, on_delete=models.CASCADE, related_name='+')
+    centro_custo = models.ForeignKey(CentroCusto, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+
+    quantidade = models.IntegerField(default=0)
+    valor_original = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    valor_quitado = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['granularidade', 'data_base', 'periodo', 'conta_contabil', 'centro_custo'],
+                name='fin_resumo_fluxo_periodo_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.granularidade} {self.periodo} - {self.conta_contabil_id}/{self.centro_custo_id} ({self.status})'
+
+class LinhaExtrato(models.Model):
+    """
+    Movimento de um extrato bancário importado (OFX ou CNAB 240).
+    Fica conciliado quando associado ao lançamento que ele quitou (ver financeiro/conciliacao.py).
+    """
+    TIPO_CHOICES = [('credito', 'Crédito'), ('debito', 'Débito')]
+    ORIGEM_CHOICES = [('ofx', 'OFX'), ('cnab240', 'CNAB 240')]
+
+    conta_bancaria = models.ForeignKey(ContaBancaria, on_delete=models.CASCADE, related_name='linhas_extrato')
+    data = models.DateField()
+    tipo = models.CharField(max_length=7, choices=TIPO_CHOICES)
+    valor = models.DecimalField(max_digits=12, decimal_places=2, validators=[MinValueValidator(0)]) # O sentido está em tipo
+    descricao = models.CharField(max_length=255, blank=True)
+    documento = models.CharField(max_length=64, blank=True) # FITID (OFX) ou número do documento (CNAB)
+    identificador = models.CharField(max_length=64) # Reimportar o mesmo extrato não duplica os movimentos
+    origem = models.CharField(max_length=7, choices=ORIGEM_CHOICES)
+    lancamento = models.ForeignKey(LancamentoFinanceiro, on_delete=models.SET_NULL, null=True, blank=True, related_name='linhas_extrato')
+    data_importacao = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('conta_bancaria', 'identificador')
+        indexes = [
+            # Movimentos ainda não conciliados de cada conta, por data
+            models.Index(fields=['conta_bancaria', 'lancamento', 'data'], name='fin_extrato_pendente_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.get_tipo_display()} {self.valor} em {self.data} ({self.conta_bancaria_id})'
@@ -0,0 +1,436 @@
+"""
+Importação de NF-e (XML) de fornecedores: cada nota vira uma NotaFiscal de entrada e as contas a
+pagar (LancamentoFinanceiro) das suas duplicatas.
+
+- Os XMLs, soltos ou dentro de um .zip, são lidos com iterparse: cada infNFe é convertida e
+  descartada da árvore assim que termina, de modo que a memória não cresce com o tamanho do arquivo.
+- O emitente é localizado pelo CNPJ/CPF em um mapa pré-carregado das Pessoas; os que faltam são
+  criados em lote (Pessoa e Fornecedor).
+- Notas já cadastradas (mesma chave do unique_together: tipo, número, série e fornecedor) ou
+  repetidas na importação são ignoradas. A conferência com o banco é uma consulta por lote: como o
+  cliente das notas de entrada é nulo, a restrição única do banco não as barraria.
+- As gravações em lote não disparam sinais: o índice de busca, os dados consolidados dos lançamentos
+  e o cache dos painéis são atualizados aqui.
+"""
+import datetime
+import io
+import os
+import re
+import xml.etree.ElementTree as ET
+import zipfile
+from dataclasses import dataclass, field
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+from django.core.files.base import ContentFile
+from django.db import transaction
+
+from busca.indexacao import indexar_objetos
+from projeto_integrador.cache_paineis import invalidar
+
+from .models import ContaContabil, Fornecedor, LancamentoFinanceiro, NotaFiscal, Pessoa
+from .signals import CAMPOS_MONITORADOS, registrar_alteracoes_lancamentos
+
+NS = '{http://www.portalfiscal.inf.br/nfe}'
+TAMANHO_LOTE = 500 # Notas por transação; cada uma pode guardar o XML (até LIMITE_XML_ARQUIVADO) até a gravação
+LIMITE_ERROS = 1000 # Erros guardados no resultado; os demais são apenas contados
+LIMITE_XML_ARQUIVADO = 256 * 1024 # XMLs de uma nota até este tamanho são guardados em NotaFiscal.arquivo_xml
+VALOR_MAXIMO = Decimal('99999999.99') # max_digits=10 de valor_total e valor_original
+CENTAVOS = Decimal('0.01')
+
+
+@dataclass
+class ResultadoImportacao:
+    importadas: int = 0
+    duplicadas: int = 0
+    fornecedores_criados: int = 0
+    lancamentos: int = 0
+    total_erros: int = 0
+    erros: list = field(default_factory=list) # (origem, [mensagens])
+
+
+def _apenas_digitos(valor):
+    return re.sub(r'\D', '', valor or '')
+
+
+def _texto(elemento, caminho):
+    if elemento is None:
+        return ''
+    valor = elemento.findtext('/'.join(NS + parte for parte in caminho.split('/')))
+    return (valor or '').strip()
+
+
+def _extrair(inf_nfe):
+    """Valores (texto) de uma infNFe, sem validação."""
+    ide = inf_nfe.find(f'{NS}ide')
+    emit = inf_nfe.find(f'{NS}emit')
+    endereco = emit.find(f'{NS}enderEmit') if emit is not None else None
+    return {
+        'chave': _apenas_digitos(inf_nfe.get('Id')),
+        'numero': _texto(ide, 'nNF'),
+        'serie': _texto(ide, 'serie'),
+        'data_emissao': _texto(ide, 'dhEmi') or _texto(ide, 'dEmi'), # dEmi: leiaute 2.0
+        'valor_total': _texto(inf_nfe, 'total/ICMSTot/vNF'),
+        'emitente': {
+            'documento': _texto(emit, 'CNPJ') or _texto(emit, 'CPF'),
+            'nome': _texto(emit, 'xNome'),
+            'inscricao_estadual': _texto(emit, 'IE'),
+            'telefone': _texto(endereco, 'fone'),
+            'cep': _texto(endereco, 'CEP'),
+            'logradouro': _texto(endereco, 'xLgr'),
+            'numero': _texto(endereco, 'nro'),
+            'complemento': _texto(endereco, 'xCpl'),
+            'bairro': _texto(endereco, 'xBairro'),
+            'cidade': _texto(endereco, 'xMun'),
+            'estado': _texto(endereco, 'UF'),
+        },
+        'duplicatas': [
+            (_texto(dup, 'nDup'), _texto(dup, 'dVenc'), _texto(dup, 'vDup'))
+            for dup in inf_nfe.iterfind(f'{NS}cobr/{NS}dup')
+        ],
+    }
+
+
+def _ler_notas(arquivo):
+    contexto = ET.iterparse(arquivo, events=('start', 'end'))
+    _, raiz = next(contexto)
+    for evento, elemento in contexto:
+        if evento == 'end' and elemento.tag == f'{NS}infNFe':
+            yield _extrair(elemento)
+            raiz.clear() # Descarta as notas já lidas (a raiz pode ser um lote com milhares delas)
+
+
+def _ler_xml(arquivo, origem, tamanho):
+    """(origem, dados) de cada nota de um XML; o próprio XML acompanha a nota quando o arquivo tem só ela."""
+    try:
+        if tamanho is not None and tamanho <= LIMITE_XML_ARQUIVADO:
+            conteudo = arquivo.read()
+            notas = list(_ler_notas(io.BytesIO(conteudo)))
+            if len(notas) == 1:
+                notas[0]['xml'] = conteudo
+            for dados in notas:
+                yield origem, dados
+        else:
+            for dados in _ler_notas(arquivo):
+                yield origem, dados
+    except ET.ParseError as erro:
+        yield origem, {'erro': f'XML inválido: {erro}'}
+
+
+def _tamanho(arquivo):
+    if hasattr(arquivo, 'size'):
+        return arquivo.size # UploadedFile
+    try:
+        return os.fstat(arquivo.fileno()).st_size
+    except (AttributeError, OSError):
+        return None
+
+
+def ler_arquivo(arquivo, nome):
+    """
+    Lê um XML de NF-e (nfeProc, NFe ou um lote delas) ou um .zip de XMLs, gerando (origem, dados)
+    para cada nota. `origem` identifica o arquivo (e o membro do .zip) nas mensagens de erro.
+    """
+    if nome.lower().endswith('.zip'):
+        try:
+            compactado = zipfile.ZipFile(arquivo)
+        except zipfile.BadZipFile as erro:
+            raise ValueError(f'Arquivo .zip inválido: {erro}')
+        with compactado:
+            for membro in compactado.infolist():
+                if membro.is_dir() or not membro.filename.lower().endswith('.xml'):
+                    continue
+                with compactado.open(membro) as conteudo:
+                    yield from _ler_xml(conteudo, f'{nome}/{membro.filename}', membro.file_size)
+    else:
+        yield from _ler_xml(arquivo, nome, _tamanho(arquivo))
+
+
+def _decimal(valor, campo):
+    try:
+        numero = Decimal(valor)
+    except (InvalidOperation, ValueError):
+        numero = None
+    if numero is None or not numero.is_finite():
+        raise ValueError(f'{campo}: valor inválido ({valor or "vazio"}).')
+    numero = numero.quantize(CENTAVOS, rounding=ROUND_HALF_UP)
+    if not Decimal(0) <= numero <= VALOR_MAXIMO:
+        raise ValueError(f'{campo}: valor fora do limite ({numero}).')
+    return numero
+
+
+def _data(valor, campo):
+    try:
+        return datetime.date.fromisoformat(valor[:10]) # dhEmi traz hora e fuso: vale a data local da emissão
+    except ValueError:
+        raise ValueError(f'{campo}: data inválida ({valor or "vazia"}).')
+
+
+def _converter(dados):
+    """Valida e converte os valores extraídos; levanta ValueError com as mensagens."""
+    mensagens = []
+    nota = {'chave': dados['chave'], 'xml': dados.get('xml'), 'duplicatas': []}
+    for campo in ('numero', 'serie'):
+        nota[campo] = dados[campo]
+        if not dados[campo]:
+            mensagens.append(f'{campo}: não informado.')
+    for campo, conversor in (('data_emissao', _data), ('valor_total', _decimal)):
+        try:
+            nota[campo] = conversor(dados[campo], campo)
+        except ValueError as erro:
+            mensagens.append(str(erro))
+    emitente = dict(dados['emitente'])
+    emitente['documento'] = _apenas_digitos(emitente['documento'])
+    if len(emitente['documento']) not in (11, 14):
+        mensagens.append('emitente: CNPJ/CPF não informado.')
+    if not emitente['nome']:
+        mensagens.append('emitente: razão social não informada.')
+    nota['emitente'] = emitente
+    for numero, vencimento, valor in dados['duplicatas']:
+        try:
+            nota['duplicatas'].append((numero, _data(vencimento, 'dVenc'), _decimal(valor, 'vDup')))
+        except ValueError as erro:
+            mensagens.append(f'duplicata {numero}: {erro}')
+    if mensagens:
+        raise ValueError(mensagens)
+    return nota
+
+
+def _chave(numero, serie, emitente):
+    # Notas digitadas à mão costumam ter zeros à esquerda no número e na série ("000123", "001")
+    return (numero or '').lstrip('0') or '0', (serie or '').lstrip('0') or '0', emitente
+
+
+def _formatar_documento(documento):
+    if len(documento) == 14:
+        return f'{documento[:2]}.{documento[2:5]}.{documento[5:8]}/{documento[8:12]}-{documento[12:]}'
+    return f'{documento[:3]}.{documento[3:6]}.{documento[6:9]}-{documento[9:]}'
+
+
+def _nova_pessoa(emitente):
+    documento = emitente['documento']
+    return Pessoa(
+        nome_razao_social=emitente['nome'][:255],
+        tipo='juridica' if len(documento) == 14 else 'fisica',
+        cpf_cnpj=_formatar_documento(documento),
+        inscricao_estadual=emitente['inscricao_estadual'][:20] or None,
+        telefone=emitente['telefone'][:20] or None,
+        cep=_apenas_digitos(emitente['cep'])[:8] or None,
+        logradouro=emitente['logradouro'][:255] or None,
+        numero=emitente['numero'][:10] or None,
+        complemento=emitente['complemento'][:100] or None,
+        bairro=emitente['bairro'][:100] or None,
+        cidade=emitente['cidade'][:100] or None,
+        estado=emitente['estado'][:2] or None,
+    )
+
+
+class _Importador:
+    """Estado de uma importação: mapas pré-carregados e o lote em formação."""
+
+    def __init__(self, conta_contabil, simular, arquivar_xml):
+        self.conta_contabil = conta_contabil
+        self.simular = simular
+        self.arquivar_xml = arquivar_xml
+        self.resultado = ResultadoImportacao()
+        # CNPJ/CPF (só dígitos) -> id da Pessoa; o cadastro manual pode ter guardado com ou sem máscara
+        self.pessoas = {
+            _apenas_digitos(documento): pessoa_id
+            for documento, pessoa_id in Pessoa.objects.exclude(cpf_cnpj=None).values_list('cpf_cnpj', 'id').iterator()
+        }
+        # id da Pessoa -> prazo de pagamento padrão, para os fornecedores já cadastrados
+        self.prazos = dict(Fornecedor.objects.select_related(None).values_list('pessoa_id', 'prazo_pagamento_padrao').iterator())
+        self.emitentes_novos = set() # Na simulação, CNPJ/CPF que seriam cadastrados
+        self.vistas = set() # _chave(número, série, CNPJ/CPF) das notas desta importação
+
+    def _criar_fornecedores(self, lote):
+        novas = {}
+        for nota in lote:
+            documento = nota['emitente']['documento']
+            if documento not in self.pessoas and documento not in novas:
+                novas[documento] = _nova_pessoa(nota['emitente'])
+        if novas:
+            Pessoa.objects.bulk_create(novas.values(), batch_size=1000)
+            if next(iter(novas.values())).pk is None:
+                # Bancos sem RETURNING no INSERT em lote: recupera os ids pelo documento
+                ids = dict(Pessoa.objects.filter(cpf_cnpj__in=[p.cpf_cnpj for p in novas.values()]).values_list('cpf_cnpj', 'id'))
+                for pessoa in novas.values():
+                    pessoa.pk = ids[pessoa.cpf_cnpj]
+            self.pessoas.update((documento, pessoa.pk) for documento, pessoa in novas.items())
+
+        sem_fornecedor = {self.pessoas[nota['emitente']['documento']] for nota in lote} - self.prazos.keys()
+        Fornecedor.objects.bulk_create([Fornecedor(pessoa_id=pessoa_id) for pessoa_id in sem_fornecedor], batch_size=1000)
+        self.prazos.update(dict.fromkeys(sem_fornecedor))
+        self.resultado.fornecedores_criados += len(sem_fornecedor)
+        return list(novas.values())
+
+    def _ja_cadastradas(self, lote):
+        """_chave(número, série, id da Pessoa) das notas já cadastradas dos emitentes do lote: uma consulta por lote."""
+        pessoa_ids = {self.pessoas[n['emitente']['documento']] for n in lote if n['emitente']['documento'] in self.pessoas}
+        if not pessoa_ids:
+            return set()
+        return {
+            _chave(numero, serie, fornecedor_id)
+            for numero, serie, fornecedor_id in NotaFiscal.objects.filter(tipo='entrada', fornecedor_id__in=pessoa_ids)
+            .values_list('numero', 'serie', 'fornecedor_id').iterator()
+        }
+
+    def _lancamentos(self, nota, nota_fiscal, pessoa_id):
+        emitente = nota['emitente']['nome']
+        duplicatas = nota['duplicatas']
+        if not duplicatas:
+            # Sem cobrança no XML: uma parcela com o valor total, no prazo padrão do fornecedor
+            prazo = self.prazos.get(pessoa_id) or 0
+            duplicatas = [('', nota['data_emissao'] + datetime.timedelta(days=prazo), nota['valor_total'])]
+        return [
+            LancamentoFinanceiro(
+                tipo_lancamento='despesa',
+                data_vencimento=vencimento,
+                data_competencia=nota['data_emissao'],
+                valor_original=valor,
+                status='aberto',
+                descricao=f'NF-e {nota["numero"]}/{nota["serie"]} - {emitente}' + (f' (parcela {numero})' if numero else ''),
+                conta_contabil=self.conta_contabil,
+                pessoa_id=pessoa_id,
+                nota_fiscal=nota_fiscal,
+            )
+            for numero, vencimento, valor in duplicatas
+        ]
+
+    def _gravar_notas(self, lote, arquivos):
+        """Grava as notas do lote e seus lançamentos; os XMLs arquivados são anotados em `arquivos`."""
+        novas_pessoas = self._criar_fornecedores(lote)
+        ja_cadastradas = self._ja_cadastradas(lote)
+        notas, notas_fiscais = [], []
+        for nota in lote:
+            pessoa_id = self.pessoas[nota['emitente']['documento']]
+            if _chave(nota['numero'], nota['serie'], pessoa_id) in ja_cadastradas:
+                self.resultado.duplicadas += 1
+                continue
+            nota_fiscal = NotaFiscal(
+                tipo='entrada',
+                numero=nota['numero'],
+                serie=nota['serie'],
+                data_emissao=nota['data_emissao'],
+                valor_total=nota['valor_total'],
+                fornecedor_id=pessoa_id,
+                observacoes=f'Chave de acesso: {nota["chave"]}' if nota['chave'] else None,
+            )
+            if self.arquivar_xml and nota['xml']:
+                nota_fiscal.arquivo_xml.save(f'{nota["chave"] or nota["numero"]}.xml', ContentFile(nota['xml']), save=False)
+                arquivos.append(nota_fiscal.arquivo_xml.name)
+            notas.append(nota)
+            notas_fiscais.append(nota_fiscal)
+
+        NotaFiscal.objects.bulk_create(notas_fiscais, batch_size=1000)
+        if notas_fiscais and notas_fiscais[0].pk is None:
+            ids = {
+                (numero, serie, fornecedor_id): nota_id
+                for nota_id, numero, serie, fornecedor_id in NotaFiscal.objects.filter(
+                    tipo='entrada', fornecedor_id__in={nf.fornecedor_id for nf in notas_fiscais},
+                    numero__in={nf.numero for nf in notas_fiscais},
+                ).values_list('id', 'numero', 'serie', 'fornecedor_id')
+            }
+            for nota_fiscal in notas_fiscais:
+                nota_fiscal.pk = ids[(nota_fiscal.numero, nota_fiscal.serie, nota_fiscal.fornecedor_id)]
+
+        lancamentos = [
+            lancamento
+            for nota, nota_fiscal in zip(notas, notas_fiscais)
+            for lancamento in self._lancamentos(nota, nota_fiscal, nota_fiscal.fornecedor_id)
+        ]
+        LancamentoFinanceiro.objects.bulk_create(lancamentos, batch_size=1000)
+        if lancamentos and lancamentos[0].pk is None:
+            lancamentos = list(LancamentoFinanceiro.objects.filter(nota_fiscal__in=notas_fiscais))
+
+        # bulk_create não dispara os sinais que mantêm o índice de busca, os consolidados e o cache dos painéis
+        indexar_objetos(novas_pessoas + lancamentos)
+        registrar_alteracoes_lancamentos(
+            (None, {campo: getattr(lancamento, campo) for campo in CAMPOS_MONITORADOS}) for lancamento in lancamentos
+        )
+        invalidar('financeiro.Pessoa', 'financeiro.Fornecedor', 'financeiro.NotaFiscal')
+        return notas_fiscais, lancamentos
+
+    def gravar(self, lote):
+        if not lote:
+            return
+        if self.simular:
+            ja_cadastradas = self._ja_cadastradas(lote)
+            for nota in lote:
+                pessoa_id = self.pessoas.get(nota['emitente']['documento'])
+                if pessoa_id is None and nota['emitente']['documento'] not in self.emitentes_novos:
+                    self.emitentes_novos.add(nota['emitente']['documento'])
+                    self.resultado.fornecedores_criados += 1
+                if _chave(nota['numero'], nota['serie'], pessoa_id) in ja_cadastradas:
+                    self.resultado.duplicadas += 1
+                else:
+                    self.resultado.importadas += 1
+                    self.resultado.lancamentos += len(nota['duplicatas']) or 1
+            lote.clear()
+            return
+
+        arquivos = []
+        try:
+            with transaction.atomic():
+                notas_fiscais, lancamentos = self._gravar_notas(lote, arquivos)
+        except BaseException:
+            # Os XMLs já foram gravados no armazenamento: sem as notas, ficariam órfãos em MEDIA_ROOT
+            armazenamento = NotaFiscal._meta.get_field('arquivo_xml').storage
+            for nome in arquivos:
+                armazenamento.delete(nome)
+            raise
+
+        self.resultado.importadas += len(notas_fiscais)
+        self.resultado.lancamentos += len(lancamentos)
+        lote.clear()
+
+
+def conta_a_pagar(codigo):
+    """Conta contábil (pelo código) em que os lançamentos a pagar das notas são gerados."""
+    conta = ContaContabil.objects.filter(codigo=codigo).first()
+    if conta is None:
+        raise ValueError(f'Conta contábil não encontrada: {codigo}')
+    if not conta.aceita_lancamentos:
+        raise ValueError(f'A conta contábil {codigo} não aceita lançamentos.')
+    return conta
+
+
+def importar_notas(notas, conta_contabil, tamanho_lote=TAMANHO_LOTE, simular=False, arquivar_xml=True, ao_errar=None):
+    """
+    Importa as notas de um iterável de (origem, dados) gerado por ler_arquivo, gravando em lotes.
+    Cada nota gera uma NotaFiscal de entrada e um lançamento a pagar por duplicata (ou um único, pelo
+    valor total, se o XML não tiver cobrança) na `conta_contabil`. Notas inválidas são registradas no
+    resultado (e repassadas a `ao_errar`, se informado) sem interromper a importação.
+    Com `simular`, apenas valida e confere as duplicadas.
+    """
+    importador = _Importador(conta_contabil, simular, arquivar_xml)
+    resultado = importador.resultado
+    lote = []
+
+    def registrar_erro(origem, mensagens):
+        resultado.total_erros += 1
+        if len(resultado.erros) < LIMITE_ERROS:
+            resultado.erros.append((origem, mensagens))
+        if ao_errar is not None:
+            ao_errar(origem, mensagens)
+
+    for origem, dados in notas:
+        if 'erro' in dados:
+            registrar_erro(origem, [dados['erro']])
+            continue
+        try:
+            nota = _converter(dados)
+        except ValueError as erro:
+            registrar_erro(origem, erro.args[0])
+            continue
+
+        chave = _chave(nota['numero'], nota['serie'], nota['emitente']['documento'])
+        if chave in importador.vistas:
+            resultado.duplicadas += 1
+            continue
+        importador.vistas.add(chave)
+        lote.append(nota)
+        if len(lote) >= tamanho_lote:
+            importador.gravar(lote)
+
+    importador.gravar(lote)
+    return resultado
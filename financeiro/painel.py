@@ -0,0 +1,51 @@
+"""
+Indicadores da página inicial do Financeiro. Cada função faz uma única consulta e é independente das
+demais, para que a view possa executá-las ao mesmo tempo (ver projeto_integrador/paralelo.py).
+"""
+import datetime
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db.models import Count, Q, Sum
+
+from .models import ContaBancaria, LancamentoFinanceiro
+
+CENTAVO = Decimal('0.01')
+
+
+def _contas_em_aberto(tipo_lancamento, hoje=None):
+    hoje = hoje or datetime.date.today()
+    totais = LancamentoFinanceiro.objects.filter(tipo_lancamento=tipo_lancamento, status='aberto').aggregate(
+        quantidade=Count('pk'),
+        valor=Sum('valor_original'),
+        vencidas=Count('pk', filter=Q(data_vencimento__lt=hoje)),
+        valor_vencido=Sum('valor_original', filter=Q(data_vencimento__lt=hoje)),
+    )
+    # O SQLite soma decimais em ponto flutuante
+    for campo in ('valor', 'valor_vencido'):
+        totais[campo] = Decimal(totais[campo] or 0).quantize(CENTAVO, rounding=ROUND_HALF_UP)
+    return totais
+
+
+def contas_a_pagar(hoje=None):
+    """Despesas em aberto: quantidade, valor e quanto já venceu."""
+    return _contas_em_aberto('despesa', hoje)
+
+
+def contas_a_receber(hoje=None):
+    """Receitas em aberto: quantidade, valor e quanto já venceu."""
+    return _contas_em_aberto('receita', hoje)
+
+
+def saldo_bancario():
+    """Soma dos saldos atuais das contas bancárias ativas."""
+    saldo = ContaBancaria.objects.filter(ativa=True).aggregate(saldo=Sum('saldo_atual'))['saldo']
+    return Decimal(saldo or 0).quantize(CENTAVO, rounding=ROUND_HALF_UP)
+
+
+# nome -> (função, modelos dos quais o valor depende), para o cache dos painéis
+INDICADORES = {
+    'contas_a_pagar': (contas_a_pagar, ('financeiro.LancamentoFinanceiro',)),
+    'contas_a_receber': (contas_a_receber, ('financeiro.LancamentoFinanceiro',)),
+    # O saldo atual é mantido pelos lançamentos quitados (financeiro/saldos.py)
+    'saldo_bancario': (saldo_bancario, ('financeiro.ContaBancaria', 'financeiro.LancamentoFinanceiro')),
+}
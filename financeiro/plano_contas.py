@@ -0,0 +1,158 @@
+from dataclasses import dataclass, field
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F, Sum
+
+from .models import ContaContabil, ContaContabilHierarquia, LancamentoFinanceiro
+
+
+@dataclass
+class NoConta:
+    conta: ContaContabil
+    filhos: list = field(default_factory=list)
+
+
+def inserir_conta(conta):
+    """
+    Registra uma conta recém-criada na hierarquia: ela mesma e todos os ancestrais da conta pai.
+    """
+    linhas = [ContaContabilHierarquia(ancestral_id=conta.pk, descendente_id=conta.pk, profundidade=0)]
+    if conta.conta_pai_id is not None:
+        ancestrais = ContaContabilHierarquia.objects.filter(descendente_id=conta.conta_pai_id)
+        linhas.extend(
+            ContaContabilHierarquia(ancestral_id=ancestral_id, descendente_id=conta.pk, profundidade=profundidade + 1)
+            for ancestral_id, profundidade in ancestrais.values_list('ancestral_id', 'profundidade')
+        )
+    ContaContabilHierarquia.objects.bulk_create(linhas)
+
+
+def mover_conta(conta):
+    """
+    Reposiciona a conta (e toda a sua subárvore) sob a nova conta pai.
+    """
+    descendentes = dict(
+        ContaContabilHierarquia.objects.filter(ancestral_id=conta.pk).values_list('descendente_id', 'profundidade')
+    )
+    if conta.conta_pai_id in descendentes:
+        raise ValidationError({'conta_pai': 'A conta pai não pode ser a própria conta nem uma de suas subcontas.'})
+
+    # Desliga a subárvore dos ancestrais antigos, preservando as ligações internas
+    ContaContabilHierarquia.objects.filter(descendente_id__in=descendentes).exclude(ancestral_id__in=descendentes).delete()
+
+    if conta.conta_pai_id is not None:
+        ancestrais = ContaContabilHierarquia.objects.filter(descendente_id=conta.conta_pai_id)
+        ContaContabilHierarquia.objects.bulk_create([
+            ContaContabilHierarquia(
+                ancestral_id=ancestral_id,
+                descendente_id=descendente_id,
+                profundidade=profundidade_ancestral + profundidade_descendente + 1,
+            )
+            for ancestral_id, profundidade_ancestral in ancestrais.values_list('ancestral_id', 'profundidade')
+            for descendente_id, profundidade_descendente in descendentes.items()
+        ], batch_size=1000)
+
+
+def desligar_subcontas(conta):
+    """
+    Antes de excluir uma conta: suas subcontas passam a ser raízes (conta_pai é SET_NULL),
+    então suas subárvores deixam de descender da conta e dos ancestrais dela.
+    """
+    descendentes = list(
+        ContaContabilHierarquia.objects.filter(ancestral_id=conta.pk, profundidade__gt=0)
+        .values_list('descendente_id', flat=True)
+    )
+    if descendentes:
+        ancestrais = list(
+            ContaContabilHierarquia.objects.filter(descendente_id=conta.pk).values_list('ancestral_id', flat=True)
+        )
+        ContaContabilHierarquia.objects.filter(descendente_id__in=descendentes, ancestral_id__in=ancestrais).delete()
+
+
+def reconstruir_hierarquia():
+    """
+    Recria toda a tabela de hierarquia a partir de conta_pai. Retorna o número de linhas gravadas.
+    """
+    pais = dict(ContaContabil.objects.values_list('id', 'conta_pai_id'))
+    linhas = []
+    for conta_id in pais:
+        atual, profundidade, visitadas = conta_id, 0, set()
+        while atual is not None and atual not in visitadas:
+            visitadas.add(atual)
+            linhas.append(ContaContabilHierarquia(ancestral_id=atual, descendente_id=conta_id, profundidade=profundidade))
+            atual = pais.get(atual)
+            profundidade += 1
+
+    with transaction.atomic():
+        ContaContabilHierarquia.objects.all().delete()
+        ContaContabilHierarquia.objects.bulk_create(linhas, batch_size=1000)
+    return len(linhas)
+
+
+def descendentes(conta, incluir_propria=True):
+    """
+    Todas as subcontas de `conta`, em qualquer nível, em uma única consulta.
+    """
+    # Condições em um único filter() para usarem a mesma junção com a tabela de hierarquia
+    filtros = {'hierarquia_ancestrais__ancestral': conta}
+    if not incluir_propria:
+        filtros['hierarquia_ancestrais__profundidade__gt'] = 0
+    return ContaContabil.objects.filter(**filtros)
+
+
+def ancestrais(conta, incluir_propria=False):
+    """
+    Cadeia de contas acima de `conta`, da raiz até a conta pai.
+    """
+    filtros = {'hierarquia_descendentes__descendente': conta}
+    if not incluir_propria:
+        filtros['hierarquia_descendentes__profundidade__gt'] = 0
+    return ContaContabil.objects.filter(**filtros).order_by('-hierarquia_descendentes__profundidade')
+
+
+def total_lancamentos(conta, lancamentos=None, campo='valor_original'):
+    """
+    Soma de `campo` dos lançamentos da conta e de todas as suas subcontas.
+    `lancamentos` permite restringir o conjunto (ex.: por status ou período).
+    """
+    if lancamentos is None:
+        lancamentos = LancamentoFinanceiro.objects.all()
+    total = lancamentos.filter(conta_contabil__hierarquia_ancestrais__ancestral=conta).aggregate(total=Sum(campo))['total']
+    return total or 0
+
+
+def totais_consolidados(lancamentos=None, campo='valor_original'):
+    """
+    Total consolidado (conta + subcontas) de todas as contas do plano, em uma única consulta.
+    Retorna {conta_id: total}.
+    """
+    if lancamentos is None:
+        lancamentos = LancamentoFinanceiro.objects.all()
+    totais = (
+        lancamentos.order_by()
+        .values(conta_id=F('conta_contabil__hierarquia_ancestrais__ancestral_id'))
+        .annotate(total=Sum(campo))
+    )
+    return {t['conta_id']: t['total'] for t in totais}
+
+
+def arvore():
+    """
+    Plano de contas completo como árvore de NoConta, carregado em uma única consulta.
+    """
+    contas = list(ContaContabil.objects.order_by('codigo', 'nome'))
+    nos = {conta.pk: NoConta(conta) for conta in contas}
+    raizes = []
+    for conta in contas:
+        pai = nos.get(conta.conta_pai_id)
+        (pai.filhos if pai is not None else raizes).append(nos[conta.pk])
+    return raizes
+
+
+def percorrer(nos, nivel=0):
+    """
+    Percorre a árvore em profundidade, gerando (conta, nível) na ordem de exibição.
+    """
+    for no in nos:
+        yield no.conta, nivel
+        yield from percorrer(no.filhos, nivel + 1)
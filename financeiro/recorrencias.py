@@ -0,0 +1,184 @@
+"""
+Lançamentos recorrentes (LancamentoRecorrente): expansão das ocorrências e materialização.
+
+Uma regra não gera todas as suas ocorrências de uma vez. As ocorrências até `materializado_ate`
+existem como LancamentoFinanceiro; as seguintes são calculadas na hora pelo fluxo de caixa
+(ocorrencias_projetadas) e só viram lançamentos quando entram no horizonte de materialização
+(materializar, executado periodicamente) ou quando precisam ser quitadas antes disso
+(materializar_ocorrencia). Projetar 24 meses de fluxo custa um laço sobre as regras, sem gravar nada.
+"""
+import calendar
+import datetime
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+
+from busca.indexacao import indexar_objetos
+
+from .models import LancamentoFinanceiro, LancamentoRecorrente
+from .signals import CAMPOS_MONITORADOS, registrar_alteracoes_lancamentos
+
+TAMANHO_LOTE = 1000
+
+
+@dataclass
+class ResultadoMaterializacao:
+    regras: int = 0
+    lancamentos: int = 0
+
+
+def _indice_mes(data):
+    return data.year * 12 + data.month - 1
+
+
+def ocorrencias(regra, inicio, fim):
+    """Datas das ocorrências da regra entre `inicio` e `fim` (inclusive), dentro da vigência."""
+    inicio = max(inicio, regra.data_inicio)
+    if regra.data_fim is not None:
+        fim = min(fim, regra.data_fim)
+    base = _indice_mes(regra.data_inicio)
+    # Pula direto para a primeira ocorrência que pode cair no período
+    n = max(0, (_indice_mes(inicio) - base) // regra.intervalo_meses)
+    while True:
+        ano, mes = divmod(base + n * regra.intervalo_meses, 12)
+        mes += 1
+        data = datetime.date(ano, mes, min(regra.dia_vencimento, calendar.monthrange(ano, mes)[1]))
+        if data > fim:
+            return
+        if data >= inicio:
+            yield data
+        n += 1
+
+
+def _pendentes(regra, inicio):
+    # Ocorrências ainda não materializadas começam depois de materializado_ate
+    if regra.materializado_ate is not None:
+        return max(inicio, regra.materializado_ate + datetime.timedelta(days=1))
+    return inicio
+
+
+def ocorrencias_projetadas(inicio, fim, conta_contabil=None, centro_custo=None):
+    """
+    Ocorrências ainda não materializadas com vencimento entre `inicio` e `fim`, como estados de
+    lançamento em aberto (dicts com os campos usados pelo cubo de fluxo de caixa).
+    """
+    regras = (
+        LancamentoRecorrente.objects.filter(ativo=True, data_inicio__lte=fim)
+        .filter(Q(data_fim__isnull=True) | Q(data_fim__gte=inicio))
+        .filter(Q(materializado_ate__isnull=True) | Q(materializado_ate__lt=fim))
+    )
+    if conta_contabil is not None:
+        regras = regras.filter(conta_contabil=conta_contabil)
+    if centro_custo is not None:
+        regras = regras.filter(centro_custo=centro_custo)
+    regras = list(regras)
+    if not regras:
+        return
+
+    # Ocorrências quitadas antes de entrarem no horizonte já são lançamentos
+    materializadas = set(
+        LancamentoFinanceiro.objects.filter(recorrencia__isnull=False, data_ocorrencia__range=(inicio, fim))
+        .values_list('recorrencia_id', 'data_ocorrencia')
+    )
+    for regra in regras:
+        for data in ocorrencias(regra, _pendentes(regra, inicio), fim):
+            if (regra.pk, data) in materializadas:
+                continue
+            yield {
+                'tipo_lancamento': regra.tipo_lancamento,
+                'status': 'aberto',
+                'conta_contabil_id': regra.conta_contabil_id,
+                'centro_custo_id': regra.centro_custo_id,
+                'data_vencimento': data,
+                'data_competencia': data.replace(day=1),
+                'valor_original': regra.valor,
+                'valor_quitado': None,
+            }
+
+
+def _lancamento(regra, data):
+    return LancamentoFinanceiro(
+        tipo_lancamento=regra.tipo_lancamento,
+        data_vencimento=data,
+        data_competencia=data.replace(day=1),
+        valor_original=regra.valor,
+        descricao=f'{regra.descricao} ({data:%m/%Y})',
+        conta_contabil_id=regra.conta_contabil_id,
+        centro_custo_id=regra.centro_custo_id,
+        pessoa_id=regra.pessoa_id,
+        conta_bancaria_id=regra.conta_bancaria_id,
+        recorrencia=regra,
+        data_ocorrencia=data,
+    )
+
+
+def horizonte_padrao(hoje=None):
+    return (hoje or datetime.date.today()) + datetime.timedelta(days=settings.RECORRENCIAS_HORIZONTE_DIAS)
+
+
+def materializar(ate=None, regra_ids=None):
+    """
+    Grava como lançamentos as ocorrências que vencem até `ate` (padrão: hoje + RECORRENCIAS_HORIZONTE_DIAS)
+    e avança materializado_ate das regras. Ocorrências já gravadas não são duplicadas.
+    """
+    ate = ate or horizonte_padrao()
+    regras = (
+        LancamentoRecorrente.objects.filter(ativo=True, data_inicio__lte=ate)
+        .filter(Q(materializado_ate__isnull=True) | Q(materializado_ate__lt=ate))
+        .order_by('id')
+    )
+    if regra_ids is not None:
+        regras = regras.filter(id__in=list(regra_ids))
+    regras = list(regras)
+    resultado = ResultadoMaterializacao()
+    for inicio_lote in range(0, len(regras), TAMANHO_LOTE):
+        lote = regras[inicio_lote:inicio_lote + TAMANHO_LOTE]
+        with transaction.atomic():
+            existentes = set(
+                LancamentoFinanceiro.objects.filter(recorrencia__in=lote, data_ocorrencia__isnull=False)
+                .filter(Q(recorrencia__materializado_ate__isnull=True) | Q(data_ocorrencia__gt=F('recorrencia__materializado_ate')))
+                .values_list('recorrencia_id', 'data_ocorrencia')
+            )
+            lancamentos = [
+                _lancamento(regra, data)
+                for regra in lote
+                for data in ocorrencias(regra, _pendentes(regra, regra.data_inicio), ate)
+                if (regra.pk, data) not in existentes
+            ]
+            LancamentoFinanceiro.objects.bulk_create(lancamentos, batch_size=1000)
+            if lancamentos and lancamentos[0].pk is None:
+                novas = {(lancamento.recorrencia_id, lancamento.data_ocorrencia) for lancamento in lancamentos}
+                lancamentos = [
+                    lancamento for lancamento in LancamentoFinanceiro.objects.filter(recorrencia__in=lote, data_ocorrencia__isnull=False)
+                    if (lancamento.recorrencia_id, lancamento.data_ocorrencia) in novas
+                ]
+
+            for regra in lote:
+                regra.materializado_ate = ate
+            LancamentoRecorrente.objects.bulk_update(lote, ['materializado_ate'], batch_size=1000)
+
+            # bulk_create não dispara os sinais que mantêm o índice de busca, os consolidados e o cache dos painéis
+            indexar_objetos(lancamentos)
+            registrar_alteracoes_lancamentos(
+                (None, {campo: getattr(lancamento, campo) for campo in CAMPOS_MONITORADOS}) for lancamento in lancamentos
+            )
+        resultado.regras += len(lote)
+        resultado.lancamentos += len(lancamentos)
+    return resultado
+
+
+def materializar_ocorrencia(regra, data):
+    """
+    Lançamento da ocorrência da regra na data informada, criado se ainda não existir
+    (ex.: para quitar uma parcela antes de ela entrar no horizonte de materialização).
+    """
+    if next(ocorrencias(regra, data, data), None) is None:
+        raise ValueError(f'{data:%d/%m/%Y} não é uma ocorrência de "{regra.descricao}".')
+    with transaction.atomic():
+        lancamento = LancamentoFinanceiro.objects.filter(recorrencia=regra, data_ocorrencia=data).first()
+        if lancamento is None:
+            lancamento = _lancamento(regra, data)
+            lancamento.save()
+    return lancamento
@@ -0,0 +1,91 @@
+from collections import defaultdict
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, Sum, When
+from django.db.models.functions import Coalesce
+
+from projeto_integrador.cache_paineis import invalidar
+
+from .models import ContaBancaria, LancamentoFinanceiro
+
+CENTAVO = Decimal('0.01')
+
+# Campos de LancamentoFinanceiro que afetam o saldo das contas bancárias
+CAMPOS_SALDO = ['tipo_lancamento', 'status', 'conta_bancaria_id', 'valor_original', 'valor_quitado']
+
+
+def _efeito(estado):
+    """
+    Efeito de um lançamento no saldo da conta: (conta_bancaria_id, valor com sinal) ou None.
+    Só lançamentos quitados e vinculados a uma conta bancária movimentam saldo; o valor
+    considerado é o quitado, ou o original quando o valor quitado não foi informado.
+    """
+    if estado is None or estado['status'] != 'quitado' or estado['conta_bancaria_id'] is None:
+        return None
+    valor = estado['valor_quitado'] if estado['valor_quitado'] is not None else estado['valor_original']
+    return estado['conta_bancaria_id'], valor if estado['tipo_lancamento'] == 'receita' else -valor
+
+
+def registrar_alteracoes(alteracoes):
+    """
+    Ajusta saldo_atual das contas a partir de pares (anterior, atual) de estados de lançamentos
+    (dicts com CAMPOS_SALDO, ou None). As diferenças são somadas por conta e aplicadas com uma
+    instrução UPDATE ... SET saldo_atual = saldo_atual + delta por conta afetada.
+    """
+    deltas = defaultdict(Decimal)
+    for anterior, atual in alteracoes:
+        for estado, sinal in ((anterior, -1), (atual, 1)):
+            efeito = _efeito(estado)
+            if efeito is not None:
+                deltas[efeito[0]] += sinal * efeito[1]
+
+    with transaction.atomic():
+        for conta_bancaria_id, delta in deltas.items():
+            if delta:
+                ContaBancaria.objects.filter(pk=conta_bancaria_id).update(saldo_atual=F('saldo_atual') + delta)
+
+
+def calcular_saldos():
+    """
+    Recalcula o saldo de todas as contas (saldo inicial + lançamentos quitados) com uma
+    única consulta agrupada. Retorna {conta_bancaria_id: saldo}.
+    """
+    valor = Coalesce('valor_quitado', 'valor_original')
+    movimentos = dict(
+        LancamentoFinanceiro.objects.filter(status='quitado', conta_bancaria__isnull=False)
+        .order_by()
+        .values('conta_bancaria_id')
+        .annotate(total=Sum(Case(
+            When(tipo_lancamento='receita', then=valor),
+            default=-valor,
+            output_field=DecimalField(max_digits=14, decimal_places=2),
+        )))
+        .values_list('conta_bancaria_id', 'total')
+    )
+    return {
+        conta_id: (saldo_inicial + (movimentos.get(conta_id) or 0)).quantize(CENTAVO, rounding=ROUND_HALF_UP)
+        for conta_id, saldo_inicial in ContaBancaria.objects.values_list('id', 'saldo_inicial')
+    }
+
+
+def reconciliar_saldos(corrigir=True):
+    """
+    Compara saldo_atual com o saldo recalculado a partir dos lançamentos.
+    Retorna a lista de divergências (conta_bancaria_id, saldo_registrado, saldo_calculado) e,
+    se `corrigir` for verdadeiro, regrava os saldos divergentes em lote.
+    """
+    with transaction.atomic():
+        # Bloqueia as contas antes de recalcular: os ajustes feitos pelos sinais (registrar_alteracoes)
+        # esperam o fim da correção, em vez de serem sobrescritos pelos saldos absolutos regravados
+        contas = list(ContaBancaria.objects.select_for_update().only('id', 'saldo_atual').order_by('id'))
+        calculados = calcular_saldos()
+        divergentes = [conta for conta in contas if conta.saldo_atual != calculados[conta.pk]]
+        divergencias = [(conta.pk, conta.saldo_atual, calculados[conta.pk]) for conta in divergentes]
+
+        if corrigir and divergentes:
+            for conta in divergentes:
+                conta.saldo_atual = calculados[conta.pk]
+            ContaBancaria.objects.bulk_update(divergentes, ['saldo_atual'], batch_size=1000)
+            invalidar('financeiro.ContaBancaria')
+    return divergencias
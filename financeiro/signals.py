@@ -0,0 +1,76 @@
+"""
+Manutenção dos dados consolidados do financeiro (cubo de fluxo de caixa, saldos bancários e
+hierarquia do plano de contas) a cada gravação de LancamentoFinanceiro e ContaContabil.
+
+Os ajustes rodam na mesma transação da gravação: por isso o save()/delete() desses modelos (e de
+BancoDeHoras, cujo saldo é mantido por rh/signals.py) abre uma transação, e o registro e os
+consolidados são gravados juntos ou não são gravados.
+"""
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from projeto_integrador.cache_paineis import invalidar
+
+from . import fluxo_caixa, plano_contas, saldos
+from .models import ContaContabil, LancamentoFinanceiro
+
+# Campos de LancamentoFinanceiro acompanhados pelos dados consolidados (cubo de fluxo de caixa e saldos bancários)
+CAMPOS_MONITORADOS = sorted(set(fluxo_caixa.CAMPOS_FLUXO_CAIXA) | set(saldos.CAMPOS_SALDO))
+
+
+def _estado_lancamento(instance):
+    return {campo: getattr(instance, campo) for campo in CAMPOS_MONITORADOS}
+
+
+def registrar_alteracoes_lancamentos(alteracoes):
+    """
+    Propaga pares (anterior, atual) de estados de lançamentos para todos os dados consolidados.
+    """
+    alteracoes = list(alteracoes)
+    fluxo_caixa.registrar_alteracoes(alteracoes)
+    saldos.registrar_alteracoes(alteracoes)
+    invalidar('financeiro.LancamentoFinanceiro')
+
+
+@receiver(pre_save, sender=LancamentoFinanceiro)
+def guardar_lancamento_anterior(sender, instance, **kwargs):
+    # Guarda o estado gravado no banco para calcular as diferenças no post_save
+    instance._lancamento_anterior = None
+    if instance.pk is not None:
+        instance._lancamento_anterior = (
+            LancamentoFinanceiro.objects.filter(pk=instance.pk)
+            .values(*CAMPOS_MONITORADOS)
+            .first()
+        )
+
+
+@receiver(post_save, sender=LancamentoFinanceiro)
+def atualizar_consolidados(sender, instance, **kwargs):
+    registrar_alteracoes_lancamentos([(getattr(instance, '_lancamento_anterior', None), _estado_lancamento(instance))])
+
+
+@receiver(post_delete, sender=LancamentoFinanceiro)
+def estornar_consolidados(sender, instance, **kwargs):
+    registrar_alteracoes_lancamentos([(_estado_lancamento(instance), None)])
+
+
+@receiver(pre_save, sender=ContaContabil)
+def guardar_conta_pai_anterior(sender, instance, **kwargs):
+    instance._conta_pai_anterior = None
+    if instance.pk is not None:
+        instance._conta_pai_anterior = (
+            ContaContabil.objects.filter(pk=instance.pk).values_list('conta_pai_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=ContaContabil)
+def atualizar_hierarquia(sender, instance, created, **kwargs):
+    if created:
+        plano_contas.inserir_conta(instance)
+    elif instance.conta_pai_id != getattr(instance, '_conta_pai_anterior', instance.conta_pai_id):
+        plano_contas.mover_conta(instance)
+
+
+@receiver(pre_delete, sender=ContaContabil)
+def desligar_subcontas(sender, instance, **kwargs):
+    plano_contas.desligar_subcontas(instance)
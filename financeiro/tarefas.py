@@ -0,0 +1,28 @@
+"""
+Tarefas do Financeiro executadas em segundo plano pelo worker (ver tarefas/registro.py).
+"""
+from tarefas.registro import tarefa
+
+from .conciliacao import JANELA_DIAS, conciliar
+from .recorrencias import materializar
+from .saldos import reconciliar_saldos
+
+
+@tarefa('financeiro.reconciliar_saldos', concorrencia=1)
+def reconciliar_saldos_bancarios(progresso):
+    """Recalcula e corrige o saldo atual das contas bancárias."""
+    return {'divergencias': len(reconciliar_saldos(corrigir=True))}
+
+
+@tarefa('financeiro.conciliar_extratos', concorrencia=1)
+def conciliar_extratos(progresso, conta_ids=None, janela_dias=JANELA_DIAS):
+    """Concilia os movimentos pendentes dos extratos com os lançamentos em aberto."""
+    resultado = conciliar(conta_ids, janela_dias)
+    return {'conciliadas': resultado.conciliadas, 'pendentes': resultado.pendentes}
+
+
+@tarefa('financeiro.materializar_recorrencias', concorrencia=1)
+def materializar_recorrencias(progresso):
+    """Grava as ocorrências dos lançamentos recorrentes que entraram no horizonte de materialização."""
+    resultado = materializar()
+    return {'regras': resultado.regras, 'lancamentos': resultado.lancamentos}
@@ -1,3 +1,618 @@
-from django.test import TestCase
+import datetime
+import io
+import os
+import shutil
+import tempfile
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+
+from . import fluxo_caixa as cubo, nfe, plano_contas
+from .conciliacao import conciliar
+from .extratos import importar_extrato, ler_cnab240, ler_extrato, ler_ofx
+from .fluxo_caixa import fluxo_caixa
+from .models import (
+    CentroCusto, ContaBancaria, ContaContabil, Fornecedor, LancamentoFinanceiro, LancamentoRecorrente, LinhaExtrato,
+    ContaContabilHierarquia, NotaFiscal, ResumoFluxoCaixa,
+)
+from .recorrencias import materializar, materializar_ocorrencia, ocorrencias
+from .saldos import calcular_saldos, reconciliar_saldos
+from .signals import CAMPOS_MONITORADOS, registrar_alteracoes_lancamentos
+
+OFX = '''OFXHEADER:100
+DATA:OFXSGML
+CHARSET:1252
+
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS>
+<BANKACCTFROM><BANKID>001<ACCTID>12345-6</BANKACCTFROM>
+<BANKTRANLIST>
+<STMTTRN>
+<TRNTYPE>CREDIT
+<DTPOSTED>20260305120000[-3:BRT]
+<TRNAMT>1500,00
+<FITID>A1
+<MEMO>PIX recebido   cliente
+</STMTTRN>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20260306
+<TRNAMT>-89.90
+<FITID>A2
+<NAME>Tarifa
+</STMTTRN>
+</BANKTRANLIST>
+</STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+'''
+
+
+def _registro(**campos):
+    """Registro CNAB 240 em branco com os campos informados: nome=(valor, (início, fim))."""
+    registro = [' '] * 240
+    for valor, (inicio, fim) in campos.values():
+        registro[inicio:fim] = list(valor.ljust(fim - inicio)[:fim - inicio])
+    return ''.join(registro)
+
+
+def _header(conta='0000000123456'):
+    return _registro(tipo=('0', (7, 8)), conta=(conta, (58, 71)))
+
+
+def _segmento_e(data, valor_centavos, natureza, descricao, documento, conta='0000000123456'):
+    return _registro(
+        tipo=('3', (7, 8)), segmento=('E', (13, 14)), conta=(conta, (58, 71)), data=(data, (142, 150)),
+        valor=(str(valor_centavos).rjust(18, '0'), (150, 168)), natureza=(natureza, (168, 169)),
+        descricao=(descricao, (176, 201)), documento=(documento, (201, 240)),
+    )
+
+
+def _segmentos_tu(movimento, nosso_numero, valor_centavos, data_ocorrencia, data_credito='00000000'):
+    titulo = _registro(
+        tipo=('3', (7, 8)), segmento=('T', (13, 14)), movimento=(movimento, (15, 17)),
+        nosso_numero=(nosso_numero, (37, 57)), documento=(f'DOC{nosso_numero}', (58, 73)),
+    )
+    pagamento = _registro(
+        tipo=('3', (7, 8)), segmento=('U', (13, 14)), valor=(str(valor_centavos).rjust(15, '0'), (77, 92)),
+        ocorrencia=(data_ocorrencia, (137, 145)), credito=(data_credito, (145, 153)),
+    )
+    return [titulo, pagamento]
+
+
+def _arquivo(registros, separador='\r\n'):
+    return io.BytesIO(separador.join(registros).encode('latin-1'))
+
+
+class LeituraExtratoTests(TestCase):
+    def test_ofx(self):
+        origem, movimentos = ler_extrato(io.BytesIO(OFX.encode('cp1252')))
+        self.assertEqual(origem, 'ofx')
+        self.assertEqual(list(movimentos), [
+            {
+                'conta': '12345-6', 'data': datetime.date(2026, 3, 5), 'tipo': 'credito', 'valor': Decimal('1500.00'),
+                'descricao': 'PIX recebido cliente', 'documento': 'A1',
+            },
+            {
+                'conta': '12345-6', 'data': datetime.date(2026, 3, 6), 'tipo': 'debito', 'valor': Decimal('89.90'),
+                'descricao': 'Tarifa', 'documento': 'A2',
+            },
+        ])
+
+    def test_ofx_com_valor_invalido(self):
+        with self.assertRaises(ValueError):
+            list(ler_ofx(io.BytesIO(OFX.replace('-89.90', 'abc').encode())))
+
+    def test_cnab240_segmento_e(self):
+        arquivo = _arquivo([
+            _header(),
+            _segmento_e('05032026', 150000, 'C', 'PIX RECEBIDO', 'D1'),
+            _segmento_e('06032026', 8990, 'D', 'TARIFA', 'D2'),
+        ])
+        origem, movimentos = ler_extrato(arquivo)
+        movimentos = list(movimentos)
+        self.assertEqual(origem, 'cnab240')
+        self.assertEqual([(m['data'], m['tipo'], m['valor']) for m in movimentos], [
+            (datetime.date(2026, 3, 5), 'credito', Decimal('1500.00')),
+            (datetime.date(2026, 3, 6), 'debito', Decimal('89.90')),
+        ])
+        self.assertEqual((movimentos[0]['conta'], movimentos[0]['descricao'], movimentos[0]['documento']), ('0000000123456', 'PIX RECEBIDO', 'D1'))
+
+    def test_cnab240_segmentos_t_e_u(self):
+        arquivo = _arquivo(
+            [_header()]
+            + _segmentos_tu('06', 'N1', 25050, '10032026', '11032026') # Liquidação: vale a data do crédito
+            + _segmentos_tu('02', 'N2', 10000, '10032026') # Entrada confirmada: não é movimento
+            + _segmentos_tu('17', 'N3', 5000, '12032026') # Sem data de crédito: a da ocorrência
+        )
+        movimentos = list(ler_cnab240(arquivo))
+        self.assertEqual([(m['conta'], m['data'], m['tipo'], m['valor'], m['documento']) for m in movimentos], [
+            ('0000000123456', datetime.date(2026, 3, 11), 'credito', Decimal('250.50'), 'N1'),
+            ('0000000123456', datetime.date(2026, 3, 12), 'credito', Decimal('50.00'), 'N3'),
+        ])
+
+    def test_cnab240_sem_quebras_de_linha(self):
+        registros = [_header(), _segmento_e('05032026', 150000, 'C', 'PIX', 'D1')] + _segmentos_tu('06', 'N1', 100, '10032026')
+        com_quebras = list(ler_cnab240(_arquivo(registros)))
+        self.assertEqual(list(ler_cnab240(_arquivo(registros, separador=''))), com_quebras)
+        self.assertEqual(len(com_quebras), 2)
+
+    def test_cnab240_registro_truncado(self):
+        with self.assertRaises(ValueError):
+            list(ler_cnab240(_arquivo([_header(), _segmento_e('05032026', 100, 'C', 'PIX', 'D1')[:200]])))
+
+    def test_formato_desconhecido(self):
+        with self.assertRaises(ValueError):
+            ler_extrato(io.BytesIO(b'data;valor\n05/03/2026;10,00\n'))
+
+
+class ConciliacaoTests(TestCase):
+    def setUp(self):
+        self.conta_contabil = ContaContabil.objects.create(nome='Vendas', tipo='receita')
+        self.conta = ContaBancaria.objects.create(banco='Banco', agencia='1', numero_conta='12345-6', saldo_inicial=Decimal('1000.00'))
+        self.outra_conta = ContaBancaria.objects.create(banco='Banco', agencia='1', numero_conta='999-1')
+
+    def _lancamento(self, vencimento, valor='100.00', tipo='receita', conta=None):
+        return LancamentoFinanceiro.objects.create(
+            tipo_lancamento=tipo, data_vencimento=vencimento, valor_original=Decimal(valor),
+            descricao='Teste', conta_contabil=self.conta_contabil, conta_bancaria=conta,
+        )
+
+    def _importar(self, *movimentos):
+        # Movimentos: (data, tipo, valor) na conta principal
+        return importar_extrato(
+            [
+                {'conta': '12345-6', 'data': data, 'tipo': tipo, 'valor': Decimal(valor), 'descricao': 'Movimento', 'documento': ''}
+                for data, tipo, valor in movimentos
+            ],
+            'ofx',
+        )
+
+    def test_reimportacao_nao_duplica(self):
+        def importar_ofx():
+            origem, movimentos = ler_extrato(io.BytesIO(OFX.encode('cp1252')))
+            return importar_extrato(movimentos, origem)
+
+        primeira = importar_ofx()
+        segunda = importar_ofx()
+        self.assertEqual((primeira.importadas, primeira.duplicadas), (2, 0))
+        self.assertEqual((segunda.importadas, segunda.duplicadas), (0, 2))
+        self.assertEqual(primeira.contas, {self.conta.pk})
+        self.assertEqual(LinhaExtrato.objects.count(), 2)
+
+    def test_movimentos_identicos_no_mesmo_extrato_sao_mantidos(self):
+        dia = datetime.date(2026, 3, 5)
+        resultado = self._importar((dia, 'debito', '10.00'), (dia, 'debito', '10.00'))
+        self.assertEqual(resultado.importadas, 2)
+        self.assertEqual(self._importar((dia, 'debito', '10.00'), (dia, 'debito', '10.00')).duplicadas, 2)
+
+    def test_conta_nao_cadastrada(self):
+        with self.assertRaises(ValueError):
+            importar_extrato([{'conta': '555', 'data': datetime.date(2026, 3, 5), 'tipo': 'credito', 'valor': Decimal('1'), 'descricao': '', 'documento': ''}], 'ofx')
+
+    def test_vencimento_mais_proximo_dentro_da_janela(self):
+        dia = datetime.date(2026, 3, 10)
+        distante = self._lancamento(dia - datetime.timedelta(days=4), conta=self.conta)
+        proximo = self._lancamento(dia + datetime.timedelta(days=1), conta=self.conta)
+        fora_da_janela = self._lancamento(dia + datetime.timedelta(days=6), valor='50.00', conta=self.conta)
+        outro_valor = self._lancamento(dia, valor='100.01', conta=self.conta)
+        despesa = self._lancamento(dia, tipo='despesa', conta=self.conta)
+        self._importar((dia, 'credito', '100.00'), (dia, 'credito', '50.00'))
+
+        resultado = conciliar(janela_dias=5)
+
+        self.assertEqual((resultado.conciliadas, resultado.pendentes), (1, 1))
+        self.assertEqual(LinhaExtrato.objects.get(valor=Decimal('100.00')).lancamento_id, proximo.pk)
+        status = dict(LancamentoFinanceiro.objects.values_list('id', 'status'))
+        self.assertEqual(status[proximo.pk], 'quitado')
+        for lancamento in (distante, fora_da_janela, outro_valor, despesa):
+            self.assertEqual(status[lancamento.pk], 'aberto')
+
+    def test_conta_do_extrato_tem_preferencia(self):
+        dia = datetime.date(2026, 3, 10)
+        sem_conta = self._lancamento(dia)
+        da_conta = self._lancamento(dia, conta=self.conta)
+        de_outra_conta = self._lancamento(dia, conta=self.outra_conta)
+        self._importar((dia, 'credito', '100.00'))
+
+        conciliar()
+
+        self.assertEqual(LinhaExtrato.objects.get().lancamento_id, da_conta.pk)
+        self.assertEqual(LancamentoFinanceiro.objects.get(pk=sem_conta.pk).status, 'aberto')
+        self.assertEqual(LancamentoFinanceiro.objects.get(pk=de_outra_conta.pk).status, 'aberto')
+
+    def test_lancamento_sem_conta_recebe_a_conta_do_extrato(self):
+        dia = datetime.date(2026, 3, 10)
+        sem_conta = self._lancamento(dia + datetime.timedelta(days=2), valor='80.00', tipo='despesa')
+        de_outra_conta = self._lancamento(dia, valor='80.00', tipo='despesa', conta=self.outra_conta)
+        self._importar((dia, 'debito', '80.00'))
+
+        conciliar()
+
+        sem_conta.refresh_from_db()
+        self.assertEqual(
+            (sem_conta.status, sem_conta.valor_quitado, sem_conta.conta_bancaria_id, sem_conta.data_pagamento_recebimento),
+            ('quitado', Decimal('80.00'), self.conta.pk, dia),
+        )
+        self.assertEqual(LancamentoFinanceiro.objects.get(pk=de_outra_conta.pk).status, 'aberto')
+
+    def test_saldos_consistentes_apos_conciliar(self):
+        dia = datetime.date(2026, 3, 10)
+        self._lancamento(dia, valor='300.00')
+        self._lancamento(dia, valor='120.00', tipo='despesa', conta=self.conta)
+        self._importar((dia, 'credito', '300.00'), (dia, 'debito', '120.00'))
+
+        self.assertEqual(conciliar().conciliadas, 2)
+        self.assertEqual(conciliar().conciliadas, 0) # Nada pendente para conciliar de novo
+
+        self.conta.refresh_from_db()
+        self.assertEqual(self.conta.saldo_atual, Decimal('1180.00'))
+        self.assertEqual(reconciliar_saldos(corrigir=False), [])
+
+
+class RecorrenciaTests(TestCase):
+    def setUp(self):
+        self.aluguel_conta = ContaContabil.objects.create(nome='Aluguel', tipo='despesa')
+        self.receita_conta = ContaContabil.objects.create(nome='Contratos', tipo='receita')
+        self.frota = CentroCusto.objects.create(nome='Frota')
+
+    def _regra(self, **campos):
+        dados = {
+            'descricao': 'Aluguel', 'tipo_lancamento': 'despesa', 'valor': Decimal('2500.00'), 'dia_vencimento': 10,
+            'data_inicio': datetime.date(2026, 1, 1), 'conta_contabil': self.aluguel_conta,
+        }
+        dados.update(campos)
+        return LancamentoRecorrente.objects.create(**dados)
+
+    def test_dia_de_vencimento_limitado_ao_fim_do_mes(self):
+        regra = LancamentoRecorrente(data_inicio=datetime.date(2024, 1, 31), dia_vencimento=31, intervalo_meses=1)
+        self.assertEqual(list(ocorrencias(regra, datetime.date(2024, 1, 1), datetime.date(2024, 4, 30))), [
+            datetime.date(2024, 1, 31), datetime.date(2024, 2, 29), datetime.date(2024, 3, 31), datetime.date(2024, 4, 30),
+        ])
+        for dia, esperado in ((29, 28), (30, 28), (31, 28)):
+            regra = LancamentoRecorrente(data_inicio=datetime.date(2025, 1, 1), dia_vencimento=dia, intervalo_meses=1)
+            with self.subTest(dia=dia):
+                fevereiro = list(ocorrencias(regra, datetime.date(2025, 2, 1), datetime.date(2025, 2, 28)))
+                self.assertEqual(fevereiro, [datetime.date(2025, 2, esperado)])
+        regra = LancamentoRecorrente(data_inicio=datetime.date(2024, 1, 1), dia_vencimento=30, intervalo_meses=1)
+        self.assertEqual(list(ocorrencias(regra, datetime.date(2024, 2, 1), datetime.date(2024, 2, 29))), [datetime.date(2024, 2, 29)])
+
+    def test_intervalos_maiores_que_um_mes_e_vigencia(self):
+        regra = LancamentoRecorrente(
+            data_inicio=datetime.date(2026, 1, 20), data_fim=datetime.date(2027, 1, 15), dia_vencimento=15, intervalo_meses=3,
+        )
+        # A primeira ocorrência cairia antes do início da vigência
+        self.assertEqual(list(ocorrencias(regra, datetime.date(2025, 1, 1), datetime.date(2030, 1, 1))), [
+            datetime.date(2026, 4, 15), datetime.date(2026, 7, 15), datetime.date(2026, 10, 15), datetime.date(2027, 1, 15),
+        ])
+        # Começando no meio do período, sem percorrer as ocorrências anteriores
+        self.assertEqual(
+            list(ocorrencias(regra, datetime.date(2026, 5, 1), datetime.date(2026, 12, 31))),
+            [datetime.date(2026, 7, 15), datetime.date(2026, 10, 15)],
+        )
+        anual = LancamentoRecorrente(data_inicio=datetime.date(2024, 2, 29), dia_vencimento=29, intervalo_meses=12)
+        self.assertEqual(list(ocorrencias(anual, datetime.date(2024, 1, 1), datetime.date(2026, 12, 31))), [
+            datetime.date(2024, 2, 29), datetime.date(2025, 2, 28), datetime.date(2026, 2, 28),
+        ])
+
+    def _fluxos(self):
+        inicio, fim = datetime.date(2026, 1, 1), datetime.date(2027, 12, 1)
+        return {
+            (granularidade, data_base): sorted(
+                (
+                    (linha['periodo'], linha['conta_contabil_id'], linha['centro_custo_id'], linha['previsto'], linha['realizado'])
+                    for linha in fluxo_caixa(inicio, fim if granularidade == 'mes' else datetime.date(2027, 12, 31), granularidade, data_base)
+                ),
+                key=str,
+            )
+            for granularidade in ('mes', 'dia')
+            for data_base in ('vencimento', 'competencia')
+        }
+
+    def test_fluxo_de_caixa_igual_antes_e_depois_de_materializar(self):
+        self._regra()
+        self._regra(
+            descricao='Locação da frota', tipo_lancamento='receita', valor=Decimal('980.45'), dia_vencimento=31,
+            intervalo_meses=2, conta_contabil=self.receita_conta, centro_custo=self.frota, data_fim=datetime.date(2027, 6, 30),
+        )
+        self._regra(descricao='Inativa', ativo=False)
+        LancamentoFinanceiro.objects.create(
+            tipo_lancamento='despesa', data_vencimento=datetime.date(2026, 3, 10), valor_original=Decimal('100.00'),
+            descricao='Avulso', conta_contabil=self.aluguel_conta,
+        )
+
+        projetado = self._fluxos()
+        mensal = {linha[0]: linha[3] for linha in projetado[('mes', 'vencimento')] if linha[1] == self.aluguel_conta.pk}
+        self.assertEqual(mensal[datetime.date(2026, 3, 1)], Decimal('-2600.00'))
+        self.assertEqual(mensal[datetime.date(2027, 12, 1)], Decimal('-2500.00'))
+        self.assertEqual(LancamentoFinanceiro.objects.count(), 1) # Projetar não grava lançamentos
+
+        resultado = materializar(ate=datetime.date(2026, 6, 30))
+        self.assertEqual(resultado.lancamentos, 6 + 3)
+        self.assertEqual(materializar(ate=datetime.date(2026, 6, 30)).lancamentos, 0)
+        self.assertEqual(self._fluxos(), projetado)
+
+        regra = LancamentoRecorrente.objects.get(descricao='Aluguel')
+        antecipada = materializar_ocorrencia(regra, datetime.date(2027, 2, 10))
+        self.assertEqual(materializar_ocorrencia(regra, datetime.date(2027, 2, 10)).pk, antecipada.pk)
+        self.assertEqual(self._fluxos(), projetado)
+
+        # Até o fim do período: nada mais é projetado e a ocorrência antecipada não é duplicada
+        materializar(ate=datetime.date(2027, 12, 31))
+        self.assertEqual(self._fluxos(), projetado)
+        self.assertEqual(LancamentoFinanceiro.objects.filter(recorrencia=regra, data_ocorrencia=datetime.date(2027, 2, 10)).count(), 1)
+
+    def test_ocorrencia_quitada_antes_do_horizonte(self):
+        regra = self._regra()
+        antes = self._fluxos()
+        lancamento = materializar_ocorrencia(regra, datetime.date(2026, 11, 10))
+        lancamento.status = 'quitado'
+        lancamento.valor_quitado = lancamento.valor_original
+        lancamento.data_pagamento_recebimento = datetime.date(2026, 3, 1)
+        lancamento.save()
+
+        depois = self._fluxos()[('mes', 'vencimento')]
+        novembro = [linha for linha in depois if linha[0] == datetime.date(2026, 11, 1)]
+        self.assertEqual([(linha[3], linha[4]) for linha in novembro], [(Decimal('-2500.00'), Decimal('-2500.00'))])
+        self.assertEqual(
+            [linha for linha in depois if linha[0] != datetime.date(2026, 11, 1)],
+            [linha for linha in antes[('mes', 'vencimento')] if linha[0] != datetime.date(2026, 11, 1)],
+        )
+
+    def test_data_que_nao_e_ocorrencia(self):
+        regra = self._regra(intervalo_meses=3)
+        with self.assertRaises(ValueError):
+            materializar_ocorrencia(regra, datetime.date(2026, 2, 10))
+        with self.assertRaises(ValueError):
+            materializar_ocorrencia(regra, datetime.date(2026, 4, 11))
+        self.assertFalse(LancamentoFinanceiro.objects.exists())
+
+
+def _nfe(numero, serie='1', cnpj='11222333000181', chave=None, duplicatas=()):
+    cobranca = ''.join(f'<dup><nDup>{n}</nDup><dVenc>{vencimento}</dVenc><vDup>{valor}</vDup></dup>' for n, vencimento, valor in duplicatas)
+    return (
+        '<nfeProc xmlns="http://www.portalfiscal.inf.br/nfe"><NFe>'
+        f'<infNFe Id="NFe{chave or numero.zfill(44)}">'
+        f'<ide><serie>{serie}</serie><nNF>{numero}</nNF><dhEmi>2026-03-10T09:30:00-03:00</dhEmi></ide>'
+        f'<emit><CNPJ>{cnpj}</CNPJ><xNome>Distribuidora Exemplo Ltda</xNome><enderEmit><xMun>Campinas</xMun><UF>SP</UF></enderEmit></emit>'
+        '<total><ICMSTot><vNF>1000.00</vNF></ICMSTot></total>'
+        f'<cobr>{cobranca}</cobr>'
+        '</infNFe></NFe></nfeProc>'
+    ).encode()
+
+
+MEDIA_TESTES = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_TESTES)
+class NotaFiscalTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_TESTES, ignore_errors=True)
+
+    def setUp(self):
+        self.conta = ContaContabil.objects.create(nome='Fornecedores', tipo='passivo', codigo='2.1.1')
+
+    def _importar(self, *arquivos, **opcoes):
+        notas = (nota for nome, conteudo in arquivos for nota in nfe.ler_arquivo(ContentFile(conteudo, name=nome), nome))
+        return nfe.importar_notas(notas, self.conta, **opcoes)
+
+    def _xmls_arquivados(self):
+        pasta = os.path.join(NotaFiscal._meta.get_field('arquivo_xml').storage.location, 'notas_fiscais', 'xml')
+        return sorted(os.listdir(pasta)) if os.path.isdir(pasta) else []
+
+    def test_importa_nota_com_duplicatas(self):
+        resultado = self._importar(('a.xml', _nfe('123', duplicatas=[('001', '2026-04-10', '400.00'), ('002', '2026-05-10', '600.00')])))
+        self.assertEqual((resultado.importadas, resultado.lancamentos, resultado.fornecedores_criados), (1, 2, 1))
+        nota = NotaFiscal.objects.get()
+        self.assertEqual(nota.fornecedor.pessoa.cpf_cnpj, '11.222.333/0001-81')
+        self.assertTrue(nota.arquivo_xml.name.endswith('.xml'))
+        self.assertEqual(
+            sorted(LancamentoFinanceiro.objects.values_list('data_vencimento', 'valor_original')),
+            [(datetime.date(2026, 4, 10), Decimal('400.00')), (datetime.date(2026, 5, 10), Decimal('600.00'))],
+        )
+
+    def test_notas_repetidas_nao_sao_duplicadas(self):
+        self._importar(('a.xml', _nfe('123')))
+        # Mesma nota reimportada, com zeros à esquerda e repetida no mesmo lote
+        resultado = self._importar(('b.xml', _nfe('000123', serie='001')), ('c.xml', _nfe('124')), ('d.xml', _nfe('124')))
+        self.assertEqual((resultado.importadas, resultado.duplicadas, resultado.fornecedores_criados), (1, 2, 0))
+        self.assertEqual(NotaFiscal.objects.count(), 2)
+        self.assertEqual(Fornecedor.objects.count(), 1)
+        # Outro emitente com o mesmo número é outra nota
+        self.assertEqual(self._importar(('e.xml', _nfe('123', cnpj='99888777000166'))).importadas, 1)
+
+    def test_nota_invalida_nao_interrompe(self):
+        resultado = self._importar(('a.xml', b'<nfeProc>'), ('b.xml', _nfe('')), ('c.xml', _nfe('125')))
+        self.assertEqual((resultado.importadas, resultado.total_erros), (1, 2))
+        self.assertEqual([origem for origem, _ in resultado.erros], ['a.xml', 'b.xml'])
+
+    def test_falha_na_gravacao_remove_os_xmls_arquivados(self):
+        antes = self._xmls_arquivados()
+
+        def falhar(objetos):
+            # Os XMLs já estão no armazenamento quando a transação é desfeita
+            self.assertEqual(len(self._xmls_arquivados()), len(antes) + 2)
+            raise RuntimeError('falha simulada')
+
+        with mock.patch.object(nfe, 'indexar_objetos', side_effect=falhar):
+            with self.assertRaises(RuntimeError):
+                self._importar(('a.xml', _nfe('321')), ('b.xml', _nfe('322')))
+        self.assertFalse(NotaFiscal.objects.exists())
+        self.assertEqual(self._xmls_arquivados(), antes)
+
+
+class FluxoCaixaCuboTests(TestCase):
+    def setUp(self):
+        self.vendas = ContaContabil.objects.create(nome='Vendas', tipo='receita')
+        self.aluguel = ContaContabil.objects.create(nome='Aluguel', tipo='despesa')
+        self.frota = CentroCusto.objects.create(nome='Frota')
+
+    def _lancamento(self, tipo, valor, vencimento, conta, **campos):
+        return LancamentoFinanceiro.objects.create(
+            tipo_lancamento=tipo, valor_original=Decimal(valor), data_vencimento=vencimento, conta_contabil=conta,
+            descricao=f'{conta.nome} {vencimento}', **campos,
+        )
+
+    @staticmethod
+    def _cubo():
+        # Células zeradas pelos estornos equivalem a células ausentes na reconstrução
+        celulas = {}
+        for celula in ResumoFluxoCaixa.objects.all():
+            if celula.quantidade or celula.valor_original or celula.valor_quitado:
+                chave = (
+                    celula.granularidade, celula.data_base, celula.periodo, celula.tipo_lancamento, celula.status,
+                    celula.conta_contabil_id, celula.centro_custo_id,
+                )
+                celulas[chave] = (celula.quantidade, celula.valor_original, celula.valor_quitado)
+        return celulas
+
+    def test_sinais_coincidem_com_a_reconstrucao(self):
+        venda = self._lancamento('receita', '1000.00', datetime.date(2026, 3, 10), self.vendas, data_competencia=datetime.date(2026, 3, 1))
+        aluguel = self._lancamento('despesa', '300.00', datetime.date(2026, 3, 15), self.aluguel, centro_custo=self.frota)
+        removido = self._lancamento('receita', '500.00', datetime.date(2026, 4, 5), self.vendas)
+        self._lancamento('despesa', '80.00', datetime.date(2026, 4, 8), self.aluguel, status='cancelado')
+
+        venda.status = 'quitado'
+        venda.valor_quitado = Decimal('990.00')
+        venda.data_vencimento = datetime.date(2026, 4, 2) # Muda de mês: sai da célula de março
+        venda.save()
+        aluguel.centro_custo = None
+        aluguel.save()
+        removido.delete()
+
+        incremental = self._cubo()
+        cubo.reconstruir_cubo()
+        self.assertEqual(incremental, self._cubo())
+
+        linhas = {
+            (linha['periodo'], linha['conta_contabil_id']): (linha['previsto'], linha['realizado'])
+            for linha in cubo.fluxo_caixa(datetime.date(2026, 3, 1), datetime.date(2026, 4, 1))
+        }
+        self.assertEqual(linhas, {
+            (datetime.date(2026, 3, 1), self.aluguel.pk): (Decimal('-300.00'), Decimal('0.00')),
+            (datetime.date(2026, 4, 1), self.vendas.pk): (Decimal('1000.00'), Decimal('990.00')),
+        })
+
+    def test_alteracoes_em_lote(self):
+        lancamentos = [
+            self._lancamento('despesa', '50.00', datetime.date(2026, 5, dia), self.aluguel) for dia in (1, 2, 3)
+        ]
+        anteriores = list(LancamentoFinanceiro.objects.order_by('pk').values(*CAMPOS_MONITORADOS))
+        LancamentoFinanceiro.objects.filter(pk__in=[l.pk for l in lancamentos]).update(status='quitado', valor_quitado=Decimal('50.00'))
+        # Quem altera via QuerySet.update() informa as diferenças, como a conciliação bancária
+        registrar_alteracoes_lancamentos(zip(anteriores, LancamentoFinanceiro.objects.order_by('pk').values(*CAMPOS_MONITORADOS)))
+
+        incremental = self._cubo()
+        cubo.reconstruir_cubo()
+        self.assertEqual(incremental, self._cubo())
+
+
+class PlanoContasTests(TestCase):
+    def setUp(self):
+        self.ativo = ContaContabil.objects.create(nome='Ativo', tipo='ativo', aceita_lancamentos=False)
+        self.circulante = ContaContabil.objects.create(nome='Circulante', tipo='ativo', conta_pai=self.ativo)
+        self.caixa = ContaContabil.objects.create(nome='Caixa', tipo='ativo', conta_pai=self.circulante)
+        self.bancos = ContaContabil.objects.create(nome='Bancos', tipo='ativo', conta_pai=self.circulante)
+        self.passivo = ContaContabil.objects.create(nome='Passivo', tipo='passivo', aceita_lancamentos=False)
+
+    @staticmethod
+    def _hierarquia():
+        return set(ContaContabilHierarquia.objects.values_list('ancestral_id', 'descendente_id', 'profundidade'))
+
+    def _confere_com_reconstrucao(self):
+        incremental = self._hierarquia()
+        plano_contas.reconstruir_hierarquia()
+        self.assertEqual(incremental, self._hierarquia())
+
+    def test_sinais_coincidem_com_a_reconstrucao(self):
+        self._confere_com_reconstrucao()
+        self.assertEqual(
+            [conta.nome for conta in plano_contas.ancestrais(self.caixa)], ['Ativo', 'Circulante'],
+        )
+
+        # Move a subárvore inteira e depois exclui o novo pai: as subcontas viram raízes
+        self.circulante.conta_pai = self.passivo
+        self.circulante.save()
+        self._confere_com_reconstrucao()
+        self.assertEqual(
+            sorted(plano_contas.descendentes(self.passivo).values_list('nome', flat=True)),
+            ['Bancos', 'Caixa', 'Circulante', 'Passivo'],
+        )
+        self.passivo.delete()
+        self._confere_com_reconstrucao()
+        self.assertEqual(list(plano_contas.ancestrais(self.caixa)), [self.circulante])
+
+    def test_ciclo_e_rejeitado(self):
+        antes = self._hierarquia()
+        for pai in (self.ativo, self.caixa):
+            with self.subTest(pai=pai.nome):
+                self.ativo.conta_pai = pai
+                with self.assertRaises(ValidationError):
+                    self.ativo.save()
+                self.assertIsNone(ContaContabil.objects.get(pk=self.ativo.pk).conta_pai_id)
+                self.assertEqual(self._hierarquia(), antes)
+
+    def test_totais_consolidados(self):
+        for conta, valor in ((self.caixa, '100.00'), (self.bancos, '250.00'), (self.circulante, '5.00')):
+            LancamentoFinanceiro.objects.create(
+                tipo_lancamento='receita', valor_original=Decimal(valor), data_vencimento=datetime.date(2026, 3, 1),
+                conta_contabil=conta, descricao=conta.nome,
+            )
+        self.assertEqual(plano_contas.total_lancamentos(self.ativo), Decimal('355.00'))
+        totais = plano_contas.totais_consolidados()
+        self.assertEqual(
+            (totais[self.ativo.pk], totais[self.circulante.pk], totais[self.bancos.pk]),
+            (Decimal('355.00'), Decimal('355.00'), Decimal('250.00')),
+        )
+
+
+class SaldosTests(TestCase):
+    def setUp(self):
+        self.vendas = ContaContabil.objects.create(nome='Vendas', tipo='receita')
+        self.conta = ContaBancaria.objects.create(banco='Banco do Brasil', agencia='0001', numero_conta='111-1', saldo_inicial=Decimal('1000.00'))
+        self.outra = ContaBancaria.objects.create(banco='Itaú', agencia='0002', numero_conta='222-2')
+
+    def _lancamento(self, tipo, valor, conta, status='quitado', **campos):
+        return LancamentoFinanceiro.objects.create(
+            tipo_lancamento=tipo, valor_original=Decimal(valor), data_vencimento=datetime.date(2026, 3, 1),
+            conta_contabil=self.vendas, descricao='Movimento', conta_bancaria=conta, status=status, **campos,
+        )
+
+    def _saldos(self):
+        return dict(ContaBancaria.objects.values_list('id', 'saldo_atual'))
+
+    def test_sinais_coincidem_com_o_recalculo(self):
+        recebido = self._lancamento('receita', '200.00', self.conta, valor_quitado=Decimal('190.00'))
+        pago = self._lancamento('despesa', '50.00', self.conta)
+        aberto = self._lancamento('receita', '999.00', self.conta, status='aberto')
+        self._lancamento('receita', '70.00', None)
+        removido = self._lancamento('despesa', '30.00', self.outra)
+
+        pago.conta_bancaria = self.outra
+        pago.save()
+        recebido.status = 'aberto' # Estorno da quitação
+        recebido.save()
+        aberto.status = 'quitado'
+        aberto.save()
+        removido.delete()
+
+        self.assertEqual(self._saldos(), {self.conta.pk: Decimal('1999.00'), self.outra.pk: Decimal('-50.00')})
+        self.assertEqual(self._saldos(), calcular_saldos())
+        self.assertEqual(reconciliar_saldos(corrigir=False), [])
+
+    def test_instancia_desatualizada_nao_sobrescreve_o_saldo(self):
+        desatualizada = ContaBancaria.objects.get(pk=self.conta.pk)
+        self._lancamento('receita', '300.00', self.conta)
+        desatualizada.saldo_inicial = Decimal('1500.00')
+        desatualizada.save()
+        self.assertEqual(desatualizada.saldo_atual, Decimal('1800.00'))
+        self.assertEqual(reconciliar_saldos(corrigir=False), [])
+
+    def test_reconciliar_corrige_divergencias(self):
+        self._lancamento('receita', '300.00', self.conta)
+        ContaBancaria.objects.filter(pk=self.conta.pk).update(saldo_atual=Decimal('1.00'))
+        self.assertEqual(reconciliar_saldos(), [(self.conta.pk, Decimal('1.00'), Decimal('1300.00'))])
+        self.assertEqual(self._saldos()[self.conta.pk], Decimal('1300.00'))
+        self.assertEqual(reconciliar_saldos(), [])
@@ -5,4 +5,11 @@ app_name = 'financeiro'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('extratos/importar/', views.extratos_importar, name='extratos_importar'),
+    path('extratos/conciliar/', views.extratos_conciliar, name='extratos_conciliar'),
+    path('recorrencias/<int:pk>/materializar/', views.recorrencia_materializar, name='recorrencia_materializar'),
+    path('fluxo-caixa/', views.fluxo_caixa, name='fluxo_caixa'),
+    path('lancamentos/exportar/', views.lancamentos_exportar, name='lancamentos_exportar'),
+    path('notas-fiscais/importar/', views.notas_fiscais_importar, name='notas_fiscais_importar'),
+    path('saldos/reconciliar/', views.saldos_reconciliar, name='saldos_reconciliar'),
 ]
\ No newline at end of file
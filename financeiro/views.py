@@ -1,9 +1,192 @@
-from django.shortcuts import render
+import datetime
 
-def index(request):
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_POST
+
+from projeto_integrador.cache_paineis import pagina_em_cache
+from projeto_integrador.exportacao import exportar
+from tarefas.fila import enfileirar
+from tarefas.views import tarefa_enfileirada
+from . import painel as painel_financeiro
+from .conciliacao import conciliar
+from .extratos import importar_extrato, ler_extrato
+from .fluxo_caixa import fluxo_caixa as consultar_fluxo_caixa
+from .models import ContaBancaria, LancamentoFinanceiro, LancamentoRecorrente
+from .nfe import conta_a_pagar, importar_notas, ler_arquivo
+from .recorrencias import materializar_ocorrencia
+
+async def index(request):
     """
     View para a página inicial (index).
+    Painel com os indicadores do módulo, consultados ao mesmo tempo e mantidos em cache.
+    """
+    return await pagina_em_cache('financeiro/index.html', painel_financeiro.INDICADORES)
+
+def _mes(valor, padrao):
+    try:
+        return datetime.datetime.strptime(valor, '%Y-%m').date()
+    except (TypeError, ValueError):
+        return padrao
+
+@staff_member_required
+def fluxo_caixa(request):
+    """
+    Fluxo de caixa previsto x realizado por mês, conta contábil e centro de custo (JSON).
+    Parâmetros: inicio e fim (AAAA-MM), data_base (vencimento/competencia), conta e centro (ids).
+    """
+    hoje = datetime.date.today().replace(day=1)
+    inicio = _mes(request.GET.get('inicio'), hoje)
+    fim = _mes(request.GET.get('fim'), inicio)
+    data_base = request.GET.get('data_base', 'vencimento')
+    if data_base not in ('vencimento', 'competencia'):
+        return JsonResponse({'erro': 'data_base inválida'}, status=400)
+    try:
+        conta_contabil = int(request.GET['conta']) if request.GET.get('conta') else None
+        centro_custo = int(request.GET['centro']) if request.GET.get('centro') else None
+    except ValueError:
+        return JsonResponse({'erro': 'conta e centro devem ser ids numéricos'}, status=400)
+
+    linhas = consultar_fluxo_caixa(
+        inicio,
+        fim, # As células mensais são datadas do primeiro dia do mês
+        data_base=data_base,
+        conta_contabil=conta_contabil,
+        centro_custo=centro_custo,
+    )
+    return JsonResponse({
+        'inicio': f'{inicio:%Y-%m}',
+        'fim': f'{fim:%Y-%m}',
+        'data_base': data_base,
+        'linhas': [
+            {
+                'mes': f'{linha["periodo"]:%Y-%m}',
+                'conta_contabil': linha['conta_contabil__nome'],
+                'conta_contabil_id': linha['conta_contabil_id'],
+                'centro_custo': linha['centro_custo__nome'],
+                'centro_custo_id': linha['centro_custo_id'],
+                'previsto': str(linha['previsto']),
+                'realizado': str(linha['realizado']),
+            }
+            for linha in linhas
+        ],
+    })
+
+COLUNAS_EXPORTACAO_LANCAMENTOS = [
+    ('id', 'ID'), ('tipo_lancamento', 'Tipo'), ('status', 'Status'), ('descricao', 'Descrição'),
+    ('data_vencimento', 'Vencimento'), ('data_competencia', 'Competência'),
+    ('data_pagamento_recebimento', 'Pagamento/recebimento'), ('valor_original', 'Valor original'),
+    ('valor_quitado', 'Valor quitado'), ('conta_contabil__codigo', 'Código da conta contábil'),
+    ('conta_contabil__nome', 'Conta contábil'), ('centro_custo__nome', 'Centro de custo'),
+    ('pessoa__nome_razao_social', 'Pessoa'), ('conta_bancaria__banco', 'Banco'), ('conta_bancaria__numero_conta', 'Conta bancária'),
+]
+
+@staff_member_required
+def lancamentos_exportar(request):
+    """
+    Exportação dos lançamentos financeiros em CSV ou XLSX (?formato=), em ordem de vencimento.
+    Parâmetros opcionais: inicio e fim (AAAA-MM) do vencimento, tipo e status.
+    """
+    lancamentos = LancamentoFinanceiro.objects.order_by('data_vencimento', 'id')
+    inicio = _mes(request.GET.get('inicio'), None)
+    fim = _mes(request.GET.get('fim'), None)
+    if inicio:
+        lancamentos = lancamentos.filter(data_vencimento__gte=inicio)
+    if fim:
+        lancamentos = lancamentos.filter(data_vencimento__lt=(fim + datetime.timedelta(days=31)).replace(day=1))
+    if request.GET.get('tipo'):
+        lancamentos = lancamentos.filter(tipo_lancamento=request.GET['tipo'])
+    if request.GET.get('status'):
+        lancamentos = lancamentos.filter(status=request.GET['status'])
+    return exportar(request, lancamentos, COLUNAS_EXPORTACAO_LANCAMENTOS, 'lancamentos')
+
+@staff_member_required
+@require_POST
+def saldos_reconciliar(request):
+    """
+    Enfileira a reconciliação dos saldos das contas bancárias com os lançamentos quitados.
+    Responde 202 com o endereço para acompanhar a execução em /tarefas/<id>/.
+    """
+    return tarefa_enfileirada(enfileirar('financeiro.reconciliar_saldos'))
+
+@staff_member_required
+@require_POST
+def notas_fiscais_importar(request):
+    """
+    Importa NF-e de fornecedores enviadas em `arquivo` (XML ou .zip de XMLs), lidas em streaming e
+    gravadas em lotes. Parâmetros: conta (código da conta contábil dos lançamentos a pagar) e
+    simular=1 (apenas valida). Para arquivos muito grandes, use o comando importar_nfe.
+    """
+    arquivo = request.FILES.get('arquivo')
+    if arquivo is None or not arquivo.name.lower().endswith(('.xml', '.zip')):
+        return JsonResponse({'erro': 'Envie um arquivo .xml ou .zip.'}, status=400)
+    try:
+        conta = conta_a_pagar(request.POST.get('conta', ''))
+        resultado = importar_notas(ler_arquivo(arquivo, arquivo.name), conta, simular=request.POST.get('simular') == '1')
+    except ValueError as erro:
+        return JsonResponse({'erro': str(erro)}, status=400)
+    return JsonResponse({
+        'importadas': resultado.importadas,
+        'duplicadas': resultado.duplicadas,
+        'fornecedores_criados': resultado.fornecedores_criados,
+        'lancamentos': resultado.lancamentos,
+        'total_erros': resultado.total_erros,
+        'erros': [{'origem': origem, 'mensagens': mensagens} for origem, mensagens in resultado.erros],
+    })
+
+@staff_member_required
+@require_POST
+def extratos_importar(request):
+    """
+    Importa o extrato enviado em `arquivo` (OFX ou CNAB 240) e concilia os movimentos com os
+    lançamentos em aberto. Parâmetro opcional: conta (número da conta bancária; padrão: o do arquivo).
+    """
+    arquivo = request.FILES.get('arquivo')
+    if arquivo is None:
+        return JsonResponse({'erro': 'Envie o arquivo do extrato.'}, status=400)
+    conta = None
+    if request.POST.get('conta'):
+        conta = ContaBancaria.objects.filter(numero_conta=request.POST['conta']).first()
+        if conta is None:
+            return JsonResponse({'erro': 'Conta bancária não encontrada.'}, status=400)
+    try:
+        origem, movimentos = ler_extrato(arquivo)
+        resultado = importar_extrato(movimentos, origem, conta_bancaria=conta)
+    except ValueError as erro:
+        return JsonResponse({'erro': str(erro)}, status=400)
+    conciliacao = conciliar(resultado.contas) if resultado.contas else None
+    return JsonResponse({
+        'formato': origem,
+        'importadas': resultado.importadas,
+        'duplicadas': resultado.duplicadas,
+        'conciliadas': conciliacao.conciliadas if conciliacao else 0,
+        'pendentes': conciliacao.pendentes if conciliacao else 0,
+    })
+
+@staff_member_required
+@require_POST
+def extratos_conciliar(request):
+    """
+    Enfileira a conciliação de todos os movimentos de extrato ainda pendentes (ex.: depois de
+    lançar as contas que faltavam). Responde 202 com o endereço para acompanhar em /tarefas/<id>/.
+    """
+    return tarefa_enfileirada(enfileirar('financeiro.conciliar_extratos'))
+
+@staff_member_required
+@require_POST
+def recorrencia_materializar(request, pk):
+    """
+    Grava (se ainda não existir) o lançamento da ocorrência `data` (AAAA-MM-DD) de um lançamento
+    recorrente, para que possa ser quitado antes de entrar no horizonte de materialização.
     """
-    # Você pode adicionar lógica aqui no futuro, se necessário.
-    # Por enquanto, apenas renderiza o template index.html
-    return render(request, 'financeiro/index.html')
\ No newline at end of file
+    regra = get_object_or_404(LancamentoRecorrente, pk=pk)
+    try:
+        data = datetime.date.fromisoformat(request.POST.get('data', ''))
+    except ValueError:
+        return JsonResponse({'erro': 'Informe a data da ocorrência (AAAA-MM-DD).'}, status=400)
+    try:
+        lancamento = materializar_ocorrencia(regra, data)
+    except ValueError as erro:
+        return JsonResponse({'erro': str(erro)}, status=400)
+    return JsonResponse({'lancamento': lancamento.pk, 'status': lancamento.status, 'data_vencimento': lancamento.data_vencimento})
@@ -5,3 +5,6 @@ app_name = 'index'
 class IndexConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'index'
+
+    def ready(self):
+        from . import signals  # noqa: F401
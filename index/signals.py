@@ -0,0 +1,27 @@
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save
+
+from financeiro import painel as painel_financeiro
+from projeto_integrador.cache_paineis import invalidar
+from rh import painel as painel_rh
+from veiculos import painel as painel_veiculos
+
+from .views import INDICADORES
+
+# Todos os modelos dos quais algum painel depende
+MODELOS_DOS_PAINEIS = sorted({
+    modelo
+    for indicadores in (painel_rh.INDICADORES, painel_veiculos.INDICADORES, painel_financeiro.INDICADORES, INDICADORES)
+    for _, modelos in indicadores.values()
+    for modelo in modelos
+})
+
+
+def invalidar_paineis(sender, **kwargs):
+    invalidar(sender._meta.label)
+
+
+for rotulo in MODELOS_DOS_PAINEIS:
+    modelo = apps.get_model(rotulo)
+    post_save.connect(invalidar_paineis, sender=modelo, dispatch_uid=f'paineis_{rotulo}_save')
+    post_delete.connect(invalidar_paineis, sender=modelo, dispatch_uid=f'paineis_{rotulo}_delete')
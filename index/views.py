@@ -1,9 +1,21 @@
-from django.shortcuts import render
+from financeiro import painel as painel_financeiro
+from projeto_integrador.cache_paineis import pagina_em_cache
+from rh import painel as painel_rh
+from veiculos import painel as painel_veiculos
 
-def index(request):
+# Resumo dos módulos exibido na página inicial
+INDICADORES = {
+    'colaboradores_por_status': painel_rh.INDICADORES['colaboradores_por_status'],
+    'gasto_combustivel': painel_veiculos.INDICADORES['gasto_combustivel'],
+    'contas_a_pagar': painel_financeiro.INDICADORES['contas_a_pagar'],
+    'contas_a_receber': painel_financeiro.INDICADORES['contas_a_receber'],
+}
+
+async def index(request):
     """
     View para a página inicial (index).
+    Resumo dos módulos: os indicadores são independentes e consultados ao mesmo tempo, então o
+    tempo da página é o da consulta mais lenta; página e indicadores ficam em cache até a próxima
+    escrita nos modelos envolvidos.
     """
-    # Você pode adicionar lógica aqui no futuro, se necessário.
-    # Por enquanto, apenas renderiza o template index.html
-    return render(request, 'index/index.html')
\ No newline at end of file
+    return await pagina_em_cache('index/index.html', INDICADORES)
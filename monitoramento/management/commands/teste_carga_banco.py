@@ -0,0 +1,100 @@
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError
+from django.db.utils import ConnectionHandler
+
+BACKEND_SQLITE = 'projeto_integrador.backends.sqlite3'
+
+
+def _conectar(perfil, caminho):
+    return ConnectionHandler({'default': {'ENGINE': perfil['ENGINE'], 'NAME': caminho, 'OPTIONS': perfil['OPTIONS']}})['default']
+
+
+def _trabalhador(perfil, caminho, transacoes, indice):
+    """
+    Executa transações curtas de leitura seguida de escrita, como um save() com sinais de
+    consolidação. Retorna (latências das transações confirmadas, quantidade de falhas).
+    """
+    conexao = _conectar(perfil, caminho)
+    latencias = []
+    falhas = 0
+    for sequencia in range(transacoes):
+        inicio = time.perf_counter()
+        try:
+            # Mesmo caminho do transaction.atomic(): BEGIN (ou BEGIN IMMEDIATE) explícito
+            conexao.set_autocommit(False, force_begin_transaction_with_broken_autocommit=True)
+            with conexao.cursor() as cursor:
+                cursor.execute('SELECT COUNT(*) FROM carga WHERE trabalhador = %s', [indice])
+                cursor.fetchone()
+                cursor.execute(
+                    'INSERT INTO carga (trabalhador, sequencia, conteudo) VALUES (%s, %s, %s)',
+                    [indice, sequencia, 'x' * 200],
+                )
+            conexao.commit()
+            latencias.append(time.perf_counter() - inicio)
+        except OperationalError:
+            conexao.rollback()
+            falhas += 1
+        finally:
+            conexao.set_autocommit(True)
+    conexao.close()
+    return latencias, falhas
+
+
+class Command(BaseCommand):
+    help = (
+        'Teste de carga de escrita concorrente no SQLite: compara o perfil padrão do Django com o perfil '
+        'configurado (WAL, synchronous=NORMAL, busy_timeout, BEGIN IMMEDIATE), em bancos temporários.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processos', type=int, default=8, help='Processos escrevendo ao mesmo tempo.')
+        parser.add_argument('--transacoes', type=int, default=200, help='Transações por processo.')
+
+    def handle(self, *args, **options):
+        configurado = settings.DATABASES['default']
+        if configurado['ENGINE'] != BACKEND_SQLITE:
+            raise CommandError(f'O teste compara perfis SQLite; o banco configurado usa {configurado["ENGINE"]}.')
+
+        perfis = {
+            'padrão': {'ENGINE': 'django.db.backends.sqlite3', 'OPTIONS': {}},
+            'configurado': {'ENGINE': BACKEND_SQLITE, 'OPTIONS': configurado.get('OPTIONS', {})},
+        }
+        processos, transacoes = options['processos'], options['transacoes']
+        self.stdout.write(f'{processos} processo(s) x {transacoes} transação(ões) de leitura + escrita.')
+
+        for nome, perfil in perfis.items():
+            with tempfile.TemporaryDirectory() as diretorio:
+                caminho = os.path.join(diretorio, 'carga.sqlite3')
+                conexao = _conectar(perfil, caminho)
+                with conexao.cursor() as cursor:
+                    cursor.execute(
+                        'CREATE TABLE carga (id INTEGER PRIMARY KEY AUTOINCREMENT, trabalhador INTEGER, '
+                        'sequencia INTEGER, conteudo TEXT)'
+                    )
+                    cursor.execute('CREATE INDEX carga_trabalhador ON carga (trabalhador)')
+                conexao.close()
+
+                inicio = time.perf_counter()
+                with ProcessPoolExecutor(max_workers=processos) as executor:
+                    resultados = list(executor.map(
+                        _trabalhador, [perfil] * processos, [caminho] * processos,
+                        [transacoes] * processos, range(processos),
+                    ))
+                duracao = time.perf_counter() - inicio
+
+            latencias = sorted(latencia for parcial, _ in resultados for latencia in parcial)
+            falhas = sum(falhas for _, falhas in resultados)
+            p95 = latencias[int(len(latencias) * 0.95) - 1] if latencias else 0
+            mediana = statistics.median(latencias) if latencias else 0
+            mensagem = (
+                f'{nome:>12}: {len(latencias) / duracao:8.1f} transações/s, {falhas} falha(s) '
+                f'("database is locked"), mediana {mediana * 1000:.1f} ms, p95 {p95 * 1000:.1f} ms'
+            )
+            self.stdout.write(self.style.SUCCESS(mensagem) if not falhas else self.style.WARNING(mensagem))
@@ -0,0 +1,183 @@
+"""
+Agregação em memória das métricas por view (nome da URL): latência, quantidade de consultas SQL,
+tempo gasto no banco e as consultas mais lentas/repetidas.
+
+Os valores são por processo: com vários workers, cada um expõe os próprios números desde que subiu.
+"""
+import contextvars
+import threading
+import time
+from dataclasses import dataclass, field
+
+# Limites superiores dos baldes dos histogramas (o último balde, +Inf, é implícito)
+BALDES_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BALDES_CONSULTAS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+CONSULTAS_LENTAS = 5 # Consultas mais lentas guardadas por view
+TAMANHO_MAXIMO_SQL = 500
+
+
+class Histograma:
+    def __init__(self, baldes):
+        self.baldes = baldes
+        self.contagens = [0] * (len(baldes) + 1)
+        self.soma = 0
+        self.quantidade = 0
+
+    def observar(self, valor):
+        for indice, limite in enumerate(self.baldes):
+            if valor <= limite:
+                break
+        else:
+            indice = len(self.baldes)
+        self.contagens[indice] += 1
+        self.soma += valor
+        self.quantidade += 1
+
+    def acumulado(self):
+        """Pares (limite, contagem acumulada), no formato dos histogramas do Prometheus."""
+        total = 0
+        pares = []
+        for limite, contagem in zip(self.baldes + (float('inf'),), self.contagens):
+            total += contagem
+            pares.append((limite, total))
+        return pares
+
+    def como_dict(self):
+        return {
+            'quantidade': self.quantidade,
+            'soma': self.soma,
+            'baldes': {('+Inf' if limite == float('inf') else str(limite)): total for limite, total in self.acumulado()},
+        }
+
+
+class ColetorConsultas:
+    """
+    Wrapper de execução (connection.execute_wrapper) que cronometra cada consulta de uma requisição.
+    Pode receber consultas de várias threads (ver projeto_integrador/paralelo.py).
+    """
+    def __init__(self):
+        self._trava = threading.Lock()
+        self.quantidade = 0
+        self.tempo_total = 0
+        self.consultas = {} # sql -> [execuções, tempo total, maior tempo]
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duracao = time.perf_counter() - inicio
+            with self._trava:
+                self.quantidade += 1
+                self.tempo_total += duracao
+                # O SQL ainda sem os parâmetros agrupa as repetições típicas de N+1
+                estatistica = self.consultas.setdefault(sql, [0, 0, 0])
+                estatistica[0] += 1
+                estatistica[1] += duracao
+                estatistica[2] = max(estatistica[2], duracao)
+
+
+# Coletor da requisição em andamento, para as consultas feitas fora da thread da requisição
+coletor_da_requisicao = contextvars.ContextVar('coletor_da_requisicao', default=None)
+
+
+@dataclass
+class MetricasView:
+    requisicoes: int = 0
+    latencia: Histograma = field(default_factory=lambda: Histograma(BALDES_SEGUNDOS))
+    consultas: Histograma = field(default_factory=lambda: Histograma(BALDES_CONSULTAS))
+    tempo_sql: Histograma = field(default_factory=lambda: Histograma(BALDES_SEGUNDOS))
+    status: dict = field(default_factory=dict)
+    mais_lentas: dict = field(default_factory=dict) # sql -> maior tempo observado
+    maior_repeticao: tuple = (0, '') # (execuções na mesma requisição, sql)
+
+    def registrar(self, duracao, status, coletor):
+        self.requisicoes += 1
+        self.latencia.observar(duracao)
+        self.consultas.observar(coletor.quantidade)
+        self.tempo_sql.observar(coletor.tempo_total)
+        self.status[status] = self.status.get(status, 0) + 1
+
+        for sql, (execucoes, _, maior_tempo) in coletor.consultas.items():
+            sql = sql[:TAMANHO_MAXIMO_SQL]
+            if execucoes > self.maior_repeticao[0]:
+                self.maior_repeticao = (execucoes, sql)
+            if maior_tempo > self.mais_lentas.get(sql, 0):
+                self.mais_lentas[sql] = maior_tempo
+        if len(self.mais_lentas) > CONSULTAS_LENTAS:
+            self.mais_lentas = dict(sorted(self.mais_lentas.items(), key=lambda item: item[1], reverse=True)[:CONSULTAS_LENTAS])
+
+    def como_dict(self):
+        return {
+            'requisicoes': self.requisicoes,
+            'status': self.status,
+            'latencia_segundos': self.latencia.como_dict(),
+            'consultas_por_requisicao': self.consultas.como_dict(),
+            'tempo_sql_segundos': self.tempo_sql.como_dict(),
+            'consultas_mais_lentas': [
+                {'segundos': tempo, 'sql': sql}
+                for sql, tempo in sorted(self.mais_lentas.items(), key=lambda item: item[1], reverse=True)
+            ],
+            'maior_repeticao': {'execucoes': self.maior_repeticao[0], 'sql': self.maior_repeticao[1]},
+        }
+
+
+class Registro:
+    def __init__(self):
+        self._trava = threading.Lock()
+        self._views = {}
+
+    def registrar(self, view, duracao, status, coletor):
+        with self._trava:
+            metricas = self._views.get(view)
+            if metricas is None:
+                metricas = self._views[view] = MetricasView()
+            metricas.registrar(duracao, status, coletor)
+
+    def zerar(self):
+        with self._trava:
+            self._views.clear()
+
+    def como_dict(self):
+        with self._trava:
+            return {view: metricas.como_dict() for view, metricas in sorted(self._views.items())}
+
+    def prometheus(self):
+        """Métricas no formato texto de exposição do Prometheus (versão 0.0.4)."""
+        with self._trava:
+            views = sorted(self._views.items())
+            linhas = []
+            for nome, descricao, atributo in (
+                ('django_view_latencia_segundos', 'Latência das requisições por view.', 'latencia'),
+                ('django_view_consultas_sql', 'Consultas SQL por requisição, por view.', 'consultas'),
+                ('django_view_tempo_sql_segundos', 'Tempo gasto em SQL por requisição, por view.', 'tempo_sql'),
+            ):
+                linhas.append(f'# HELP {nome} {descricao}')
+                linhas.append(f'# TYPE {nome} histogram')
+                for view, metricas in views:
+                    histograma = getattr(metricas, atributo)
+                    rotulo = _rotulo(view)
+                    for limite, total in histograma.acumulado():
+                        le = '+Inf' if limite == float('inf') else str(limite)
+                        linhas.append(f'{nome}_bucket{{view="{rotulo}",le="{le}"}} {total}')
+                    linhas.append(f'{nome}_sum{{view="{rotulo}"}} {histograma.soma}')
+                    linhas.append(f'{nome}_count{{view="{rotulo}"}} {histograma.quantidade}')
+
+            linhas.append('# HELP django_view_requisicoes_total Requisições por view e status HTTP.')
+            linhas.append('# TYPE django_view_requisicoes_total counter')
+            for view, metricas in views:
+                for status, total in sorted(metricas.status.items()):
+                    linhas.append(f'django_view_requisicoes_total{{view="{_rotulo(view)}",status="{status}"}} {total}')
+
+            linhas.append('# HELP django_view_maior_repeticao_sql Maior número de execuções de um mesmo SQL em uma requisição.')
+            linhas.append('# TYPE django_view_maior_repeticao_sql gauge')
+            for view, metricas in views:
+                linhas.append(f'django_view_maior_repeticao_sql{{view="{_rotulo(view)}"}} {metricas.maior_repeticao[0]}')
+        return '\n'.join(linhas) + '\n'
+
+
+def _rotulo(valor):
+    return valor.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+registro = Registro()
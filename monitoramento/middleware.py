@@ -0,0 +1,36 @@
+import time
+from contextlib import ExitStack
+
+from django.db import connections
+
+from .metricas import ColetorConsultas, coletor_da_requisicao, registro
+
+SEM_ROTA = '<sem rota>'
+
+
+class MonitoramentoMiddleware:
+    """
+    Mede cada requisição (latência, consultas SQL e tempo no banco) e agrega os números pelo nome
+    da URL resolvida. Deve ser o primeiro da lista para incluir o tempo dos demais middlewares.
+    Consultas feitas durante a iteração de respostas em streaming não são contabilizadas.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        coletor = ColetorConsultas()
+        token = coletor_da_requisicao.set(coletor)
+        inicio = time.perf_counter()
+        try:
+            with ExitStack() as pilha:
+                for conexao in connections.all():
+                    pilha.enter_context(conexao.execute_wrapper(coletor))
+                response = self.get_response(request)
+        finally:
+            coletor_da_requisicao.reset(token)
+        duracao = time.perf_counter() - inicio
+
+        rota = getattr(request, 'resolver_match', None)
+        view = (rota.view_name or rota._func_path) if rota else SEM_ROTA
+        registro.registrar(view, duracao, response.status_code, coletor)
+        return response
@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+app_name = 'monitoramento'
+
+urlpatterns = [
+    path('metricas/', views.metricas, name='metricas'),
+    path('metricas/prometheus/', views.metricas_prometheus, name='metricas_prometheus'),
+]
@@ -0,0 +1,23 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import HttpResponse, JsonResponse
+
+from .metricas import registro
+
+
+@staff_member_required
+def metricas(request):
+    """
+    Métricas agregadas por view (JSON), apenas para a equipe administrativa.
+    Com POST, zera os contadores (ex.: antes de um teste de carga).
+    """
+    if request.method == 'POST':
+        registro.zerar()
+    return JsonResponse({'views': registro.como_dict()})
+
+
+@staff_member_required
+def metricas_prometheus(request):
+    """
+    As mesmas métricas no formato texto do Prometheus.
+    """
+    return HttpResponse(registro.prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,76 @@
+"""
+Armazenamento de documentos endereçado pelo conteúdo.
+
+Cada arquivo é gravado uma única vez em conteudo/<aa>/<bb>/<sha256><extensão>, de modo que o mesmo
+documento enviado mais de uma vez (ex.: a mesma CTPS digitalizada de novo) ocupa o disco uma só vez.
+O nome sugerido pelo upload_to do campo é usado apenas para a extensão.
+
+Uploads recebidos por projeto_integrador.uploads.UploadComHash já chegam com o SHA-256 calculado e
+em um arquivo temporário no mesmo disco: basta movê-lo, sem reler o conteúdo. Os demais (arquivos
+pequenos mantidos em memória, ContentFile) são gravados em blocos enquanto o hash é calculado.
+
+Como um arquivo pode ser compartilhado por vários registros, nada é apagado daqui ao excluir um registro.
+"""
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage, storages
+
+PASTA_CONTEUDO = 'conteudo'
+PASTA_TEMPORARIOS = '.temporarios' # Dentro de MEDIA_ROOT, para que mover o arquivo seja um rename
+
+
+class ArmazenamentoDeduplicado(FileSystemStorage):
+
+    def nome_do_conteudo(self, sha256, nome):
+        extensao = Path(nome).suffix.lower()
+        return f'{PASTA_CONTEUDO}/{sha256[:2]}/{sha256[2:4]}/{sha256}{extensao}'
+
+    def get_available_name(self, name, max_length=None):
+        # O nome final depende só do conteúdo (ver _save): não há conflito a evitar
+        return name
+
+    def _gravar_temporario(self, content):
+        pasta = Path(self.path(PASTA_TEMPORARIOS))
+        pasta.mkdir(parents=True, exist_ok=True)
+        descritor, caminho = tempfile.mkstemp(dir=pasta, suffix='.upload')
+        sha256 = hashlib.sha256()
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        with os.fdopen(descritor, 'wb') as destino:
+            for bloco in content.chunks():
+                destino.write(bloco)
+                sha256.update(bloco)
+        return caminho, sha256.hexdigest()
+
+    def _save(self, name, content):
+        temporario = None
+        sha256 = getattr(content, 'sha256', None)
+        if sha256 is not None and hasattr(content, 'temporary_file_path'):
+            origem = content.temporary_file_path()
+        else:
+            temporario, sha256 = self._gravar_temporario(content)
+            origem = temporario
+
+        nome = self.nome_do_conteudo(sha256, name)
+        destino = Path(self.path(nome))
+        try:
+            if destino.exists():
+                return nome # Conteúdo já armazenado: o novo registro apenas aponta para ele
+            destino.parent.mkdir(parents=True, exist_ok=True)
+            # Dois envios simultâneos do mesmo conteúdo gravam bytes idênticos: sobrescrever é seguro
+            file_move_safe(origem, str(destino), allow_overwrite=True)
+            if self.file_permissions_mode is not None:
+                os.chmod(destino, self.file_permissions_mode)
+            return nome
+        finally:
+            if temporario is not None and os.path.exists(temporario):
+                os.remove(temporario)
+
+
+def armazenamento_documentos():
+    """Armazenamento dos documentos digitalizados e atestados (STORAGES['documentos'])."""
+    return storages['documentos']
@@ -0,0 +1,28 @@
+"""
+Backend SQLite do projeto: o mesmo do Django, com PRAGMAs aplicados a cada nova conexão e
+transações iniciadas com BEGIN IMMEDIATE.
+
+Opções extras em DATABASES['OPTIONS'] (retiradas antes de chegar ao sqlite3.connect):
+- 'pragmas': dict de PRAGMAs, aplicados na ordem (ex.: {'journal_mode': 'WAL', 'synchronous': 'NORMAL'});
+- 'begin_immediate': reserva a escrita já no início da transação. Com o BEGIN padrão (DEFERRED), uma
+  transação que lê e depois escreve pode falhar com "database is locked" sem esperar o busy_timeout,
+  quando outra conexão escreveu nesse meio-tempo.
+"""
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        self.pragmas = params.pop('pragmas', {})
+        self.begin_immediate = params.pop('begin_immediate', False)
+        return params
+
+    def get_new_connection(self, conn_params):
+        conexao = super().get_new_connection(conn_params)
+        for nome, valor in self.pragmas.items():
+            conexao.execute(f'PRAGMA {nome} = {valor}')
+        return conexao
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN IMMEDIATE' if self.begin_immediate else 'BEGIN')
@@ -0,0 +1,83 @@
+"""
+Cache das páginas iniciais (painéis) e dos indicadores que elas exibem.
+
+Cada modelo do qual um painel depende tem uma versão no cache (um token aleatório). As chaves das
+páginas e dos indicadores incluem as versões dos seus modelos, então uma escrita, ao trocar a versão
+do modelo (post_save/post_delete, depois do commit), faz as leituras seguintes usarem chaves novas:
+o conteúdo antigo não é mais servido e simplesmente expira.
+
+O backend padrão (arquivo) é compartilhado pelos processos da máquina, então as versões trocadas
+pelo worker de tarefas e pelos comandos de gerenciamento também valem para o processo web. Com o
+backend em memória (CACHE_BACKEND=memoria), o cache e as versões são de cada processo.
+"""
+import hashlib
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .paralelo import em_paralelo
+
+PREFIXO = 'painel'
+
+
+def _chave_versao(modelo):
+    return f'{PREFIXO}:versao:{modelo}'
+
+
+def invalidar(*modelos):
+    """
+    Troca a versão dos modelos informados ('app.Modelo') depois do commit da transação atual.
+    Chamado pelos sinais e pelas gravações em lote, que não disparam sinais.
+    """
+    chaves = {_chave_versao(modelo): uuid.uuid4().hex for modelo in modelos}
+    transaction.on_commit(lambda: cache.set_many(chaves, timeout=None))
+
+
+async def _chave(nome, modelos):
+    chaves = [_chave_versao(modelo) for modelo in sorted(modelos)]
+    versoes = await cache.aget_many(chaves)
+    for chave in chaves:
+        if chave not in versoes:
+            # add não sobrescreve a versão criada por outra requisição ao mesmo tempo
+            await cache.aadd(chave, uuid.uuid4().hex, timeout=None)
+            versoes[chave] = await cache.aget(chave)
+    # A data entra na chave porque os indicadores dependem de "hoje" (mês corrente, vencidos)
+    assinatura = '|'.join([timezone.localdate().isoformat()] + [versoes[chave] or '' for chave in chaves])
+    return f'{PREFIXO}:{nome}:{hashlib.md5(assinatura.encode()).hexdigest()}'
+
+
+async def indicadores_em_cache(indicadores):
+    """
+    Valores dos indicadores {nome: (função, modelos)}, calculando ao mesmo tempo só os que
+    não estão no cache para as versões atuais dos seus modelos.
+    """
+    chaves = {}
+    for nome, (funcao, modelos) in indicadores.items():
+        chaves[nome] = await _chave(f'indicador:{funcao.__module__}.{funcao.__name__}', modelos)
+    em_cache = await cache.aget_many(chaves.values())
+
+    faltando = {nome: funcao for nome, (funcao, _) in indicadores.items() if chaves[nome] not in em_cache}
+    calculados = await em_paralelo(**faltando) if faltando else {}
+    if calculados:
+        await cache.aset_many({chaves[nome]: valor for nome, valor in calculados.items()})
+    return {nome: calculados[nome] if nome in calculados else em_cache[chaves[nome]] for nome in indicadores}
+
+
+async def pagina_em_cache(template, indicadores):
+    """
+    Resposta com o template renderizado para o painel dos indicadores, reaproveitando o HTML
+    enquanto nenhum dos modelos envolvidos mudar. O template não pode depender da requisição
+    (usuário, mensagens), pois o mesmo HTML é servido a todos.
+    """
+    modelos = {modelo for _, modelos_indicador in indicadores.values() for modelo in modelos_indicador}
+    chave = await _chave(f'pagina:{template}', modelos)
+    html = await cache.aget(chave)
+    if html is None:
+        painel = await indicadores_em_cache(indicadores)
+        html = render_to_string(template, {'painel': painel})
+        await cache.aset(chave, html)
+    return HttpResponse(html)
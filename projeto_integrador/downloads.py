@@ -0,0 +1,97 @@
+"""
+Download de arquivos armazenados (FileField), com suporte a Range e a revalidação por ETag.
+
+- Com DOWNLOAD_X_ACCEL_REDIRECT configurado (prefixo de uma location "internal" do nginx que aponta
+  para MEDIA_ROOT), a view só autoriza e o nginx envia o arquivo, inclusive as faixas.
+- Sem ele, o arquivo inteiro ou uma faixa até o fim vão por FileResponse: o servidor WSGI usa o
+  wsgi.file_wrapper (sendfile no gunicorn), sem copiar o conteúdo pelo Python. Faixas que terminam
+  antes do fim do arquivo são enviadas em blocos, com o tamanho exato.
+"""
+import mimetypes
+import os
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.http import content_disposition_header
+
+FAIXA = re.compile(r'^bytes=(\d*)-(\d*)$')
+TAMANHO_BLOCO = 64 * 1024
+
+
+def _faixa(cabecalho, tamanho):
+    """
+    Interpreta um cabeçalho Range com uma única faixa. Retorna (inicio, fim) inclusivo, None para
+    enviar o arquivo inteiro (sem Range, ou com várias faixas) ou False se a faixa for inválida.
+    """
+    correspondencia = FAIXA.match(cabecalho.replace(' ', ''))
+    if correspondencia is None:
+        return None
+    inicio, fim = correspondencia.groups()
+    if not inicio and not fim:
+        return False
+    if not inicio:
+        # Sufixo: os últimos N bytes
+        inicio, fim = max(tamanho - int(fim), 0), tamanho - 1
+    else:
+        inicio, fim = int(inicio), min(int(fim), tamanho - 1) if fim else tamanho - 1
+    if inicio > fim or inicio >= tamanho:
+        return False
+    return inicio, fim
+
+
+def _ler_faixa(caminho, inicio, quantidade):
+    with open(caminho, 'rb') as arquivo:
+        arquivo.seek(inicio)
+        while quantidade > 0:
+            bloco = arquivo.read(min(TAMANHO_BLOCO, quantidade))
+            if not bloco:
+                break
+            quantidade -= len(bloco)
+            yield bloco
+
+
+def resposta_arquivo(request, arquivo, nome_download):
+    """Resposta com o conteúdo do FieldFile `arquivo`, exibido no navegador com o nome `nome_download`."""
+    caminho = arquivo.path
+    info = os.stat(caminho)
+    # Nos arquivos endereçados pelo conteúdo o próprio nome é o hash; nos demais, tamanho e data
+    etag = f'"{Path(arquivo.name).stem}-{info.st_size:x}-{int(info.st_mtime):x}"'
+    if etag in [valor.strip() for valor in request.headers.get('If-None-Match', '').split(',')]:
+        return HttpResponseNotModified(headers={'ETag': etag})
+
+    content_type = mimetypes.guess_type(nome_download)[0] or 'application/octet-stream'
+    cabecalhos = {
+        'ETag': etag,
+        'Accept-Ranges': 'bytes',
+        'Cache-Control': 'private, no-cache', # Documentos pessoais: só o navegador guarda, revalidando
+        'Content-Disposition': content_disposition_header(False, nome_download),
+    }
+
+    if settings.DOWNLOAD_X_ACCEL_REDIRECT:
+        relativo = Path(caminho).relative_to(settings.MEDIA_ROOT).as_posix()
+        cabecalhos['X-Accel-Redirect'] = settings.DOWNLOAD_X_ACCEL_REDIRECT.rstrip('/') + '/' + relativo
+        return HttpResponse(content_type=content_type, headers=cabecalhos)
+
+    faixa = None
+    if 'Range' in request.headers and request.headers.get('If-Range', etag) == etag:
+        faixa = _faixa(request.headers['Range'], info.st_size)
+    if faixa is False:
+        cabecalhos['Content-Range'] = f'bytes */{info.st_size}'
+        return HttpResponse(status=416, headers=cabecalhos)
+    if faixa is None:
+        resposta = FileResponse(open(caminho, 'rb'), content_type=content_type)
+    else:
+        inicio, fim = faixa
+        cabecalhos['Content-Range'] = f'bytes {inicio}-{fim}/{info.st_size}'
+        if fim == info.st_size - 1:
+            descritor = open(caminho, 'rb')
+            descritor.seek(inicio) # O FileResponse envia da posição atual até o fim
+            resposta = FileResponse(descritor, status=206, content_type=content_type)
+        else:
+            resposta = StreamingHttpResponse(_ler_faixa(caminho, inicio, fim - inicio + 1), status=206, content_type=content_type)
+            resposta['Content-Length'] = fim - inicio + 1
+    for nome, valor in cabecalhos.items():
+        resposta[nome] = valor
+    return resposta
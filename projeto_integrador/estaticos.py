@@ -0,0 +1,145 @@
+"""
+Camada WSGI que serve os arquivos de STATIC_ROOT (gerados pelo collectstatic) antes de chegar ao Django.
+
+- Os arquivos com hash no nome (ver projeto_integrador/storage.py) nunca mudam de conteúdo, então
+  são enviados com cache de um ano ("immutable"): o navegador nem volta a pedi-los.
+- Os demais são revalidados a cada uso pelo ETag/Last-Modified, respondendo 304 sem corpo.
+- Quando o cliente aceita, envia a versão pré-comprimida (.br ou .gz) gravada pelo collectstatic.
+
+A lista de arquivos é lida uma vez, na inicialização; após um novo collectstatic, reinicie o servidor.
+Caminhos que não estão na lista seguem para a aplicação normalmente.
+"""
+import email.utils
+import mimetypes
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from urllib.parse import urlsplit
+from wsgiref.util import FileWrapper
+
+from django.conf import settings
+
+CACHE_IMUTAVEL = 'public, max-age=31536000, immutable'
+CACHE_REVALIDAR = 'no-cache'
+NOME_COM_HASH = re.compile(r'\.[0-9a-f]{12}\.[^./]+$') # Formato do ManifestStaticFilesStorage
+TAMANHO_BLOCO = 64 * 1024
+
+# Codificações na ordem de preferência: (nome no Accept-Encoding, extensão do arquivo)
+CODIFICACOES = [('br', '.br'), ('gzip', '.gz')]
+
+
+@dataclass
+class Representacao:
+    caminho: str
+    tamanho: int
+    etag: str
+
+
+@dataclass
+class ArquivoEstatico:
+    content_type: str
+    modificado: str
+    imutavel: bool
+    representacoes: dict = field(default_factory=dict) # Codificação ('' = sem compressão) -> Representacao
+
+
+def _aceitas(environ):
+    """Codificações aceitas pelo cliente (ignorando as marcadas com q=0)."""
+    aceitas = set()
+    for parte in environ.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        nome, _, parametros = parte.partition(';')
+        qualidade = parametros.strip().removeprefix('q=')
+        try:
+            if qualidade and float(qualidade) == 0:
+                continue
+        except ValueError:
+            continue
+        aceitas.add(nome.strip().lower())
+    return aceitas
+
+
+def _etag_confere(environ, etag):
+    valor = environ.get('HTTP_IF_NONE_MATCH')
+    if valor is None:
+        return None
+    etags = {item.strip().removeprefix('W/') for item in valor.split(',')}
+    return '*' in etags or etag in etags
+
+
+class ArquivosEstaticos:
+
+    def __init__(self, aplicacao, raiz=None, url=None):
+        self.aplicacao = aplicacao
+        raiz = raiz or settings.STATIC_ROOT
+        self.raiz = Path(raiz) if raiz else None
+        self.prefixo = '/' + urlsplit(url or settings.STATIC_URL).path.strip('/') + '/'
+        self.arquivos = self._indexar()
+
+    def _indexar(self):
+        arquivos = {}
+        if self.raiz is None or not self.raiz.is_dir():
+            return arquivos
+        comprimidos = {extensao for _, extensao in CODIFICACOES}
+        for pasta, _, nomes in os.walk(self.raiz):
+            for nome in nomes:
+                caminho = Path(pasta) / nome
+                if caminho.suffix in comprimidos:
+                    continue
+                relativo = caminho.relative_to(self.raiz).as_posix()
+                info = caminho.stat()
+                content_type, _ = mimetypes.guess_type(nome)
+                content_type = content_type or 'application/octet-stream'
+                if content_type.startswith('text/') or content_type in ('application/javascript', 'image/svg+xml'):
+                    content_type += '; charset=utf-8'
+                versao = f'{int(info.st_mtime):x}-{info.st_size:x}'
+                arquivo = ArquivoEstatico(
+                    content_type=content_type,
+                    modificado=email.utils.formatdate(info.st_mtime, usegmt=True),
+                    imutavel=bool(NOME_COM_HASH.search(nome)),
+                )
+                arquivo.representacoes[''] = Representacao(str(caminho), info.st_size, f'"{versao}"')
+                for codificacao, extensao in CODIFICACOES:
+                    variante = caminho.with_name(nome + extensao)
+                    if variante.is_file():
+                        arquivo.representacoes[codificacao] = Representacao(
+                            str(variante), variante.stat().st_size, f'"{versao}-{codificacao}"',
+                        )
+                arquivos[relativo] = arquivo
+        return arquivos
+
+    def __call__(self, environ, start_response):
+        caminho = environ.get('PATH_INFO', '')
+        metodo = environ.get('REQUEST_METHOD')
+        if not caminho.startswith(self.prefixo) or metodo not in ('GET', 'HEAD'):
+            return self.aplicacao(environ, start_response)
+        arquivo = self.arquivos.get(caminho[len(self.prefixo):])
+        if arquivo is None:
+            return self.aplicacao(environ, start_response)
+
+        aceitas = _aceitas(environ)
+        codificacao = next((nome for nome, _ in CODIFICACOES if nome in aceitas and nome in arquivo.representacoes), '')
+        representacao = arquivo.representacoes[codificacao]
+        cabecalhos = [
+            ('Cache-Control', CACHE_IMUTAVEL if arquivo.imutavel else CACHE_REVALIDAR),
+            ('ETag', representacao.etag),
+            ('Last-Modified', arquivo.modificado),
+        ]
+        if len(arquivo.representacoes) > 1:
+            cabecalhos.append(('Vary', 'Accept-Encoding'))
+
+        confere = _etag_confere(environ, representacao.etag)
+        if confere is None:
+            confere = environ.get('HTTP_IF_MODIFIED_SINCE') == arquivo.modificado
+        if confere:
+            start_response('304 Not Modified', cabecalhos)
+            return []
+
+        cabecalhos += [('Content-Type', arquivo.content_type), ('Content-Length', str(representacao.tamanho))]
+        if codificacao:
+            cabecalhos.append(('Content-Encoding', codificacao))
+        start_response('200 OK', cabecalhos)
+        if metodo == 'HEAD':
+            return []
+        envoltorio = environ.get('wsgi.file_wrapper', FileWrapper)
+        return envoltorio(open(representacao.caminho, 'rb'), TAMANHO_BLOCO)
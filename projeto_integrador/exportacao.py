@@ -0,0 +1,210 @@
+"""
+Exportação em streaming (CSV e XLSX) das listagens dos módulos.
+
+As linhas são lidas do banco em blocos (`values_list().iterator()`) e enviadas ao cliente à medida que são
+formatadas, de modo que a memória usada não depende da quantidade de registros.
+"""
+import csv
+import datetime
+import re
+import zipfile
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+TAMANHO_BLOCO = 2000 # Registros lidos do banco por vez
+LINHAS_POR_ENVIO = 500 # Linhas da planilha acumuladas antes de enviar um trecho ao cliente
+FORMATOS = ('csv', 'xlsx')
+
+CONTENT_TYPE_XLSX = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+EPOCA_EXCEL = datetime.date(1899, 12, 30)
+CARACTERES_INVALIDOS_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+INICIO_FORMULA = ('=', '+', '-', '@', '\t', '\r') # Textos assim viram fórmulas ao abrir o CSV no Excel/LibreOffice
+
+
+class _Eco:
+    """Objeto com a interface de arquivo que apenas devolve o que recebe, para o csv.writer."""
+    def write(self, valor):
+        return valor
+
+
+class _Buffer:
+    """
+    Destino não posicionável para o ZipFile: acumula os bytes escritos até serem drenados.
+    Sem seek/tell, o zipfile grava os tamanhos em descritores após cada arquivo, sem voltar no fluxo.
+    """
+    def __init__(self):
+        self.partes = []
+
+    def write(self, dados):
+        self.partes.append(bytes(dados))
+        return len(dados)
+
+    def flush(self):
+        pass
+
+    def drenar(self):
+        dados = b''.join(self.partes)
+        self.partes.clear()
+        return dados
+
+
+def _data_local(valor):
+    if timezone.is_aware(valor):
+        valor = timezone.localtime(valor)
+    return valor.replace(tzinfo=None)
+
+
+def _valor_csv(valor):
+    if valor is None:
+        return ''
+    if isinstance(valor, bool):
+        return 'Sim' if valor else 'Não'
+    if isinstance(valor, datetime.datetime):
+        return f'{_data_local(valor):%d/%m/%Y %H:%M}'
+    if isinstance(valor, datetime.date):
+        return f'{valor:%d/%m/%Y}'
+    if isinstance(valor, (Decimal, float)):
+        return str(valor).replace('.', ',') # Separador decimal brasileiro, como o Excel em pt-BR espera
+    if isinstance(valor, str) and valor.startswith(INICIO_FORMULA):
+        # Textos vêm dos cadastros e importações: o apóstrofo faz a planilha tratá-los como texto
+        return "'" + valor
+    return valor
+
+
+def _linhas_csv(cabecalho, linhas):
+    escritor = csv.writer(_Eco(), delimiter=';')
+    yield '\ufeff' + escritor.writerow(cabecalho) # BOM para o Excel reconhecer o UTF-8
+    for linha in linhas:
+        yield escritor.writerow([_valor_csv(valor) for valor in linha])
+
+
+def exportar_csv(nome_arquivo, cabecalho, linhas):
+    resposta = StreamingHttpResponse(_linhas_csv(cabecalho, linhas), content_type='text/csv; charset=utf-8')
+    resposta['Content-Disposition'] = f'attachment; filename="{nome_arquivo}.csv"'
+    return resposta
+
+
+# Estrutura mínima de uma pasta de trabalho com uma planilha. As células de data usam os formatos
+# nativos 14 (data) e 22 (data e hora) para continuarem sendo datas no Excel.
+_XLSX_FIXOS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Dados" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/styles.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+        '<fills count="1"><fill><patternFill patternType="none"/></fill></fills>'
+        '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+        '<cellXfs count="3">'
+        '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+        '<xf numFmtId="14" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+        '<xf numFmtId="22" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+        '</cellXfs>'
+        '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+        '</styleSheet>'
+    ),
+}
+_XLSX_INICIO_PLANILHA = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_XLSX_FIM_PLANILHA = '</sheetData></worksheet>'
+
+
+def _celula_xlsx(valor):
+    if valor is None:
+        return '<c/>'
+    if isinstance(valor, bool):
+        return f'<c t="b"><v>{int(valor)}</v></c>'
+    if isinstance(valor, (int, float, Decimal)):
+        return f'<c><v>{valor}</v></c>'
+    if isinstance(valor, datetime.datetime):
+        valor = _data_local(valor)
+        dias = (valor - datetime.datetime.combine(EPOCA_EXCEL, datetime.time())).total_seconds() / 86400
+        return f'<c s="2"><v>{dias}</v></c>'
+    if isinstance(valor, datetime.date):
+        return f'<c s="1"><v>{(valor - EPOCA_EXCEL).days}</v></c>'
+    # Texto sempre como inlineStr, nunca como fórmula (<f>), mesmo que comece com '='
+    texto = escape(CARACTERES_INVALIDOS_XML.sub('', str(valor)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{texto}</t></is></c>'
+
+
+def _linha_xlsx(valores):
+    return '<row>' + ''.join(_celula_xlsx(valor) for valor in valores) + '</row>'
+
+
+def _linhas_xlsx(cabecalho, linhas):
+    buffer = _Buffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as arquivo_zip:
+        for nome, conteudo in _XLSX_FIXOS.items():
+            arquivo_zip.writestr(nome, conteudo)
+        yield buffer.drenar()
+
+        # A planilha é comprimida e enviada aos poucos; zip64 porque o tamanho final não é conhecido
+        with arquivo_zip.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as planilha:
+            pendentes = [_XLSX_INICIO_PLANILHA, _linha_xlsx(cabecalho)]
+            for linha in linhas:
+                pendentes.append(_linha_xlsx(linha))
+                if len(pendentes) >= LINHAS_POR_ENVIO:
+                    planilha.write(''.join(pendentes).encode('utf-8'))
+                    pendentes.clear()
+                    dados = buffer.drenar()
+                    if dados:
+                        yield dados
+            pendentes.append(_XLSX_FIM_PLANILHA)
+            planilha.write(''.join(pendentes).encode('utf-8'))
+    yield buffer.drenar()
+
+
+def exportar_xlsx(nome_arquivo, cabecalho, linhas):
+    resposta = StreamingHttpResponse(_linhas_xlsx(cabecalho, linhas), content_type=CONTENT_TYPE_XLSX)
+    resposta['Content-Disposition'] = f'attachment; filename="{nome_arquivo}.xlsx"'
+    return resposta
+
+
+def exportar(request, queryset, colunas, nome_arquivo):
+    """
+    Resposta de exportação em streaming de `queryset`, no formato pedido em ?formato= (csv ou xlsx).
+    `colunas` é uma lista de (campo ou lookup, título da coluna).
+    """
+    formato = request.GET.get('formato', 'csv')
+    if formato not in FORMATOS:
+        formato = 'csv'
+    campos = [campo for campo, _ in colunas]
+    cabecalho = [titulo for _, titulo in colunas]
+    linhas = queryset.values_list(*campos).iterator(chunk_size=TAMANHO_BLOCO)
+    if formato == 'xlsx':
+        return exportar_xlsx(nome_arquivo, cabecalho, linhas)
+    return exportar_csv(nome_arquivo, cabecalho, linhas)
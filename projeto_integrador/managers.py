@@ -0,0 +1,15 @@
+from django.db import models
+
+
+class RelacionadosManager(models.Manager):
+    """
+    Manager que já traz no mesmo SELECT as FKs listadas em `relacionados`.
+    Usado como manager padrão dos modelos cujo __str__ percorre chaves estrangeiras, para que
+    listagens, selects de formulário e o admin não façam uma consulta por linha. As listagens do
+    admin declaram list_select_related com a mesma cadeia (e as FKs das colunas), de modo que o custo
+    de uma página não depende do número de linhas.
+    """
+    relacionados = ()
+
+    def get_queryset(self):
+        return super().get_queryset().select_related(*self.relacionados)
@@ -0,0 +1,236 @@
+"""
+Miniaturas dos arquivos armazenados (FileField), em um cache em disco com remoção dos menos usados (LRU).
+
+- A chave de cada miniatura é o conteúdo do arquivo: nos documentos endereçados pelo conteúdo
+  (projeto_integrador/armazenamento.py) o próprio nome já é o SHA-256, de modo que a mesma
+  digitalização usada por vários registros tem uma única miniatura. Nos demais, nome, tamanho e data.
+- Imagens são reduzidas com o Pillow para caber em MINIATURAS_TAMANHO x MINIATURAS_TAMANHO (WebP).
+  PDFs não são rasterizados (o Pillow não lê PDF): recebem um ícone gerado uma vez.
+- A data de modificação da miniatura marca o último uso; podar() remove as mais antigas quando o
+  cache passa de MINIATURAS_LIMITE_MB.
+- gerar_em_lote() gera as miniaturas que faltam em um pool de processos (decodificar imagens é
+  cálculo pesado); a view gera na hora apenas a que ainda faltar.
+"""
+import hashlib
+import multiprocessing
+import os
+import re
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponseNotModified
+from PIL import Image, ImageDraw, ImageFont, ImageOps
+
+EXTENSOES_IMAGEM = {'.jpg', '.jpeg', '.png'}
+FORMATO = 'WEBP'
+QUALIDADE = 75
+CONTENT_TYPE = 'image/webp'
+INTERVALO_TOQUE = 3600 # Segundos: o último uso só é regravado se for mais antigo que isso
+PODA_A_CADA = 100 # Miniaturas geradas pelas views entre duas podas do cache
+FRACAO_APOS_PODA = 0.9 # A poda libera um pouco além do limite, para não podar a cada nova miniatura
+SHA256 = re.compile(r'^[0-9a-f]{64}$')
+# Arquivo ilegível, imagem corrompida ou grande demais para decodificar (proteção do Pillow contra
+# "decompression bombs", que não deriva de OSError)
+ERROS_IMAGEM = (OSError, ValueError, Image.DecompressionBombError)
+
+_geradas_desde_a_poda = 0
+
+
+def _pasta():
+    return Path(settings.MINIATURAS_DIR)
+
+
+def chave(arquivo):
+    """Identifica o conteúdo do FieldFile `arquivo`."""
+    nome = Path(arquivo.name).stem
+    if SHA256.match(nome):
+        return nome
+    info = os.stat(arquivo.path)
+    return hashlib.sha256(f'{arquivo.name}:{info.st_size}:{int(info.st_mtime)}'.encode()).hexdigest()
+
+
+def e_imagem(arquivo):
+    return Path(arquivo.name).suffix.lower() in EXTENSOES_IMAGEM
+
+
+def caminho_miniatura(arquivo, tamanho=None):
+    """Caminho da miniatura no cache (para PDFs e outros formatos, o do ícone)."""
+    tamanho = tamanho or settings.MINIATURAS_TAMANHO
+    if not e_imagem(arquivo):
+        # Ícones começam com "_": ficam fora da poda
+        return _pasta() / f'_{Path(arquivo.name).suffix.lower().lstrip(".") or "arquivo"}-{tamanho}.webp'
+    valor = chave(arquivo)
+    return _pasta() / valor[:2] / f'{valor}-{tamanho}.webp'
+
+
+def _salvar(imagem, destino):
+    # Grava em um temporário e troca: quem lê nunca vê uma miniatura pela metade
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    descritor, temporario = tempfile.mkstemp(dir=destino.parent, suffix='.tmp')
+    try:
+        with os.fdopen(descritor, 'wb') as saida:
+            imagem.save(saida, FORMATO, quality=QUALIDADE, method=4)
+        os.replace(temporario, destino)
+    except BaseException:
+        os.remove(temporario)
+        raise
+    return destino.stat().st_size
+
+
+def gerar(origem, destino, tamanho):
+    """
+    Gera a miniatura da imagem `origem` em `destino` e retorna o tamanho gravado, em bytes.
+    Não consulta o banco nem as configurações: é executada também nos processos do pool.
+    """
+    with Image.open(origem) as imagem:
+        # JPEG: decodifica já reduzido (1/2, 1/4, 1/8), sem carregar a digitalização inteira
+        imagem.draft('RGB', (tamanho, tamanho))
+        imagem = ImageOps.exif_transpose(imagem)
+        imagem.thumbnail((tamanho, tamanho), Image.Resampling.LANCZOS, reducing_gap=2.0)
+        if imagem.mode not in ('RGB', 'RGBA'):
+            imagem = imagem.convert('RGBA' if 'transparency' in imagem.info else 'RGB')
+        return _salvar(imagem, Path(destino))
+
+
+def gerar_icone(destino, tamanho, rotulo):
+    """Ícone de página com o tipo do arquivo (ex.: PDF), usado no lugar da miniatura."""
+    imagem = Image.new('RGB', (tamanho, tamanho), 'white')
+    desenho = ImageDraw.Draw(imagem)
+    margem_x, margem_y = tamanho // 5, tamanho // 10
+    dobra = tamanho // 6
+    direita, base = tamanho - margem_x, tamanho - margem_y
+    desenho.polygon(
+        [(margem_x, margem_y), (direita - dobra, margem_y), (direita, margem_y + dobra), (direita, base), (margem_x, base)],
+        fill='#f4f4f4', outline='#9e9e9e', width=max(tamanho // 64, 1),
+    )
+    desenho.polygon([(direita - dobra, margem_y), (direita - dobra, margem_y + dobra), (direita, margem_y + dobra)], fill='#d0d0d0')
+    fonte = ImageFont.load_default(size=tamanho // 6)
+    desenho.text((tamanho / 2, tamanho * 0.6), rotulo.upper(), fill='#c62828', font=fonte, anchor='mm')
+    return _salvar(imagem, Path(destino))
+
+
+def _tocar(caminho, info):
+    # Marca o uso para a poda; regrava no máximo uma vez por INTERVALO_TOQUE
+    agora = time.time()
+    if agora - info.st_mtime > INTERVALO_TOQUE:
+        try:
+            os.utime(caminho, (agora, agora))
+        except FileNotFoundError:
+            pass # Removida pela poda de outro processo
+
+
+def miniatura(arquivo, tamanho=None):
+    """Caminho da miniatura do FieldFile `arquivo`, gerada na hora se ainda não estiver no cache."""
+    global _geradas_desde_a_poda
+    tamanho = tamanho or settings.MINIATURAS_TAMANHO
+    destino = caminho_miniatura(arquivo, tamanho)
+    try:
+        _tocar(destino, destino.stat())
+        return destino
+    except FileNotFoundError:
+        pass
+    rotulo = Path(arquivo.name).suffix.lstrip('.') or 'arquivo'
+    if not e_imagem(arquivo):
+        gerar_icone(destino, tamanho, rotulo)
+        return destino
+    try:
+        gerar(arquivo.path, destino, tamanho)
+    except FileNotFoundError:
+        raise
+    except ERROS_IMAGEM:
+        gerar_icone(destino, tamanho, rotulo) # Imagem corrompida ou grande demais: o ícone fica no lugar da miniatura
+    _geradas_desde_a_poda += 1
+    if _geradas_desde_a_poda >= PODA_A_CADA:
+        _geradas_desde_a_poda = 0
+        podar()
+    return destino
+
+
+def gerar_em_lote(arquivos, tamanho=None, processos=None, progresso=None):
+    """
+    Gera, em um pool de processos, as miniaturas que faltam para os FieldFiles `arquivos` e poda o
+    cache ao final. Retorna quantas foram geradas; `progresso(atual, total)` é chamado a cada uma.
+    """
+    tamanho = tamanho or settings.MINIATURAS_TAMANHO
+    pendentes = {}
+    for arquivo in arquivos:
+        if not e_imagem(arquivo):
+            continue
+        destino = caminho_miniatura(arquivo, tamanho)
+        if not destino.exists():
+            pendentes[destino] = arquivo.path # A mesma digitalização em vários registros: gera uma vez
+    if not pendentes:
+        return 0
+
+    if len(pendentes) == 1 or processos == 1:
+        # Não compensa iniciar um pool (ex.: logo após o upload de um documento)
+        for atual, (destino, origem) in enumerate(pendentes.items(), start=1):
+            try:
+                gerar(origem, destino, tamanho)
+            except ERROS_IMAGEM:
+                continue # Arquivo ausente ou imagem corrompida: tratados pela view
+            if progresso:
+                progresso(atual, len(pendentes))
+        podar()
+        return sum(1 for destino in pendentes if destino.exists())
+
+    geradas = 0
+    # spawn: os processos não herdam as threads nem as conexões com o banco de quem chamou
+    with ProcessPoolExecutor(processos, mp_context=multiprocessing.get_context('spawn')) as pool:
+        futuros = [pool.submit(gerar, origem, str(destino), tamanho) for destino, origem in pendentes.items()]
+        for atual, futuro in enumerate(as_completed(futuros), start=1):
+            try:
+                futuro.result()
+                geradas += 1
+            except ERROS_IMAGEM:
+                pass # Arquivo ausente ou imagem corrompida: tratados pela view
+            if progresso:
+                progresso(atual, len(futuros))
+    podar()
+    return geradas
+
+
+def podar(limite_bytes=None):
+    """Remove as miniaturas usadas há mais tempo até o cache ficar abaixo do limite. Retorna quantas removeu."""
+    limite_bytes = limite_bytes if limite_bytes is not None else settings.MINIATURAS_LIMITE_MB * 1024 * 1024
+    pasta = _pasta()
+    if not pasta.is_dir():
+        return 0
+    arquivos, total = [], 0
+    for subpasta in os.scandir(pasta):
+        if not subpasta.is_dir():
+            continue
+        for entrada in os.scandir(subpasta.path):
+            info = entrada.stat()
+            arquivos.append((info.st_mtime, info.st_size, entrada.path))
+            total += info.st_size
+    if total <= limite_bytes:
+        return 0
+    removidas = 0
+    for _, tamanho, caminho in sorted(arquivos):
+        if total <= limite_bytes * FRACAO_APOS_PODA:
+            break
+        try:
+            os.remove(caminho)
+        except FileNotFoundError:
+            pass
+        total -= tamanho
+        removidas += 1
+    return removidas
+
+
+def resposta_miniatura(request, arquivo, tamanho=None):
+    """Resposta com a miniatura do FieldFile `arquivo`, revalidada por ETag (304 se não mudou)."""
+    tamanho = tamanho or settings.MINIATURAS_TAMANHO
+    # A miniatura depende só do conteúdo do original e do tamanho: o ETag sai sem abrir nada
+    etag = f'"{caminho_miniatura(arquivo, tamanho).stem}"'
+    cabecalhos = {'ETag': etag, 'Cache-Control': 'private, no-cache'} # Documentos pessoais, revalidando
+    if etag in [valor.strip() for valor in request.headers.get('If-None-Match', '').split(',')]:
+        return HttpResponseNotModified(headers=cabecalhos)
+    resposta = FileResponse(open(miniatura(arquivo, tamanho), 'rb'), content_type=CONTENT_TYPE)
+    for nome, valor in cabecalhos.items():
+        resposta[nome] = valor
+    return resposta
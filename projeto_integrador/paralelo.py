@@ -0,0 +1,46 @@
+"""
+Execução concorrente de consultas independentes em views assíncronas.
+
+No Django 4.2 os métodos assíncronos do ORM (aaggregate, acount...) ainda rodam todos na mesma
+thread (sync_to_async com thread_sensitive=True), um depois do outro. Para que a latência de um
+painel seja a da consulta mais lenta, e não a soma de todas, cada consulta roda aqui em uma das
+threads de um pool fixo. Cada thread mantém a sua conexão entre as consultas, com as mesmas regras
+de uma requisição (CONN_MAX_AGE e CONN_HEALTH_CHECKS): a conexão é descartada só quando expira,
+falha ou fica inutilizável.
+"""
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections, connection
+
+from monitoramento.metricas import coletor_da_requisicao
+
+# Limita as conexões abertas pelos painéis, qualquer que seja o número de requisições simultâneas
+THREADS = int(os.environ.get('PAINEL_THREADS', 8))
+_executor = ThreadPoolExecutor(max_workers=THREADS, thread_name_prefix='painel')
+
+
+def _executar(funcao):
+    # Como no início e no fim de uma requisição: fecha só as conexões expiradas ou com erro
+    close_old_connections()
+    # Mantém as consultas desta thread na contabilização da requisição (monitoramento)
+    coletor = coletor_da_requisicao.get()
+    try:
+        with connection.execute_wrapper(coletor) if coletor else nullcontext():
+            return funcao()
+    finally:
+        close_old_connections()
+
+
+async def em_paralelo(**consultas):
+    """
+    Executa ao mesmo tempo as funções (síncronas, sem argumentos) informadas por nome e devolve
+    um dict nome -> resultado.
+    """
+    resultados = await asyncio.gather(*(
+        sync_to_async(_executar, thread_sensitive=False, executor=_executor)(funcao) for funcao in consultas.values()
+    ))
+    return dict(zip(consultas, resultados))
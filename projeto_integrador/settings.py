@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -35,6 +36,9 @@ INSTALLED_APPS = [
     'rh.apps.RhConfig',
     'veiculos.apps.VeiculosConfig',
     'financeiro.apps.FinanceiroConfig',
+    'busca.apps.BuscaConfig',
+    'monitoramento.apps.MonitoramentoConfig',
+    'tarefas.apps.TarefasConfig',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -44,6 +48,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'monitoramento.middleware.MonitoramentoMiddleware', # Primeiro, para medir a requisição inteira
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -77,12 +82,86 @@ WSGI_APPLICATION = 'projeto_integrador.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# O perfil do banco vem do ambiente: DB_ENGINE=sqlite (padrão) ou postgresql.
+
+def _env_bool(nome, padrao):
+    return os.environ.get(nome, str(padrao)).lower() in ('1', 'true', 'sim', 'yes')
+
+def _env_segundos(nome, padrao):
+    # Variável ausente: o padrão; definida vazia: None (sem limite)
+    valor = os.environ.get(nome)
+    if valor is None:
+        return padrao
+    return int(valor) if valor.strip() else None
+
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'projeto_integrador'),
+            'USER': os.environ.get('DB_USER', ''),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', ''),
+            'PORT': os.environ.get('DB_PORT', ''),
+            # Conexões persistentes entre requisições (segundos, padrão 60; 0 fecha a cada requisição,
+            # DB_CONN_MAX_AGE definido vazio = sem limite)
+            'CONN_MAX_AGE': _env_segundos('DB_CONN_MAX_AGE', 60),
+            # Testa a conexão reaproveitada antes de usá-la, descartando as que o servidor encerrou
+            'CONN_HEALTH_CHECKS': _env_bool('DB_CONN_HEALTH_CHECKS', True),
+        }
+    }
+else:
+    # Backend próprio (projeto_integrador/backends/sqlite3) para aplicar os PRAGMAs em cada conexão.
+    # WAL permite leituras simultâneas a uma escrita; busy_timeout faz as escritas concorrentes
+    # esperarem a vez em vez de falharem com "database is locked".
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    DATABASES = {
+        'default': {
+            'ENGINE': 'projeto_integrador.backends.sqlite3',
+            'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {
+                'timeout': SQLITE_BUSY_TIMEOUT_MS / 1000,
+                'begin_immediate': _env_bool('SQLITE_BEGIN_IMMEDIATE', True),
+                'pragmas': {
+                    'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+                    'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+                    'busy_timeout': SQLITE_BUSY_TIMEOUT_MS,
+                    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+                    'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', -64 * 1024)), # Negativo: em KiB
+                },
+            },
+        }
+    }
+
+
+# Cache (sem serviço externo): CACHE_BACKEND=arquivo (padrão, compartilhado entre os workers web, o
+# worker de tarefas e os comandos da mesma máquina) ou memoria (por processo: as gravações feitas fora
+# do processo web só aparecem nos painéis quando o cache expira). Usado pelas páginas iniciais
+# (projeto_integrador/cache_paineis.py).
+
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'arquivo')
+CACHE_TIMEOUT = int(os.environ.get('CACHE_TIMEOUT', 3600))
+
+if CACHE_BACKEND == 'arquivo':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('CACHE_DIR', BASE_DIR / 'cache' / 'paineis'),
+            'TIMEOUT': CACHE_TIMEOUT,
+            'OPTIONS': {'MAX_ENTRIES': 2000},
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'projeto_integrador',
+            'TIMEOUT': CACHE_TIMEOUT,
+            'OPTIONS': {'MAX_ENTRIES': 2000},
+        }
     }
-}
 
 
 # Password validation
@@ -122,6 +201,51 @@ USE_TZ = True
 STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'static'
 
+# Fora do modo de desenvolvimento, o collectstatic grava os arquivos com o hash do conteúdo no nome
+# e as versões .gz/.br, servidos com cache longo por projeto_integrador/estaticos.py (ver wsgi.py).
+# Em DEBUG os nomes originais são usados, sem exigir o manifesto do collectstatic.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    # Documentos digitalizados e atestados: gravados uma única vez por conteúdo (SHA-256)
+    'documentos': {
+        'BACKEND': 'projeto_integrador.armazenamento.ArmazenamentoDeduplicado',
+    },
+    'staticfiles': {
+        'BACKEND': (
+            'django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG
+            else 'projeto_integrador.storage.ArquivosEstaticosComprimidos'
+        ),
+    },
+}
+
+# Arquivos enviados (documentos, atestados, notas fiscais)
+
+MEDIA_URL = 'media/'
+MEDIA_ROOT = os.environ.get('MEDIA_ROOT', BASE_DIR / 'media')
+
+# Uploads pequenos ficam em memória; os maiores são gravados em blocos com o SHA-256 calculado
+# durante o recebimento (ver projeto_integrador/uploads.py)
+FILE_UPLOAD_HANDLERS = [
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'projeto_integrador.uploads.UploadComHash',
+]
+
+# Prefixo de uma location "internal" do nginx com alias para MEDIA_ROOT: os downloads passam a ser
+# enviados pelo nginx (X-Accel-Redirect). Vazio: enviados pelo Django (ver projeto_integrador/downloads.py)
+DOWNLOAD_X_ACCEL_REDIRECT = os.environ.get('DOWNLOAD_X_ACCEL_REDIRECT', '')
+
+# Miniaturas dos documentos digitalizados (projeto_integrador/miniaturas.py): lado máximo em pixels e
+# limite do cache em disco, podado pelas menos usadas
+MINIATURAS_DIR = os.environ.get('MINIATURAS_DIR', BASE_DIR / 'cache' / 'miniaturas')
+MINIATURAS_TAMANHO = int(os.environ.get('MINIATURAS_TAMANHO', 256))
+MINIATURAS_LIMITE_MB = int(os.environ.get('MINIATURAS_LIMITE_MB', 200))
+
+# Lançamentos recorrentes (financeiro/recorrencias.py): as ocorrências que vencem até este número de
+# dias à frente são gravadas como lançamentos; as seguintes são apenas projetadas no fluxo de caixa
+RECORRENCIAS_HORIZONTE_DIAS = int(os.environ.get('RECORRENCIAS_HORIZONTE_DIAS', 60))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -0,0 +1,60 @@
+"""
+Armazenamento dos arquivos estáticos: nomes com o hash do conteúdo (ManifestStaticFilesStorage) e,
+no collectstatic, cópias pré-comprimidas (.gz e, se o pacote brotli estiver instalado, .br) dos
+arquivos de texto, servidas por projeto_integrador/estaticos.py.
+"""
+import gzip
+from pathlib import Path
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError: # Opcional: sem ele, apenas as versões gzip são geradas
+    brotli = None
+
+EXTENSOES_COMPRIMIVEIS = {'.css', '.js', '.mjs', '.map', '.json', '.svg', '.txt', '.html', '.xml', '.ico'}
+REDUCAO_MINIMA = 0.95 # Só mantém a versão comprimida se ela tiver no máximo 95% do tamanho original
+
+
+def _comprimir_gzip(dados):
+    return gzip.compress(dados, compresslevel=9, mtime=0) # mtime fixo: mesma entrada, mesmo arquivo
+
+
+def _comprimir_brotli(dados):
+    return brotli.compress(dados, quality=11)
+
+
+COMPRESSORES = [('.gz', _comprimir_gzip)]
+if brotli is not None:
+    COMPRESSORES.append(('.br', _comprimir_brotli))
+
+
+class ArquivosEstaticosComprimidos(ManifestStaticFilesStorage):
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        # Comprime tanto os originais quanto as cópias com hash registradas no manifesto
+        nomes = set(paths) | set(self.hashed_files.values())
+        for nome in sorted(nomes):
+            if Path(nome).suffix.lower() not in EXTENSOES_COMPRIMIVEIS or not self.exists(nome):
+                continue
+            for nome_comprimido in self.comprimir(nome):
+                yield nome, nome_comprimido, True
+
+    def comprimir(self, nome):
+        """Grava as versões comprimidas de `nome` que valem a pena e devolve os nomes gravados."""
+        with self.open(nome) as arquivo:
+            dados = arquivo.read()
+        gravados = []
+        for extensao, compressor in COMPRESSORES:
+            destino = Path(self.path(nome + extensao))
+            comprimido = compressor(dados)
+            if len(comprimido) > len(dados) * REDUCAO_MINIMA:
+                destino.unlink(missing_ok=True)
+                continue
+            destino.write_bytes(comprimido)
+            gravados.append(nome + extensao)
+        return gravados
@@ -0,0 +1,80 @@
+import os
+import tempfile
+from types import SimpleNamespace
+
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from .downloads import _faixa, resposta_arquivo
+
+CONTEUDO = bytes(range(256)) * 4
+
+
+class FaixaTests(SimpleTestCase):
+    def test_faixas_validas(self):
+        self.assertEqual(_faixa('bytes=0-99', 1000), (0, 99))
+        self.assertEqual(_faixa('bytes=500-', 1000), (500, 999))
+        self.assertEqual(_faixa('bytes = 990-2000', 1000), (990, 999)) # Fim além do arquivo é truncado
+        self.assertEqual(_faixa('bytes=999-999', 1000), (999, 999))
+
+    def test_sufixo(self):
+        self.assertEqual(_faixa('bytes=-100', 1000), (900, 999))
+        self.assertEqual(_faixa('bytes=-5000', 1000), (0, 999))
+
+    def test_faixas_invalidas(self):
+        for cabecalho in ('bytes=1000-', 'bytes=1500-1600', 'bytes=50-10', 'bytes=-', 'bytes=-0'):
+            with self.subTest(cabecalho=cabecalho):
+                self.assertIs(_faixa(cabecalho, 1000), False)
+
+    def test_arquivo_inteiro(self):
+        # Várias faixas ou outra unidade: o arquivo inteiro é enviado
+        for cabecalho in ('bytes=0-10,20-30', 'items=0-10', ''):
+            with self.subTest(cabecalho=cabecalho):
+                self.assertIsNone(_faixa(cabecalho, 1000))
+
+
+@override_settings(DOWNLOAD_X_ACCEL_REDIRECT='')
+class RespostaArquivoTests(SimpleTestCase):
+    def setUp(self):
+        descritor, caminho = tempfile.mkstemp(suffix='.pdf')
+        with os.fdopen(descritor, 'wb') as arquivo:
+            arquivo.write(CONTEUDO)
+        self.addCleanup(os.remove, caminho)
+        self.arquivo = SimpleNamespace(path=caminho, name=os.path.basename(caminho))
+
+    def _baixar(self, cabecalhos=None):
+        resposta = resposta_arquivo(RequestFactory().get('/', headers=cabecalhos), self.arquivo, 'contrato.pdf')
+        if resposta.streaming:
+            corpo = b''.join(resposta.streaming_content)
+            resposta.close()
+        else:
+            corpo = resposta.content
+        return resposta, corpo
+
+    def test_arquivo_inteiro(self):
+        resposta, corpo = self._baixar()
+        self.assertEqual((resposta.status_code, resposta['Content-Type'], resposta['Accept-Ranges']), (200, 'application/pdf', 'bytes'))
+        self.assertEqual(corpo, CONTEUDO)
+
+    def test_faixa_no_meio_e_no_fim(self):
+        resposta, corpo = self._baixar({'Range': 'bytes=100-199'})
+        self.assertEqual((resposta.status_code, resposta['Content-Range']), (206, 'bytes 100-199/1024'))
+        self.assertEqual(int(resposta['Content-Length']), 100)
+        self.assertEqual(corpo, CONTEUDO[100:200])
+
+        resposta, corpo = self._baixar({'Range': 'bytes=-24'})
+        self.assertEqual((resposta.status_code, resposta['Content-Range']), (206, 'bytes 1000-1023/1024'))
+        self.assertEqual(corpo, CONTEUDO[-24:])
+
+    def test_faixa_fora_do_arquivo(self):
+        resposta, corpo = self._baixar({'Range': 'bytes=1024-'})
+        self.assertEqual((resposta.status_code, resposta['Content-Range']), (416, 'bytes */1024'))
+        self.assertEqual(corpo, b'')
+
+    def test_revalidacao_por_etag(self):
+        resposta, _ = self._baixar()
+        etag = resposta['ETag']
+        self.assertEqual(self._baixar({'If-None-Match': etag})[0].status_code, 304)
+        # If-Range com ETag desatualizado: a faixa é ignorada e o arquivo vai inteiro
+        resposta, corpo = self._baixar({'Range': 'bytes=0-9', 'If-Range': '"antigo"'})
+        self.assertEqual((resposta.status_code, corpo), (200, CONTEUDO))
+        self.assertEqual(self._baixar({'Range': 'bytes=0-9', 'If-Range': etag})[0].status_code, 206)
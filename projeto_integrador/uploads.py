@@ -0,0 +1,64 @@
+"""
+Tratamento de uploads grandes: o arquivo é gravado em blocos em um temporário dentro de MEDIA_ROOT
+e o SHA-256 é calculado à medida que os blocos chegam, sem manter o arquivo em memória.
+O armazenamento deduplicado (projeto_integrador/armazenamento.py) usa o hash pronto e move o temporário.
+
+Arquivos pequenos continuam com o MemoryFileUploadHandler, que vem antes na lista FILE_UPLOAD_HANDLERS.
+"""
+import hashlib
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+
+from .armazenamento import PASTA_TEMPORARIOS
+
+
+class ArquivoComHash(UploadedFile):
+    """Upload gravado em um arquivo temporário, com o SHA-256 do conteúdo."""
+
+    def __init__(self, file, name, content_type, size, charset, content_type_extra, sha256):
+        super().__init__(file, name, content_type, size, charset, content_type_extra)
+        self.sha256 = sha256
+
+    def temporary_file_path(self):
+        return self.file.name
+
+    def close(self):
+        try:
+            return self.file.close()
+        except FileNotFoundError:
+            pass # O armazenamento já moveu o temporário para o destino
+
+
+class UploadComHash(FileUploadHandler):
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        # Criado só no primeiro bloco: se o MemoryFileUploadHandler ficar com o arquivo, nada chega aqui
+        self.arquivo = None
+        self.sha256 = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.arquivo is None:
+            pasta = Path(settings.MEDIA_ROOT) / PASTA_TEMPORARIOS
+            pasta.mkdir(parents=True, exist_ok=True)
+            self.arquivo = tempfile.NamedTemporaryFile(suffix='.upload', dir=pasta)
+        self.arquivo.write(raw_data)
+        self.sha256.update(raw_data)
+
+    def file_complete(self, file_size):
+        if self.arquivo is None:
+            return None
+        self.arquivo.flush()
+        self.arquivo.seek(0)
+        return ArquivoComHash(
+            self.arquivo, self.file_name, self.content_type, file_size, self.charset, self.content_type_extra,
+            self.sha256.hexdigest(),
+        )
+
+    def upload_interrupted(self):
+        if getattr(self, 'arquivo', None) is not None:
+            self.arquivo.close() # Remove o temporário
@@ -21,6 +21,9 @@ urlpatterns = [
     path('financeiro/', include('financeiro.urls')),
     path('veiculos/', include('veiculos.urls')),
     path('rh/', include('rh.urls')),
+    path('busca/', include('busca.urls')),
+    path('monitoramento/', include('monitoramento.urls')),
+    path('tarefas/', include('tarefas.urls')),
     path('', include('index.urls')),
     path('admin/', admin.site.urls),
 ]
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'projeto_integrador.settings')
 
 application = get_wsgi_application()
+
+# Arquivos estáticos (com hash, comprimidos e com cache longo) servidos antes de chegar ao Django
+from .estaticos import ArquivosEstaticos  # noqa: E402
+
+application = ArquivosEstaticos(application)
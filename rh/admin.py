@@ -1,3 +1,107 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import (
+    AtestadoMedico, BancoDeHoras, Colaborador, DocumentoDigitalizado, HistoricoPagamento, ItemFolhaPagamento,
+    ObrigacaoLegal, PrazoTrabalhista, ProgramacaoFerias, SaldoBancoDeHoras, VinculoEmpregaticio,
+)
+
+
+@admin.register(Colaborador)
+class ColaboradorAdmin(admin.ModelAdmin):
+    list_display = ('nome_completo', 'cpf', 'email', 'status', 'data_admissao_primeiro_vinculo')
+    list_filter = ('status',)
+    search_fields = ('nome_completo', 'cpf', 'email')
+    raw_id_fields = ('usuario',)
+
+@admin.register(VinculoEmpregaticio)
+class VinculoEmpregaticioAdmin(admin.ModelAdmin):
+    list_display = ('colaborador', 'cargo', 'departamento', 'tipo_contrato', 'data_inicio', 'data_fim', 'salario_base')
+    list_select_related = ('colaborador',)
+    list_filter = ('tipo_contrato', 'departamento')
+    search_fields = ('colaborador__nome_completo', 'cargo', 'matricula')
+    raw_id_fields = ('colaborador',)
+
+@admin.register(DocumentoDigitalizado)
+class DocumentoDigitalizadoAdmin(admin.ModelAdmin):
+    list_display = ('tipo_documento', 'colaborador', 'data_upload')
+    list_select_related = ('colaborador',)
+    search_fields = ('colaborador__nome_completo', 'tipo_documento')
+    raw_id_fields = ('colaborador', 'vinculo')
+
+@admin.register(PrazoTrabalhista)
+class PrazoTrabalhistaAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'tipo_prazo', 'data_prazo', 'cumprido')
+    list_select_related = ('vinculo__colaborador',)
+    list_filter = ('cumprido', 'tipo_prazo')
+    search_fields = ('vinculo__colaborador__nome_completo',)
+    raw_id_fields = ('vinculo',)
+
+@admin.register(ObrigacaoLegal)
+class ObrigacaoLegalAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'tipo_obrigacao', 'periodo_referencia', 'data_vencimento', 'valor', 'cumprida')
+    list_select_related = ('vinculo__colaborador',)
+    list_filter = ('cumprida', 'tipo_obrigacao')
+    search_fields = ('vinculo__colaborador__nome_completo',)
+    raw_id_fields = ('vinculo',)
+
+class ItemFolhaPagamentoInline(admin.TabularInline):
+    model = ItemFolhaPagamento
+    extra = 0
+
+@admin.register(HistoricoPagamento)
+class HistoricoPagamentoAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'periodo_referencia', 'data_pagamento', 'salario_bruto', 'total_descontos', 'salario_liquido')
+    list_select_related = ('vinculo__colaborador',)
+    search_fields = ('vinculo__colaborador__nome_completo',)
+    date_hierarchy = 'periodo_referencia'
+    raw_id_fields = ('vinculo',)
+    inlines = (ItemFolhaPagamentoInline,)
+
+@admin.register(ItemFolhaPagamento)
+class ItemFolhaPagamentoAdmin(admin.ModelAdmin):
+    list_display = ('descricao', 'tipo_item', 'valor', 'colaborador', 'periodo_referencia')
+    list_select_related = ('historico_pagamento__vinculo__colaborador',)
+    list_filter = ('tipo_item',)
+    search_fields = ('descricao', 'historico_pagamento__vinculo__colaborador__nome_completo')
+    raw_id_fields = ('historico_pagamento',)
+
+    @admin.display(description='Colaborador', ordering='historico_pagamento__vinculo__colaborador__nome_completo')
+    def colaborador(self, item):
+        return item.historico_pagamento.vinculo.colaborador.nome_completo
+
+    @admin.display(description='Período', ordering='historico_pagamento__periodo_referencia')
+    def periodo_referencia(self, item):
+        return item.historico_pagamento.periodo_referencia.strftime('%Y-%m')
+
+@admin.register(BancoDeHoras)
+class BancoDeHorasAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'data', 'tipo_lancamento', 'horas', 'aprovado_por')
+    list_select_related = ('vinculo__colaborador', 'aprovado_por')
+    list_filter = ('tipo_lancamento',)
+    search_fields = ('vinculo__colaborador__nome_completo',)
+    raw_id_fields = ('vinculo', 'aprovado_por')
+
+@admin.register(SaldoBancoDeHoras)
+class SaldoBancoDeHorasAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'total_creditos', 'total_debitos', 'saldo', 'data_atualizacao')
+    list_select_related = ('vinculo__colaborador',)
+    search_fields = ('vinculo__colaborador__nome_completo',)
+    readonly_fields = ('vinculo', 'total_creditos', 'total_debitos', 'saldo') # Mantidos pelos lançamentos (rh/banco_horas.py)
+
+    def has_add_permission(self, request):
+        return False
+
+@admin.register(ProgramacaoFerias)
+class ProgramacaoFeriasAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'data_inicio_gozo', 'data_fim_gozo', 'dias_gozados', 'status')
+    list_select_related = ('vinculo__colaborador',)
+    list_filter = ('status',)
+    search_fields = ('vinculo__colaborador__nome_completo',)
+    raw_id_fields = ('vinculo',)
+
+@admin.register(AtestadoMedico)
+class AtestadoMedicoAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'data_inicio_afastamento', 'data_fim_afastamento', 'cid')
+    list_select_related = ('vinculo__colaborador',)
+    search_fields = ('vinculo__colaborador__nome_completo', 'cid')
+    raw_id_fields = ('vinculo',)
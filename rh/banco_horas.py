@@ -0,0 +1,138 @@
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, DecimalField, F, Sum, Value, When
+from django.utils import timezone
+
+from .models import BancoDeHoras, SaldoBancoDeHoras
+
+ZERO = Decimal('0.00')
+
+
+def _efeito(lancamento):
+    """
+    Converte um lançamento (vinculo_id, tipo_lancamento, horas) em (créditos, débitos).
+    """
+    _, tipo_lancamento, horas = lancamento
+    if tipo_lancamento == 'credito':
+        return horas, ZERO
+    return ZERO, horas
+
+
+def _aplicar(vinculo_id, creditos, debitos, criar):
+    """
+    Soma créditos/débitos ao saldo consolidado do vínculo com uma única instrução UPDATE.
+    Só cria o registro de saldo quando `criar` é verdadeiro (inclusões), para não recriar
+    saldos de vínculos que estão sendo excluídos em cascata.
+    """
+    if not creditos and not debitos:
+        return
+    atualizados = SaldoBancoDeHoras.objects.filter(vinculo_id=vinculo_id).update(
+        total_creditos=F('total_creditos') + creditos,
+        total_debitos=F('total_debitos') + debitos,
+        saldo=F('saldo') + creditos - debitos,
+        data_atualizacao=timezone.now(),
+    )
+    if atualizados or not criar:
+        return
+    try:
+        with transaction.atomic():
+            SaldoBancoDeHoras.objects.create(
+                vinculo_id=vinculo_id,
+                total_creditos=creditos,
+                total_debitos=debitos,
+                saldo=creditos - debitos,
+            )
+    except IntegrityError:
+        # Outro processo criou o saldo entre o UPDATE e o INSERT
+        _aplicar(vinculo_id, creditos, debitos, criar=False)
+
+
+def registrar_alteracao(anterior, atual):
+    """
+    Ajusta o saldo consolidado a partir do estado anterior e atual de um lançamento.
+    Cada estado é uma tupla (vinculo_id, tipo_lancamento, horas) ou None (inclusão/exclusão).
+    """
+    if anterior == atual:
+        return
+    if anterior is not None:
+        creditos, debitos = _efeito(anterior)
+        _aplicar(anterior[0], -creditos, -debitos, criar=False)
+    if atual is not None:
+        creditos, debitos = _efeito(atual)
+        _aplicar(atual[0], creditos, debitos, criar=True)
+
+
+def saldo_do_vinculo(vinculo_id):
+    """
+    Saldo atual de um vínculo (uma consulta por chave primária).
+    """
+    saldo = SaldoBancoDeHoras.objects.filter(vinculo_id=vinculo_id).values_list('saldo', flat=True).first()
+    return saldo if saldo is not None else ZERO
+
+
+def saldos_da_empresa():
+    """
+    Saldo atual de todos os vínculos, no formato {vinculo_id: saldo}.
+    """
+    return dict(SaldoBancoDeHoras.objects.values_list('vinculo_id', 'saldo'))
+
+
+def calcular_saldos():
+    """
+    Recalcula créditos e débitos de todos os vínculos a partir dos lançamentos brutos,
+    em uma única consulta agrupada. Retorna {vinculo_id: (creditos, debitos)}.
+    """
+    def soma_do_tipo(tipo):
+        return Sum(
+            Case(When(tipo_lancamento=tipo, then=F('horas')), default=Value(ZERO)),
+            output_field=DecimalField(max_digits=10, decimal_places=2),
+        )
+
+    totais = (
+        BancoDeHoras.objects.order_by()
+        .values('vinculo_id')
+        .annotate(creditos=soma_do_tipo('credito'), debitos=soma_do_tipo('debito'))
+    )
+    return {t['vinculo_id']: (t['creditos'] or ZERO, t['debitos'] or ZERO) for t in totais}
+
+
+def reconstruir_saldos(corrigir=True):
+    """
+    Confere o saldo consolidado contra os lançamentos brutos.
+    Retorna a lista de divergências (vinculo_id, saldo_registrado, saldo_calculado) e,
+    se `corrigir` for verdadeiro, regrava os saldos divergentes em lote.
+    """
+    with transaction.atomic():
+        # Bloqueia os saldos antes de recalcular: os ajustes dos sinais (registrar_alteracao)
+        # esperam o fim da correção, em vez de serem sobrescritos pelos valores absolutos regravados
+        registrados = {s.vinculo_id: s for s in SaldoBancoDeHoras.objects.select_for_update().order_by('vinculo_id')}
+        calculados = calcular_saldos()
+
+        divergencias = []
+        novos = []
+        alterados = []
+        agora = timezone.now()
+        for vinculo_id in calculados.keys() | registrados.keys():
+            creditos, debitos = calculados.get(vinculo_id, (ZERO, ZERO))
+            registro = registrados.get(vinculo_id)
+            if registro is None:
+                divergencias.append((vinculo_id, None, creditos - debitos))
+                novos.append(SaldoBancoDeHoras(
+                    vinculo_id=vinculo_id, total_creditos=creditos, total_debitos=debitos, saldo=creditos - debitos,
+                ))
+            elif (registro.total_creditos, registro.total_debitos, registro.saldo) != (creditos, debitos, creditos - debitos):
+                divergencias.append((vinculo_id, registro.saldo, creditos - debitos))
+                registro.total_creditos = creditos
+                registro.total_debitos = debitos
+                registro.saldo = creditos - debitos
+                registro.data_atualizacao = agora
+                alterados.append(registro)
+
+        if corrigir:
+            # Saldo criado por um lançamento concorrente não é sobrescrito; a próxima conferência o confere
+            SaldoBancoDeHoras.objects.bulk_create(novos, batch_size=1000, ignore_conflicts=True)
+            SaldoBancoDeHoras.objects.bulk_update(
+                alterados, ['total_creditos', 'total_debitos', 'saldo', 'data_atualizacao'], batch_size=1000,
+            )
+    return sorted(divergencias)
@@ -0,0 +1,102 @@
+"""
+Cálculo de INSS, IRRF e FGTS sobre vetores de salários.
+
+Os valores são convertidos para centavos inteiros e as alíquotas para pontos-base
+(1/10000), de modo que todo o cálculo é feito em aritmética inteira exata; o
+arredondamento para centavos (meio para cima) acontece uma única vez, no final.
+Com NumPy disponível o cálculo é vetorizado; sem ele, usa-se o mesmo algoritmo em Python.
+"""
+from collections import namedtuple
+from decimal import Decimal, ROUND_HALF_UP
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+CENTAVO = Decimal('0.01')
+ESCALA = 10000 # Alíquotas em pontos-base: 7,5% == 750
+
+# Tabela progressiva do INSS (empregado) vigente em 2024: limites superiores das faixas, em centavos, e alíquotas
+LIMITES_INSS = [141200, 266668, 400003, 778602]
+ALIQUOTAS_INSS = [750, 900, 1200, 1400]
+
+# Tabela progressiva mensal do IRRF vigente a partir de 02/2024: limites superiores, alíquotas e parcelas a deduzir
+LIMITES_IRRF = [225920, 282665, 375105, 466468] # Acima do último limite vale a última faixa
+ALIQUOTAS_IRRF = [0, 750, 1500, 2250, 2750]
+DEDUCOES_IRRF = [0, 16944, 38144, 66277, 89600]
+
+ALIQUOTA_FGTS = 800
+
+# Tipos de contrato sujeitos a INSS, IRRF e FGTS na folha
+CONTRATOS_COM_ENCARGOS = {'clt'}
+
+Encargos = namedtuple('Encargos', ['inss', 'irrf', 'fgts'])
+
+
+def arredondar(valor):
+    return valor.quantize(CENTAVO, rounding=ROUND_HALF_UP)
+
+
+def _para_centavos(valor):
+    return int((valor * 100).to_integral_value(rounding=ROUND_HALF_UP))
+
+
+def _para_decimal(centavos):
+    return Decimal(int(centavos)).scaleb(-2)
+
+
+def _arredondar_escala(valor):
+    # valor em centavos * ESCALA, não negativo -> centavos, arredondando meio para cima
+    return (valor + ESCALA // 2) // ESCALA
+
+
+def _calcular_numpy(centavos):
+    salarios = np.asarray(centavos, dtype=np.int64)
+
+    limites = np.array([0] + LIMITES_INSS, dtype=np.int64)
+    faixas = np.clip(salarios[:, None], limites[:-1], limites[1:]) - limites[:-1]
+    inss = _arredondar_escala(faixas @ np.array(ALIQUOTAS_INSS, dtype=np.int64))
+
+    base = salarios - inss
+    faixa_irrf = np.searchsorted(np.array(LIMITES_IRRF, dtype=np.int64), base, side='left')
+    imposto = base * np.array(ALIQUOTAS_IRRF, dtype=np.int64)[faixa_irrf] - np.array(DEDUCOES_IRRF, dtype=np.int64)[faixa_irrf] * ESCALA
+    irrf = _arredondar_escala(np.maximum(imposto, 0))
+
+    fgts = _arredondar_escala(salarios * ALIQUOTA_FGTS)
+    return inss.tolist(), irrf.tolist(), fgts.tolist()
+
+
+def _calcular_python(centavos):
+    inss, irrf, fgts = [], [], []
+    for salario in centavos:
+        contribuicao = 0
+        limite_anterior = 0
+        for limite, aliquota in zip(LIMITES_INSS, ALIQUOTAS_INSS):
+            if salario <= limite_anterior:
+                break
+            contribuicao += (min(salario, limite) - limite_anterior) * aliquota
+            limite_anterior = limite
+        inss_salario = _arredondar_escala(contribuicao)
+
+        base = salario - inss_salario
+        faixa = next((i for i, limite in enumerate(LIMITES_IRRF) if base <= limite), len(LIMITES_IRRF))
+        imposto = base * ALIQUOTAS_IRRF[faixa] - DEDUCOES_IRRF[faixa] * ESCALA
+
+        inss.append(inss_salario)
+        irrf.append(_arredondar_escala(max(imposto, 0)))
+        fgts.append(_arredondar_escala(salario * ALIQUOTA_FGTS))
+    return inss, irrf, fgts
+
+
+def calcular_encargos(salarios):
+    """
+    Calcula INSS e IRRF (descontos do empregado) e FGTS (depósito do empregador)
+    para uma sequência de salários brutos em Decimal, em uma única passada.
+    Retorna Encargos(inss, irrf, fgts), cada um uma lista de Decimal na ordem de entrada.
+    """
+    centavos = [_para_centavos(salario) for salario in salarios]
+    if not centavos:
+        return Encargos([], [], [])
+    calcular = _calcular_numpy if np is not None else _calcular_python
+    return Encargos(*([_para_decimal(v) for v in valores] for valores in calcular(centavos)))
@@ -0,0 +1,143 @@
+import calendar
+import datetime
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+
+from .encargos import CONTRATOS_COM_ENCARGOS, arredondar, calcular_encargos
+from .models import HistoricoPagamento, ItemFolhaPagamento, VinculoEmpregaticio
+
+TAMANHO_LOTE = 500
+
+
+@dataclass
+class ResumoFolha:
+    periodo_referencia: datetime.date
+    processados: int = 0
+    ja_existentes: int = 0
+
+
+def inicio_do_mes(data):
+    return data.replace(day=1)
+
+
+def fim_do_mes(data):
+    return data.replace(day=calendar.monthrange(data.year, data.month)[1])
+
+
+def vinculos_ativos(periodo_referencia):
+    """
+    Vínculos com pelo menos um dia de vigência no mês de referência.
+    """
+    inicio = inicio_do_mes(periodo_referencia)
+    fim = fim_do_mes(periodo_referencia)
+    return VinculoEmpregaticio.objects.filter(data_inicio__lte=fim).filter(
+        Q(data_fim__isnull=True) | Q(data_fim__gte=inicio)
+    )
+
+
+def _salario_do_periodo(salario_base, data_inicio, data_fim, periodo_referencia):
+    """
+    Salário proporcional aos dias de vigência no mês (mês comercial de 30 dias).
+    """
+    inicio = max(data_inicio, inicio_do_mes(periodo_referencia))
+    fim = min(data_fim or fim_do_mes(periodo_referencia), fim_do_mes(periodo_referencia))
+    if inicio.day == 1 and fim == fim_do_mes(periodo_referencia):
+        return salario_base
+    dias = min((fim - inicio).days + 1, 30)
+    return arredondar(salario_base * dias / 30)
+
+
+def salarios_do_periodo(vinculos, periodo_referencia):
+    """
+    Salário bruto do período para tuplas (id, tipo_contrato, salario_base, data_inicio, data_fim).
+    """
+    return [
+        _salario_do_periodo(salario_base, data_inicio, data_fim, periodo_referencia)
+        for _, _, salario_base, data_inicio, data_fim in vinculos
+    ]
+
+
+def calcular_itens(vinculos, periodo_referencia):
+    """
+    Calcula proventos e descontos de um lote de vínculos.
+    Recebe tuplas (id, tipo_contrato, salario_base, data_inicio, data_fim) e
+    retorna {vinculo_id: [(tipo_item, descricao, valor), ...]}.
+    """
+    brutos = salarios_do_periodo(vinculos, periodo_referencia)
+    # Encargos calculados de uma vez para todo o lote
+    encargos = calcular_encargos(brutos)
+
+    itens = {}
+    for (vinculo_id, tipo_contrato, *_), bruto, inss, irrf in zip(vinculos, brutos, encargos.inss, encargos.irrf):
+        itens_vinculo = [('provento', 'Salário Base', bruto)]
+        if tipo_contrato in CONTRATOS_COM_ENCARGOS:
+            itens_vinculo.append(('desconto', 'INSS', inss))
+            if irrf:
+                itens_vinculo.append(('desconto', 'IRRF', irrf))
+        itens[vinculo_id] = itens_vinculo
+    return itens
+
+
+def _gravar_lote(lote, periodo, data_pagamento):
+    itens_por_vinculo = calcular_itens(lote, periodo)
+
+    historicos = []
+    for vinculo_id, itens in itens_por_vinculo.items():
+        bruto = sum((valor for tipo, _, valor in itens if tipo == 'provento'), Decimal('0'))
+        descontos = sum((valor for tipo, _, valor in itens if tipo == 'desconto'), Decimal('0'))
+        historicos.append(HistoricoPagamento(
+            vinculo_id=vinculo_id,
+            periodo_referencia=periodo,
+            data_pagamento=data_pagamento,
+            salario_bruto=bruto,
+            total_descontos=descontos,
+            salario_liquido=bruto - descontos,
+        ))
+
+    with transaction.atomic():
+        HistoricoPagamento.objects.bulk_create(historicos)
+        ids = {h.vinculo_id: h.pk for h in historicos}
+        if None in ids.values():
+            # Bancos sem RETURNING no INSERT em lote: recupera os ids pela chave única (vinculo, periodo)
+            ids = dict(
+                HistoricoPagamento.objects.filter(periodo_referencia=periodo, vinculo_id__in=list(ids))
+                .values_list('vinculo_id', 'id')
+            )
+        ItemFolhaPagamento.objects.bulk_create([
+            ItemFolhaPagamento(historico_pagamento_id=ids[vinculo_id], tipo_item=tipo, descricao=descricao, valor=valor)
+            for vinculo_id, itens in itens_por_vinculo.items()
+            for tipo, descricao, valor in itens
+        ])
+
+
+def processar_folha(periodo_referencia, data_pagamento=None, tamanho_lote=TAMANHO_LOTE, progresso=None):
+    """
+    Gera a folha do período para todos os vínculos ativos, em lotes gravados com bulk_create.
+    Cada lote é uma transação; vínculos que já possuem folha no período são ignorados,
+    de modo que uma execução interrompida pode ser retomada sem duplicar registros.
+    `progresso`, se informado, é chamado com (processados, total) após cada lote.
+    """
+    periodo = inicio_do_mes(periodo_referencia)
+    if data_pagamento is None:
+        # Padrão: dia 5 do mês seguinte ao de referência
+        data_pagamento = (fim_do_mes(periodo) + datetime.timedelta(days=1)).replace(day=5)
+
+    ja_gerados = HistoricoPagamento.objects.filter(vinculo=OuterRef('pk'), periodo_referencia=periodo)
+    ativos = vinculos_ativos(periodo)
+    resumo = ResumoFolha(periodo_referencia=periodo, ja_existentes=ativos.filter(Exists(ja_gerados)).count())
+    pendentes = list(
+        ativos.filter(~Exists(ja_gerados))
+        .order_by('id')
+        .values_list('id', 'tipo_contrato', 'salario_base', 'data_inicio', 'data_fim')
+    )
+
+    for inicio in range(0, len(pendentes), tamanho_lote):
+        lote = pendentes[inicio:inicio + tamanho_lote]
+        _gravar_lote(lote, periodo, data_pagamento)
+        resumo.processados += len(lote)
+        if progresso is not None:
+            progresso(resumo.processados, len(pendentes))
+    return resumo
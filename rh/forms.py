@@ -44,3 +44,13 @@ class ColaboradorForm(forms.ModelForm):
             'genero': forms.Select(choices=[('masculino', 'Masculino'), ('feminino', 'Feminino')]),
         }
 
+
+class ImportacaoColaboradoresForm(forms.Form):
+    arquivo = forms.FileField(label='Arquivo (CSV ou XLSX)')
+    simular = forms.BooleanField(label='Apenas validar, sem gravar', required=False)
+
+    def clean_arquivo(self):
+        arquivo = self.cleaned_data['arquivo']
+        if not arquivo.name.lower().endswith(('.csv', '.xlsx')):
+            raise forms.ValidationError('Envie um arquivo .csv ou .xlsx.')
+        return arquivo
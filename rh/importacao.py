@@ -0,0 +1,163 @@
+import codecs
+import csv
+import datetime
+import re
+from dataclasses import dataclass, field
+
+from django.db import transaction
+
+from busca.indexacao import indexar_objetos
+from projeto_integrador.cache_paineis import invalidar
+
+from .forms import ColaboradorForm
+from .models import Colaborador
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+TAMANHO_LOTE = 1000
+LIMITE_ERROS = 1000 # Erros guardados no resultado; os demais são apenas contados
+FORMATOS_DATA = ['%d/%m/%Y', '%Y-%m-%d']
+
+
+class ColaboradorImportacaoForm(ColaboradorForm):
+    """
+    Mesmas regras de campo do cadastro (ColaboradorForm), aceitando datas no formato brasileiro.
+    A unicidade de cpf/email é conferida pelo importador contra conjuntos pré-carregados,
+    em vez de uma consulta por linha.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for nome in ('data_nascimento', 'data_admissao_primeiro_vinculo'):
+            self.fields[nome].input_formats = FORMATOS_DATA
+
+    def validate_unique(self):
+        pass
+
+
+@dataclass
+class ResultadoImportacao:
+    importados: int = 0
+    total_erros: int = 0
+    erros: list = field(default_factory=list) # (número da linha, [mensagens])
+
+
+def ler_csv(arquivo, delimitador=None, encoding='utf-8-sig'):
+    """
+    Lê um CSV binário linha a linha, gerando (número da linha, dict de campos).
+    Sem `delimitador`, detecta entre ';' e ',' pelo cabeçalho.
+    """
+    linhas = codecs.iterdecode(arquivo, encoding)
+    cabecalho = next(linhas, '')
+    if delimitador is None:
+        delimitador = ';' if cabecalho.count(';') > cabecalho.count(',') else ','
+
+    def com_cabecalho():
+        yield cabecalho
+        yield from linhas
+
+    leitor = csv.DictReader(com_cabecalho(), delimiter=delimitador)
+    for numero, linha in enumerate(leitor, start=2):
+        yield numero, linha
+
+
+def ler_xlsx(arquivo):
+    """
+    Lê a primeira planilha de um XLSX em modo somente leitura (streaming), gerando
+    (número da linha, dict de campos) a partir do cabeçalho na primeira linha.
+    """
+    if openpyxl is None:
+        raise ValueError('A leitura de arquivos XLSX requer o pacote openpyxl.')
+    planilha = openpyxl.load_workbook(arquivo, read_only=True, data_only=True)
+    try:
+        linhas = planilha.worksheets[0].iter_rows(values_only=True)
+        cabecalho = [str(coluna or '').strip() for coluna in next(linhas, ())]
+        for numero, valores in enumerate(linhas, start=2):
+            if any(valor is not None for valor in valores):
+                yield numero, dict(zip(cabecalho, valores))
+    finally:
+        planilha.close()
+
+
+def _normalizar(dados):
+    linha = {}
+    for chave, valor in dados.items():
+        if chave is None:
+            continue
+        if valor is None:
+            valor = ''
+        elif isinstance(valor, float) and valor.is_integer():
+            valor = str(int(valor)) # Planilhas guardam números inteiros como float
+        elif isinstance(valor, datetime.datetime):
+            valor = valor.date()
+        elif not isinstance(valor, datetime.date):
+            valor = str(valor).strip()
+        linha[chave.strip()] = valor
+    # CPF costuma vir formatado (000.000.000-00) ou, em planilhas, como número sem os zeros à esquerda
+    cpf = re.sub(r'\D', '', str(linha.get('cpf', '')))
+    linha['cpf'] = cpf.zfill(11) if cpf else cpf
+    return linha
+
+
+def _gravar(lote, resultado, simular):
+    if lote and not simular:
+        with transaction.atomic():
+            Colaborador.objects.bulk_create(lote)
+            if lote[0].pk is None:
+                # Bancos sem RETURNING no INSERT em lote: recupera os ids pelo CPF
+                ids = dict(Colaborador.objects.filter(cpf__in=[c.cpf for c in lote]).values_list('cpf', 'id'))
+                for colaborador in lote:
+                    colaborador.pk = ids[colaborador.cpf]
+            # bulk_create não dispara os sinais que mantêm o índice de busca e o cache dos painéis
+            indexar_objetos(lote)
+            invalidar('rh.Colaborador')
+    resultado.importados += len(lote)
+    lote.clear()
+
+
+def importar_colaboradores(linhas, tamanho_lote=TAMANHO_LOTE, simular=False, ao_errar=None):
+    """
+    Valida e insere colaboradores a partir de um iterável de (número da linha, dict de campos),
+    gravando em lotes com bulk_create. Linhas inválidas são registradas no resultado (e
+    repassadas a `ao_errar`, se informado) sem interromper a importação.
+    Com `simular`, apenas valida.
+    """
+    cpfs = set(Colaborador.objects.values_list('cpf', flat=True).iterator())
+    emails = set(Colaborador.objects.values_list('email', flat=True).iterator())
+    resultado = ResultadoImportacao()
+    lote = []
+
+    def registrar_erro(numero, mensagens):
+        resultado.total_erros += 1
+        if len(resultado.erros) < LIMITE_ERROS:
+            resultado.erros.append((numero, mensagens))
+        if ao_errar is not None:
+            ao_errar(numero, mensagens)
+
+    for numero, dados in linhas:
+        form = ColaboradorImportacaoForm(_normalizar(dados))
+        if not form.is_valid():
+            registrar_erro(numero, [f'{campo}: {erro}' for campo, erros in form.errors.items() for erro in erros])
+            continue
+
+        colaborador = form.instance
+        mensagens = []
+        if colaborador.cpf in cpfs:
+            mensagens.append('cpf: CPF já cadastrado.')
+        if colaborador.email in emails:
+            mensagens.append('email: E-mail já cadastrado.')
+        if mensagens:
+            registrar_erro(numero, mensagens)
+            continue
+
+        cpfs.add(colaborador.cpf)
+        emails.add(colaborador.email)
+        colaborador.atualizar_nome_busca() # bulk_create não passa pelo save()
+        lote.append(colaborador)
+        if len(lote) >= tamanho_lote:
+            _gravar(lote, resultado, simular)
+
+    _gravar(lote, resultado, simular)
+    return resultado
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from rh.miniaturas import gerar_miniaturas
+
+
+class Command(BaseCommand):
+    help = 'Gera as miniaturas que faltam dos documentos digitalizados e atestados médicos, em um pool de processos.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processos', type=int, default=None, help='Processos do pool (padrão: um por CPU).')
+
+    def handle(self, *args, **options):
+        if options['processos'] is not None and options['processos'] < 1:
+            raise CommandError('Informe pelo menos um processo.')
+        geradas = gerar_miniaturas(processos=options['processos'])
+        self.stdout.write(self.style.SUCCESS(f'{geradas} miniatura(s) gerada(s).'))
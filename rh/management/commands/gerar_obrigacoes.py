@@ -0,0 +1,23 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from rh.obrigacoes import gerar_obrigacoes
+
+
+class Command(BaseCommand):
+    help = 'Gera ou recalcula as obrigações de FGTS, INSS e IRRF do período (AAAA-MM).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('periodo', help='Mês de referência no formato AAAA-MM.')
+
+    def handle(self, *args, **options):
+        try:
+            periodo = datetime.datetime.strptime(options['periodo'], '%Y-%m').date()
+        except ValueError:
+            raise CommandError(f'Período inválido: {options["periodo"]}')
+
+        criadas, atualizadas, removidas = gerar_obrigacoes(periodo)
+        self.stdout.write(self.style.SUCCESS(
+            f'Obrigações {periodo:%Y-%m}: {criadas} criada(s), {atualizadas} recalculada(s), {removidas} removida(s).'
+        ))
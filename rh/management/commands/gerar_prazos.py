@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from rh.prazos import TAMANHO_LOTE, gerar_prazos
+
+
+class Command(BaseCommand):
+    help = 'Gera ou corrige os prazos trabalhistas (experiência, aviso prévio, desligamento) de todos os vínculos.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=TAMANHO_LOTE, help='Vínculos processados por transação.')
+
+    def handle(self, *args, **options):
+        criados, atualizados, removidos = gerar_prazos(tamanho_lote=options['lote'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Prazos: {criados} criado(s), {atualizados} atualizado(s), {removidos} removido(s).'
+        ))
@@ -0,0 +1,39 @@
+import csv
+import zipfile
+
+from django.core.management.base import BaseCommand, CommandError
+
+from rh.importacao import TAMANHO_LOTE, importar_colaboradores, ler_csv, ler_xlsx
+
+
+class Command(BaseCommand):
+    help = 'Importa colaboradores de um arquivo CSV ou XLSX (cabeçalho com os nomes dos campos do cadastro).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo', help='Caminho do arquivo .csv ou .xlsx.')
+        parser.add_argument('--lote', type=int, default=TAMANHO_LOTE, help='Colaboradores inseridos por lote.')
+        parser.add_argument('--delimitador', help='Delimitador do CSV. Padrão: detectado pelo cabeçalho.')
+        parser.add_argument('--simular', action='store_true', help='Apenas valida, sem gravar.')
+
+    def handle(self, *args, **options):
+        caminho = options['arquivo']
+
+        def ao_errar(numero, mensagens):
+            self.stderr.write(f'Linha {numero}: {"; ".join(mensagens)}')
+
+        try:
+            with open(caminho, 'rb') as arquivo:
+                if caminho.lower().endswith('.xlsx'):
+                    linhas = ler_xlsx(arquivo)
+                else:
+                    linhas = ler_csv(arquivo, delimitador=options['delimitador'])
+                resultado = importar_colaboradores(
+                    linhas, tamanho_lote=options['lote'], simular=options['simular'], ao_errar=ao_errar,
+                )
+        except (OSError, ValueError, csv.Error, zipfile.BadZipFile) as erro:
+            raise CommandError(str(erro))
+
+        acao = 'validado(s)' if options['simular'] else 'importado(s)'
+        self.stdout.write(self.style.SUCCESS(
+            f'{resultado.importados} colaborador(es) {acao}, {resultado.total_erros} linha(s) com erro.'
+        ))
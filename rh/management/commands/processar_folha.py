@@ -0,0 +1,35 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from rh.folha import TAMANHO_LOTE, processar_folha
+
+
+def _data(valor, formato):
+    try:
+        return datetime.datetime.strptime(valor, formato).date()
+    except ValueError:
+        raise CommandError(f'Data inválida: {valor}')
+
+
+class Command(BaseCommand):
+    help = 'Gera a folha de pagamento do período (AAAA-MM) para todos os vínculos ativos.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('periodo', help='Mês de referência no formato AAAA-MM.')
+        parser.add_argument('--data-pagamento', help='Data de pagamento (AAAA-MM-DD). Padrão: dia 5 do mês seguinte.')
+        parser.add_argument('--lote', type=int, default=TAMANHO_LOTE, help='Vínculos gravados por transação.')
+
+    def handle(self, *args, **options):
+        periodo = _data(options['periodo'], '%Y-%m')
+        data_pagamento = None
+        if options['data_pagamento']:
+            data_pagamento = _data(options['data_pagamento'], '%Y-%m-%d')
+
+        def progresso(processados, total):
+            self.stdout.write(f'{processados}/{total} vínculos processados')
+
+        resumo = processar_folha(periodo, data_pagamento, tamanho_lote=options['lote'], progresso=progresso)
+        self.stdout.write(self.style.SUCCESS(
+            f'Folha {periodo:%Y-%m}: {resumo.processados} gerada(s), {resumo.ja_existentes} já existente(s).'
+        ))
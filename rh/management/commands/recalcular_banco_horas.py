@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from rh.banco_horas import reconstruir_saldos
+
+
+class Command(BaseCommand):
+    help = 'Recalcula o saldo consolidado do banco de horas a partir dos lançamentos e informa divergências.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verificar',
+            action='store_true',
+            help='Apenas confere os saldos, sem gravar correções.',
+        )
+
+    def handle(self, *args, **options):
+        corrigir = not options['verificar']
+        divergencias = reconstruir_saldos(corrigir=corrigir)
+
+        for vinculo_id, registrado, calculado in divergencias:
+            self.stdout.write(f'Vínculo {vinculo_id}: saldo registrado {registrado}, calculado {calculado}')
+
+        if not divergencias:
+            self.stdout.write(self.style.SUCCESS('Nenhuma divergência encontrada.'))
+        elif corrigir:
+            self.stdout.write(self.style.SUCCESS(f'{len(divergencias)} saldo(s) corrigido(s).'))
+        else:
+            self.stdout.write(self.style.WARNING(f'{len(divergencias)} divergência(s) encontrada(s).'))
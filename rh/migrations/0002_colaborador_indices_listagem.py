@@ -0,0 +1,21 @@
+# Generated by Django 4.2.11 on 2026-10-17 02:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rh', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='colaborador',
+            index=models.Index(fields=['nome_completo', 'id'], name='rh_colab_nome_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='colaborador',
+            index=models.Index(fields=['status', 'nome_completo', 'id'], name='rh_colab_status_nome_id_idx'),
+        ),
+    ]
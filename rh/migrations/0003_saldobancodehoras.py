@@ -0,0 +1,44 @@
+# Generated by Django 4.2.11 on 2026-10-17 02:52
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def popular_saldos(apps, schema_editor):
+    # Consolida os lançamentos já existentes antes de os sinais assumirem a manutenção
+    BancoDeHoras = apps.get_model('rh', 'BancoDeHoras')
+    SaldoBancoDeHoras = apps.get_model('rh', 'SaldoBancoDeHoras')
+    totais = {}
+    for vinculo_id, tipo_lancamento, horas in BancoDeHoras.objects.values_list('vinculo_id', 'tipo_lancamento', 'horas').iterator():
+        creditos, debitos = totais.get(vinculo_id, (0, 0))
+        if tipo_lancamento == 'credito':
+            creditos += horas
+        else:
+            debitos += horas
+        totais[vinculo_id] = (creditos, debitos)
+    SaldoBancoDeHoras.objects.bulk_create([
+        SaldoBancoDeHoras(vinculo_id=vinculo_id, total_creditos=creditos, total_debitos=debitos, saldo=creditos - debitos)
+        for vinculo_id, (creditos, debitos) in totais.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rh', '0002_colaborador_indices_listagem'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SaldoBancoDeHoras',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_creditos', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('total_debitos', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('saldo', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('data_atualizacao', models.DateTimeField(auto_now=True)),
+                ('vinculo', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='saldo_banco_horas', to='rh.vinculoempregaticio')),
+            ],
+        ),
+        migrations.RunPython(popular_saldos, migrations.RunPython.noop),
+    ]
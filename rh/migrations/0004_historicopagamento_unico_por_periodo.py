@@ -0,0 +1,17 @@
+# Generated by Django 4.2.11 on 2026-10-17 02:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rh', '0003_saldobancodehoras'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='historicopagamento',
+            constraint=models.UniqueConstraint(fields=('vinculo', 'periodo_referencia'), name='rh_historico_vinculo_periodo_uniq'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.11 on 2026-10-17 03:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rh', '0004_historicopagamento_unico_por_periodo'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='prazotrabalhista',
+            index=models.Index(fields=['cumprido', 'data_prazo'], name='rh_prazo_cumprido_data_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.11 on 2026-10-17 03:25
+
+import django.core.validators
+from django.db import migrations, models
+import projeto_integrador.armazenamento
+import rh.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rh', '0005_prazotrabalhista_cumprido_data'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='atestadomedico',
+            name='documento_atestado',
+            field=models.FileField(blank=True, null=True, storage=projeto_integrador.armazenamento.armazenamento_documentos, upload_to=rh.models.user_directory_path, validators=[django.core.validators.FileExtensionValidator(allowed_extensions=['pdf', 'jpg', 'jpeg', 'png'])]),
+        ),
+        migrations.AlterField(
+            model_name='documentodigitalizado',
+            name='arquivo',
+            field=models.FileField(storage=projeto_integrador.armazenamento.armazenamento_documentos, upload_to=rh.models.user_directory_path, validators=[django.core.validators.FileExtensionValidator(allowed_extensions=['pdf', 'jpg', 'jpeg', 'png'])]),
+        ),
+    ]
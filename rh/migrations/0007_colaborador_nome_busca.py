@@ -0,0 +1,35 @@
+# Generated by Django 4.2.11 on 2026-10-17 04:12
+
+import unicodedata
+
+from django.db import migrations, models
+
+
+def popular_nome_busca(apps, schema_editor):
+    # Mesma normalização de busca.indexacao.normalizar, copiada para a migração não depender do código atual
+    Colaborador = apps.get_model('rh', 'Colaborador')
+    colaboradores = list(Colaborador.objects.only('id', 'nome_completo'))
+    for colaborador in colaboradores:
+        nome = unicodedata.normalize('NFKD', colaborador.nome_completo or '')
+        colaborador.nome_busca = ''.join(c for c in nome if not unicodedata.combining(c)).lower().strip()
+    Colaborador.objects.bulk_update(colaboradores, ['nome_busca'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rh', '0006_documentos_armazenamento_deduplicado'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='colaborador',
+            name='nome_busca',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(popular_nome_busca, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='colaborador',
+            index=models.Index(fields=['nome_busca'], name='rh_colab_nome_busca_idx'),
+        ),
+    ]
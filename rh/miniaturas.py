@@ -0,0 +1,31 @@
+"""
+Miniaturas dos documentos digitalizados e atestados médicos (ver projeto_integrador/miniaturas.py).
+"""
+from projeto_integrador.miniaturas import gerar_em_lote
+
+from .models import AtestadoMedico, DocumentoDigitalizado
+
+
+def arquivos_digitalizados(documento_ids=None, atestado_ids=None):
+    """Arquivos dos documentos e atestados informados (todos, se ambos forem None)."""
+    todos = documento_ids is None and atestado_ids is None
+    if todos or documento_ids is not None:
+        documentos = DocumentoDigitalizado.objects.select_related(None).only('arquivo').order_by('id')
+        if documento_ids is not None:
+            documentos = documentos.filter(id__in=list(documento_ids))
+        for documento in documentos.iterator(chunk_size=1000):
+            yield documento.arquivo
+    if todos or atestado_ids is not None:
+        atestados = (
+            AtestadoMedico.objects.select_related(None).exclude(documento_atestado='').exclude(documento_atestado__isnull=True)
+            .only('documento_atestado').order_by('id')
+        )
+        if atestado_ids is not None:
+            atestados = atestados.filter(id__in=list(atestado_ids))
+        for atestado in atestados.iterator(chunk_size=1000):
+            yield atestado.documento_atestado
+
+
+def gerar_miniaturas(documento_ids=None, atestado_ids=None, processos=None, progresso=None):
+    """Gera as miniaturas que faltam, em um pool de processos. Retorna quantas foram geradas."""
+    return gerar_em_lote(arquivos_digitalizados(documento_ids, atestado_ids), processos=processos, progresso=progresso)
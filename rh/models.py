@@ -1,11 +1,25 @@
-from django.db import models
+from decimal import Decimal
+
+from django.db import models, transaction
 from django.conf import settings # Importar settings para referenciar o modelo User
 from django.core.validators import FileExtensionValidator
 
+from projeto_integrador.armazenamento import armazenamento_documentos
+from projeto_integrador.managers import RelacionadosManager
+
 # Função para definir o caminho de upload dos documentos
 def user_directory_path(instance, filename):
-    # O arquivo será upado para MEDIA_ROOT/user_<id>/<filename>
-    return f'documentos/colaborador_{instance.colaborador.id}/{filename}'
+    # Documentos têm colaborador; atestados, apenas o vínculo. Com o armazenamento deduplicado
+    # (STORAGES['documentos']) o nome final é o hash do conteúdo e daqui só se aproveita a extensão.
+    colaborador_id = getattr(instance, 'colaborador_id', None) or instance.vinculo.colaborador_id
+    return f'documentos/colaborador_{colaborador_id}/{filename}'
+
+# Managers padrão que trazem junto as FKs usadas no __str__ (ver projeto_integrador/managers.py)
+class ComColaboradorManager(RelacionadosManager):
+    relacionados = ('colaborador',)
+
+class ComVinculoManager(RelacionadosManager):
+    relacionados = ('vinculo__colaborador',)
 
 class Colaborador(models.Model):
     """
@@ -13,6 +27,7 @@ class Colaborador(models.Model):
     """
     # Dados Pessoais
     nome_completo = models.CharField(max_length=255)
+    nome_busca = models.CharField(max_length=255, blank=True, default='', editable=False) # Nome sem acentos e em minúsculas, para o filtro por prefixo
     data_nascimento = models.DateField()
     cpf = models.CharField(max_length=11, unique=True)
     rg = models.CharField(max_length=20, blank=True, null=True)
@@ -49,9 +64,28 @@ class Colaborador(models.Model):
     data_criacao = models.DateTimeField(auto_now_add=True)
     data_atualizacao = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Índices para a listagem paginada por chave (nome_completo, id), com e sem filtro de status
+            models.Index(fields=['nome_completo', 'id'], name='rh_colab_nome_id_idx'),
+            models.Index(fields=['status', 'nome_completo', 'id'], name='rh_colab_status_nome_id_idx'),
+            # Filtro por prefixo do nome sem diferenciar acentos e maiúsculas
+            models.Index(fields=['nome_busca'], name='rh_colab_nome_busca_idx'),
+        ]
+
     def __str__(self):
         return self.nome_completo
 
+    def atualizar_nome_busca(self):
+        from busca.indexacao import normalizar # Importado aqui: busca.indexacao depende dos modelos dos apps
+        self.nome_busca = normalizar(self.nome_completo).strip()
+
+    def save(self, *args, **kwargs):
+        self.atualizar_nome_busca()
+        if kwargs.get('update_fields') is not None and 'nome_completo' in kwargs['update_fields']:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'nome_busca'}
+        super().save(*args, **kwargs)
+
 class VinculoEmpregaticio(models.Model):
     """
     Histórico completo de vínculos empregatícios do colaborador na empresa.
@@ -73,6 +107,8 @@ class VinculoEmpregaticio(models.Model):
     data_criacao = models.DateTimeField(auto_now_add=True)
     data_atualizacao = models.DateTimeField(auto_now=True)
 
+    objects = ComColaboradorManager()
+
     def __str__(self):
         return f'{self.colaborador.nome_completo} - {self.cargo} ({self.data_inicio} to {self.data_fim if self.data_fim else "Present"})'
 
@@ -98,11 +134,14 @@ class DocumentoDigitalizado(models.Model):
     )
     arquivo = models.FileField(
         upload_to=user_directory_path,
+        storage=armazenamento_documentos,
         validators=[FileExtensionValidator(allowed_extensions=['pdf', 'jpg', 'jpeg', 'png'])]
     )
     descricao = models.TextField(blank=True, null=True)
     data_upload = models.DateTimeField(auto_now_add=True)
 
+    objects = ComColaboradorManager()
+
     def __str__(self):
         return f'{self.tipo_documento} - {self.colaborador.nome_completo}'
 
@@ -128,6 +167,14 @@ class PrazoTrabalhista(models.Model):
     data_criacao = models.DateTimeField(auto_now_add=True)
     data_atualizacao = models.DateTimeField(auto_now=True)
 
+    objects = ComVinculoManager()
+
+    class Meta:
+        indexes = [
+            # Prazos a vencer: intervalo de datas entre os não cumpridos (ver rh/prazos.py)
+            models.Index(fields=['cumprido', 'data_prazo'], name='rh_prazo_cumprido_data_idx'),
+        ]
+
     def __str__(self):
         return f'{self.tipo_prazo} for {self.vinculo.colaborador.nome_completo} on {self.data_prazo}'
 
@@ -157,6 +204,8 @@ class ObrigacaoLegal(models.Model):
     data_criacao = models.DateTimeField(auto_now_add=True)
     data_atualizacao = models.DateTimeField(auto_now=True)
 
+    objects = ComVinculoManager()
+
     def __str__(self):
         return f'{self.tipo_obrigacao} for {self.vinculo.colaborador.nome_completo} ({self.periodo_referencia.strftime("%Y-%m")})'
 
@@ -174,6 +223,14 @@ class HistoricoPagamento(models.Model):
 
     data_criacao = models.DateTimeField(auto_now_add=True)
 
+    objects = ComVinculoManager()
+
+    class Meta:
+        constraints = [
+            # Uma folha por vínculo e período: torna o processamento da folha (rh/folha.py) idempotente
+            models.UniqueConstraint(fields=['vinculo', 'periodo_referencia'], name='rh_historico_vinculo_periodo_uniq'),
+        ]
+
     def __str__(self):
         return f'Pagamento {self.periodo_referencia.strftime("%Y-%m")} - {self.vinculo.colaborador.nome_completo}'
 
@@ -210,14 +267,43 @@ class BancoDeHoras(models.Model):
 
     data_criacao = models.DateTimeField(auto_now_add=True)
 
+    objects = ComVinculoManager()
+
     def __str__(self):
         return f'{self.tipo_lancamento} de {self.horas}h em {self.data} for {self.vinculo.colaborador.nome_completo}'
 
-    # Opcional: Propriedade para calcular o saldo atual do banco de horas para um vínculo
-    # def get_saldo(self):
-    #     creditos = self.vinculo.banco_horas.filter(tipo_lancamento='credito').aggregate(models.Sum('horas'))['horas__sum'] or 0
-    #     debitos = self.vinculo.banco_horas.filter(tipo_lancamento='debito').aggregate(models.Sum('horas'))['horas__sum'] or 0
-    #     return creditos - debitos
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            return super().delete(*args, **kwargs)
+
+    def get_saldo(self):
+        """
+        Saldo atual do banco de horas do vínculo, lido do saldo consolidado.
+        """
+        saldo = SaldoBancoDeHoras.objects.filter(vinculo_id=self.vinculo_id).values_list('saldo', flat=True).first()
+        return saldo if saldo is not None else Decimal('0')
+
+class SaldoBancoDeHoras(models.Model):
+    """
+    Saldo consolidado do banco de horas por vínculo.
+    Atualizado incrementalmente a cada lançamento em BancoDeHoras (ver rh/banco_horas.py),
+    evitando somar todo o histórico a cada consulta.
+    """
+    vinculo = models.OneToOneField(VinculoEmpregaticio, on_delete=models.CASCADE, related_name='saldo_banco_horas')
+    total_creditos = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    total_debitos = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    saldo = models.DecimalField(max_digits=10, decimal_places=2, default=0) # total_creditos - total_debitos
+
+    data_atualizacao = models.DateTimeField(auto_now=True)
+
+    objects = ComVinculoManager()
+
+    def __str__(self):
+        return f'Saldo de {self.saldo}h for {self.vinculo.colaborador.nome_completo}'
 
 
 class ProgramacaoFerias(models.Model):
@@ -240,6 +326,8 @@ class ProgramacaoFerias(models.Model):
     data_criacao = models.DateTimeField(auto_now_add=True)
     data_atualizacao = models.DateTimeField(auto_now=True)
 
+    objects = ComVinculoManager()
+
     def __str__(self):
         return f'Férias de {self.vinculo.colaborador.nome_completo} ({self.data_inicio_gozo} to {self.data_fim_gozo})'
 
@@ -256,6 +344,7 @@ class AtestadoMedico(models.Model):
     medico_crm = models.CharField(max_length=20, blank=True, null=True)
     documento_atestado = models.FileField(
         upload_to=user_directory_path, # Reutiliza a função de upload
+        storage=armazenamento_documentos,
         validators=[FileExtensionValidator(allowed_extensions=['pdf', 'jpg', 'jpeg', 'png'])],
         blank=True,
         null=True
@@ -265,5 +354,7 @@ class AtestadoMedico(models.Model):
     data_criacao = models.DateTimeField(auto_now_add=True)
     data_atualizacao = models.DateTimeField(auto_now=True)
 
+    objects = ComVinculoManager()
+
     def __str__(self):
         return f'Atestado Médico for {self.vinculo.colaborador.nome_completo} ({self.data_inicio_afastamento} to {self.data_fim_afastamento})'
\ No newline at end of file
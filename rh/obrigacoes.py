@@ -0,0 +1,68 @@
+import datetime
+
+from django.db import transaction
+from django.utils import timezone
+
+from .encargos import CONTRATOS_COM_ENCARGOS, calcular_encargos
+from .folha import fim_do_mes, inicio_do_mes, salarios_do_periodo, vinculos_ativos
+from .models import ObrigacaoLegal
+
+TIPOS_CALCULADOS = ('fgts', 'inss', 'irrf')
+DIA_VENCIMENTO = 20 # FGTS, INSS e IRRF vencem no dia 20 do mês seguinte ao de referência
+
+
+def gerar_obrigacoes(periodo_referencia):
+    """
+    Calcula FGTS, INSS e IRRF do período para todos os vínculos com encargos e grava
+    as ObrigacaoLegal correspondentes em lote. Obrigações já existentes e ainda não
+    cumpridas são recalculadas (ex.: após mudança de alíquota); as cumpridas não são alteradas.
+    Obrigações pendentes de vínculos que deixaram de ter encargos no período (desligados, contrato
+    alterado) são removidas. Retorna (criadas, atualizadas, removidas).
+    """
+    periodo = inicio_do_mes(periodo_referencia)
+    vencimento = (fim_do_mes(periodo) + datetime.timedelta(days=1)).replace(day=DIA_VENCIMENTO)
+
+    vinculos = list(
+        vinculos_ativos(periodo)
+        .filter(tipo_contrato__in=CONTRATOS_COM_ENCARGOS)
+        .order_by('id')
+        .values_list('id', 'tipo_contrato', 'salario_base', 'data_inicio', 'data_fim')
+    )
+    encargos = calcular_encargos(salarios_do_periodo(vinculos, periodo))
+
+    existentes = {
+        (o.vinculo_id, o.tipo_obrigacao): o
+        # Sem o select_related padrão do manager: aqui só os próprios campos são usados
+        for o in ObrigacaoLegal.objects.select_related(None).filter(periodo_referencia=periodo, tipo_obrigacao__in=TIPOS_CALCULADOS)
+    }
+
+    novas = []
+    alteradas = []
+    devidas = set()
+    agora = timezone.now()
+    for (vinculo_id, *_), fgts, inss, irrf in zip(vinculos, encargos.fgts, encargos.inss, encargos.irrf):
+        for tipo, valor in (('fgts', fgts), ('inss', inss), ('irrf', irrf)):
+            devidas.add((vinculo_id, tipo))
+            obrigacao = existentes.get((vinculo_id, tipo))
+            if obrigacao is None:
+                if valor:
+                    novas.append(ObrigacaoLegal(
+                        vinculo_id=vinculo_id,
+                        tipo_obrigacao=tipo,
+                        periodo_referencia=periodo,
+                        data_vencimento=vencimento,
+                        valor=valor,
+                    ))
+            elif not obrigacao.cumprida and obrigacao.valor != valor:
+                obrigacao.valor = valor
+                obrigacao.data_atualizacao = agora
+                alteradas.append(obrigacao)
+
+    # Como em prazos.gerar_prazos: o que não é mais devido sai, exceto o que já foi cumprido
+    obsoletas = [obrigacao.pk for chave, obrigacao in existentes.items() if chave not in devidas and not obrigacao.cumprida]
+
+    with transaction.atomic():
+        ObrigacaoLegal.objects.bulk_create(novas, batch_size=1000)
+        ObrigacaoLegal.objects.bulk_update(alteradas, ['valor', 'data_atualizacao'], batch_size=1000)
+        ObrigacaoLegal.objects.filter(pk__in=obsoletas).delete()
+    return len(novas), len(alteradas), len(obsoletas)
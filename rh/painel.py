@@ -0,0 +1,29 @@
+"""
+Indicadores da página inicial do RH. Cada função faz uma única consulta e é independente das
+demais, para que a view possa executá-las ao mesmo tempo (ver projeto_integrador/paralelo.py).
+"""
+import datetime
+
+from django.db.models import Count, Q
+
+from .models import Colaborador, VinculoEmpregaticio
+
+
+def colaboradores_por_status():
+    """Lista de (rótulo do status, quantidade), na ordem das opções do campo."""
+    totais = dict(Colaborador.objects.order_by().values_list('status').annotate(total=Count('id')))
+    return [(rotulo, totais.get(valor, 0)) for valor, rotulo in Colaborador._meta.get_field('status').choices]
+
+
+def vinculos_vigentes(hoje=None):
+    hoje = hoje or datetime.date.today()
+    return VinculoEmpregaticio.objects.filter(
+        Q(data_fim__isnull=True) | Q(data_fim__gte=hoje), data_inicio__lte=hoje,
+    ).count()
+
+
+# nome -> (função, modelos dos quais o valor depende), para o cache dos painéis
+INDICADORES = {
+    'colaboradores_por_status': (colaboradores_por_status, ('rh.Colaborador',)),
+    'vinculos_vigentes': (vinculos_vigentes, ('rh.VinculoEmpregaticio',)),
+}
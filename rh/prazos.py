@@ -0,0 +1,158 @@
+"""
+Geração dos prazos trabalhistas de cada vínculo e consulta dos prazos a vencer.
+
+Os prazos gerados (experiência de 45 e 90 dias, aviso prévio e desligamento) são derivados das
+datas do vínculo. A geração é idempotente: prazos ainda não cumpridos são criados, corrigidos ou
+removidos conforme as datas atuais do vínculo; prazos cumpridos e os do tipo "outro" (lançados
+manualmente) não são alterados.
+"""
+import datetime
+from collections import defaultdict
+from itertools import groupby
+
+from django.db import transaction
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import PrazoTrabalhista, VinculoEmpregaticio
+
+TIPOS_GERADOS = ('experiencia_45', 'experiencia_90', 'aviso_previo', 'desligamento')
+CONTRATOS_COM_EXPERIENCIA = {'clt'}
+AVISO_PREVIO_DIAS = 30 # Lei 12.506/2011: 30 dias, mais 3 por ano completo de serviço, até 90
+AVISO_PREVIO_DIAS_POR_ANO = 3
+AVISO_PREVIO_MAXIMO = 90
+TAMANHO_LOTE = 1000
+
+
+def _anos_completos(inicio, fim):
+    return fim.year - inicio.year - ((fim.month, fim.day) < (inicio.month, inicio.day))
+
+
+def dias_aviso_previo(data_inicio, data_fim):
+    return min(AVISO_PREVIO_DIAS + AVISO_PREVIO_DIAS_POR_ANO * _anos_completos(data_inicio, data_fim), AVISO_PREVIO_MAXIMO)
+
+
+def prazos_do_vinculo(tipo_contrato, data_inicio, data_fim):
+    """
+    Prazos devidos para as datas do vínculo, no formato {tipo_prazo: (data_prazo, observacoes)}.
+    O contrato de experiência conta o dia de início: 45 dias terminam em data_inicio + 44.
+    """
+    prazos = {}
+    if tipo_contrato in CONTRATOS_COM_EXPERIENCIA:
+        for dias in (45, 90):
+            termino = data_inicio + datetime.timedelta(days=dias - 1)
+            if data_fim is None or termino <= data_fim:
+                prazos[f'experiencia_{dias}'] = (termino, None)
+    if data_fim is not None:
+        prazos['desligamento'] = (data_fim, None)
+        if tipo_contrato == 'clt':
+            dias = dias_aviso_previo(data_inicio, data_fim)
+            comunicacao = data_fim - datetime.timedelta(days=dias - 1)
+            prazos['aviso_previo'] = (data_fim, f'Aviso prévio de {dias} dias: comunicar até {comunicacao:%d/%m/%Y}.')
+    return prazos
+
+
+def gerar_prazos(vinculo_ids=None, tamanho_lote=TAMANHO_LOTE):
+    """
+    Cria, corrige ou remove os prazos gerados dos vínculos informados (todos, se None), em lotes.
+    Retorna (criados, atualizados, removidos).
+    """
+    vinculos = VinculoEmpregaticio.objects.order_by('id').values_list('id', 'tipo_contrato', 'data_inicio', 'data_fim')
+    if vinculo_ids is not None:
+        vinculos = vinculos.filter(id__in=list(vinculo_ids))
+    vinculos = list(vinculos)
+
+    criados = atualizados = removidos = 0
+    agora = timezone.now()
+    for inicio in range(0, len(vinculos), tamanho_lote):
+        lote = vinculos[inicio:inicio + tamanho_lote]
+        existentes = defaultdict(dict)
+        duplicados = []
+        for prazo in PrazoTrabalhista.objects.select_related(None).filter(
+            vinculo_id__in=[vinculo_id for vinculo_id, *_ in lote], tipo_prazo__in=TIPOS_GERADOS, cumprido=False,
+        ):
+            if prazo.tipo_prazo in existentes[prazo.vinculo_id]:
+                duplicados.append(prazo.pk)
+            else:
+                existentes[prazo.vinculo_id][prazo.tipo_prazo] = prazo
+
+        novos, alterados, obsoletos = [], [], duplicados
+        for vinculo_id, tipo_contrato, data_inicio, data_fim in lote:
+            devidos = prazos_do_vinculo(tipo_contrato, data_inicio, data_fim)
+            for tipo_prazo, prazo in existentes[vinculo_id].items():
+                if tipo_prazo not in devidos:
+                    obsoletos.append(prazo.pk)
+            for tipo_prazo, (data_prazo, observacoes) in devidos.items():
+                prazo = existentes[vinculo_id].get(tipo_prazo)
+                if prazo is None:
+                    novos.append(PrazoTrabalhista(
+                        vinculo_id=vinculo_id, tipo_prazo=tipo_prazo, data_prazo=data_prazo, observacoes=observacoes,
+                    ))
+                elif (prazo.data_prazo, prazo.observacoes) != (data_prazo, observacoes):
+                    prazo.data_prazo = data_prazo
+                    prazo.observacoes = observacoes
+                    prazo.data_atualizacao = agora
+                    alterados.append(prazo)
+
+        with transaction.atomic():
+            PrazoTrabalhista.objects.bulk_create(novos, batch_size=1000)
+            PrazoTrabalhista.objects.bulk_update(alterados, ['data_prazo', 'observacoes', 'data_atualizacao'], batch_size=1000)
+            PrazoTrabalhista.objects.filter(pk__in=obsoletos).delete()
+        criados += len(novos)
+        atualizados += len(alterados)
+        removidos += len(obsoletos)
+    return criados, atualizados, removidos
+
+
+def prazos_a_vencer(dias, hoje=None, incluir_vencidos=False):
+    """
+    Prazos não cumpridos que vencem nos próximos `dias` dias (e, opcionalmente, os já vencidos).
+    Uma consulta por intervalo no índice (cumprido, data_prazo).
+    """
+    hoje = hoje or datetime.date.today()
+    fim = hoje + datetime.timedelta(days=dias)
+    # cumprido__in em vez de cumprido=False: no SQLite o Django gera "NOT cumprido", que não usa o índice
+    pendentes = PrazoTrabalhista.objects.filter(cumprido__in=[False])
+    if incluir_vencidos:
+        return pendentes.filter(data_prazo__lte=fim)
+    return pendentes.filter(data_prazo__range=(hoje, fim))
+
+
+def calendario(dias, hoje=None, incluir_vencidos=False):
+    """
+    Prazos a vencer de toda a empresa agrupados por dia e departamento, em uma única consulta:
+    [{'data', 'departamentos': [{'departamento', 'prazos': [...]}]}].
+    """
+    rotulos = dict(PrazoTrabalhista._meta.get_field('tipo_prazo').choices)
+    prazos = (
+        prazos_a_vencer(dias, hoje, incluir_vencidos)
+        .annotate(departamento=Coalesce('vinculo__departamento', Value('')))
+        .order_by('data_prazo', 'departamento', 'vinculo__colaborador__nome_completo', 'id')
+        .values(
+            'id', 'data_prazo', 'tipo_prazo', 'observacoes', 'vinculo_id', 'departamento', 'vinculo__cargo',
+            'vinculo__colaborador_id', 'vinculo__colaborador__nome_completo',
+        )
+    )
+    dias_agrupados = []
+    for data_prazo, prazos_do_dia in groupby(prazos, key=lambda p: p['data_prazo']):
+        departamentos = []
+        for departamento, prazos_do_departamento in groupby(prazos_do_dia, key=lambda p: p['departamento']):
+            departamentos.append({
+                'departamento': departamento,
+                'prazos': [
+                    {
+                        'id': p['id'],
+                        'tipo': p['tipo_prazo'],
+                        'descricao': rotulos.get(p['tipo_prazo'], p['tipo_prazo']),
+                        'observacoes': p['observacoes'],
+                        'vinculo_id': p['vinculo_id'],
+                        'cargo': p['vinculo__cargo'],
+                        'colaborador_id': p['vinculo__colaborador_id'],
+                        'colaborador': p['vinculo__colaborador__nome_completo'],
+                    }
+                    for p in prazos_do_departamento
+                ],
+            })
+        dias_agrupados.append({'data': data_prazo, 'departamentos': departamentos})
+    return dias_agrupados
@@ -0,0 +1,78 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from projeto_integrador.miniaturas import e_imagem
+from tarefas.fila import enfileirar
+
+from . import banco_horas, prazos
+from .models import AtestadoMedico, BancoDeHoras, DocumentoDigitalizado, VinculoEmpregaticio
+
+
+def _estado_banco_horas(instance):
+    return (instance.vinculo_id, instance.tipo_lancamento, instance.horas)
+
+
+@receiver(pre_save, sender=BancoDeHoras)
+def guardar_banco_horas_anterior(sender, instance, **kwargs):
+    # Guarda o estado gravado no banco para calcular a diferença no post_save
+    instance._banco_horas_anterior = None
+    if instance.pk is not None:
+        instance._banco_horas_anterior = (
+            BancoDeHoras.objects.filter(pk=instance.pk)
+            .values_list('vinculo_id', 'tipo_lancamento', 'horas')
+            .first()
+        )
+
+
+@receiver(post_save, sender=BancoDeHoras)
+def atualizar_saldo_banco_horas(sender, instance, **kwargs):
+    banco_horas.registrar_alteracao(
+        getattr(instance, '_banco_horas_anterior', None),
+        _estado_banco_horas(instance),
+    )
+
+
+@receiver(post_delete, sender=BancoDeHoras)
+def estornar_saldo_banco_horas(sender, instance, **kwargs):
+    banco_horas.registrar_alteracao(_estado_banco_horas(instance), None)
+
+
+@receiver(post_save, sender=VinculoEmpregaticio)
+def gerar_prazos_do_vinculo(sender, instance, raw=False, **kwargs):
+    # Prazos de experiência, aviso prévio e desligamento acompanham as datas do vínculo
+    if not raw:
+        prazos.gerar_prazos(vinculo_ids=[instance.pk])
+
+
+@receiver(pre_save, sender=DocumentoDigitalizado)
+def guardar_arquivo_anterior_do_documento(sender, instance, **kwargs):
+    # Edições que não trocam o arquivo (descrição, vínculo) não geram outra miniatura
+    instance._arquivo_anterior = None
+    if instance.pk is not None:
+        instance._arquivo_anterior = (
+            DocumentoDigitalizado.objects.filter(pk=instance.pk).values_list('arquivo', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=DocumentoDigitalizado)
+def gerar_miniatura_do_documento(sender, instance, created, raw=False, **kwargs):
+    # A miniatura é gerada em segundo plano logo após o upload, antes da primeira visualização
+    arquivo_novo = created or instance.arquivo.name != getattr(instance, '_arquivo_anterior', None)
+    if not raw and arquivo_novo and e_imagem(instance.arquivo):
+        enfileirar('rh.gerar_miniaturas', documento_ids=[instance.pk])
+
+
+@receiver(pre_save, sender=AtestadoMedico)
+def guardar_arquivo_anterior_do_atestado(sender, instance, **kwargs):
+    instance._arquivo_anterior = None
+    if instance.pk is not None:
+        instance._arquivo_anterior = (
+            AtestadoMedico.objects.filter(pk=instance.pk).values_list('documento_atestado', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=AtestadoMedico)
+def gerar_miniatura_do_atestado(sender, instance, created, raw=False, **kwargs):
+    arquivo_novo = created or instance.documento_atestado.name != getattr(instance, '_arquivo_anterior', None)
+    if not raw and arquivo_novo and instance.documento_atestado and e_imagem(instance.documento_atestado):
+        enfileirar('rh.gerar_miniaturas', atestado_ids=[instance.pk])
@@ -0,0 +1,51 @@
+"""
+Tarefas do RH executadas em segundo plano pelo worker (ver tarefas/registro.py).
+"""
+import datetime
+
+from tarefas.registro import tarefa
+
+from .banco_horas import reconstruir_saldos
+from .folha import processar_folha
+from .miniaturas import gerar_miniaturas
+from .obrigacoes import gerar_obrigacoes
+from .prazos import gerar_prazos
+
+
+def _data(valor, formato):
+    return datetime.datetime.strptime(valor, formato).date()
+
+
+@tarefa('rh.processar_folha', processo=True, concorrencia=1)
+def processar_folha_do_periodo(progresso, periodo, data_pagamento=None):
+    """Folha do período AAAA-MM (data de pagamento opcional, AAAA-MM-DD)."""
+    if data_pagamento:
+        data_pagamento = _data(data_pagamento, '%Y-%m-%d')
+    resumo = processar_folha(_data(periodo, '%Y-%m'), data_pagamento, progresso=progresso)
+    return {'processados': resumo.processados, 'ja_existentes': resumo.ja_existentes}
+
+
+@tarefa('rh.gerar_obrigacoes', processo=True, concorrencia=1)
+def gerar_obrigacoes_do_periodo(progresso, periodo):
+    """FGTS, INSS e IRRF do período AAAA-MM."""
+    criadas, atualizadas, removidas = gerar_obrigacoes(_data(periodo, '%Y-%m'))
+    return {'criadas': criadas, 'atualizadas': atualizadas, 'removidas': removidas}
+
+
+@tarefa('rh.recalcular_banco_horas', concorrencia=1)
+def recalcular_banco_horas(progresso):
+    """Confere e corrige os saldos consolidados do banco de horas."""
+    return {'divergencias': len(reconstruir_saldos(corrigir=True))}
+
+
+@tarefa('rh.gerar_prazos', concorrencia=1)
+def gerar_prazos_dos_vinculos(progresso):
+    """Prazos trabalhistas de todos os vínculos (ex.: após importação em lote)."""
+    criados, atualizados, removidos = gerar_prazos()
+    return {'criados': criados, 'atualizados': atualizados, 'removidos': removidos}
+
+
+@tarefa('rh.gerar_miniaturas')
+def gerar_miniaturas_dos_documentos(progresso, documento_ids=None, atestado_ids=None):
+    """Miniaturas dos documentos digitalizados e atestados (todos, se nenhum for informado)."""
+    return {'geradas': gerar_miniaturas(documento_ids, atestado_ids, progresso=progresso)}
@@ -1,3 +1,355 @@
-from django.test import TestCase
+import datetime
+import io
+import random
+import unittest
+from decimal import Decimal
+from unittest import mock
+from urllib.parse import parse_qsl
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from . import banco_horas, encargos, importacao, views
+from .encargos import calcular_encargos
+from .importacao import importar_colaboradores, ler_csv, ler_xlsx
+from .models import BancoDeHoras, Colaborador, ObrigacaoLegal, PrazoTrabalhista, SaldoBancoDeHoras, VinculoEmpregaticio
+from .obrigacoes import gerar_obrigacoes
+from .prazos import dias_aviso_previo, gerar_prazos, prazos_do_vinculo
+
+
+class EncargosTests(SimpleTestCase):
+    # Valores conferidos à mão com as tabelas de 2024 (INSS progressivo, IRRF a partir de 02/2024, FGTS 8%)
+    CASOS = [
+        # salário, INSS, IRRF, FGTS
+        ('0.00', '0.00', '0.00', '0.00'),
+        ('1412.00', '105.90', '0.00', '112.96'), # Limite da 1ª faixa do INSS
+        ('1412.01', '105.90', '0.00', '112.96'),
+        ('2666.68', '218.82', '14.15', '213.33'), # Limite da 2ª faixa do INSS
+        ('4000.03', '378.82', '161.74', '320.00'), # Limite da 3ª faixa do INSS
+        ('7786.02', '908.86', '995.22', '622.88'), # Teto do INSS
+        ('7786.03', '908.86', '995.22', '622.88'), # Acima do teto a contribuição não aumenta
+        ('10000.00', '908.86', '1604.06', '800.00'),
+        ('2459.36', '200.16', '0.00', '196.75'), # Base do IRRF exatamente no limite da isenção (2259,20)
+        ('2459.37', '200.16', '0.00', '196.75'), # Base logo acima da isenção: imposto abaixo de meio centavo
+        ('3097.12', '270.47', '42.56', '247.77'), # Base exatamente no limite da faixa de 7,5% (2826,65)
+    ]
+
+    def test_valores_nos_limites_das_faixas(self):
+        resultado = calcular_encargos([Decimal(caso[0]) for caso in self.CASOS])
+        for (salario, inss, irrf, fgts), calculado in zip(self.CASOS, zip(*resultado)):
+            with self.subTest(salario=salario):
+                self.assertEqual(calculado, (Decimal(inss), Decimal(irrf), Decimal(fgts)))
+
+    def test_ordem_e_lista_vazia(self):
+        self.assertEqual(calcular_encargos([]), encargos.Encargos([], [], []))
+        resultado = calcular_encargos([Decimal('10000.00'), Decimal('1412.00')])
+        self.assertEqual(resultado.inss, [Decimal('908.86'), Decimal('105.90')])
+
+    def test_sem_numpy_usa_o_calculo_em_python(self):
+        with mock.patch.object(encargos, 'np', None):
+            resultado = calcular_encargos([Decimal(caso[0]) for caso in self.CASOS])
+        self.assertEqual(resultado.irrf, [Decimal(caso[2]) for caso in self.CASOS])
+
+    @unittest.skipIf(encargos.np is None, 'NumPy não instalado')
+    def test_numpy_e_python_coincidem(self):
+        # Salários em volta de cada limite das tabelas, mais salários aleatórios
+        centavos = {0, 1}
+        for limite in encargos.LIMITES_INSS:
+            centavos.update(range(limite - 100, limite + 101))
+        for limite in encargos.LIMITES_IRRF:
+            # O limite do IRRF vale para a base (salário - INSS): acha o salário em que ela o atinge
+            salario = self._salario_com_base(limite)
+            centavos.update(range(salario - 100, salario + 101))
+        aleatorio = random.Random(4)
+        centavos.update(aleatorio.randrange(0, 5000000) for _ in range(5000))
+        centavos = sorted(centavos)
+        self.assertEqual(encargos._calcular_numpy(centavos), encargos._calcular_python(centavos))
+
+    @staticmethod
+    def _salario_com_base(base):
+        menor, maior = base, base * 2
+        while menor < maior:
+            meio = (menor + maior) // 2
+            inss = encargos._calcular_python([meio])[0][0]
+            if meio - inss < base:
+                menor = meio + 1
+            else:
+                maior = meio
+        return menor
+
+
+def _colaborador(nome='Maria da Silva', cpf='12345678901', **campos):
+    return Colaborador.objects.create(
+        nome_completo=nome, cpf=cpf, email=f'{cpf}@empresa.com.br', data_nascimento=datetime.date(1990, 5, 17), **campos,
+    )
+
+
+def _vinculo(colaborador, **campos):
+    dados = {
+        'tipo_contrato': 'clt', 'cargo': 'Analista', 'departamento': 'Financeiro',
+        'data_inicio': datetime.date(2026, 1, 5), 'salario_base': Decimal('3500.00'),
+    }
+    dados.update(campos)
+    return VinculoEmpregaticio.objects.create(colaborador=colaborador, **dados)
+
+
+class PrazosDoVinculoTests(SimpleTestCase):
+    inicio = datetime.date(2026, 1, 5)
+
+    def _datas(self, tipo_contrato, data_fim=None):
+        return {tipo: data for tipo, (data, _) in prazos_do_vinculo(tipo_contrato, self.inicio, data_fim).items()}
+
+    def test_experiencia_conta_o_dia_de_inicio(self):
+        self.assertEqual(self._datas('clt'), {
+            'experiencia_45': datetime.date(2026, 2, 18),
+            'experiencia_90': datetime.date(2026, 4, 4),
+        })
+        # Desligado no último dia dos 45: só o prazo de 90 dias deixa de existir
+        self.assertEqual(
+            set(self._datas('clt', datetime.date(2026, 2, 18))),
+            {'experiencia_45', 'desligamento', 'aviso_previo'},
+        )
+        self.assertEqual(set(self._datas('clt', datetime.date(2026, 2, 17))), {'desligamento', 'aviso_previo'})
+        self.assertEqual(set(self._datas('clt', datetime.date(2026, 4, 4))), {'experiencia_45', 'experiencia_90', 'desligamento', 'aviso_previo'})
+
+    def test_contratos_sem_experiencia_nem_aviso(self):
+        self.assertEqual(self._datas('pj'), {})
+        self.assertEqual(self._datas('pj', datetime.date(2026, 2, 1)), {'desligamento': datetime.date(2026, 2, 1)})
+
+    def test_aviso_previo_proporcional_limitado_a_90_dias(self):
+        admissao = datetime.date(2015, 3, 10)
+        self.assertEqual(dias_aviso_previo(admissao, datetime.date(2015, 12, 31)), 30)
+        self.assertEqual(dias_aviso_previo(admissao, datetime.date(2026, 3, 9)), 60)
+        self.assertEqual(dias_aviso_previo(admissao, datetime.date(2026, 3, 10)), 63)
+        self.assertEqual(dias_aviso_previo(datetime.date(2000, 1, 1), datetime.date(2026, 1, 1)), 90)
+
+        data, observacoes = prazos_do_vinculo('clt', datetime.date(2000, 1, 1), datetime.date(2026, 3, 31))['aviso_previo']
+        self.assertEqual(data, datetime.date(2026, 3, 31))
+        self.assertEqual(observacoes, 'Aviso prévio de 90 dias: comunicar até 01/01/2026.')
+
+
+class GerarPrazosTests(TestCase):
+    def _prazos(self, vinculo):
+        return dict(PrazoTrabalhista.objects.filter(vinculo=vinculo).values_list('tipo_prazo', 'data_prazo'))
+
+    def test_prazos_acompanham_as_datas_do_vinculo(self):
+        vinculo = _vinculo(_colaborador())
+        self.assertEqual(self._prazos(vinculo), {
+            'experiencia_45': datetime.date(2026, 2, 18),
+            'experiencia_90': datetime.date(2026, 4, 4),
+        })
+        PrazoTrabalhista.objects.filter(vinculo=vinculo, tipo_prazo='experiencia_45').update(cumprido=True)
+        PrazoTrabalhista.objects.create(vinculo=vinculo, tipo_prazo='outro', data_prazo=datetime.date(2026, 3, 1))
+
+        vinculo.data_fim = datetime.date(2026, 3, 20)
+        vinculo.save()
+        # O prazo de 90 dias deixou de existir; o cumprido e o lançado manualmente são mantidos
+        self.assertEqual(self._prazos(vinculo), {
+            'experiencia_45': datetime.date(2026, 2, 18),
+            'outro': datetime.date(2026, 3, 1),
+            'desligamento': datetime.date(2026, 3, 20),
+            'aviso_previo': datetime.date(2026, 3, 20),
+        })
+
+        vinculo.data_fim = datetime.date(2026, 3, 25)
+        vinculo.save()
+        self.assertEqual(self._prazos(vinculo)['desligamento'], datetime.date(2026, 3, 25))
+        self.assertEqual(gerar_prazos(), (0, 0, 0))
+
+    def test_remove_prazos_duplicados(self):
+        vinculo = _vinculo(_colaborador(), tipo_contrato='pj', data_fim=datetime.date(2026, 6, 30))
+        PrazoTrabalhista.objects.create(vinculo=vinculo, tipo_prazo='desligamento', data_prazo=datetime.date(2026, 6, 1))
+        PrazoTrabalhista.objects.create(vinculo=vinculo, tipo_prazo='experiencia_45', data_prazo=datetime.date(2026, 2, 1))
+        self.assertEqual(gerar_prazos(tamanho_lote=1), (0, 0, 2))
+        self.assertEqual(self._prazos(vinculo), {'desligamento': datetime.date(2026, 6, 30)})
+
+
+class ObrigacoesTests(TestCase):
+    def test_remove_pendentes_de_vinculos_sem_encargos(self):
+        colaborador = _colaborador()
+        mantido = _vinculo(colaborador)
+        alterado = _vinculo(colaborador, cargo='Assistente')
+        desligado = _vinculo(colaborador, cargo='Auxiliar')
+        periodo = datetime.date(2026, 3, 1)
+
+        self.assertEqual(gerar_obrigacoes(periodo), (9, 0, 0))
+        ObrigacaoLegal.objects.filter(vinculo=alterado, tipo_obrigacao='fgts').update(cumprida=True)
+
+        alterado.tipo_contrato = 'pj'
+        alterado.save()
+        desligado.data_fim = datetime.date(2026, 2, 27)
+        desligado.save()
+        self.assertEqual(gerar_obrigacoes(periodo), (0, 0, 5))
+        # A obrigação já cumprida é mantida
+        self.assertEqual(
+            sorted(ObrigacaoLegal.objects.values_list('vinculo_id', 'tipo_obrigacao')),
+            [(mantido.pk, 'fgts'), (mantido.pk, 'inss'), (mantido.pk, 'irrf'), (alterado.pk, 'fgts')],
+        )
+        self.assertEqual(gerar_obrigacoes(periodo), (0, 0, 0))
+
+
+class EmpregadosTests(TestCase):
+    def setUp(self):
+        for numero, nome in enumerate(['João Pereira', 'JOÃO ANTÔNIO', 'Joana Lima', 'Maria Joaquina']):
+            _colaborador(nome, cpf=f'{numero:011d}')
+
+    def _nomes(self, **filtros):
+        resposta = self.client.get(reverse('rh:empregados'), filtros)
+        return [colaborador.nome_completo for colaborador in resposta.context['empregados']]
+
+    def test_prefixo_ignora_acentos_e_maiusculas(self):
+        for termo in ('joão', 'JOAO', 'Joao '):
+            with self.subTest(termo=termo):
+                self.assertEqual(self._nomes(nome=termo), ['JOÃO ANTÔNIO', 'João Pereira'])
+        self.assertEqual(self._nomes(nome='jo'), ['JOÃO ANTÔNIO', 'Joana Lima', 'João Pereira'])
+        # Apenas prefixo: sobrenomes não entram
+        self.assertEqual(self._nomes(nome='joaquina'), [])
+
+    def test_nome_busca_acompanha_alteracoes(self):
+        colaborador = Colaborador.objects.get(nome_completo='Maria Joaquina')
+        colaborador.nome_completo = 'Márcia Joaquina'
+        colaborador.save(update_fields=['nome_completo'])
+        self.assertEqual(Colaborador.objects.get(pk=colaborador.pk).nome_busca, 'marcia joaquina')
+        self.assertEqual(self._nomes(nome='marc'), ['Márcia Joaquina'])
+
+    def test_paginacao_com_filtro(self):
+        with mock.patch.object(views, 'EMPREGADOS_POR_PAGINA', 1):
+            nomes = []
+            parametros = {'nome': 'jo'}
+            while parametros is not None:
+                resposta = self.client.get(reverse('rh:empregados'), parametros)
+                nomes += [colaborador.nome_completo for colaborador in resposta.context['empregados']]
+                proxima = resposta.context['proxima_pagina']
+                parametros = dict(parse_qsl(proxima)) if proxima else None
+        self.assertEqual(nomes, ['JOÃO ANTÔNIO', 'Joana Lima', 'João Pereira'])
+
+
+class BancoDeHorasTests(TestCase):
+    def setUp(self):
+        colaborador = _colaborador()
+        self.vinculo = _vinculo(colaborador)
+        self.outro = _vinculo(colaborador, cargo='Coordenador')
+
+    def _lancar(self, tipo, horas, vinculo=None):
+        return BancoDeHoras.objects.create(
+            vinculo=vinculo or self.vinculo, data=datetime.date(2026, 3, 2), tipo_lancamento=tipo, horas=Decimal(horas),
+        )
+
+    def _consolidados(self):
+        return {
+            s.vinculo_id: (s.total_creditos, s.total_debitos)
+            for s in SaldoBancoDeHoras.objects.select_related(None)
+        }
+
+    def test_sinais_coincidem_com_o_recalculo(self):
+        self._lancar('credito', '8.00')
+        debito = self._lancar('debito', '2.50')
+        alterado = self._lancar('credito', '1.00')
+        removido = self._lancar('credito', '4.00', vinculo=self.outro)
+
+        debito.horas = Decimal('3.25')
+        debito.save()
+        # Troca de tipo e de vínculo: estorna do saldo anterior e lança no novo
+        alterado.tipo_lancamento = 'debito'
+        alterado.vinculo = self.outro
+        alterado.save()
+        removido.delete()
+
+        self.assertEqual(self._consolidados(), banco_horas.calcular_saldos())
+        self.assertEqual(banco_horas.reconstruir_saldos(corrigir=False), [])
+        self.assertEqual(debito.get_saldo(), Decimal('4.75'))
+        self.assertEqual(banco_horas.saldo_do_vinculo(self.outro.pk), Decimal('-1.00'))
+
+    def test_reconstruir_corrige_divergencias(self):
+        self._lancar('credito', '8.00')
+        self._lancar('debito', '1.00', vinculo=self.outro)
+        SaldoBancoDeHoras.objects.filter(vinculo=self.vinculo).update(total_creditos=0, saldo=0)
+        SaldoBancoDeHoras.objects.filter(vinculo=self.outro).delete()
+
+        self.assertEqual(
+            banco_horas.reconstruir_saldos(),
+            sorted([(self.vinculo.pk, Decimal('0.00'), Decimal('8.00')), (self.outro.pk, None, Decimal('-1.00'))]),
+        )
+        self.assertEqual(banco_horas.saldos_da_empresa(), {self.vinculo.pk: Decimal('8.00'), self.outro.pk: Decimal('-1.00')})
+        self.assertEqual(banco_horas.reconstruir_saldos(), [])
+
+    def test_exclusao_do_vinculo_nao_recria_o_saldo(self):
+        self._lancar('credito', '2.00', vinculo=self.outro)
+        self.outro.delete()
+        self.assertFalse(SaldoBancoDeHoras.objects.filter(vinculo_id=self.outro.pk).exists())
+
+
+CSV_COLABORADORES = """nome_completo;cpf;email;data_nascimento;status;nacionalidade
+Ana Souza;111.444.777-35;ana@empresa.com.br;17/05/1990;ativo;Brasileira
+Bruno Lima;22255588846;bruno@empresa.com.br;1985-02-01;ativo;Brasileira
+Sem E-mail;33366699900;;01/01/1980;ativo;Brasileira
+Ana Repetida;11144477735;ana2@empresa.com.br;17/05/1990;ativo;Brasileira
+Já Cadastrada;12345678901;outra@empresa.com.br;01/01/1980;ativo;Brasileira
+Carla Dias;44477700011;carla@empresa.com.br;31/02/1990;ativo;Brasileira
+Daniel Reis;55588811122;daniel@empresa.com.br;03/03/1993;ativo;Brasileira
+"""
+
+
+class ImportacaoColaboradoresTests(TestCase):
+    def setUp(self):
+        self.existente = _colaborador('Maria da Silva', cpf='12345678901')
+
+    def _importar(self, **opcoes):
+        erros = []
+        resultado = importar_colaboradores(
+            ler_csv(io.BytesIO(CSV_COLABORADORES.encode('utf-8-sig'))),
+            ao_errar=lambda numero, mensagens: erros.append(numero),
+            **opcoes,
+        )
+        return resultado, erros
+
+    def test_linhas_com_erro_nao_interrompem(self):
+        resultado, erros = self._importar(tamanho_lote=2)
+        self.assertEqual((resultado.importados, resultado.total_erros), (3, 4))
+        self.assertEqual(erros, [4, 5, 6, 7])
+        self.assertEqual([numero for numero, _ in resultado.erros], erros)
+        self.assertIn('cpf: CPF já cadastrado.', dict(resultado.erros)[5])
+        self.assertEqual(
+            sorted(Colaborador.objects.values_list('cpf', 'nome_busca')),
+            [('11144477735', 'ana souza'), ('12345678901', 'maria da silva'), ('22255588846', 'bruno lima'), ('55588811122', 'daniel reis')],
+        )
+        # Um CPF já cadastrado é rejeitado, sem sobrescrever o colaborador existente
+        self.assertEqual(Colaborador.objects.get(cpf='12345678901').email, self.existente.email)
+
+    def test_reimportacao_e_simulacao(self):
+        resultado, _ = self._importar(simular=True)
+        self.assertEqual((resultado.importados, resultado.total_erros), (3, 4))
+        self.assertEqual(Colaborador.objects.count(), 1)
+
+        self._importar()
+        resultado, _ = self._importar()
+        self.assertEqual((resultado.importados, resultado.total_erros), (0, 7))
+        self.assertEqual(Colaborador.objects.count(), 4)
+
+    @unittest.skipIf(importacao.openpyxl is None, 'openpyxl não instalado')
+    def test_xlsx(self):
+        planilha = importacao.openpyxl.Workbook()
+        folha = planilha.active
+        folha.append(['nome_completo', 'cpf', 'email', 'data_nascimento', 'status', 'nacionalidade'])
+        folha.append(['Eva Prado', 1444777, 'eva@empresa.com.br', datetime.datetime(1991, 7, 4), 'ativo', 'Brasileira']) # CPF numérico, sem os zeros
+        folha.append([None] * 6)
+        conteudo = io.BytesIO()
+        planilha.save(conteudo)
+        conteudo.seek(0)
+        resultado = importar_colaboradores(ler_xlsx(conteudo))
+        self.assertEqual((resultado.importados, resultado.total_erros), (1, 0))
+        self.assertEqual(Colaborador.objects.get(email='eva@empresa.com.br').cpf, '00001444777')
+
+    def test_view_exige_staff_e_rejeita_arquivo_corrompido(self):
+        url = reverse('rh:empregados_importar')
+        arquivo = SimpleUploadedFile('colaboradores.xlsx', b'nao e um zip')
+        self.assertEqual(self.client.post(url, {'arquivo': arquivo}).status_code, 302)
+        self.assertEqual(Colaborador.objects.count(), 1)
+
+        self.client.force_login(get_user_model().objects.create_user('rh', password='x', is_staff=True))
+        arquivo.seek(0)
+        resposta = self.client.post(url, {'arquivo': arquivo})
+        self.assertEqual(resposta.status_code, 200)
+        self.assertIn('Não foi possível ler o arquivo', [str(m) for m in resposta.context['messages']][0])
@@ -7,4 +7,15 @@ urlpatterns = [
     path('', views.index, name='index'),
     path('empregados/', views.empregados, name='empregados'),
     path('empregados/cadastrar/', views.empregados_cadastrar, name='empregados_cadastrar'),
+    path('empregados/importar/', views.empregados_importar, name='empregados_importar'),
+    path('empregados/exportar/', views.empregados_exportar, name='empregados_exportar'),
+    path('empregados/<int:colaborador_id>/documentos/', views.colaborador_documentos, name='colaborador_documentos'),
+    path('documentos/<int:documento_id>/arquivo/', views.documento_arquivo, name='documento_arquivo'),
+    path('documentos/<int:documento_id>/miniatura/', views.documento_miniatura, name='documento_miniatura'),
+    path('atestados/<int:atestado_id>/arquivo/', views.atestado_arquivo, name='atestado_arquivo'),
+    path('atestados/<int:atestado_id>/miniatura/', views.atestado_miniatura, name='atestado_miniatura'),
+    path('prazos/calendario/', views.prazos_calendario, name='prazos_calendario'),
+    path('folha/processar/', views.folha_processar, name='folha_processar'),
+    path('obrigacoes/gerar/', views.obrigacoes_gerar, name='obrigacoes_gerar'),
+    path('banco-horas/recalcular/', views.banco_horas_recalcular, name='banco_horas_recalcular'),
 ]
\ No newline at end of file
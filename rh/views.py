@@ -1,30 +1,117 @@
-from django.shortcuts import render, redirect
+import csv
+import datetime
+import zipfile
+from pathlib import Path
+from urllib.parse import urlencode
+
+from django.shortcuts import get_object_or_404, render, redirect
 from django.contrib import messages
-from .models import Colaborador
-from .forms import ColaboradorForm
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db.models import Q
+from django.http import Http404, JsonResponse
+from django.urls import reverse
+from django.views.decorators.http import require_POST
+from busca.indexacao import normalizar
+from projeto_integrador.cache_paineis import pagina_em_cache
+from projeto_integrador.downloads import resposta_arquivo
+from projeto_integrador.exportacao import exportar
+from projeto_integrador.miniaturas import resposta_miniatura
+from tarefas.fila import enfileirar
+from tarefas.views import tarefa_enfileirada
+from . import painel as painel_rh
+from .models import AtestadoMedico, Colaborador, DocumentoDigitalizado
+from .forms import ColaboradorForm, ImportacaoColaboradoresForm
+from .importacao import importar_colaboradores, ler_csv, ler_xlsx
+from .prazos import calendario
+
+EMPREGADOS_POR_PAGINA = 50
+DIAS_CALENDARIO = 30
+DIAS_CALENDARIO_MAXIMO = 366
 
-def index(request):
+async def index(request):
     """
     View para a página inicial do módulo Controle de RH.
+    Painel com os indicadores do módulo, consultados ao mesmo tempo e mantidos em cache.
     """
     # Renderiza o template rh/index.html
-    return render(request, 'rh/index.html')
+    return await pagina_em_cache('rh/index.html', painel_rh.INDICADORES)
+
+def _filtrar_empregados(empregados, status, nome):
+    empregados = empregados.order_by('nome_completo', 'id')
+    if status:
+        empregados = empregados.filter(status=status)
+    if nome:
+        # Prefixo sobre o nome normalizado (sem acentos, minúsculo): 'joao' e 'JOÃO' encontram 'João'.
+        # Intervalo em vez de LIKE para que o filtro use o índice de nome_busca
+        nome = normalizar(nome)
+        empregados = empregados.filter(nome_busca__gte=nome, nome_busca__lt=nome + '\U0010ffff')
+    return empregados
 
 def empregados(request):
     """
     View para a página de empregados do módulo Controle de RH.
+    Lista paginada por chave (nome_completo, id), com filtros de status e prefixo do nome.
     """
     # Renderiza o template rh/empregados.html
 
-    # Pega todos os empregados do banco
-    empregados = Colaborador.objects.all()
-    
-    # Passa a lista de empregados para o template
+    status = request.GET.get('status', '')
+    nome = request.GET.get('nome', '').strip()
+
+    # Apenas as colunas exibidas na tabela, já ordenadas pelo banco
+    empregados = _filtrar_empregados(Colaborador.objects.only('id', 'nome_completo', 'status'), status, nome)
+
+    # Paginação por chave: continua a partir do último (nome, id) da página anterior
+    apos_nome = request.GET.get('apos_nome')
+    apos_id = request.GET.get('apos_id', '')
+    if apos_nome is not None and apos_id.isdigit():
+        empregados = empregados.filter(
+            Q(nome_completo__gt=apos_nome) | Q(nome_completo=apos_nome, id__gt=int(apos_id))
+        )
+
+    # Busca um registro a mais só para saber se existe próxima página
+    pagina = list(empregados[:EMPREGADOS_POR_PAGINA + 1])
+    proxima_pagina = None
+    if len(pagina) > EMPREGADOS_POR_PAGINA:
+        pagina = pagina[:EMPREGADOS_POR_PAGINA]
+        ultimo = pagina[-1]
+        proxima_pagina = urlencode({
+            'status': status,
+            'nome': nome,
+            'apos_nome': ultimo.nome_completo,
+            'apos_id': ultimo.id,
+        })
+
+    # Passa a página de empregados para o template
     context = {
-        'empregados': empregados
+        'empregados': pagina,
+        'status': status,
+        'nome': nome,
+        'status_choices': Colaborador._meta.get_field('status').choices,
+        'proxima_pagina': proxima_pagina,
+        'primeira_pagina': apos_nome is None,
+        'filtros': urlencode({'status': status, 'nome': nome}),
     }
     return render(request, 'rh/empregados.html', context)
 
+COLUNAS_EXPORTACAO_EMPREGADOS = [
+    ('id', 'ID'), ('nome_completo', 'Nome completo'), ('cpf', 'CPF'), ('rg', 'RG'),
+    ('data_nascimento', 'Data de nascimento'), ('estado_civil', 'Estado civil'), ('genero', 'Gênero'),
+    ('nacionalidade', 'Nacionalidade'), ('naturalidade', 'Naturalidade'), ('email', 'E-mail'),
+    ('telefone', 'Telefone'), ('celular', 'Celular'), ('cep', 'CEP'), ('logradouro', 'Logradouro'),
+    ('numero', 'Número'), ('complemento', 'Complemento'), ('bairro', 'Bairro'), ('cidade', 'Cidade'),
+    ('estado', 'Estado'), ('data_admissao_primeiro_vinculo', 'Data de admissão'), ('status', 'Status'),
+]
+
+@staff_member_required
+def empregados_exportar(request):
+    """
+    Exportação dos empregados em CSV ou XLSX (?formato=), com os mesmos filtros da listagem.
+    """
+    empregados = _filtrar_empregados(
+        Colaborador.objects.all(), request.GET.get('status', ''), request.GET.get('nome', '').strip(),
+    )
+    return exportar(request, empregados, COLUNAS_EXPORTACAO_EMPREGADOS, 'empregados')
+
 def empregados_cadastrar(request):
     if request.method == 'POST':
         form = ColaboradorForm(request.POST)
@@ -36,4 +123,157 @@ def empregados_cadastrar(request):
             messages.error(request, 'Erro ao cadastrar colaborador!')
     else:
         form = ColaboradorForm()
-    return render(request, 'rh/empregados_cadastrar.html', {'form': form})
\ No newline at end of file
+    return render(request, 'rh/empregados_cadastrar.html', {'form': form})
+
+@staff_member_required
+def empregados_importar(request):
+    """Importação em massa de colaboradores a partir de CSV/XLSX, lido em streaming e gravado em lotes."""
+    resultado = None
+    if request.method == 'POST':
+        form = ImportacaoColaboradoresForm(request.POST, request.FILES)
+        if form.is_valid():
+            arquivo = form.cleaned_data['arquivo']
+            try:
+                if arquivo.name.lower().endswith('.xlsx'):
+                    linhas = ler_xlsx(arquivo)
+                else:
+                    linhas = ler_csv(arquivo)
+                resultado = importar_colaboradores(linhas, simular=form.cleaned_data['simular'])
+            except (ValueError, csv.Error, zipfile.BadZipFile) as erro:
+                messages.error(request, f'Não foi possível ler o arquivo: {erro}')
+            else:
+                if resultado.total_erros:
+                    messages.warning(request, f'{resultado.importados} colaborador(es) processado(s), {resultado.total_erros} linha(s) com erro.')
+                else:
+                    messages.success(request, f'{resultado.importados} colaborador(es) processado(s) com sucesso!')
+        else:
+            messages.error(request, 'Erro ao importar colaboradores!')
+    else:
+        form = ImportacaoColaboradoresForm()
+    return render(request, 'rh/empregados_importar.html', {'form': form, 'resultado': resultado})
+
+def _periodo_informado(request):
+    periodo = request.POST.get('periodo', '')
+    try:
+        datetime.datetime.strptime(periodo, '%Y-%m')
+    except ValueError:
+        return None
+    return periodo
+
+@staff_member_required
+@require_POST
+def folha_processar(request):
+    """
+    Enfileira a geração da folha do período (POST periodo=AAAA-MM, data_pagamento=AAAA-MM-DD opcional).
+    Responde 202 com o endereço para acompanhar o progresso em /tarefas/<id>/.
+    """
+    periodo = _periodo_informado(request)
+    if periodo is None:
+        return JsonResponse({'erro': 'Período inválido; use AAAA-MM.'}, status=400)
+    data_pagamento = request.POST.get('data_pagamento') or None
+    if data_pagamento:
+        try:
+            datetime.datetime.strptime(data_pagamento, '%Y-%m-%d')
+        except ValueError:
+            return JsonResponse({'erro': 'Data de pagamento inválida; use AAAA-MM-DD.'}, status=400)
+    return tarefa_enfileirada(enfileirar('rh.processar_folha', periodo=periodo, data_pagamento=data_pagamento))
+
+@staff_member_required
+@require_POST
+def obrigacoes_gerar(request):
+    """Enfileira a geração das obrigações de FGTS, INSS e IRRF do período (POST periodo=AAAA-MM)."""
+    periodo = _periodo_informado(request)
+    if periodo is None:
+        return JsonResponse({'erro': 'Período inválido; use AAAA-MM.'}, status=400)
+    return tarefa_enfileirada(enfileirar('rh.gerar_obrigacoes', periodo=periodo))
+
+@staff_member_required
+@require_POST
+def banco_horas_recalcular(request):
+    """Enfileira a conferência e correção dos saldos do banco de horas."""
+    return tarefa_enfileirada(enfileirar('rh.recalcular_banco_horas'))
+
+@staff_member_required
+def prazos_calendario(request):
+    """
+    Prazos trabalhistas não cumpridos da empresa, agrupados por dia e departamento (JSON).
+    Parâmetros: dias (padrão 30, a partir de hoje) e vencidos=1 para incluir os já vencidos.
+    """
+    try:
+        dias = min(max(int(request.GET.get('dias', DIAS_CALENDARIO)), 0), DIAS_CALENDARIO_MAXIMO)
+    except ValueError:
+        dias = DIAS_CALENDARIO
+    hoje = datetime.date.today()
+    incluir_vencidos = request.GET.get('vencidos') == '1'
+    return JsonResponse({
+        'inicio': None if incluir_vencidos else hoje,
+        'fim': hoje + datetime.timedelta(days=dias),
+        'dias': calendario(dias, hoje=hoje, incluir_vencidos=incluir_vencidos),
+    })
+
+@staff_member_required
+def documento_arquivo(request, documento_id):
+    """Arquivo de um documento digitalizado, com suporte a download parcial (Range)."""
+    documento = get_object_or_404(DocumentoDigitalizado, pk=documento_id)
+    extensao = Path(documento.arquivo.name).suffix
+    return resposta_arquivo(request, documento.arquivo, f'{documento.tipo_documento}_{documento.colaborador_id}{extensao}')
+
+@staff_member_required
+def atestado_arquivo(request, atestado_id):
+    """Arquivo digitalizado de um atestado médico, com suporte a download parcial (Range)."""
+    atestado = get_object_or_404(AtestadoMedico, pk=atestado_id)
+    if not atestado.documento_atestado:
+        raise Http404('Atestado sem documento digitalizado.')
+    extensao = Path(atestado.documento_atestado.name).suffix
+    return resposta_arquivo(request, atestado.documento_atestado, f'atestado_{atestado.pk}{extensao}')
+
+def _miniatura(request, arquivo):
+    try:
+        return resposta_miniatura(request, arquivo)
+    except FileNotFoundError:
+        raise Http404('Arquivo não encontrado.')
+
+@staff_member_required
+def documento_miniatura(request, documento_id):
+    """Miniatura de um documento digitalizado (ícone para PDFs), revalidada por ETag."""
+    documento = get_object_or_404(DocumentoDigitalizado.objects.select_related(None).only('arquivo'), pk=documento_id)
+    return _miniatura(request, documento.arquivo)
+
+@staff_member_required
+def atestado_miniatura(request, atestado_id):
+    """Miniatura do documento digitalizado de um atestado médico, revalidada por ETag."""
+    atestado = get_object_or_404(AtestadoMedico.objects.select_related(None).only('documento_atestado'), pk=atestado_id)
+    if not atestado.documento_atestado:
+        raise Http404('Atestado sem documento digitalizado.')
+    return _miniatura(request, atestado.documento_atestado)
+
+@staff_member_required
+def colaborador_documentos(request, colaborador_id):
+    """
+    Documentos digitalizados de um colaborador, em JSON, com os endereços da miniatura e do arquivo:
+    a tela lista as miniaturas e só abre o arquivo escolhido.
+    """
+    colaborador = get_object_or_404(Colaborador.objects.only('id', 'nome_completo'), pk=colaborador_id)
+    rotulos = dict(DocumentoDigitalizado._meta.get_field('tipo_documento').choices)
+    documentos = (
+        DocumentoDigitalizado.objects.filter(colaborador_id=colaborador.pk)
+        .order_by('-data_upload', '-id')
+        .values('id', 'tipo_documento', 'descricao', 'vinculo_id', 'data_upload')
+    )
+    return JsonResponse({
+        'colaborador_id': colaborador.pk,
+        'colaborador': colaborador.nome_completo,
+        'documentos': [
+            {
+                'id': documento['id'],
+                'tipo': documento['tipo_documento'],
+                'descricao_tipo': rotulos.get(documento['tipo_documento'], documento['tipo_documento']),
+                'descricao': documento['descricao'],
+                'vinculo_id': documento['vinculo_id'],
+                'data_upload': documento['data_upload'],
+                'miniatura': reverse('rh:documento_miniatura', args=[documento['id']]),
+                'arquivo': reverse('rh:documento_arquivo', args=[documento['id']]),
+            }
+            for documento in documentos
+        ],
+    })
@@ -0,0 +1,19 @@
+from django.contrib import admin
+
+from .models import Tarefa
+
+
+@admin.register(Tarefa)
+class TarefaAdmin(admin.ModelAdmin):
+    list_display = ('id', 'nome', 'situacao', 'tentativas', 'progresso_atual', 'progresso_total', 'data_criacao', 'data_conclusao')
+    list_filter = ('situacao', 'nome')
+    search_fields = ('nome',)
+    readonly_fields = (
+        'tentativas', 'progresso_atual', 'progresso_total', 'mensagem', 'resultado', 'erro', 'trabalhador',
+        'data_criacao', 'data_inicio', 'data_conclusao', 'data_atualizacao',
+    )
+    ordering = ('-id',)
+
+    def has_add_permission(self, request):
+        # Tarefas são criadas pelas views e pelo código (tarefas.fila.enfileirar)
+        return False
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class TarefasConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'tarefas'
+
+    def ready(self):
+        # Registra as tarefas declaradas no módulo `tarefas.py` de cada app (ver tarefas/registro.py)
+        autodiscover_modules('tarefas')
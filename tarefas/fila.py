@@ -0,0 +1,145 @@
+"""
+Fila de tarefas em segundo plano guardada no próprio banco (modelo Tarefa).
+
+- enfileirar: cria a tarefa pendente. Dentro de uma transação, ela só fica visível ao worker após o commit.
+- reservar: o worker marca a próxima pendente como em execução com um UPDATE condicional
+  (situacao='pendente'), de modo que dois workers nunca reservam a mesma tarefa.
+- executar: roda a função registrada em uma thread ou processo do worker, grava o progresso
+  e, em caso de erro, reagenda a tarefa com espera exponencial até o limite de tentativas.
+- recuperar_abandonadas: devolve à fila as tarefas de workers que pararam de dar sinal de vida.
+"""
+import datetime
+import time
+import traceback
+from collections import Counter
+
+from django.db import close_old_connections, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Tarefa
+from .registro import REGISTRO, definicao
+
+LIMITE_CANDIDATAS = 50 # Pendentes examinadas por reserva (as demais aguardam a próxima)
+INTERVALO_PROGRESSO = 1.0 # Segundos mínimos entre duas gravações de progresso da mesma tarefa
+
+
+def enfileirar(nome, **argumentos):
+    """Enfileira a tarefa registrada `nome` com os argumentos (JSON) informados e a devolve."""
+    return Tarefa.objects.create(nome=nome, argumentos=argumentos, max_tentativas=definicao(nome).max_tentativas)
+
+
+def reservar(trabalhador, processo=None):
+    """
+    Marca como em execução a próxima tarefa pendente que pode rodar agora e a devolve (ou None).
+    Respeita o limite de concorrência de cada tarefa; `processo` restringe às tarefas do pool de
+    processos (True) ou de threads (False).
+    """
+    agora = timezone.now()
+    with transaction.atomic():
+        em_execucao = Counter(Tarefa.objects.filter(situacao=Tarefa.EXECUTANDO).values_list('nome', flat=True))
+        candidatas = (
+            Tarefa.objects.filter(situacao=Tarefa.PENDENTE, executar_apos__lte=agora)
+            .order_by('executar_apos', 'id')
+            .values_list('id', 'nome')[:LIMITE_CANDIDATAS]
+        )
+        for tarefa_id, nome in candidatas:
+            definicao_tarefa = REGISTRO.get(nome)
+            if definicao_tarefa is None:
+                continue # Tarefa de um app não carregado neste worker
+            if processo is not None and definicao_tarefa.processo != processo:
+                continue
+            if definicao_tarefa.concorrencia is not None and em_execucao[nome] >= definicao_tarefa.concorrencia:
+                continue
+            reservada = Tarefa.objects.filter(pk=tarefa_id, situacao=Tarefa.PENDENTE).update(
+                situacao=Tarefa.EXECUTANDO,
+                trabalhador=trabalhador,
+                tentativas=F('tentativas') + 1,
+                data_inicio=agora,
+                data_atualizacao=agora,
+            )
+            if reservada:
+                return Tarefa.objects.get(pk=tarefa_id)
+    return None
+
+
+class _Progresso:
+    """Callback de progresso passado às tarefas; grava no máximo uma vez por INTERVALO_PROGRESSO."""
+
+    def __init__(self, tarefa_id):
+        self.tarefa_id = tarefa_id
+        self.ultima_gravacao = 0.0
+
+    def __call__(self, atual, total=None, mensagem=''):
+        agora = time.monotonic()
+        if agora - self.ultima_gravacao < INTERVALO_PROGRESSO and atual != total:
+            return
+        self.ultima_gravacao = agora
+        Tarefa.objects.filter(pk=self.tarefa_id).update(
+            progresso_atual=atual, progresso_total=total, mensagem=mensagem[:255], data_atualizacao=timezone.now(),
+        )
+
+
+def falhar(tarefa_id, erro):
+    """
+    Registra a falha da execução atual e reagenda a tarefa, se ainda houver tentativas.
+    Retorna a nova situação (pendente ou falhou).
+    """
+    tarefa = Tarefa.objects.get(pk=tarefa_id)
+    agora = timezone.now()
+    definicao_tarefa = REGISTRO.get(tarefa.nome)
+    if definicao_tarefa is not None and tarefa.tentativas < tarefa.max_tentativas:
+        espera = definicao_tarefa.espera_retentativa * 2 ** (tarefa.tentativas - 1)
+        Tarefa.objects.filter(pk=tarefa_id, situacao=Tarefa.EXECUTANDO).update(
+            situacao=Tarefa.PENDENTE,
+            executar_apos=agora + datetime.timedelta(seconds=espera),
+            erro=erro,
+            trabalhador='',
+            data_atualizacao=agora,
+        )
+        return Tarefa.PENDENTE
+    Tarefa.objects.filter(pk=tarefa_id, situacao=Tarefa.EXECUTANDO).update(
+        situacao=Tarefa.FALHOU, erro=erro, data_conclusao=agora, data_atualizacao=agora,
+    )
+    return Tarefa.FALHOU
+
+
+def executar(tarefa_id):
+    """
+    Executa uma tarefa já reservada. Roda nas threads e nos processos do worker: abre a própria
+    conexão com o banco e a fecha ao terminar.
+    """
+    close_old_connections()
+    try:
+        tarefa = Tarefa.objects.get(pk=tarefa_id)
+        try:
+            resultado = definicao(tarefa.nome).funcao(_Progresso(tarefa_id), **tarefa.argumentos)
+        except Exception:
+            return falhar(tarefa_id, traceback.format_exc())
+        agora = timezone.now()
+        Tarefa.objects.filter(pk=tarefa_id, situacao=Tarefa.EXECUTANDO).update(
+            situacao=Tarefa.CONCLUIDA, resultado=resultado, erro='', data_conclusao=agora, data_atualizacao=agora,
+        )
+        return Tarefa.CONCLUIDA
+    finally:
+        connections.close_all()
+
+
+def sinalizar(tarefa_ids):
+    """Atualiza o sinal de vida das tarefas em execução pelo worker (ver recuperar_abandonadas)."""
+    if tarefa_ids:
+        Tarefa.objects.filter(pk__in=tarefa_ids, situacao=Tarefa.EXECUTANDO).update(data_atualizacao=timezone.now())
+
+
+def recuperar_abandonadas(expiracao):
+    """
+    Tarefas em execução sem sinal de vida há mais de `expiracao` segundos (worker encerrado à força)
+    voltam à fila ou, sem tentativas restantes, são marcadas como falhas. Retorna quantas foram tratadas.
+    """
+    limite = timezone.now() - datetime.timedelta(seconds=expiracao)
+    abandonadas = list(
+        Tarefa.objects.filter(situacao=Tarefa.EXECUTANDO, data_atualizacao__lt=limite).values_list('id', flat=True)
+    )
+    for tarefa_id in abandonadas:
+        falhar(tarefa_id, 'Execução interrompida: o worker parou de responder.')
+    return len(abandonadas)
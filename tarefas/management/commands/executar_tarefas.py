@@ -0,0 +1,106 @@
+import multiprocessing
+import os
+import socket
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from tarefas import processos
+from tarefas.fila import executar, falhar, recuperar_abandonadas, reservar, sinalizar
+from tarefas.models import Tarefa
+
+INTERVALO_SINAL = 30 # Segundos entre os sinais de vida das tarefas em execução
+
+
+def _pool_de_processos(quantidade):
+    # spawn: os processos não herdam as threads nem as conexões com o banco do worker
+    return ProcessPoolExecutor(quantidade, mp_context=multiprocessing.get_context('spawn'), initializer=processos.iniciar)
+
+
+class Command(BaseCommand):
+    help = (
+        'Executa as tarefas em segundo plano enfileiradas no banco (ver tarefas/fila.py). '
+        'Tarefas comuns rodam em threads; as marcadas com processo=True, em um pool de processos.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=2, help='Tarefas comuns executadas ao mesmo tempo.')
+        parser.add_argument('--processos', type=int, default=1, help='Tarefas de cálculo pesado executadas ao mesmo tempo (0 desativa).')
+        parser.add_argument('--intervalo', type=float, default=1.0, help='Segundos entre as consultas à fila quando ociosa.')
+        parser.add_argument('--expiracao', type=int, default=300, help='Segundos sem sinal de vida para considerar uma tarefa abandonada.')
+        parser.add_argument('--ate-esvaziar', action='store_true', help='Encerra quando não houver mais tarefas prontas para executar.')
+
+    def handle(self, *args, **options):
+        if options['threads'] < 1 or options['processos'] < 0:
+            raise CommandError('Informe pelo menos uma thread e um número não negativo de processos.')
+        trabalhador = f'{socket.gethostname()}:{os.getpid()}'
+        limites = {False: options['threads'], True: options['processos']}
+        em_execucao = {} # futuro -> (tarefa_id, processo)
+        ultimo_sinal = 0.0
+
+        # Conexões não podem ser compartilhadas com os processos do pool
+        connections.close_all()
+        pools = {False: ThreadPoolExecutor(options['threads'])}
+        funcoes = {False: executar, True: processos.executar}
+        if options['processos']:
+            pools[True] = _pool_de_processos(options['processos'])
+        self.stdout.write(f'Worker {trabalhador}: {options["threads"]} thread(s), {options["processos"]} processo(s).')
+
+        try:
+            while True:
+                if time.monotonic() - ultimo_sinal >= INTERVALO_SINAL:
+                    sinalizar([tarefa_id for tarefa_id, _ in em_execucao.values()])
+                    recuperadas = recuperar_abandonadas(options['expiracao'])
+                    if recuperadas:
+                        self.stdout.write(self.style.WARNING(f'{recuperadas} tarefa(s) abandonada(s) devolvida(s) à fila.'))
+                    ultimo_sinal = time.monotonic()
+
+                reservadas = 0
+                for processo, pool in pools.items():
+                    ocupados = sum(1 for _, do_processo in em_execucao.values() if do_processo == processo)
+                    while ocupados < limites[processo]:
+                        tarefa = reservar(trabalhador, processo=processo)
+                        if tarefa is None:
+                            break
+                        em_execucao[pool.submit(funcoes[processo], tarefa.pk)] = (tarefa.pk, processo)
+                        self.stdout.write(f'Iniciada: {tarefa} (tentativa {tarefa.tentativas}/{tarefa.max_tentativas})')
+                        ocupados += 1
+                        reservadas += 1
+
+                if not em_execucao:
+                    if options['ate_esvaziar'] and not reservadas:
+                        break
+                    time.sleep(options['intervalo'])
+                    continue
+
+                concluidos, _ = wait(em_execucao, timeout=options['intervalo'], return_when=FIRST_COMPLETED)
+                pool_quebrado = False
+                for futuro in concluidos:
+                    tarefa_id, _ = em_execucao.pop(futuro)
+                    try:
+                        situacao = futuro.result()
+                    except Exception as erro:
+                        # Falha fora da tarefa (ex.: processo do pool encerrado pelo sistema)
+                        situacao = falhar(tarefa_id, traceback.format_exc())
+                        pool_quebrado = pool_quebrado or isinstance(erro, BrokenProcessPool)
+                    if situacao == Tarefa.CONCLUIDA:
+                        self.stdout.write(self.style.SUCCESS(f'Tarefa #{tarefa_id}: concluída.'))
+                    elif situacao == Tarefa.PENDENTE:
+                        self.stdout.write(self.style.WARNING(f'Tarefa #{tarefa_id}: falhou, reagendada.'))
+                    else:
+                        self.stdout.write(self.style.ERROR(f'Tarefa #{tarefa_id}: falhou, sem novas tentativas.'))
+                if pool_quebrado:
+                    # As demais tarefas do pool antigo também terminam com erro e são reagendadas acima
+                    self.stdout.write(self.style.ERROR('Pool de processos interrompido; criando um novo.'))
+                    pools[True].shutdown(wait=False)
+                    pools[True] = _pool_de_processos(options['processos'])
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('Encerrando: aguardando as tarefas em execução terminarem.'))
+        finally:
+            for pool in pools.values():
+                pool.shutdown(wait=True)
+        self.stdout.write(self.style.SUCCESS('Worker encerrado.'))
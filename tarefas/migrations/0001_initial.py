@@ -0,0 +1,40 @@
+# Generated by Django 4.2.11 on 2026-10-17 03:21
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tarefa',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=100)),
+                ('argumentos', models.JSONField(default=dict)),
+                ('situacao', models.CharField(choices=[('pendente', 'Pendente'), ('executando', 'Em execução'), ('concluida', 'Concluída'), ('falhou', 'Falhou')], default='pendente', max_length=20)),
+                ('tentativas', models.PositiveIntegerField(default=0)),
+                ('max_tentativas', models.PositiveIntegerField(default=3)),
+                ('executar_apos', models.DateTimeField(default=django.utils.timezone.now)),
+                ('progresso_atual', models.PositiveIntegerField(default=0)),
+                ('progresso_total', models.PositiveIntegerField(blank=True, null=True)),
+                ('mensagem', models.CharField(blank=True, max_length=255)),
+                ('resultado', models.JSONField(blank=True, null=True)),
+                ('erro', models.TextField(blank=True)),
+                ('trabalhador', models.CharField(blank=True, max_length=100)),
+                ('data_criacao', models.DateTimeField(auto_now_add=True)),
+                ('data_inicio', models.DateTimeField(blank=True, null=True)),
+                ('data_conclusao', models.DateTimeField(blank=True, null=True)),
+                ('data_atualizacao', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['situacao', 'executar_apos'], name='tarefas_situacao_exec_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,69 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Tarefa(models.Model):
+    """
+    Uma execução de tarefa em segundo plano, enfileirada por tarefas.fila.enfileirar e executada
+    pelo comando `executar_tarefas`. O próprio banco é a fila: não há serviço externo.
+    """
+    PENDENTE = 'pendente'
+    EXECUTANDO = 'executando'
+    CONCLUIDA = 'concluida'
+    FALHOU = 'falhou'
+    SITUACAO_CHOICES = [
+        (PENDENTE, 'Pendente'),
+        (EXECUTANDO, 'Em execução'),
+        (CONCLUIDA, 'Concluída'),
+        (FALHOU, 'Falhou'),
+    ]
+    nome = models.CharField(max_length=100) # Nome registrado com @tarefa (ver tarefas/registro.py)
+    argumentos = models.JSONField(default=dict)
+    situacao = models.CharField(max_length=20, choices=SITUACAO_CHOICES, default=PENDENTE)
+    tentativas = models.PositiveIntegerField(default=0)
+    max_tentativas = models.PositiveIntegerField(default=3)
+    executar_apos = models.DateTimeField(default=timezone.now) # Adiado a cada nova tentativa após falha
+    progresso_atual = models.PositiveIntegerField(default=0)
+    progresso_total = models.PositiveIntegerField(blank=True, null=True)
+    mensagem = models.CharField(max_length=255, blank=True)
+    resultado = models.JSONField(blank=True, null=True)
+    erro = models.TextField(blank=True)
+    trabalhador = models.CharField(max_length=100, blank=True) # host:pid do worker que reservou a tarefa
+    data_criacao = models.DateTimeField(auto_now_add=True)
+    data_inicio = models.DateTimeField(blank=True, null=True)
+    data_conclusao = models.DateTimeField(blank=True, null=True)
+    data_atualizacao = models.DateTimeField(blank=True, null=True) # Progresso ou sinal de vida do worker
+
+    class Meta:
+        indexes = [
+            # Próximas pendentes (reserva pelo worker) e em execução (limites de concorrência e expiração)
+            models.Index(fields=['situacao', 'executar_apos'], name='tarefas_situacao_exec_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.nome} #{self.pk} ({self.get_situacao_display()})'
+
+    @property
+    def percentual(self):
+        if self.situacao == self.CONCLUIDA:
+            return 100
+        if not self.progresso_total:
+            return None
+        return min(100, round(100 * self.progresso_atual / self.progresso_total))
+
+    def como_dict(self):
+        return {
+            'id': self.pk,
+            'nome': self.nome,
+            'situacao': self.situacao,
+            'tentativas': self.tentativas,
+            'max_tentativas': self.max_tentativas,
+            'progresso': {'atual': self.progresso_atual, 'total': self.progresso_total, 'percentual': self.percentual},
+            'mensagem': self.mensagem,
+            'resultado': self.resultado,
+            # Apenas a última linha do traceback: o restante fica no admin
+            'erro': self.erro.strip().splitlines()[-1] if self.erro.strip() else '',
+            'data_criacao': self.data_criacao,
+            'data_inicio': self.data_inicio,
+            'data_conclusao': self.data_conclusao,
+        }
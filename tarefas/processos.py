@@ -0,0 +1,17 @@
+"""
+Ponto de entrada das tarefas no pool de processos do worker.
+
+Os processos são iniciados do zero (spawn) e recebem apenas a referência a `executar`, importada
+antes do Django estar configurado; por isso este módulo não importa modelos no topo.
+"""
+import django
+
+
+def iniciar():
+    # Carrega o Django e, com ele, o registro de tarefas (ver tarefas/apps.py)
+    django.setup()
+
+
+def executar(tarefa_id):
+    from .fila import executar as executar_tarefa
+    return executar_tarefa(tarefa_id)
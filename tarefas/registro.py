@@ -0,0 +1,45 @@
+"""
+Registro das tarefas que podem ser executadas em segundo plano.
+
+Cada app declara as suas no módulo `tarefas.py`, importado na inicialização (ver tarefas/apps.py):
+
+    @tarefa('rh.processar_folha', processo=True, concorrencia=1)
+    def processar_folha(progresso, periodo):
+        ...
+
+A função recebe `progresso(atual, total=None, mensagem='')` e os argumentos informados ao enfileirar
+(valores JSON); o valor retornado, também JSON, fica em Tarefa.resultado.
+"""
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from django.core.exceptions import ImproperlyConfigured
+
+REGISTRO = {}
+
+
+@dataclass(frozen=True)
+class DefinicaoTarefa:
+    nome: str
+    funcao: Callable
+    max_tentativas: int = 3
+    concorrencia: Optional[int] = None # Máximo de execuções simultâneas desta tarefa; None: sem limite
+    processo: bool = False # Executa no pool de processos do worker (cálculo pesado, sem disputar o GIL)
+    espera_retentativa: int = 30 # Segundos até a primeira nova tentativa; dobra a cada falha
+
+
+def tarefa(nome, **opcoes):
+    """Decorador que registra a função como tarefa `nome` (ver DefinicaoTarefa para as opções)."""
+    def registrar(funcao):
+        if nome in REGISTRO:
+            raise ImproperlyConfigured(f'Tarefa registrada mais de uma vez: {nome}')
+        REGISTRO[nome] = DefinicaoTarefa(nome=nome, funcao=funcao, **opcoes)
+        return funcao
+    return registrar
+
+
+def definicao(nome):
+    try:
+        return REGISTRO[nome]
+    except KeyError:
+        raise ValueError(f'Tarefa desconhecida: {nome}')
@@ -0,0 +1,130 @@
+import datetime
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from .fila import enfileirar, executar, recuperar_abandonadas, reservar, sinalizar
+from .models import Tarefa
+from .registro import REGISTRO, DefinicaoTarefa
+
+
+def _concluir(progresso):
+    return {'ok': True}
+
+
+def _quebrar(progresso):
+    raise RuntimeError('falha simulada')
+
+
+class FilaTests(TestCase):
+    def setUp(self):
+        # Tarefas de teste registradas só durante cada teste
+        registro = mock.patch.dict(REGISTRO, {
+            'teste.livre': DefinicaoTarefa('teste.livre', _concluir),
+            'teste.exclusiva': DefinicaoTarefa('teste.exclusiva', _concluir, concorrencia=1),
+            'teste.quebra': DefinicaoTarefa('teste.quebra', _quebrar, max_tentativas=3, espera_retentativa=30),
+        })
+        registro.start()
+        self.addCleanup(registro.stop)
+
+    def _liberar(self, tarefa):
+        # Antecipa a nova tentativa agendada, em vez de esperar a espera real
+        Tarefa.objects.filter(pk=tarefa.pk).update(executar_apos=timezone.now())
+
+    def test_tarefa_nao_e_reservada_duas_vezes(self):
+        tarefa = enfileirar('teste.livre')
+        reservada = reservar('worker-a')
+        self.assertEqual((reservada.pk, reservada.situacao, reservada.trabalhador), (tarefa.pk, Tarefa.EXECUTANDO, 'worker-a'))
+        self.assertIsNone(reservar('worker-b'))
+
+        outras = [enfileirar('teste.livre') for _ in range(3)]
+        ids = [reservar(f'worker-{n}').pk for n in range(3)]
+        self.assertEqual(sorted(ids), [outra.pk for outra in outras])
+        self.assertEqual(set(Tarefa.objects.values_list('tentativas', flat=True)), {1})
+
+    def test_reserva_concorrente_perde_a_tarefa(self):
+        disputada = enfileirar('teste.livre')
+        seguinte = enfileirar('teste.livre')
+
+        class RegistroComConcorrente(dict):
+            # Outro worker reserva a tarefa entre a leitura das candidatas e o UPDATE condicional
+            def get(self, nome, padrao=None):
+                Tarefa.objects.filter(pk=disputada.pk, situacao=Tarefa.PENDENTE).update(
+                    situacao=Tarefa.EXECUTANDO, trabalhador='worker-b', tentativas=1,
+                )
+                return super().get(nome, padrao)
+
+        with mock.patch('tarefas.fila.REGISTRO', RegistroComConcorrente(REGISTRO)):
+            reservada = reservar('worker-a')
+        self.assertEqual(reservada.pk, seguinte.pk)
+        disputada.refresh_from_db()
+        self.assertEqual((disputada.trabalhador, disputada.tentativas), ('worker-b', 1))
+
+    def test_tarefa_de_app_nao_carregado_fica_na_fila(self):
+        tarefa = enfileirar('teste.livre')
+        Tarefa.objects.filter(pk=tarefa.pk).update(nome='outro_app.tarefa')
+        self.assertIsNone(reservar('worker-a'))
+        self.assertEqual(Tarefa.objects.get(pk=tarefa.pk).situacao, Tarefa.PENDENTE)
+
+    def test_limite_de_concorrencia(self):
+        primeira = enfileirar('teste.exclusiva')
+        segunda = enfileirar('teste.exclusiva')
+        livre = enfileirar('teste.livre')
+
+        self.assertEqual(reservar('worker-a').pk, primeira.pk)
+        # A segunda espera a primeira terminar; as demais tarefas não ficam bloqueadas por ela
+        self.assertEqual(reservar('worker-b').pk, livre.pk)
+        self.assertIsNone(reservar('worker-b'))
+
+        self.assertEqual(executar(primeira.pk), Tarefa.CONCLUIDA)
+        self.assertEqual(reservar('worker-b').pk, segunda.pk)
+
+    def test_pool_de_processos_e_de_threads(self):
+        tarefa = enfileirar('teste.livre')
+        self.assertIsNone(reservar('worker-a', processo=True))
+        self.assertEqual(reservar('worker-a', processo=False).pk, tarefa.pk)
+
+    def test_retentativas_com_espera_exponencial(self):
+        tarefa = enfileirar('teste.quebra')
+        esperas = []
+        for tentativa in (1, 2):
+            self.assertEqual(reservar('worker-a').pk, tarefa.pk)
+            self.assertEqual(executar(tarefa.pk), Tarefa.PENDENTE)
+            tarefa.refresh_from_db()
+            self.assertEqual((tarefa.tentativas, tarefa.trabalhador), (tentativa, ''))
+            self.assertIn('falha simulada', tarefa.erro)
+            esperas.append(tarefa.executar_apos - tarefa.data_atualizacao)
+            # Ainda não chegou a hora da nova tentativa
+            self.assertIsNone(reservar('worker-a'))
+            self._liberar(tarefa)
+        self.assertEqual(esperas, [datetime.timedelta(seconds=30), datetime.timedelta(seconds=60)])
+
+        self.assertEqual(reservar('worker-a').pk, tarefa.pk)
+        self.assertEqual(executar(tarefa.pk), Tarefa.FALHOU)
+        tarefa.refresh_from_db()
+        self.assertEqual((tarefa.situacao, tarefa.tentativas), (Tarefa.FALHOU, 3))
+        self.assertIsNotNone(tarefa.data_conclusao)
+        self.assertIsNone(reservar('worker-a'))
+
+    def test_recupera_tarefas_abandonadas(self):
+        abandonada = enfileirar('teste.livre')
+        ativa = enfileirar('teste.livre')
+        esgotada = enfileirar('teste.livre')
+        for _ in range(3):
+            reservar('worker-a')
+        Tarefa.objects.filter(pk=esgotada.pk).update(tentativas=3)
+        Tarefa.objects.exclude(pk=ativa.pk).update(data_atualizacao=timezone.now() - datetime.timedelta(minutes=10))
+        # O worker da tarefa ativa continua dando sinal de vida
+        sinalizar([ativa.pk])
+
+        self.assertEqual(recuperar_abandonadas(300), 2)
+        situacoes = dict(Tarefa.objects.values_list('pk', 'situacao'))
+        self.assertEqual(situacoes, {abandonada.pk: Tarefa.PENDENTE, ativa.pk: Tarefa.EXECUTANDO, esgotada.pk: Tarefa.FALHOU})
+        self.assertIn('parou de responder', Tarefa.objects.get(pk=abandonada.pk).erro)
+        self.assertEqual(recuperar_abandonadas(300), 0)
+
+        # Devolvida à fila, é executada de novo (como segunda tentativa) depois da espera
+        self._liberar(abandonada)
+        reservada = reservar('worker-b')
+        self.assertEqual((reservada.pk, reservada.tentativas), (abandonada.pk, 2))
@@ -0,0 +1,8 @@
+from django.urls import path
+from . import views
+
+app_name = 'tarefas'
+
+urlpatterns = [
+    path('<int:tarefa_id>/', views.situacao, name='situacao'),
+]
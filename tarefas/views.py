@@ -0,0 +1,23 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+
+from .models import Tarefa
+
+
+def tarefa_enfileirada(tarefa):
+    """Resposta 202 das views que enfileiram trabalho: situação inicial e endereço para acompanhar."""
+    dados = tarefa.como_dict()
+    dados['url'] = reverse('tarefas:situacao', args=[tarefa.pk])
+    return JsonResponse(dados, status=202)
+
+
+@staff_member_required
+def situacao(request, tarefa_id):
+    """
+    Situação de uma tarefa em segundo plano (JSON): progresso, resultado ou erro.
+    Consultada periodicamente pela interface após enfileirar o trabalho.
+    """
+    tarefa = get_object_or_404(Tarefa, pk=tarefa_id)
+    return JsonResponse(tarefa.como_dict())
@@ -1,3 +1,91 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import (
+    Abastecimento, AlertaManutencao, ConsumoAbastecimento, EstatisticaConsumoVeiculo, Implemento, Manutencao,
+    TipoCombustivel, TipoManutencao, UltimaManutencao, Veiculo, VeiculoImplemento,
+)
+
+
+@admin.register(TipoCombustivel)
+class TipoCombustivelAdmin(admin.ModelAdmin):
+    list_display = ('nome', 'unidade_medida')
+
+@admin.register(Veiculo)
+class VeiculoAdmin(admin.ModelAdmin):
+    list_display = ('placa', 'modelo', 'marca', 'ano_fabricacao', 'tipo_veiculo', 'tipo_combustivel', 'quilometragem_atual', 'ativo')
+    list_select_related = ('tipo_combustivel',)
+    list_filter = ('ativo', 'tipo_veiculo')
+    search_fields = ('placa', 'modelo', 'marca', 'chassi')
+
+@admin.register(Abastecimento)
+class AbastecimentoAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'veiculo', 'data_hora', 'tipo_combustivel', 'quantidade_litros', 'valor_por_litro', 'quilometragem_atual')
+    list_select_related = ('veiculo', 'tipo_combustivel')
+    list_filter = ('tipo_combustivel',)
+    search_fields = ('veiculo__placa', 'posto_combustivel')
+    date_hierarchy = 'data_hora'
+    raw_id_fields = ('veiculo',)
+
+@admin.register(ConsumoAbastecimento)
+class ConsumoAbastecimentoAdmin(admin.ModelAdmin):
+    list_display = ('veiculo', 'data_hora', 'km_percorridos', 'km_por_litro', 'custo_por_km', 'media_movel_km_por_litro', 'anomalia')
+    list_select_related = ('veiculo',)
+    list_filter = ('anomalia',)
+    search_fields = ('veiculo__placa',)
+
+    def has_add_permission(self, request):
+        return False # Calculado a partir dos abastecimentos (veiculos/consumo.py)
+
+@admin.register(EstatisticaConsumoVeiculo)
+class EstatisticaConsumoVeiculoAdmin(admin.ModelAdmin):
+    list_display = ('veiculo', 'quantidade_abastecimentos', 'total_litros', 'total_gasto', 'media_km_por_litro', 'quantidade_anomalias')
+    list_select_related = ('veiculo',)
+    search_fields = ('veiculo__placa',)
+
+    def has_add_permission(self, request):
+        return False # Calculado a partir dos abastecimentos (veiculos/consumo.py)
+
+@admin.register(TipoManutencao)
+class TipoManutencaoAdmin(admin.ModelAdmin):
+    list_display = ('nome',)
+    search_fields = ('nome',)
+
+@admin.register(Manutencao)
+class ManutencaoAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'veiculo', 'tipo_manutencao', 'data_servico', 'quilometragem_servico', 'custo_total', 'oficina')
+    list_select_related = ('veiculo', 'tipo_manutencao')
+    list_filter = ('tipo_manutencao',)
+    search_fields = ('veiculo__placa', 'oficina', 'descricao_servico')
+    date_hierarchy = 'data_servico'
+    raw_id_fields = ('veiculo',)
+
+@admin.register(UltimaManutencao)
+class UltimaManutencaoAdmin(admin.ModelAdmin):
+    list_display = ('veiculo', 'tipo_manutencao', 'data_servico', 'proxima_manutencao_data', 'proxima_manutencao_quilometragem')
+    list_select_related = ('veiculo', 'tipo_manutencao')
+    list_filter = ('tipo_manutencao',)
+    search_fields = ('veiculo__placa',)
+
+    def has_add_permission(self, request):
+        return False # Mantida pelas manutenções (veiculos/agenda_manutencao.py)
+
+@admin.register(AlertaManutencao)
+class AlertaManutencaoAdmin(admin.ModelAdmin):
+    list_display = ('veiculo', 'tipo_manutencao', 'motivo', 'situacao', 'data_prevista', 'quilometragem_prevista', 'resolvido')
+    list_select_related = ('veiculo', 'tipo_manutencao')
+    list_filter = ('resolvido', 'situacao', 'motivo', 'tipo_manutencao')
+    search_fields = ('veiculo__placa',)
+    raw_id_fields = ('veiculo', 'manutencao')
+
+@admin.register(Implemento)
+class ImplementoAdmin(admin.ModelAdmin):
+    list_display = ('nome', 'modelo', 'marca', 'numero_serie', 'ativo')
+    list_filter = ('ativo',)
+    search_fields = ('nome', 'numero_serie')
+
+@admin.register(VeiculoImplemento)
+class VeiculoImplementoAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'veiculo', 'implemento', 'data_conexao', 'data_desconexao')
+    list_select_related = ('veiculo', 'implemento')
+    search_fields = ('veiculo__placa', 'implemento__nome')
+    raw_id_fields = ('veiculo', 'implemento')
@@ -0,0 +1,153 @@
+import datetime
+
+from django.db import transaction
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from projeto_integrador.cache_paineis import invalidar
+
+from .models import AlertaManutencao, Manutencao, UltimaManutencao
+
+ANTECEDENCIA_DIAS = 15 # Alerta de manutenção próxima por data
+ANTECEDENCIA_KM = 500 # Alerta de manutenção próxima por quilometragem
+
+
+def atualizar_ultima_manutencao(veiculo_id, tipo_manutencao_id):
+    """
+    Recalcula a última manutenção de um par (veículo, tipo) usando o índice
+    (veiculo, tipo_manutencao, -data_servico) e resolve os alertas que ela atende.
+    """
+    ultima = (
+        Manutencao.objects.filter(veiculo_id=veiculo_id, tipo_manutencao_id=tipo_manutencao_id)
+        .order_by('-data_servico', '-id')
+        .values('id', 'data_servico', 'proxima_manutencao_data', 'proxima_manutencao_quilometragem')
+        .first()
+    )
+    if ultima is None:
+        UltimaManutencao.objects.filter(veiculo_id=veiculo_id, tipo_manutencao_id=tipo_manutencao_id).delete()
+        return
+
+    UltimaManutencao.objects.update_or_create(
+        veiculo_id=veiculo_id,
+        tipo_manutencao_id=tipo_manutencao_id,
+        defaults={
+            'manutencao_id': ultima['id'],
+            'data_servico': ultima['data_servico'],
+            'proxima_manutencao_data': ultima['proxima_manutencao_data'],
+            'proxima_manutencao_quilometragem': ultima['proxima_manutencao_quilometragem'],
+        },
+    )
+    AlertaManutencao.objects.filter(
+        veiculo_id=veiculo_id, tipo_manutencao_id=tipo_manutencao_id, resolvido=False,
+    ).exclude(manutencao_id=ultima['id']).update(resolvido=True, data_resolucao=timezone.now())
+    invalidar('veiculos.AlertaManutencao') # update() não dispara os sinais do cache dos painéis
+
+
+def reconstruir_ultimas_manutencoes():
+    """
+    Recria a tabela de últimas manutenções com uma única consulta (ROW_NUMBER por veículo e tipo).
+    Retorna o número de linhas gravadas.
+    """
+    ultimas = (
+        Manutencao.objects.annotate(
+            ordem=Window(
+                RowNumber(),
+                partition_by=[F('veiculo_id'), F('tipo_manutencao_id')],
+                order_by=[F('data_servico').desc(), F('id').desc()],
+            )
+        )
+        .filter(ordem=1)
+        .values_list('id', 'veiculo_id', 'tipo_manutencao_id', 'data_servico', 'proxima_manutencao_data', 'proxima_manutencao_quilometragem')
+    )
+    linhas = [
+        UltimaManutencao(
+            manutencao_id=manutencao_id,
+            veiculo_id=veiculo_id,
+            tipo_manutencao_id=tipo_manutencao_id,
+            data_servico=data_servico,
+            proxima_manutencao_data=proxima_data,
+            proxima_manutencao_quilometragem=proxima_km,
+        )
+        for manutencao_id, veiculo_id, tipo_manutencao_id, data_servico, proxima_data, proxima_km in ultimas
+    ]
+    with transaction.atomic():
+        UltimaManutencao.objects.all().delete()
+        UltimaManutencao.objects.bulk_create(linhas, batch_size=1000)
+    return len(linhas)
+
+
+def manutencoes_pendentes(hoje=None, antecedencia_dias=ANTECEDENCIA_DIAS, antecedencia_km=ANTECEDENCIA_KM):
+    """
+    Últimas manutenções de veículos ativos cuja próxima revisão vence (ou já venceu) por data,
+    dentro de `antecedencia_dias`, ou por quilometragem, dentro de `antecedencia_km` da
+    quilometragem atual do veículo. Uma única consulta para a frota inteira.
+    """
+    hoje = hoje or timezone.localdate()
+    return (
+        UltimaManutencao.objects.filter(veiculo__ativo=True)
+        .filter(
+            Q(proxima_manutencao_data__lte=hoje + datetime.timedelta(days=antecedencia_dias))
+            | Q(proxima_manutencao_quilometragem__lte=F('veiculo__quilometragem_atual') + antecedencia_km)
+        )
+        .select_related('veiculo', 'tipo_manutencao')
+        .order_by('proxima_manutencao_data', 'veiculo_id')
+    )
+
+
+def _motivos(pendente, hoje, antecedencia_dias, antecedencia_km):
+    """
+    Motivos de alerta de uma manutenção pendente: (motivo, situação).
+    """
+    km_veiculo = pendente.veiculo.quilometragem_atual
+    if pendente.proxima_manutencao_data is not None:
+        if pendente.proxima_manutencao_data <= hoje:
+            yield 'data', 'vencida'
+        elif pendente.proxima_manutencao_data <= hoje + datetime.timedelta(days=antecedencia_dias):
+            yield 'data', 'proxima'
+    if pendente.proxima_manutencao_quilometragem is not None:
+        if pendente.proxima_manutencao_quilometragem <= km_veiculo:
+            yield 'quilometragem', 'vencida'
+        elif pendente.proxima_manutencao_quilometragem <= km_veiculo + antecedencia_km:
+            yield 'quilometragem', 'proxima'
+
+
+def gerar_alertas(hoje=None, antecedencia_dias=ANTECEDENCIA_DIAS, antecedencia_km=ANTECEDENCIA_KM):
+    """
+    Execução periódica do agendador: cria alertas para as manutenções pendentes e atualiza
+    a situação (próxima -> vencida) dos alertas já abertos. Retorna (criados, atualizados).
+    """
+    hoje = hoje or timezone.localdate()
+    abertos = {
+        (a.manutencao_id, a.motivo): a
+        for a in AlertaManutencao.objects.filter(resolvido=False)
+    }
+
+    novos = []
+    alterados = []
+    agora = timezone.now()
+    for pendente in manutencoes_pendentes(hoje, antecedencia_dias, antecedencia_km):
+        for motivo, situacao in _motivos(pendente, hoje, antecedencia_dias, antecedencia_km):
+            alerta = abertos.get((pendente.manutencao_id, motivo))
+            if alerta is None:
+                novos.append(AlertaManutencao(
+                    veiculo_id=pendente.veiculo_id,
+                    tipo_manutencao_id=pendente.tipo_manutencao_id,
+                    manutencao_id=pendente.manutencao_id,
+                    motivo=motivo,
+                    situacao=situacao,
+                    data_prevista=pendente.proxima_manutencao_data,
+                    quilometragem_prevista=pendente.proxima_manutencao_quilometragem,
+                    quilometragem_veiculo=pendente.veiculo.quilometragem_atual,
+                ))
+            elif (alerta.situacao, alerta.quilometragem_veiculo) != (situacao, pendente.veiculo.quilometragem_atual):
+                alerta.situacao = situacao
+                alerta.quilometragem_veiculo = pendente.veiculo.quilometragem_atual
+                alerta.data_atualizacao = agora
+                alterados.append(alerta)
+
+    with transaction.atomic():
+        AlertaManutencao.objects.bulk_create(novos, batch_size=1000)
+        AlertaManutencao.objects.bulk_update(alterados, ['situacao', 'quilometragem_veiculo', 'data_atualizacao'], batch_size=1000)
+        invalidar('veiculos.AlertaManutencao')
+    return len(novos), len(alterados)
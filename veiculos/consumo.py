@@ -0,0 +1,138 @@
+from collections import defaultdict, deque
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import transaction
+from django.db.models import F, Sum, Window
+from django.db.models.functions import Lag
+
+from .models import Abastecimento, ConsumoAbastecimento, EstatisticaConsumoVeiculo
+
+JANELA_MEDIA_MOVEL = 5 # Medições consideradas na média móvel de cada veículo
+MEDICOES_MINIMAS = 3 # Medições anteriores necessárias antes de avaliar queda de eficiência
+LIMITE_QUEDA_EFICIENCIA = Decimal('0.70') # km/L abaixo de 70% da média móvel é anômalo
+LIMITE_SALTO_HODOMETRO = Decimal('2.00') # km/L acima do dobro da média móvel indica hodômetro digitado errado
+
+CENTAVO = Decimal('0.01')
+
+
+def _arredondar(valor, casas=CENTAVO):
+    return valor.quantize(casas, rounding=ROUND_HALF_UP)
+
+
+def _leituras(veiculo_ids=None):
+    """
+    Abastecimentos em ordem cronológica por veículo, cada um com a quilometragem do
+    abastecimento anterior do mesmo veículo, obtida com LAG em uma única consulta.
+    """
+    abastecimentos = Abastecimento.objects.all()
+    if veiculo_ids is not None:
+        abastecimentos = abastecimentos.filter(veiculo_id__in=veiculo_ids)
+    return (
+        abastecimentos.annotate(
+            km_anterior=Window(
+                Lag('quilometragem_atual'),
+                partition_by=[F('veiculo_id')],
+                order_by=[F('data_hora').asc(), F('id').asc()],
+            )
+        )
+        .order_by('veiculo_id', 'data_hora', 'id')
+        .values_list('id', 'veiculo_id', 'data_hora', 'quantidade_litros', 'valor_por_litro', 'quilometragem_atual', 'km_anterior')
+        .iterator(chunk_size=2000)
+    )
+
+
+def recalcular_consumo(veiculo_ids=None):
+    """
+    Recalcula km/L, custo por km, média móvel e anomalias de cada abastecimento e as
+    estatísticas por veículo. Sem `veiculo_ids`, processa a frota inteira.
+    Retorna o número de abastecimentos processados.
+    """
+    consumos = []
+    estatisticas = {}
+    medias = defaultdict(lambda: deque(maxlen=JANELA_MEDIA_MOVEL))
+
+    for abastecimento_id, veiculo_id, data_hora, litros, valor_por_litro, km_atual, km_anterior in _leituras(veiculo_ids):
+        estatistica = estatisticas.get(veiculo_id)
+        if estatistica is None:
+            estatistica = estatisticas[veiculo_id] = EstatisticaConsumoVeiculo(veiculo_id=veiculo_id)
+        estatistica.quantidade_abastecimentos += 1
+        estatistica.total_litros += litros
+        estatistica.total_gasto += _arredondar(litros * valor_por_litro)
+
+        consumo = ConsumoAbastecimento(abastecimento_id=abastecimento_id, veiculo_id=veiculo_id, data_hora=data_hora)
+        janela = medias[veiculo_id]
+        media_anterior = sum(janela) / len(janela) if janela else None
+
+        if km_anterior is not None:
+            km = km_atual - km_anterior
+            consumo.km_percorridos = km
+            if km < 0:
+                consumo.anomalia = 'hodometro_regressivo'
+            elif km > 0:
+                km_por_litro = km / litros
+                consumo.km_por_litro = _arredondar(km_por_litro)
+                consumo.custo_por_km = _arredondar(litros * valor_por_litro / km, Decimal('0.0001'))
+                if len(janela) >= MEDICOES_MINIMAS and km_por_litro < media_anterior * LIMITE_QUEDA_EFICIENCIA:
+                    consumo.anomalia = 'queda_eficiencia'
+                elif len(janela) >= MEDICOES_MINIMAS and km_por_litro > media_anterior * LIMITE_SALTO_HODOMETRO:
+                    consumo.anomalia = 'salto_hodometro'
+                else:
+                    # Medições anômalas não entram na média, para não mascarar as seguintes
+                    janela.append(km_por_litro)
+                    estatistica.km_medidos += km
+                    estatistica.litros_medidos += litros
+
+        if janela:
+            consumo.media_movel_km_por_litro = _arredondar(sum(janela) / len(janela))
+        if consumo.anomalia:
+            estatistica.quantidade_anomalias += 1
+        consumos.append(consumo)
+
+    for estatistica in estatisticas.values():
+        if estatistica.litros_medidos:
+            estatistica.media_km_por_litro = _arredondar(estatistica.km_medidos / estatistica.litros_medidos)
+        janela = medias[estatistica.veiculo_id]
+        if janela:
+            estatistica.media_movel_km_por_litro = _arredondar(sum(janela) / len(janela))
+
+    with transaction.atomic():
+        antigos_consumos = ConsumoAbastecimento.objects.all()
+        antigas_estatisticas = EstatisticaConsumoVeiculo.objects.all()
+        if veiculo_ids is not None:
+            antigos_consumos = antigos_consumos.filter(veiculo_id__in=veiculo_ids)
+            antigas_estatisticas = antigas_estatisticas.filter(veiculo_id__in=veiculo_ids)
+        antigos_consumos.delete()
+        antigas_estatisticas.delete()
+        ConsumoAbastecimento.objects.bulk_create(consumos, batch_size=1000)
+        EstatisticaConsumoVeiculo.objects.bulk_create(estatisticas.values(), batch_size=1000)
+    return len(consumos)
+
+
+def estatisticas_frota():
+    """
+    Consumo médio e totais da frota inteira, agregados das estatísticas por veículo.
+    """
+    totais = EstatisticaConsumoVeiculo.objects.aggregate(
+        abastecimentos=Sum('quantidade_abastecimentos'),
+        litros=Sum('total_litros'),
+        gasto=Sum('total_gasto'),
+        km_medidos=Sum('km_medidos'),
+        litros_medidos=Sum('litros_medidos'),
+        anomalias=Sum('quantidade_anomalias'),
+    )
+    media = None
+    if totais['litros_medidos']:
+        media = _arredondar(Decimal(totais['km_medidos']) / Decimal(totais['litros_medidos']))
+    return {**totais, 'media_km_por_litro': media}
+
+
+def anomalias(veiculo=None, desde=None):
+    """
+    Abastecimentos sinalizados como anômalos, do mais recente para o mais antigo.
+    """
+    consumos = ConsumoAbastecimento.objects.filter(anomalia__isnull=False)
+    if veiculo is not None:
+        consumos = consumos.filter(veiculo=veiculo)
+    if desde is not None:
+        consumos = consumos.filter(data_hora__gte=desde)
+    return consumos.select_related('abastecimento', 'veiculo').order_by('-data_hora')
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from veiculos.consumo import estatisticas_frota, recalcular_consumo
+
+
+class Command(BaseCommand):
+    help = 'Recalcula o consumo (km/L) de cada abastecimento, as estatísticas por veículo e sinaliza anomalias.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--veiculo', type=int, action='append', help='Id do veículo (pode ser repetido). Padrão: frota inteira.')
+
+    def handle(self, *args, **options):
+        processados = recalcular_consumo(options['veiculo'])
+        frota = estatisticas_frota()
+        self.stdout.write(self.style.SUCCESS(
+            f'{processados} abastecimento(s) processado(s). Média da frota: {frota["media_km_por_litro"]} km/L, '
+            f'{frota["anomalias"] or 0} anomalia(s).'
+        ))
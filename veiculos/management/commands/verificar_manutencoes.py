@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from veiculos.agenda_manutencao import (
+    ANTECEDENCIA_DIAS, ANTECEDENCIA_KM, gerar_alertas, reconstruir_ultimas_manutencoes,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Gera alertas de manutenções próximas ou vencidas por data ou quilometragem. '
+        'Feito para execução periódica (ex.: diária, via cron).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--antecedencia-dias', type=int, default=ANTECEDENCIA_DIAS)
+        parser.add_argument('--antecedencia-km', type=int, default=ANTECEDENCIA_KM)
+        parser.add_argument(
+            '--reconstruir',
+            action='store_true',
+            help='Recria antes a tabela de últimas manutenções por veículo e tipo.',
+        )
+
+    def handle(self, *args, **options):
+        if options['reconstruir']:
+            linhas = reconstruir_ultimas_manutencoes()
+            self.stdout.write(f'Últimas manutenções reconstruídas: {linhas}.')
+
+        criados, atualizados = gerar_alertas(
+            antecedencia_dias=options['antecedencia_dias'],
+            antecedencia_km=options['antecedencia_km'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'{criados} alerta(s) criado(s), {atualizados} atualizado(s).'))
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.11 on 2026-10-17 03:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('veiculos', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EstatisticaConsumoVeiculo',
+            fields=[
+                ('veiculo', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='estatistica_consumo', serialize=False, to='veiculos.veiculo')),
+                ('quantidade_abastecimentos', models.IntegerField(default=0)),
+                ('total_litros', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('total_gasto', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('km_medidos', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('litros_medidos', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('media_km_por_litro', models.DecimalField(blank=True, decimal_places=2, max_digits=8, null=True)),
+                ('media_movel_km_por_litro', models.DecimalField(blank=True, decimal_places=2, max_digits=8, null=True)),
+                ('quantidade_anomalias', models.IntegerField(default=0)),
+                ('data_atualizacao', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ConsumoAbastecimento',
+            fields=[
+                ('abastecimento', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='consumo', serialize=False, to='veiculos.abastecimento')),
+                ('data_hora', models.DateTimeField()),
+                ('km_percorridos', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('km_por_litro', models.DecimalField(blank=True, decimal_places=2, max_digits=8, null=True)),
+                ('custo_por_km', models.DecimalField(blank=True, decimal_places=4, max_digits=8, null=True)),
+                ('media_movel_km_por_litro', models.DecimalField(blank=True, decimal_places=2, max_digits=8, null=True)),
+                ('anomalia', models.CharField(blank=True, choices=[('hodometro_regressivo', 'Hodômetro Regressivo'), ('queda_eficiencia', 'Queda de Eficiência'), ('salto_hodometro', 'Salto de Hodômetro')], max_length=30, null=True)),
+                ('veiculo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='consumos', to='veiculos.veiculo')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['veiculo', 'data_hora'], name='veic_consumo_veiculo_data_idx'), models.Index(fields=['anomalia', 'data_hora'], name='veic_consumo_anomalia_idx')],
+            },
+        ),
+    ]
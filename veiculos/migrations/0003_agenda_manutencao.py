@@ -0,0 +1,119 @@
+# Generated by Django 4.2.11 on 2026-10-17 03:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+
+def popular_ultimas_manutencoes(apps, schema_editor):
+    # Última manutenção de cada veículo por tipo entre as já registradas
+    Manutencao = apps.get_model('veiculos', 'Manutencao')
+    UltimaManutencao = apps.get_model('veiculos', 'UltimaManutencao')
+    ultimas = (
+        Manutencao.objects.annotate(
+            ordem=Window(
+                RowNumber(),
+                partition_by=[F('veiculo_id'), F('tipo_manutencao_id')],
+                order_by=[F('data_servico').desc(), F('id').desc()],
+            )
+        )
+        .filter(ordem=1)
+        .values_list('id', 'veiculo_id', 'tipo_manutencao_id', 'data_servico', 'proxima_manutencao_data', 'proxima_manutencao_quilometragem')
+    )
+    UltimaManutencao.objects.bulk_create([
+        UltimaManutencao(
+            manutencao_id=manutencao_id,
+            veiculo_id=veiculo_id,
+            tipo_manutencao_id=tipo_manutencao_id,
+            data_servico=data_servico,
+            proxima_manutencao_data=proxima_data,
+            proxima_manutencao_quilometragem=proxima_km,
+        )
+        for manutencao_id, veiculo_id, tipo_manutencao_id, data_servico, proxima_data, proxima_km in ultimas
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('veiculos', '0002_consumo_abastecimento'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlertaManutencao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('motivo', models.CharField(choices=[('data', 'Data'), ('quilometragem', 'Quilometragem')], max_length=15)),
+                ('situacao', models.CharField(choices=[('proxima', 'Próxima'), ('vencida', 'Vencida')], max_length=10)),
+                ('data_prevista', models.DateField(blank=True, null=True)),
+                ('quilometragem_prevista', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('quilometragem_veiculo', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('resolvido', models.BooleanField(default=False)),
+                ('data_resolucao', models.DateTimeField(blank=True, null=True)),
+                ('data_geracao', models.DateTimeField(auto_now_add=True)),
+                ('data_atualizacao', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='UltimaManutencao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data_servico', models.DateField()),
+                ('proxima_manutencao_data', models.DateField(blank=True, null=True)),
+                ('proxima_manutencao_quilometragem', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='manutencao',
+            index=models.Index(fields=['veiculo', 'tipo_manutencao', '-data_servico'], name='veic_manut_veic_tipo_data_idx'),
+        ),
+        migrations.AddField(
+            model_name='ultimamanutencao',
+            name='manutencao',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='veiculos.manutencao'),
+        ),
+        migrations.AddField(
+            model_name='ultimamanutencao',
+            name='tipo_manutencao',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='veiculos.tipomanutencao'),
+        ),
+        migrations.AddField(
+            model_name='ultimamanutencao',
+            name='veiculo',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ultimas_manutencoes', to='veiculos.veiculo'),
+        ),
+        migrations.AddField(
+            model_name='alertamanutencao',
+            name='manutencao',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alertas', to='veiculos.manutencao'),
+        ),
+        migrations.AddField(
+            model_name='alertamanutencao',
+            name='tipo_manutencao',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alertas', to='veiculos.tipomanutencao'),
+        ),
+        migrations.AddField(
+            model_name='alertamanutencao',
+            name='veiculo',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alertas_manutencao', to='veiculos.veiculo'),
+        ),
+        migrations.AddIndex(
+            model_name='ultimamanutencao',
+            index=models.Index(fields=['proxima_manutencao_data'], name='veic_ultima_manut_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ultimamanutencao',
+            index=models.Index(fields=['proxima_manutencao_quilometragem'], name='veic_ultima_manut_km_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='ultimamanutencao',
+            unique_together={('veiculo', 'tipo_manutencao')},
+        ),
+        migrations.AddIndex(
+            model_name='alertamanutencao',
+            index=models.Index(fields=['resolvido', 'veiculo', 'tipo_manutencao'], name='veic_alerta_manut_aberto_idx'),
+        ),
+        migrations.RunPython(popular_ultimas_manutencoes, migrations.RunPython.noop),
+    ]
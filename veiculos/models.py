@@ -1,6 +1,18 @@
 from django.db import models
 from django.core.validators import MinValueValidator
 
+from projeto_integrador.managers import RelacionadosManager
+
+# Managers padrão que trazem junto as FKs usadas no __str__ (ver projeto_integrador/managers.py)
+class AbastecimentoManager(RelacionadosManager):
+    relacionados = ('veiculo',)
+
+class ManutencaoManager(RelacionadosManager):
+    relacionados = ('veiculo', 'tipo_manutencao')
+
+class VeiculoImplementoManager(RelacionadosManager):
+    relacionados = ('veiculo', 'implemento')
+
 class TipoCombustivel(models.Model):
     """
     Tipos de combustível utilizados pela frota.
@@ -75,10 +87,60 @@ class Abastecimento(models.Model):
 
     data_registro = models.DateTimeField(auto_now_add=True)
 
+    objects = AbastecimentoManager()
+
     def __str__(self):
         return f'Abastecimento de {self.quantidade_litros} L em {self.data_hora.strftime("%Y-%m-%d %H:%M")} for {self.veiculo.placa}'
 
-    # Opcional: Adicionar lógica para calcular o custo total ou média de rendimento aqui ou em métodos/managers
+    # Médias de rendimento: ver ConsumoAbastecimento e veiculos/consumo.py
+
+class ConsumoAbastecimento(models.Model):
+    """
+    Métricas de consumo de cada abastecimento em relação ao abastecimento anterior do mesmo veículo
+    (considerando tanque cheio). Calculadas em lote por veiculos/consumo.py.
+    """
+    ANOMALIA_CHOICES = [
+        ('hodometro_regressivo', 'Hodômetro Regressivo'),
+        ('queda_eficiencia', 'Queda de Eficiência'),
+        ('salto_hodometro', 'Salto de Hodômetro'),
+    ]
+
+    abastecimento = models.OneToOneField(Abastecimento, on_delete=models.CASCADE, primary_key=True, related_name='consumo')
+    veiculo = models.ForeignKey(Veiculo, on_delete=models.CASCADE, related_name='consumos') # Repetido do abastecimento para consultas por veículo
+    data_hora = models.DateTimeField()
+    km_percorridos = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True) # Nulo no primeiro abastecimento do veículo
+    km_por_litro = models.DecimalField(max_digits=8, decimal_places=2, blank=True, null=True)
+    custo_por_km = models.DecimalField(max_digits=8, decimal_places=4, blank=True, null=True)
+    media_movel_km_por_litro = models.DecimalField(max_digits=8, decimal_places=2, blank=True, null=True) # Média das últimas medições válidas
+    anomalia = models.CharField(max_length=30, choices=ANOMALIA_CHOICES, blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['veiculo', 'data_hora'], name='veic_consumo_veiculo_data_idx'),
+            models.Index(fields=['anomalia', 'data_hora'], name='veic_consumo_anomalia_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.km_por_litro} km/L em {self.data_hora.strftime("%Y-%m-%d %H:%M")} for {self.veiculo_id}'
+
+class EstatisticaConsumoVeiculo(models.Model):
+    """
+    Estatísticas acumuladas de consumo por veículo, recalculadas junto com ConsumoAbastecimento.
+    """
+    veiculo = models.OneToOneField(Veiculo, on_delete=models.CASCADE, primary_key=True, related_name='estatistica_consumo')
+    quantidade_abastecimentos = models.IntegerField(default=0)
+    total_litros = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_gasto = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    km_medidos = models.DecimalField(max_digits=12, decimal_places=2, default=0) # Soma dos trechos válidos
+    litros_medidos = models.DecimalField(max_digits=12, decimal_places=2, default=0) # Litros correspondentes aos trechos válidos
+    media_km_por_litro = models.DecimalField(max_digits=8, decimal_places=2, blank=True, null=True)
+    media_movel_km_por_litro = models.DecimalField(max_digits=8, decimal_places=2, blank=True, null=True)
+    quantidade_anomalias = models.IntegerField(default=0)
+
+    data_atualizacao = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.media_km_por_litro} km/L for {self.veiculo_id}'
 
 class TipoManutencao(models.Model):
     """
@@ -122,9 +184,69 @@ class Manutencao(models.Model):
 
     data_registro = models.DateTimeField(auto_now_add=True)
 
+    objects = ManutencaoManager()
+
+    class Meta:
+        indexes = [
+            # Última manutenção por veículo e tipo (ver veiculos/agenda_manutencao.py)
+            models.Index(fields=['veiculo', 'tipo_manutencao', '-data_servico'], name='veic_manut_veic_tipo_data_idx'),
+        ]
+
     def __str__(self):
         return f'{self.tipo_manutencao.nome} em {self.data_servico} for {self.veiculo.placa}'
 
+class UltimaManutencao(models.Model):
+    """
+    Última manutenção de cada veículo por tipo, com a próxima revisão prevista (data e/ou quilometragem).
+    Mantida pelos sinais de Manutencao (ver veiculos/agenda_manutencao.py).
+    """
+    veiculo = models.ForeignKey(Veiculo, on_delete=models.CASCADE, related_name='ultimas_manutencoes')
+    tipo_manutencao = models.ForeignKey(TipoManutencao, on_delete=models.CASCADE, related_name='+')
+    manutencao = models.OneToOneField(Manutencao, on_delete=models.CASCADE, related_name='+')
+    data_servico = models.DateField()
+    proxima_manutencao_data = models.DateField(blank=True, null=True)
+    proxima_manutencao_quilometragem = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
+
+    class Meta:
+        unique_together = ('veiculo', 'tipo_manutencao')
+        indexes = [
+            models.Index(fields=['proxima_manutencao_data'], name='veic_ultima_manut_data_idx'),
+            models.Index(fields=['proxima_manutencao_quilometragem'], name='veic_ultima_manut_km_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.tipo_manutencao_id} em {self.data_servico} for {self.veiculo_id}'
+
+class AlertaManutencao(models.Model):
+    """
+    Alertas de manutenção próxima ou vencida, gerados periodicamente pelo agendador
+    (comando verificar_manutencoes) e resolvidos quando uma nova manutenção do mesmo tipo é registrada.
+    """
+    MOTIVO_CHOICES = [('data', 'Data'), ('quilometragem', 'Quilometragem')]
+    SITUACAO_CHOICES = [('proxima', 'Próxima'), ('vencida', 'Vencida')]
+
+    veiculo = models.ForeignKey(Veiculo, on_delete=models.CASCADE, related_name='alertas_manutencao')
+    tipo_manutencao = models.ForeignKey(TipoManutencao, on_delete=models.CASCADE, related_name='alertas')
+    manutencao = models.ForeignKey(Manutencao, on_delete=models.CASCADE, related_name='alertas') # Manutenção que definiu a revisão prevista
+    motivo = models.CharField(max_length=15, choices=MOTIVO_CHOICES)
+    situacao = models.CharField(max_length=10, choices=SITUACAO_CHOICES)
+    data_prevista = models.DateField(blank=True, null=True)
+    quilometragem_prevista = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
+    quilometragem_veiculo = models.DecimalField(max_digits=10, decimal_places=2) # Quilometragem do veículo na última verificação
+    resolvido = models.BooleanField(default=False)
+    data_resolucao = models.DateTimeField(blank=True, null=True)
+
+    data_geracao = models.DateTimeField(auto_now_add=True)
+    data_atualizacao = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['resolvido', 'veiculo', 'tipo_manutencao'], name='veic_alerta_manut_aberto_idx'),
+        ]
+
+    def __str__(self):
+        return f'Manutenção {self.situacao} ({self.motivo}) for {self.veiculo_id}'
+
 class Implemento(models.Model):
     """
     Cadastro completo de equipamentos agrícolas e outros implementos.
@@ -153,6 +275,8 @@ class VeiculoImplemento(models.Model):
     data_conexao = models.DateField()
     data_desconexao = models.DateField(blank=True, null=True) # Para rastrear o período de uso
 
+    objects = VeiculoImplementoManager()
+
     class Meta:
         unique_together = ('veiculo', 'implemento', 'data_conexao') # Garante unicidade para a mesma conexão no mesmo dia
 
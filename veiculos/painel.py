@@ -0,0 +1,46 @@
+"""
+Indicadores da página inicial de Veículos. Cada função faz uma única consulta e é independente das
+demais, para que a view possa executá-las ao mesmo tempo (ver projeto_integrador/paralelo.py).
+"""
+import datetime
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Sum
+from django.utils import timezone
+
+from .models import Abastecimento, AlertaManutencao, Veiculo
+
+CENTAVO = Decimal('0.01')
+
+
+def gasto_combustivel_do_mes(hoje=None):
+    """Abastecimentos, litros e valor gasto pela frota no mês corrente."""
+    hoje = hoje or timezone.localdate()
+    inicio = timezone.make_aware(datetime.datetime.combine(hoje.replace(day=1), datetime.time()))
+    totais = Abastecimento.objects.filter(data_hora__gte=inicio).aggregate(
+        abastecimentos=Count('pk'),
+        litros=Sum('quantidade_litros'),
+        valor=Sum(ExpressionWrapper(F('quantidade_litros') * F('valor_por_litro'), output_field=DecimalField(max_digits=14, decimal_places=4))),
+    )
+    # O SQLite soma decimais em ponto flutuante
+    for campo in ('litros', 'valor'):
+        totais[campo] = Decimal(totais[campo] or 0).quantize(CENTAVO, rounding=ROUND_HALF_UP)
+    return totais
+
+
+def veiculos_ativos():
+    return Veiculo.objects.filter(ativo=True).count()
+
+
+def alertas_manutencao_abertos():
+    """Quantidade de alertas não resolvidos por situação (proxima/vencida)."""
+    totais = dict(AlertaManutencao.objects.filter(resolvido=False).order_by().values_list('situacao').annotate(total=Count('pk')))
+    return {situacao: totais.get(situacao, 0) for situacao, _ in AlertaManutencao._meta.get_field('situacao').choices}
+
+
+# nome -> (função, modelos dos quais o valor depende), para o cache dos painéis
+INDICADORES = {
+    'gasto_combustivel': (gasto_combustivel_do_mes, ('veiculos.Abastecimento',)),
+    'veiculos_ativos': (veiculos_ativos, ('veiculos.Veiculo',)),
+    'alertas_manutencao': (alertas_manutencao_abertos, ('veiculos.AlertaManutencao',)),
+}
@@ -0,0 +1,62 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import agenda_manutencao, consumo
+from .models import Abastecimento, Manutencao
+
+
+def _recalcular_consumo_pendente():
+    conexao = transaction.get_connection()
+    veiculo_ids = getattr(conexao, 'consumo_pendente', None)
+    if veiculo_ids:
+        conexao.consumo_pendente = set()
+        consumo.recalcular_consumo(sorted(veiculo_ids))
+
+
+def _recalcular_consumo_apos_commit(veiculo_id):
+    """
+    Recalcula após o commit, quando o histórico do veículo já está completo (inclusive em exclusões em cascata).
+    Os veículos alterados se acumulam na conexão: o primeiro callback da transação recalcula cada um uma
+    única vez e os demais não encontram mais nada pendente. Veículos de uma transação desfeita ficam para
+    o próximo commit, o que só repete um recálculo.
+    """
+    conexao = transaction.get_connection()
+    if not hasattr(conexao, 'consumo_pendente'):
+        conexao.consumo_pendente = set()
+    conexao.consumo_pendente.add(veiculo_id)
+    transaction.on_commit(_recalcular_consumo_pendente)
+
+
+@receiver(post_save, sender=Abastecimento)
+def atualizar_consumo(sender, instance, **kwargs):
+    _recalcular_consumo_apos_commit(instance.veiculo_id)
+
+
+@receiver(post_delete, sender=Abastecimento)
+def estornar_consumo(sender, instance, **kwargs):
+    _recalcular_consumo_apos_commit(instance.veiculo_id)
+
+
+@receiver(pre_save, sender=Manutencao)
+def guardar_manutencao_anterior(sender, instance, **kwargs):
+    # Veículo/tipo gravados antes da alteração, para recalcular também o par anterior
+    instance._manutencao_anterior = None
+    if instance.pk is not None:
+        instance._manutencao_anterior = (
+            Manutencao.objects.filter(pk=instance.pk).values_list('veiculo_id', 'tipo_manutencao_id').first()
+        )
+
+
+@receiver(post_save, sender=Manutencao)
+def atualizar_ultima_manutencao(sender, instance, **kwargs):
+    anterior = getattr(instance, '_manutencao_anterior', None)
+    atual = (instance.veiculo_id, instance.tipo_manutencao_id)
+    if anterior is not None and anterior != atual:
+        agenda_manutencao.atualizar_ultima_manutencao(*anterior)
+    agenda_manutencao.atualizar_ultima_manutencao(*atual)
+
+
+@receiver(post_delete, sender=Manutencao)
+def estornar_ultima_manutencao(sender, instance, **kwargs):
+    agenda_manutencao.atualizar_ultima_manutencao(instance.veiculo_id, instance.tipo_manutencao_id)
@@ -1,3 +1,59 @@
+import datetime
+from decimal import Decimal
+from unittest import mock
+
+from django.db import transaction
 from django.test import TestCase
+from django.utils import timezone
+
+from . import consumo
+from .models import Abastecimento, ConsumoAbastecimento, EstatisticaConsumoVeiculo, TipoCombustivel, Veiculo
+
+
+class ConsumoTests(TestCase):
+    def setUp(self):
+        self.diesel = TipoCombustivel.objects.create(nome='Diesel S10')
+        self.caminhao = Veiculo.objects.create(placa='ABC1D23', modelo='Atego', marca='Mercedes', ano_fabricacao=2020)
+        self.trator = Veiculo.objects.create(placa='TRT0001', modelo='6110J', marca='John Deere', ano_fabricacao=2019)
+        self.inicio = timezone.make_aware(datetime.datetime(2026, 3, 1, 8))
+
+    def _abastecer(self, veiculo, dia, km, litros='40.00'):
+        return Abastecimento.objects.create(
+            veiculo=veiculo, tipo_combustivel=self.diesel, data_hora=self.inicio + datetime.timedelta(days=dia),
+            quantidade_litros=Decimal(litros), valor_por_litro=Decimal('6.00'), quilometragem_atual=Decimal(km),
+        )
+
+    def test_recalcula_cada_veiculo_uma_vez_por_transacao(self):
+        with mock.patch.object(consumo, 'recalcular_consumo', wraps=consumo.recalcular_consumo) as recalcular:
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    for dia in range(5):
+                        self._abastecer(self.caminhao, dia, 1000 + 400 * dia)
+                    self._abastecer(self.trator, 0, 50)
+                    self._abastecer(self.trator, 1, 90)
+        self.assertEqual(recalcular.call_count, 1)
+        self.assertTrue({self.caminhao.pk, self.trator.pk} <= set(recalcular.call_args.args[0]))
+        self.assertEqual(ConsumoAbastecimento.objects.count(), 7)
+        self.assertEqual(EstatisticaConsumoVeiculo.objects.get(veiculo=self.caminhao).media_km_por_litro, Decimal('10.00'))
+
+    def test_consumo_apos_excluir_abastecimento_intermediario(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self._abastecer(self.caminhao, 0, 1000)
+            intermediario = self._abastecer(self.caminhao, 1, 1400)
+            ultimo = self._abastecer(self.caminhao, 2, 1800)
+        self.assertEqual(ConsumoAbastecimento.objects.get(pk=ultimo.pk).km_por_litro, Decimal('10.00'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            intermediario.delete()
+        # O LAG passa a comparar com o abastecimento anterior ao excluído
+        consumo_ultimo = ConsumoAbastecimento.objects.get(pk=ultimo.pk)
+        self.assertEqual((consumo_ultimo.km_percorridos, consumo_ultimo.km_por_litro), (Decimal('800.00'), Decimal('20.00')))
+        estatistica = EstatisticaConsumoVeiculo.objects.get(veiculo=self.caminhao)
+        self.assertEqual((estatistica.quantidade_abastecimentos, estatistica.km_medidos), (2, Decimal('800.00')))
 
-# Create your tests here.
+    def test_hodometro_regressivo(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self._abastecer(self.caminhao, 0, 1000)
+            errado = self._abastecer(self.caminhao, 1, 900)
+        self.assertEqual(ConsumoAbastecimento.objects.get(pk=errado.pk).anomalia, 'hodometro_regressivo')
+        self.assertEqual(list(consumo.anomalias(self.caminhao).values_list('pk', flat=True)), [errado.pk])
@@ -5,4 +5,6 @@ app_name = 'veiculos'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('abastecimentos/exportar/', views.abastecimentos_exportar, name='abastecimentos_exportar'),
+    path('manutencoes/exportar/', views.manutencoes_exportar, name='manutencoes_exportar'),
 ]
\ No newline at end of file
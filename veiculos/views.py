@@ -1,8 +1,48 @@
-from django.shortcuts import render
+from django.contrib.admin.views.decorators import staff_member_required
 
-def index(request):
+from projeto_integrador.cache_paineis import pagina_em_cache
+from projeto_integrador.exportacao import exportar
+from . import painel as painel_veiculos
+from .models import Abastecimento, Manutencao
+
+async def index(request):
     """
     View para a página inicial do módulo Veículos.
+    Painel com os indicadores do módulo, consultados ao mesmo tempo e mantidos em cache.
     """
     # Renderiza o template veiculos/index.html
-    return render(request, 'veiculos/index.html')
\ No newline at end of file
+    return await pagina_em_cache('veiculos/index.html', painel_veiculos.INDICADORES)
+
+COLUNAS_EXPORTACAO_ABASTECIMENTOS = [
+    ('id', 'ID'), ('veiculo__placa', 'Placa'), ('data_hora', 'Data/hora'), ('tipo_combustivel__nome', 'Combustível'),
+    ('quantidade_litros', 'Litros'), ('valor_por_litro', 'Valor por litro'),
+    ('quilometragem_atual', 'Quilometragem'), ('posto_combustivel', 'Posto'), ('observacoes', 'Observações'),
+]
+
+COLUNAS_EXPORTACAO_MANUTENCOES = [
+    ('id', 'ID'), ('veiculo__placa', 'Placa'), ('tipo_manutencao__nome', 'Tipo de manutenção'),
+    ('data_servico', 'Data do serviço'), ('quilometragem_servico', 'Quilometragem'),
+    ('descricao_servico', 'Descrição'), ('custo_total', 'Custo total'), ('oficina', 'Oficina'),
+]
+
+def _filtrar_por_veiculo(request, queryset):
+    veiculo = request.GET.get('veiculo', '')
+    if veiculo.isdigit():
+        queryset = queryset.filter(veiculo_id=int(veiculo))
+    return queryset
+
+@staff_member_required
+def abastecimentos_exportar(request):
+    """
+    Exportação dos abastecimentos em CSV ou XLSX (?formato=), opcionalmente de um veículo (?veiculo=id).
+    """
+    abastecimentos = _filtrar_por_veiculo(request, Abastecimento.objects.order_by('data_hora', 'id'))
+    return exportar(request, abastecimentos, COLUNAS_EXPORTACAO_ABASTECIMENTOS, 'abastecimentos')
+
+@staff_member_required
+def manutencoes_exportar(request):
+    """
+    Exportação das manutenções em CSV ou XLSX (?formato=), opcionalmente de um veículo (?veiculo=id).
+    """
+    manutencoes = _filtrar_por_veiculo(request, Manutencao.objects.order_by('data_servico', 'id'))
+    return exportar(request, manutencoes, COLUNAS_EXPORTACAO_MANUTENCOES, 'manutencoes')